@@ -0,0 +1,108 @@
+"""
+Excel 清算文件读取基准测试
+
+对比以下读取方式在同一份 .xlsx 上的耗时：
+- two_pass: 旧实现，read_excel(header=None) 定位表头后再 read_excel(header=n) 读一遍
+- openpyxl: DataCleaner._load_excel 单次读取（openpyxl 只读模式）
+- calamine: 单次读取，使用 python-calamine 引擎（未安装时跳过）
+- stream: DataCleaner.iter_clean_chunks 分块读取（openpyxl 只读模式逐行）
+
+用法:
+    python benchmarks/bench_excel_loader.py                      # 将样例文件复制 20 份生成大文件
+    python benchmarks/bench_excel_loader.py --input export.xlsx  # 使用真实导出文件
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+from trade_analysis.models.data_cleaner import DataCleaner
+
+SAMPLE_PATH = str(Path(__file__).parent.parent / 'data' / 'raw' / '23_26_settlement.xlsx')
+
+
+def build_large_export(sample_path: str, repeat: int, output_path: str) -> int:
+    """将样例导出的数据行复制 repeat 份，保留表头前的标题行"""
+    df_raw = pd.read_excel(sample_path, header=None)
+    header_row = DataCleaner(sample_path).parser.detect_file_structure(df_raw)['header_row']
+    head = df_raw.iloc[:header_row + 1]
+    body = pd.concat([df_raw.iloc[header_row + 1:]] * repeat, ignore_index=True)
+    pd.concat([head, body], ignore_index=True).to_excel(output_path, header=False, index=False)
+    return len(body)
+
+
+def load_two_pass(filepath: str) -> int:
+    cleaner = DataCleaner(filepath)
+    df_raw = pd.read_excel(filepath, header=None)
+    header_row = cleaner.parser.detect_file_structure(df_raw)['header_row']
+    df = pd.read_excel(filepath, header=header_row)
+    return len(cleaner.parser.parse_frame(cleaner._standardize_columns(df)))
+
+
+def load_single_pass(filepath: str, engine: str = None) -> int:
+    cleaner = DataCleaner(filepath)
+    df_raw = pd.read_excel(filepath, header=None, engine=engine)
+    header_row = cleaner.parser.detect_file_structure(df_raw)['header_row']
+    df = cleaner._slice_header(df_raw, header_row)
+    return len(cleaner.parser.parse_frame(cleaner._standardize_columns(df)))
+
+
+def load_stream(filepath: str) -> int:
+    return sum(len(chunk) for chunk in DataCleaner(filepath).iter_clean_chunks())
+
+
+def has_calamine() -> bool:
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def run(filepath: str, rounds: int):
+    cases = [
+        ('two_pass', lambda: load_two_pass(filepath)),
+        ('openpyxl', lambda: load_single_pass(filepath, 'openpyxl')),
+    ]
+    if has_calamine():
+        cases.append(('calamine', lambda: load_single_pass(filepath, 'calamine')))
+    else:
+        print("python-calamine 未安装，跳过 calamine")
+    cases.append(('stream', lambda: load_stream(filepath)))
+
+    results = []
+    for name, func in cases:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            rows = func()
+            timings.append(time.perf_counter() - started)
+        results.append({'方式': name, '记录数': rows, '最快(s)': min(timings)})
+
+    report = pd.DataFrame(results)
+    report['相对 two_pass'] = report['最快(s)'].iloc[0] / report['最快(s)']
+    print(report.to_string(index=False, float_format='{:.2f}'.format))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Excel 清算文件读取基准测试')
+    parser.add_argument('--input', help='清算文件路径（.xlsx），不指定时由样例文件生成')
+    parser.add_argument('--repeat', type=int, default=20, help='生成文件时样例数据的复制份数')
+    parser.add_argument('--rounds', type=int, default=3, help='每种方式运行次数，取最快一次')
+    args = parser.parse_args()
+
+    if args.input:
+        run(args.input, args.rounds)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'settlement.xlsx')
+            rows = build_large_export(SAMPLE_PATH, args.repeat, path)
+            print(f"生成测试文件: {rows} 行")
+            run(path, args.rounds)
@@ -0,0 +1,87 @@
+"""
+Excel 报告写出基准测试
+
+对比 ReportGenerator.generate_excel_report 两种模式在不同交易明细行数下的耗时和内存峰值：
+- normal: 普通工作簿，所有单元格对象留在内存中直到保存
+- stream: openpyxl 只写模式，按批把 DataFrame 转换后逐行写出
+
+内存峰值用 tracemalloc 统计（openpyxl 为纯 Python 实现，分配都能被统计到；统计本身会使耗时成倍增加）。
+只写模式的内存峰值应基本不随行数增长。
+
+用法:
+    python benchmarks/bench_excel_report.py                      # 默认 25k/50k/100k 行
+    python benchmarks/bench_excel_report.py --rows 100000 200000
+"""
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+import pandas as pd
+from trade_analysis.models.report_generator import ReportGenerator
+
+
+def build_trade_results(rows: int, seed: int = 0) -> pd.DataFrame:
+    """生成与 PerformanceCalculator.get_trade_results_df 列相同的交易明细"""
+    rng = np.random.default_rng(seed)
+    buy_date = pd.Timestamp('2015-01-05') + pd.to_timedelta(rng.integers(0, 3000, rows), unit='D')
+    buy_price = rng.uniform(5, 100, rows).round(2)
+    sell_price = (buy_price * rng.normal(1.0, 0.08, rows)).round(2)
+    quantity = rng.integers(1, 100, rows) * 100
+    profit = ((sell_price - buy_price) * quantity).round(2)
+    return pd.DataFrame({
+        '证券代码': [f'{code:06d}' for code in rng.integers(1, 4000, rows)],
+        '证券名称': '样例证券',
+        '买入日期': buy_date,
+        '卖出日期': buy_date + pd.to_timedelta(rng.integers(1, 60, rows), unit='D'),
+        '买入价格': buy_price,
+        '卖出价格': sell_price,
+        '数量': quantity,
+        '盈亏': profit,
+        '盈亏率(%)': (sell_price / buy_price - 1) * 100,
+        '是否盈利': np.where(profit > 0, '是', '否'),
+    })
+
+
+def measure(generator: ReportGenerator, data: dict, streaming: bool) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    generator.generate_excel_report(data, 'bench.xlsx', streaming=streaming)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def run(row_counts):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = ReportGenerator(tmp)
+        for rows in row_counts:
+            trade_results = build_trade_results(rows)
+            data = {
+                'trade_results': trade_results,
+                'stock_performance': trade_results.groupby('证券代码', as_index=False)['盈亏'].sum(),
+            }
+            for name, streaming in [('normal', False), ('stream', True)]:
+                elapsed, peak = measure(generator, data, streaming)
+                results.append({'行数': rows, '方式': name, '耗时(s)': elapsed, '内存峰值(MB)': peak})
+                print(f"  {rows} 行 {name}: {elapsed:.2f}s, {peak:.1f}MB")
+
+    print(pd.DataFrame(results).to_string(index=False, float_format='{:.2f}'.format))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Excel 报告写出基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[25_000, 50_000, 100_000], help='交易明细行数')
+    args = parser.parse_args()
+
+    run(args.rows)
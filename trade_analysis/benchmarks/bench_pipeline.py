@@ -0,0 +1,194 @@
+"""
+端到端基准测试
+
+用模拟交割单（tools/settlement_generator.py）在不同数据量下逐阶段计时：
+- generate / write: 生成模拟数据并写出 GBK 文本 .xls（不参与回归比较）
+- load: DataCleaner.load_data（读取 + RecordParser 解析）
+- clean: DataCleaner.clean
+- db_insert / db_load: 写入临时数据库、整表读回
+- fifo: PerformanceCalculator 先进先出配对
+- nav: 每日资产曲线
+- metrics: calculate_all_metrics（复用 fifo 阶段的配对结果）
+- analysis: TradeAnalyzer.run_analysis（不含 bootstrap，现价取各证券最后成交价）
+- report: Excel + HTML 报告
+
+结果写入 benchmarks/results/pipeline_<时间>.json；指定 --baseline 时与之前的结果逐项比较，
+耗时超过基准 (1 + threshold) 倍的阶段记为回归，存在回归时退出码为 1。
+
+用法:
+    python benchmarks/bench_pipeline.py                                   # 10k/100k/1M 行
+    python benchmarks/bench_pipeline.py --rows 10000 100000 --stages load clean fifo nav
+    python benchmarks/bench_pipeline.py --rows 100000 --baseline benchmarks/results/pipeline_xxx.json
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+import pandas as pd
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.models.data_cleaner import DataCleaner
+from trade_analysis.models.performance import PerformanceCalculator
+from trade_analysis.models.report_generator import ReportGenerator
+from trade_analysis.services.analyzer import TradeAnalyzer, AnalysisConfig
+from trade_analysis.tools.settlement_generator import SyntheticConfig, generate_settlement, write_settlement
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+STAGES = ['generate', 'write', 'load', 'clean', 'db_insert', 'db_load', 'fifo', 'nav', 'metrics', 'analysis', 'report']
+
+# 只用于准备数据，不参与回归比较
+SETUP_STAGES = {'generate', 'write'}
+
+# 基准耗时低于该值的阶段波动较大，不判定回归
+MIN_COMPARE_SECONDS = 0.05
+
+
+def _timed(results: list, rows: int, stage: str, func):
+    started = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - started
+    results.append({'rows': rows, 'stage': stage, 'seconds': elapsed})
+    print(f"  {rows} 行 {stage}: {elapsed:.3f}s")
+    return value
+
+
+def run_size(rows: int, stages: set, workdir: Path, seed: int) -> list:
+    """
+    在 rows 行的模拟数据上运行所选阶段；后续阶段依赖的数据总会生成，但只记录所选阶段的耗时
+    """
+    results = []
+
+    def step(stage, func):
+        if stage in stages:
+            return _timed(results, rows, stage, func)
+        return func()
+
+    path = str(workdir / f'synthetic_{rows}.xls')
+    raw = step('generate', lambda: generate_settlement(SyntheticConfig(records=rows, seed=seed)))
+    step('write', lambda: write_settlement(raw, path))
+    del raw
+
+    cleaner = DataCleaner(path)
+    step('load', cleaner.load_data)
+    df = step('clean', cleaner.clean)
+
+    if stages & {'db_insert', 'db_load'}:
+        db = DatabaseManager(str(workdir / f'bench_{rows}.db'))
+        step('db_insert', lambda: db.insert_trade_records(df))
+        if 'db_load' in stages:
+            step('db_load', db.get_all_trade_records)
+
+    if 'fifo' in stages or 'metrics' in stages:
+        calculator = PerformanceCalculator(df)
+        step('fifo', calculator._calculate_trade_results)
+        if 'metrics' in stages:
+            step('metrics', calculator.calculate_all_metrics)
+    if 'nav' in stages:
+        step('nav', PerformanceCalculator(df)._calculate_daily_total_assets)
+
+    if stages & {'analysis', 'report'}:
+        trades = df[df['trade_type'].isin(['buy', 'sell'])]
+        last_price = trades.groupby('security_code', observed=True)['price'].last().to_dict()
+        config = AnalysisConfig(manual_prices=last_price, bootstrap_resamples=0)
+        result = step('analysis', lambda: TradeAnalyzer.from_dataframe(df, config).run_analysis())
+        if 'report' in stages:
+            generator = ReportGenerator(str(workdir))
+            step('report', lambda: generator.generate_from_result(result, formats=['excel', 'html']))
+
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        commit = ''
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def compare(current: list, baseline_path: str, threshold: float) -> pd.DataFrame:
+    """
+    与基准结果逐项比较，返回含 baseline、ratio、regression 列的表
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = pd.DataFrame(json.load(f)['results'])
+    table = pd.DataFrame(current).merge(
+        baseline.rename(columns={'seconds': 'baseline'}), on=['rows', 'stage'], how='left'
+    )
+    table['ratio'] = table['seconds'] / table['baseline']
+    table['regression'] = (
+        ~table['stage'].isin(SETUP_STAGES)
+        & (table['baseline'] >= MIN_COMPARE_SECONDS)
+        & (table['ratio'] > 1 + threshold)
+    )
+    return table
+
+
+def run(row_counts, stages, baseline=None, threshold=0.2, save=None, seed=0) -> int:
+    logging.disable(logging.WARNING)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in row_counts:
+            results.extend(run_size(rows, set(stages), Path(tmp), seed))
+
+    table = pd.DataFrame(results)
+    print(table.pivot(index='stage', columns='rows', values='seconds')
+          .reindex([s for s in STAGES if s in stages]).to_string(float_format='{:.3f}'.format))
+
+    if save is not False:
+        path = Path(save) if save else RESULTS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**environment(), 'seed': seed, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {path}")
+
+    if baseline:
+        comparison = compare(results, baseline, threshold)
+        print(f"\n与基准 {baseline} 比较（阈值 +{threshold:.0%}）:")
+        print(comparison.to_string(index=False, float_format='{:.3f}'.format))
+        regressions = comparison[comparison['regression']]
+        if not regressions.empty:
+            print(f"\n发现 {len(regressions)} 项回归")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='端到端基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='模拟记录数')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='计时的阶段')
+    parser.add_argument('--baseline', type=str, default=None, help='用于比较的历史结果 JSON')
+    parser.add_argument('--threshold', type=float, default=0.2, help='判定回归的耗时增幅')
+    parser.add_argument('--save', type=str, default=None, help='结果保存路径，默认 benchmarks/results/')
+    parser.add_argument('--no-save', action='store_true', help='不保存结果')
+    parser.add_argument('--seed', type=int, default=0, help='模拟数据随机种子')
+    args = parser.parse_args()
+
+    sys.exit(run(
+        args.rows, args.stages,
+        baseline=args.baseline, threshold=args.threshold,
+        save=False if args.no_save else args.save, seed=args.seed,
+    ))
@@ -0,0 +1,504 @@
+"""
+交易分析命令行（非交互）
+
+与 main.py 的交互菜单使用相同的分析流程，所有选项由命令行参数给出，可用于定时任务：
+
+    python -m trade_analysis.cli analyze --mode all --report xlsx,html
+    python -m trade_analysis.cli analyze --mode stock --since 20240101 --workers 8
+    python -m trade_analysis.cli analyze --mode stock --codes 600000,000001 --offline
+
+个股模式下交易记录只读取一次，按证券切片后在进程池中并行分析，每只证券生成
+trade_report_<代码>.xlsx/.html，并在输出目录写出汇总表 batch_summary.csv。
+持仓现价和基准指数行情在主进程中统一获取（实时行情 → daily_prices 缓存 → 0），
+以 manual_prices / benchmark_close 传给各任务；任务使用关闭全部数据源的 PriceFetcher，
+子进程不访问任何数据源，也不写 daily_prices。
+派生结果缓存位于数据库所在目录的 cache/ 下（可用 --cache-dir 指定）。
+
+serve 启动本地只读分析服务，常驻内存回答持仓、净值、逐股绩效等查询（见 services/api_server.py）：
+
+    python -m trade_analysis.cli serve --port 8765
+
+--profile 输出各阶段（读取、清洗、数据库、行情、FIFO、资产曲线、报告）的调用次数、耗时和数据量，
+子进程中的统计汇总到主进程；--profile-memory 另外记录各阶段峰值内存。
+
+退出码：0 全部成功，1 有任务失败，2 参数或数据错误。
+"""
+
+import argparse
+import functools
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# 将项目根目录添加到 Python 路径，支持直接运行此文件
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.main import DB_PATH, OUTPUT_PATH
+from trade_analysis.models.data_cleaner import DataCleaner
+from trade_analysis.models.profit_calculator import ProfitCalculator
+from trade_analysis.models.report_generator import ReportGenerator
+from trade_analysis.services.analyzer import TradeAnalyzer, AnalysisConfig, load_benchmark
+from trade_analysis.services.api_server import DEFAULT_HOST, DEFAULT_PORT, serve
+from trade_analysis.services.price_fetcher import PriceFetcher, DataSourceConfig
+from trade_analysis.services.result_cache import ResultCache
+from trade_analysis.utils.code_formatter import normalize_user_code
+from trade_analysis.utils.profiler import PROFILER
+
+logger = logging.getLogger(__name__)
+
+# 命令行报告格式 -> ReportGenerator 格式
+REPORT_FORMATS = {'xlsx': 'excel', 'excel': 'excel', 'html': 'html', 'console': 'console'}
+
+SUMMARY_COLUMNS = [
+    'security_code', 'security_name', 'records', 'buy_count', 'sell_count', 'current_position',
+    'realized_profit', 'profit_rate', 'total_trades', 'win_rate', 'seconds', 'files', 'error',
+]
+
+
+@dataclass
+class BatchJob:
+    """
+    单个分析任务（在子进程中执行，需可 pickle）
+
+    Attributes:
+        label: 任务名，用于报告文件名
+        df: 该任务的交易记录
+        config: 分析配置
+        formats: ReportGenerator 报告格式
+        output_dir: 报告目录
+        db_path: 数据库路径，用于基准行情、压力测试回放和结果缓存
+        cache_dir: 结果缓存目录，None 表示不缓存
+        security_summary: 个股模式下 security_summary 中的汇总行
+        benchmark_close: 主进程读取的基准指数收盘价
+        profile: 在子进程中记录阶段耗时，随结果返回
+        profile_memory: 同时记录峰值内存
+    """
+    label: str
+    df: pd.DataFrame
+    config: AnalysisConfig
+    formats: List[str]
+    output_dir: str
+    db_path: Optional[str] = None
+    cache_dir: Optional[str] = None
+    security_summary: Optional[Dict] = None
+    benchmark_close: Optional[pd.Series] = None
+    profile: bool = False
+    profile_memory: bool = False
+
+
+@dataclass
+class BatchResult:
+    """
+    单个任务的结果摘要
+    """
+    label: str
+    security_code: str = ''
+    security_name: str = ''
+    records: int = 0
+    buy_count: int = 0
+    sell_count: int = 0
+    current_position: int = 0
+    realized_profit: float = 0.0
+    profit_rate: float = 0.0
+    total_trades: int = 0
+    win_rate: float = 0.0
+    seconds: float = 0.0
+    files: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    profile: Optional[Dict] = None
+
+
+@functools.lru_cache(maxsize=None)
+def offline_price_fetcher() -> PriceFetcher:
+    """
+    关闭全部数据源的 PriceFetcher，每个进程创建一次
+    """
+    return PriceFetcher(DataSourceConfig.disabled())
+
+
+def run_job(job: BatchJob) -> BatchResult:
+    """
+    执行一个分析任务并生成报告，异常记录在结果中而不抛出
+    """
+    started = time.perf_counter()
+    outcome = BatchResult(label=job.label, security_code=job.config.stock_code or '', records=len(job.df))
+    # 主进程中直接执行时计时器已开启，统计直接记入；子进程中按任务单独记录后随结果返回
+    own_profile = job.profile and not PROFILER.enabled
+    if own_profile:
+        PROFILER.reset()
+        PROFILER.enable(memory=job.profile_memory)
+    try:
+        db = DatabaseManager(job.db_path) if job.db_path else None
+        cache = ResultCache(job.cache_dir, db) if db is not None and job.cache_dir else None
+        analyzer = TradeAnalyzer.from_dataframe(
+            job.df, job.config, security_summary=job.security_summary, db=db, cache=cache,
+            price_fetcher=offline_price_fetcher(), benchmark_close=job.benchmark_close
+        )
+        result = analyzer.run_analysis()
+
+        stats = result.summary.get('stock_stats') or {}
+        outcome.security_name = stats.get('stock_name', '')
+        outcome.buy_count = stats.get('buy_count', result.summary['buy_count'])
+        outcome.sell_count = stats.get('sell_count', result.summary['sell_count'])
+        outcome.current_position = stats.get('current_position', 0)
+        outcome.realized_profit = stats.get('realized_profit', 0.0)
+        outcome.profit_rate = stats.get('profit_rate', 0.0)
+        if result.performance_metrics:
+            outcome.total_trades = result.performance_metrics.total_trades
+            outcome.win_rate = result.performance_metrics.win_rate
+
+        prefix = 'trade_report' if job.label == 'all' else f'trade_report_{job.label}'
+        files = ReportGenerator(job.output_dir).generate_from_result(
+            result, formats=job.formats, filename_prefix=prefix
+        )
+        outcome.files = {name: path for name, path in files.items() if path and path != 'printed'}
+    except Exception as e:
+        logger.exception(f"任务 {job.label} 失败")
+        outcome.error = f"{type(e).__name__}: {e}"
+    if own_profile:
+        outcome.profile = PROFILER.snapshot()
+        PROFILER.disable()
+        PROFILER.reset()
+    outcome.seconds = time.perf_counter() - started
+    return outcome
+
+
+def _init_worker() -> None:
+    """
+    子进程初始化：fork 时会继承主进程的计时器状态，清空后由任务自行开启
+    """
+    PROFILER.disable()
+    PROFILER.reset()
+
+
+def run_batch(jobs: Sequence[BatchJob], workers: int = 1) -> List[BatchResult]:
+    """
+    执行一组任务，workers > 1 时使用进程池；结果按任务顺序返回
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return [run_job(job) for job in jobs]
+
+    results: Dict[int, BatchResult] = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker) as executor:
+        futures = {executor.submit(run_job, job): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i] = future.result()
+            if results[i].profile:
+                PROFILER.merge(results[i].profile)
+            status = '失败' if results[i].error else f'{results[i].seconds:.1f}s'
+            logger.info(f"[{done}/{len(jobs)}] {jobs[i].label} {status}")
+    return [results[i] for i in range(len(jobs))]
+
+
+def resolve_close_prices(
+    df: pd.DataFrame,
+    db: Optional[DatabaseManager],
+    offline: bool = False,
+    manual: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    """
+    期末持仓现价：手动价格 → 实时行情（offline 时跳过）→ daily_prices 最新收盘价 → 0
+
+    实时获取到的价格以当日日期写回 daily_prices，与交互模式一致
+    """
+    positions = ProfitCalculator(df)._calculate_positions()
+    prices = {code: price for code, price in (manual or {}).items() if code in positions}
+    missing = [code for code in positions if code not in prices]
+
+    if missing and not offline:
+        fetched = {}
+        with PriceFetcher() as price_fetcher:
+            for code in missing:
+                price = price_fetcher.get_latest_price(code)
+                if price is not None and price > 0:
+                    fetched[code] = price
+        if fetched and db is not None:
+            today = pd.Timestamp.now().strftime('%Y%m%d')
+            db.save_daily_prices([
+                {'date': today, 'security_code': code, 'close_price': price} for code, price in fetched.items()
+            ])
+        prices.update(fetched)
+        missing = [code for code in missing if code not in fetched]
+
+    if missing and db is not None:
+        cached = db.get_all_latest_prices()
+        prices.update({code: cached[code] for code in missing if code in cached})
+        missing = [code for code in missing if code not in prices]
+
+    for code in missing:
+        logger.warning(f"无法获取股票 {code} 的价格，按 0 计算")
+        prices[code] = 0.0
+    return prices
+
+
+def parse_manual_prices(items: Sequence[str]) -> Dict[str, float]:
+    """
+    解析 代码=价格 列表
+    """
+    prices = {}
+    for item in items:
+        code, sep, price = item.partition('=')
+        if not sep:
+            raise ValueError(f"价格格式应为 代码=价格: {item}")
+        prices[normalize_user_code(code.strip())] = float(price)
+    return prices
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='trade_analysis', description='交易分析（非交互批处理）')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    analyze = commands.add_parser('analyze', help='分析并生成报告')
+    analyze.add_argument('--mode', choices=['all', 'stock'], default='all',
+                         help='all: 账户整体分析；stock: 逐只证券分析')
+    analyze.add_argument('--codes', type=str, default=None,
+                         help='个股模式的证券代码，逗号分隔，默认所有有买卖记录的证券')
+    analyze.add_argument('--since', type=str, default=None, help='开始日期 YYYYMMDD')
+    analyze.add_argument('--until', type=str, default=None, help='结束日期 YYYYMMDD')
+    analyze.add_argument('--report', type=str, default='xlsx,html',
+                         help=f"报告格式，逗号分隔: {','.join(REPORT_FORMATS)}")
+    analyze.add_argument('--input', '-i', type=str, default=None,
+                         help='直接分析清算文件，不读取数据库中的交易记录')
+    analyze.add_argument('--db', type=str, default=DB_PATH, help='数据库路径')
+    analyze.add_argument('--output', '-o', type=str, default=OUTPUT_PATH, help='报告目录')
+    analyze.add_argument('--workers', '-j', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    analyze.add_argument('--price', action='append', default=[], metavar='CODE=PRICE',
+                         help='手动设置现价，可重复')
+    analyze.add_argument('--offline', action='store_true',
+                         help='不访问行情数据源，现价只取 daily_prices 缓存')
+    analyze.add_argument('--benchmark', type=str, default=None, help='基准指数代码，默认不对比')
+    analyze.add_argument('--bootstrap', type=int, default=0, help='bootstrap 重抽样次数，默认不计算')
+    analyze.add_argument('--no-cache', action='store_true', help='不使用派生结果缓存')
+    analyze.add_argument('--cache-dir', type=str, default=None,
+                         help='派生结果缓存目录，默认为数据库所在目录下的 cache/')
+    analyze.add_argument('--profile', nargs='?', const='', default=None, metavar='JSON',
+                         help='输出各阶段耗时，并写出 JSON（默认 <output>/profile.json）')
+    analyze.add_argument('--profile-memory', action='store_true',
+                         help='配合 --profile 用 tracemalloc 记录各阶段峰值内存（明显变慢）')
+    analyze.add_argument('--verbose', '-v', action='store_true', help='输出 INFO 日志')
+
+    server = commands.add_parser('serve', help='启动本地只读分析服务（HTTP/JSON）')
+    server.add_argument('--db', type=str, default=DB_PATH, help='数据库路径')
+    server.add_argument('--host', type=str, default=DEFAULT_HOST, help='监听地址，默认只接受本机访问')
+    server.add_argument('--port', type=int, default=DEFAULT_PORT, help='端口')
+    server.add_argument('--price', action='append', default=[], metavar='CODE=PRICE',
+                        help='手动设置现价（覆盖 daily_prices 收盘价），可重复')
+    server.add_argument('--refresh-interval', type=float, default=1.0,
+                        help='检查数据库数据版本的最小间隔（秒）')
+    server.add_argument('--verbose', '-v', action='store_true', help='输出 INFO 日志')
+    return parser
+
+
+def resolve_benchmark(
+    code: Optional[str],
+    df: pd.DataFrame,
+    db: Optional[DatabaseManager],
+    offline: bool = False
+) -> Optional[pd.Series]:
+    """
+    基准指数收盘价：daily_prices 缓存 → 数据源（offline 时跳过），获取到的行情写回 daily_prices
+    """
+    if not code or df.empty:
+        return None
+    start, end = df['date'].min(), df['date'].max()
+    if offline:
+        return load_benchmark(code, start, end, offline_price_fetcher(), db)
+    with PriceFetcher() as price_fetcher:
+        return load_benchmark(code, start, end, price_fetcher, db)
+
+
+def load_records(args) -> tuple:
+    """
+    读取交易记录，返回 (DataFrame, DatabaseManager 或 None)
+    """
+    if args.input:
+        cleaner = DataCleaner(args.input)
+        cleaner.load_data()
+        df = cleaner.clean()
+        # 只有显式指定 --db 时才使用数据库（行情缓存），避免创建空库
+        db = DatabaseManager(args.db) if args.db != DB_PATH else None
+        return df, db
+
+    if not Path(args.db).exists():
+        raise FileNotFoundError(f"数据库不存在: {args.db}")
+    db = DatabaseManager(args.db)
+    return db.get_all_trade_records(), db
+
+
+def build_jobs(args, df: pd.DataFrame, db: Optional[DatabaseManager]) -> List[BatchJob]:
+    """
+    按参数生成分析任务
+    """
+    names = [name.strip().lower() for name in args.report.split(',') if name.strip()]
+    unknown = [name for name in names if name not in REPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"未知报告格式: {', '.join(unknown)}")
+    formats = list(dict.fromkeys(REPORT_FORMATS[name] for name in names))
+    dated = bool(args.since or args.until)
+    # 数据来自文件时缓存键无法反映数据内容，不使用缓存
+    if args.no_cache or args.input or db is None:
+        cache_dir = None
+    else:
+        cache_dir = args.cache_dir or str(Path(db.db_path).parent / 'cache')
+
+    manual = parse_manual_prices(args.price)
+
+    window = df
+    if args.since:
+        window = window[window['date'] >= pd.to_datetime(args.since, format='%Y%m%d')]
+    if args.until:
+        window = window[window['date'] <= pd.to_datetime(args.until, format='%Y%m%d')]
+
+    benchmark_close = resolve_benchmark(args.benchmark, window, db, offline=args.offline)
+    base = dict(
+        start_date=args.since,
+        end_date=args.until,
+        bootstrap_resamples=args.bootstrap,
+        benchmark_code=args.benchmark if benchmark_close is not None else None,
+    )
+
+    common = dict(
+        formats=formats,
+        output_dir=args.output,
+        db_path=str(db.db_path) if db is not None else None,
+        cache_dir=cache_dir,
+        benchmark_close=benchmark_close,
+        profile=args.profile is not None,
+        profile_memory=args.profile_memory,
+    )
+
+    if args.mode == 'all':
+        prices = resolve_close_prices(window, db, offline=args.offline, manual=manual)
+        config = AnalysisConfig(mode='period' if dated else 'full', manual_prices=prices, **base)
+        return [BatchJob(label='all', df=df, config=config, **common)]
+
+    if args.codes:
+        codes = [normalize_user_code(code.strip()) for code in args.codes.split(',') if code.strip()]
+    else:
+        traded = df[df['trade_type'].isin(['buy', 'sell'])]['security_code']
+        codes = sorted(traded[traded != ''].unique())
+    prices = resolve_close_prices(
+        window[window['security_code'].isin(codes)], db, offline=args.offline, manual=manual
+    )
+
+    jobs = []
+    by_code = dict(tuple(df.groupby('security_code', sort=False)))
+    for code in codes:
+        records = by_code.get(code)
+        if records is None:
+            logger.warning(f"没有证券 {code} 的交易记录，跳过")
+            continue
+        config = AnalysisConfig(
+            mode='stock', stock_code=code,
+            manual_prices={c: p for c, p in prices.items() if c == code}, **base
+        )
+        # security_summary 为全历史汇总，只在不限日期时使用
+        summary = db.get_security_summary(code) if db is not None and not dated and not args.input else None
+        jobs.append(BatchJob(label=code, df=records, config=config, security_summary=summary, **common))
+    return jobs
+
+
+def write_summary(results: Sequence[BatchResult], output_dir: str) -> str:
+    """
+    写出批处理汇总表
+    """
+    rows = []
+    for r in results:
+        row = asdict(r)
+        row['files'] = ';'.join(r.files.values())
+        rows.append(row)
+    table = pd.DataFrame(rows, columns=['label'] + SUMMARY_COLUMNS)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    path = str(Path(output_dir) / 'batch_summary.csv')
+    table.to_csv(path, index=False, encoding='utf-8-sig')
+    return path
+
+
+def analyze_command(args) -> int:
+    if args.profile is not None:
+        PROFILER.reset()
+        PROFILER.enable(memory=args.profile_memory)
+    try:
+        return _analyze(args)
+    finally:
+        if args.profile is not None:
+            print("\n阶段耗时:")
+            print(PROFILER.format_table())
+            Path(args.output).mkdir(parents=True, exist_ok=True)
+            path = args.profile or str(Path(args.output) / 'profile.json')
+            print(f"阶段耗时 JSON: {PROFILER.dump_json(path)}")
+            PROFILER.disable()
+
+
+def _analyze(args) -> int:
+    try:
+        with PROFILER.span('cli.load_records'):
+            df, db = load_records(args)
+    except Exception as e:
+        print(f"读取数据失败: {e}", file=sys.stderr)
+        return 2
+    if df.empty:
+        print("没有交易记录", file=sys.stderr)
+        return 2
+
+    try:
+        with PROFILER.span('cli.build_jobs'):
+            jobs = build_jobs(args, df, db)
+    except ValueError as e:
+        print(f"参数错误: {e}", file=sys.stderr)
+        return 2
+    if not jobs:
+        print("没有需要分析的证券", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    print(f"分析 {len(jobs)} 个任务，{min(args.workers, len(jobs))} 个进程")
+    with PROFILER.span('cli.run_batch'):
+        results = run_batch(jobs, workers=args.workers)
+    summary_path = write_summary(results, args.output)
+
+    failed = [r for r in results if r.error]
+    print(f"完成 {len(results) - len(failed)}/{len(results)}，用时 {time.perf_counter() - started:.1f}s")
+    print(f"汇总表: {summary_path}")
+    for r in failed:
+        print(f"  失败 {r.label}: {r.error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def serve_command(args) -> int:
+    if not Path(args.db).exists():
+        print(f"数据库不存在: {args.db}", file=sys.stderr)
+        return 2
+    try:
+        manual_prices = parse_manual_prices(args.price)
+        serve(args.db, host=args.host, port=args.port, manual_prices=manual_prices,
+              refresh_interval=args.refresh_interval)
+    except ValueError as e:
+        print(f"启动失败: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    if args.command == 'analyze':
+        return analyze_command(args)
+    if args.command == 'serve':
+        return serve_command(args)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,4 @@
 from .database import DatabaseManager
+from .analytics import DuckDBAnalytics, PandasAnalytics, open_analytics, export_parquet
 
-__all__ = ['DatabaseManager']
+__all__ = ['DatabaseManager', 'DuckDBAnalytics', 'PandasAnalytics', 'open_analytics', 'export_parquet']
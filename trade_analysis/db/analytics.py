@@ -0,0 +1,450 @@
+"""
+数据库聚合查询
+
+持仓、月度/年度汇总、逐股绩效、价格覆盖等聚合有两种实现，接口和返回的 DataFrame 形状相同：
+- DuckDBAnalytics: 嵌入式 DuckDB（无需服务），ATTACH 现有的 trade_data.db 或读取 Parquet 快照，
+  聚合以列式 SQL 执行，只把结果表读回 pandas
+- PandasAnalytics: 未安装 duckdb 时的实现，从 SQLite 读取所需列后用 pandas 聚合
+
+结果与 ProfitCalculator / PerformanceCalculator / AsOfPositionIndex 的同名结果一致，报告层无需区分。
+
+使用方法:
+    from trade_analysis.db.analytics import open_analytics
+
+    with open_analytics('data/trade_data.db') as analytics:   # 安装了 duckdb 时使用 DuckDB
+        monthly = analytics.monthly_summary()
+        holdings = analytics.positions('20241231')
+
+    export_parquet('data/trade_data.db', 'data/parquet')       # 导出快照（需要 duckdb）
+    analytics = open_analytics(parquet_dir='data/parquet')
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .database import DEFAULT_DB_PATH
+from ..models.asof_index import AsOfPositionIndex, HOLDING_COLUMNS, POSITION_TYPES
+from ..utils.date_utils import to_day_number, day_numbers_to_datetime, day_number_to_timestamp
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TABLES = ('trade_records', 'daily_prices')
+
+MONTHLY_SUMMARY_COLUMNS = ['month', '净发生额']
+YEARLY_SUMMARY_COLUMNS = ['year', '净发生额']
+MONTHLY_PERFORMANCE_COLUMNS = ['月份', '盈亏合计', '交易次数', '盈利次数', '胜率(%)']
+STOCK_PERFORMANCE_COLUMNS = ['证券代码', '证券名称', '总盈亏', '平均盈亏', '平均盈亏率(%)', '盈利次数', '交易次数', '胜率(%)']
+PRICE_COVERAGE_COLUMNS = [
+    'security_code', 'security_name', 'first_trade_date', 'last_trade_date',
+    'price_days', 'first_price_date', 'last_price_date', 'covered',
+]
+
+DateLike = Union[str, pd.Timestamp]
+
+
+def _finish_holdings(df: pd.DataFrame, as_of: pd.Timestamp) -> pd.DataFrame:
+    """
+    security_code / security_name / quantity / cost 聚合结果补齐为 HOLDING_COLUMNS
+    """
+    quantity = df['quantity'].to_numpy(dtype=float)
+    cost = df['cost'].to_numpy(dtype=float)
+    holdings = pd.DataFrame({
+        'date': as_of,
+        'security_code': df['security_code'].astype(str).to_numpy(),
+        'security_name': df['security_name'].astype(str).to_numpy(),
+        'quantity': quantity,
+        'cost_price': np.divide(cost, quantity, out=np.zeros_like(cost), where=quantity > 0),
+        'cost': cost,
+    }, columns=HOLDING_COLUMNS)
+    return holdings[holdings['quantity'] > 0].reset_index(drop=True)
+
+
+def _finish_performance(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    df['胜率(%)'] = df['盈利次数'] / df['交易次数'] * 100
+    return df[columns].reset_index(drop=True)
+
+
+class PandasAnalytics:
+    """
+    pandas 实现：从 SQLite 读取所需列后聚合
+
+    Args:
+        db_path: SQLite 数据库路径
+    """
+
+    engine = 'pandas'
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+
+    def __enter__(self) -> 'PandasAnalytics':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+    def _read(self, query: str, params: tuple = ()) -> pd.DataFrame:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+
+    def _records(self, columns: str, where: str = '1 = 1', params: tuple = ()) -> pd.DataFrame:
+        df = self._read(f"SELECT {columns} FROM trade_records WHERE {where} ORDER BY date, id", params)
+        df['date'] = day_numbers_to_datetime(df['date'])
+        return df
+
+    def overview(self) -> Dict[str, Any]:
+        """
+        记录数、日期范围、买卖笔数、涉及证券数
+        """
+        row = self._read('''
+            SELECT COUNT(*) AS records, MIN(date) AS first_date, MAX(date) AS last_date,
+                   SUM(trade_type = 'buy') AS buy_count, SUM(trade_type = 'sell') AS sell_count,
+                   COUNT(DISTINCT NULLIF(security_code, '')) AS securities
+            FROM trade_records
+        ''').iloc[0]
+        return _overview(row)
+
+    def monthly_summary(self) -> pd.DataFrame:
+        """
+        按月汇总发生金额，与 ProfitCalculator.get_monthly_summary 相同
+        """
+        df = self._records('date, net_amount')
+        monthly = df.groupby(df['date'].dt.to_period('M'))['net_amount'].sum().reset_index()
+        monthly.columns = MONTHLY_SUMMARY_COLUMNS
+        monthly['month'] = monthly['month'].astype(str)
+        return monthly
+
+    def yearly_summary(self) -> pd.DataFrame:
+        """
+        按年汇总发生金额，与 ProfitCalculator.get_yearly_summary 相同
+        """
+        df = self._records('date, net_amount')
+        yearly = df.groupby(df['date'].dt.year)['net_amount'].sum().reset_index()
+        yearly.columns = YEARLY_SUMMARY_COLUMNS
+        return yearly
+
+    def positions(self, as_of: Optional[DateLike] = None) -> pd.DataFrame:
+        """
+        指定日期收盘后的持仓，与 AsOfPositionIndex.holdings_as_of 相同；as_of 为 None 时取最后交割日
+        """
+        placeholders = ', '.join('?' * len(POSITION_TYPES))
+        df = self._records(
+            'date, security_code, security_name, trade_type, quantity, amount, total_fee',
+            f'trade_type IN ({placeholders})', tuple(POSITION_TYPES)
+        )
+        if as_of is None:
+            as_of = day_number_to_timestamp(self._read('SELECT MAX(date) AS date FROM trade_records')['date'].iloc[0])
+        if as_of is None or df.empty:
+            return pd.DataFrame(columns=HOLDING_COLUMNS)
+        return AsOfPositionIndex(df).holdings_as_of(as_of)
+
+    def monthly_performance(self, trade_results: pd.DataFrame) -> pd.DataFrame:
+        """
+        按卖出月份汇总 FIFO 配对结果（PerformanceCalculator.get_trade_results_df），
+        与 PerformanceCalculator.get_monthly_performance 相同
+        """
+        if trade_results.empty:
+            return pd.DataFrame()
+        month = pd.to_datetime(trade_results['卖出日期']).dt.to_period('M').astype(str)
+        grouped = trade_results.assign(月份=month, 盈利=trade_results['是否盈利'] == '是').groupby('月份')
+        monthly = pd.DataFrame({
+            '盈亏合计': grouped['盈亏'].sum(),
+            '交易次数': grouped['盈亏'].count(),
+            '盈利次数': grouped['盈利'].sum(),
+        }).reset_index()
+        return _finish_performance(monthly, MONTHLY_PERFORMANCE_COLUMNS)
+
+    def stock_performance(self, trade_results: pd.DataFrame) -> pd.DataFrame:
+        """
+        按证券汇总 FIFO 配对结果，与 PerformanceCalculator.get_stock_performance 相同（按总盈亏降序）
+        """
+        if trade_results.empty:
+            return pd.DataFrame()
+        grouped = trade_results.assign(盈利=trade_results['是否盈利'] == '是').groupby(['证券代码', '证券名称'])
+        stock = pd.DataFrame({
+            '总盈亏': grouped['盈亏'].sum(),
+            '平均盈亏': grouped['盈亏'].mean(),
+            '平均盈亏率(%)': grouped['盈亏率(%)'].mean(),
+            '盈利次数': grouped['盈利'].sum(),
+            '交易次数': grouped['盈亏'].count(),
+        }).reset_index()
+        stock = stock.sort_values(['总盈亏', '证券代码'], ascending=[False, True], kind='mergesort')
+        return _finish_performance(stock, STOCK_PERFORMANCE_COLUMNS)
+
+    def price_coverage(self) -> pd.DataFrame:
+        """
+        每只交易过的证券在 daily_prices 中的收盘价覆盖情况
+
+        Returns:
+            DataFrame，列见 PRICE_COVERAGE_COLUMNS；covered 表示价格区间覆盖首次到最后一次交易日
+        """
+        placeholders = ', '.join('?' * len(POSITION_TYPES))
+        trades = self._records('date, security_code, security_name', f'trade_type IN ({placeholders})', tuple(POSITION_TYPES))
+        if trades.empty:
+            return pd.DataFrame(columns=PRICE_COVERAGE_COLUMNS)
+        traded = trades.groupby('security_code').agg(
+            security_name=('security_name', 'last'),
+            first_trade_date=('date', 'min'),
+            last_trade_date=('date', 'max'),
+        )
+
+        prices = self._read('SELECT security_code, date FROM daily_prices WHERE close_price IS NOT NULL')
+        prices['date'] = day_numbers_to_datetime(prices['date'])
+        priced = prices.groupby('security_code').agg(
+            price_days=('date', 'count'),
+            first_price_date=('date', 'min'),
+            last_price_date=('date', 'max'),
+        )
+
+        coverage = traded.join(priced, how='left').reset_index()
+        return _finish_coverage(coverage)
+
+
+def _overview(row: pd.Series) -> Dict[str, Any]:
+    return {
+        'records': int(row['records']),
+        'first_date': day_number_to_timestamp(row['first_date']),
+        'last_date': day_number_to_timestamp(row['last_date']),
+        'buy_count': int(row['buy_count'] or 0),
+        'sell_count': int(row['sell_count'] or 0),
+        'securities': int(row['securities']),
+    }
+
+
+def _finish_coverage(coverage: pd.DataFrame) -> pd.DataFrame:
+    coverage['price_days'] = coverage['price_days'].fillna(0).astype(int)
+    coverage['covered'] = (
+        (coverage['first_price_date'] <= coverage['first_trade_date'])
+        & (coverage['last_price_date'] >= coverage['last_trade_date'])
+    )
+    return coverage[PRICE_COVERAGE_COLUMNS].sort_values('security_code').reset_index(drop=True)
+
+
+# trade_records / daily_prices 的 date 列（整数天数）转为 DATE
+_DAY_SQL = "(DATE '1970-01-01' + CAST(date AS INTEGER))"
+
+
+class DuckDBAnalytics:
+    """
+    DuckDB 实现：聚合以列式 SQL 执行
+
+    Args:
+        db_path: SQLite 数据库路径（通过 DuckDB sqlite 扩展只读 ATTACH，读取的是实时数据）
+        parquet_dir: Parquet 快照目录（export_parquet 的输出），指定时不读取 SQLite
+        threads: DuckDB 线程数，None 时使用默认值
+    """
+
+    engine = 'duckdb'
+
+    def __init__(self, db_path: str = None, parquet_dir: str = None, threads: Optional[int] = None):
+        if not HAS_DUCKDB:
+            raise ImportError("DuckDB 后端需要安装 duckdb: pip install duckdb")
+
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+
+        if parquet_dir:
+            self.source = Path(parquet_dir)
+            for table in SNAPSHOT_TABLES:
+                path = str(self.source / f'{table}.parquet').replace("'", "''")
+                self.con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{path}')")
+        else:
+            self.source = Path(db_path or DEFAULT_DB_PATH)
+            path = str(self.source).replace("'", "''")
+            try:
+                # sqlite 扩展未安装时 DuckDB 会尝试下载，离线时抛出 duckdb.IOException
+                self.con.execute(f"ATTACH '{path}' AS src (TYPE sqlite, READ_ONLY)")
+            except duckdb.Error:
+                self.con.close()
+                raise
+            for table in SNAPSHOT_TABLES:
+                self.con.execute(f"CREATE VIEW {table} AS SELECT * FROM src.{table}")
+
+    def __enter__(self) -> 'DuckDBAnalytics':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.con.close()
+
+    def _query(self, sql: str, params: list = None) -> pd.DataFrame:
+        return self.con.execute(sql, params or []).df()
+
+    def overview(self) -> Dict[str, Any]:
+        row = self._query('''
+            SELECT COUNT(*) AS records, MIN(date) AS first_date, MAX(date) AS last_date,
+                   COUNT(*) FILTER (WHERE trade_type = 'buy') AS buy_count,
+                   COUNT(*) FILTER (WHERE trade_type = 'sell') AS sell_count,
+                   COUNT(DISTINCT NULLIF(security_code, '')) AS securities
+            FROM trade_records
+        ''').iloc[0]
+        return _overview(row)
+
+    def monthly_summary(self) -> pd.DataFrame:
+        return self._query(f'''
+            SELECT strftime({_DAY_SQL}, '%Y-%m') AS month, SUM(net_amount) AS "净发生额"
+            FROM trade_records
+            GROUP BY month
+            ORDER BY month
+        ''')
+
+    def yearly_summary(self) -> pd.DataFrame:
+        return self._query(f'''
+            SELECT CAST(year({_DAY_SQL}) AS INTEGER) AS year, SUM(net_amount) AS "净发生额"
+            FROM trade_records
+            GROUP BY year
+            ORDER BY year
+        ''')
+
+    def positions(self, as_of: Optional[DateLike] = None) -> pd.DataFrame:
+        if as_of is None:
+            as_of = day_number_to_timestamp(self._query('SELECT MAX(date) AS date FROM trade_records')['date'].iloc[0])
+            if as_of is None:
+                return pd.DataFrame(columns=HOLDING_COLUMNS)
+        day = to_day_number(as_of)
+
+        df = self._query(f'''
+            SELECT
+                security_code,
+                last(security_name ORDER BY date, id) AS security_name,
+                SUM(CASE WHEN trade_type = 'sell' THEN -quantity ELSE quantity END) AS quantity,
+                SUM(CASE WHEN trade_type = 'buy' THEN amount + COALESCE(total_fee, 0)
+                         WHEN trade_type = 'sell' THEN -amount + COALESCE(total_fee, 0)
+                         ELSE 0 END) AS cost
+            FROM trade_records
+            WHERE trade_type IN ('buy', 'sell', 'stock_dividend') AND date <= ?
+            GROUP BY security_code
+            ORDER BY security_code
+        ''', [day])
+        return _finish_holdings(df, day_number_to_timestamp(day))
+
+    def _register(self, trade_results: pd.DataFrame) -> None:
+        frame = trade_results[['证券代码', '证券名称', '卖出日期', '盈亏', '盈亏率(%)']].copy()
+        frame['盈利'] = (trade_results['是否盈利'] == '是').astype(int)
+        self.con.register('trade_results', frame)
+
+    def monthly_performance(self, trade_results: pd.DataFrame) -> pd.DataFrame:
+        if trade_results.empty:
+            return pd.DataFrame()
+        self._register(trade_results)
+        try:
+            monthly = self._query('''
+                SELECT strftime("卖出日期", '%Y-%m') AS "月份", SUM("盈亏") AS "盈亏合计",
+                       COUNT(*) AS "交易次数", SUM("盈利") AS "盈利次数"
+                FROM trade_results
+                GROUP BY "月份"
+                ORDER BY "月份"
+            ''')
+        finally:
+            self.con.unregister('trade_results')
+        return _finish_performance(monthly, MONTHLY_PERFORMANCE_COLUMNS)
+
+    def stock_performance(self, trade_results: pd.DataFrame) -> pd.DataFrame:
+        if trade_results.empty:
+            return pd.DataFrame()
+        self._register(trade_results)
+        try:
+            stock = self._query('''
+                SELECT "证券代码", "证券名称", SUM("盈亏") AS "总盈亏", AVG("盈亏") AS "平均盈亏",
+                       AVG("盈亏率(%)") AS "平均盈亏率(%)", SUM("盈利") AS "盈利次数", COUNT(*) AS "交易次数"
+                FROM trade_results
+                GROUP BY "证券代码", "证券名称"
+                ORDER BY "总盈亏" DESC, "证券代码"
+            ''')
+        finally:
+            self.con.unregister('trade_results')
+        return _finish_performance(stock, STOCK_PERFORMANCE_COLUMNS)
+
+    def price_coverage(self) -> pd.DataFrame:
+        coverage = self._query(f'''
+            WITH traded AS (
+                SELECT security_code,
+                       last(security_name ORDER BY date, id) AS security_name,
+                       MIN({_DAY_SQL}) AS first_trade_date,
+                       MAX({_DAY_SQL}) AS last_trade_date
+                FROM trade_records
+                WHERE trade_type IN ('buy', 'sell', 'stock_dividend')
+                GROUP BY security_code
+            ), priced AS (
+                SELECT security_code, COUNT(*) AS price_days,
+                       MIN({_DAY_SQL}) AS first_price_date, MAX({_DAY_SQL}) AS last_price_date
+                FROM daily_prices
+                WHERE close_price IS NOT NULL
+                GROUP BY security_code
+            )
+            SELECT t.*, p.price_days, p.first_price_date, p.last_price_date
+            FROM traded t LEFT JOIN priced p USING (security_code)
+        ''')
+        for col in ('first_trade_date', 'last_trade_date', 'first_price_date', 'last_price_date'):
+            coverage[col] = pd.to_datetime(coverage[col])
+        return _finish_coverage(coverage)
+
+
+def export_parquet(db_path: str = None, output_dir: str = 'data/parquet') -> Dict[str, str]:
+    """
+    把 SNAPSHOT_TABLES 导出为 Parquet 快照（需要 duckdb）
+
+    Returns:
+        {表名: 文件路径}
+    """
+    if not HAS_DUCKDB:
+        raise ImportError("导出 Parquet 需要安装 duckdb: pip install duckdb")
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    with DuckDBAnalytics(db_path) as analytics:
+        for table in SNAPSHOT_TABLES:
+            path = output / f'{table}.parquet'
+            target = str(path).replace("'", "''")
+            analytics.con.execute(f"COPY (SELECT * FROM {table}) TO '{target}' (FORMAT parquet)")
+            paths[table] = str(path)
+    logger.info(f"已导出 Parquet 快照到 {output}")
+    return paths
+
+
+def open_analytics(
+    db_path: str = None,
+    engine: str = 'auto',
+    parquet_dir: str = None,
+    threads: Optional[int] = None
+) -> Union[DuckDBAnalytics, PandasAnalytics]:
+    """
+    创建聚合查询后端
+
+    Args:
+        db_path: SQLite 数据库路径
+        engine: 'auto'（安装了 duckdb 且能加载 sqlite 扩展时用 DuckDB，否则用 pandas）、'duckdb' 或 'pandas'
+        parquet_dir: Parquet 快照目录，仅 DuckDB 支持
+        threads: DuckDB 线程数
+    """
+    if engine not in ('auto', 'duckdb', 'pandas'):
+        raise ValueError(f"未知的聚合后端: {engine}")
+    if engine == 'duckdb' or (engine == 'auto' and parquet_dir):
+        return DuckDBAnalytics(db_path, parquet_dir=parquet_dir, threads=threads)
+    if engine == 'auto' and HAS_DUCKDB:
+        try:
+            return DuckDBAnalytics(db_path, threads=threads)
+        except duckdb.Error as e:
+            logger.warning(f"DuckDB 无法读取 SQLite 数据库（sqlite 扩展不可用），改用 pandas 聚合: {e}")
+    return PandasAnalytics(db_path)
@@ -1,20 +1,154 @@
 import sqlite3
+import uuid
 import pandas as pd
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import logging
 
+from ..models.schema import apply_trade_schema
+from ..utils.date_utils import to_day_number, dates_to_day_numbers, day_numbers_to_datetime, day_number_to_timestamp
+from ..utils.profiler import profiled, frame_nbytes
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_DB_PATH = str(Path(__file__).parent.parent / 'data' / 'trade_data.db')
 
+# 维护数据版本号的表（DatabaseManager 的写入方法每个事务加一）
+VERSIONED_TABLES = ('trade_records', 'daily_prices')
+
+# data_version 中保存数据库标识的行，建库时写入随机数，区分写入次数相同的不同数据库
+DATABASE_ID_KEY = 'database_id'
+
+# 数据库结构版本（PRAGMA user_version）
+# 1: 日期列由 'YYYYMMDD' TEXT 改为整数天数（距 1970-01-01 的天数）
+SCHEMA_VERSION = 1
+
+# 含日期列的表；security_summary 的日期由 trade_records 汇总得出，升级时直接重建
+DATE_TABLES = ('trade_records', 'daily_prices', 'daily_positions', 'daily_net_values')
+
+# 旧版 'YYYYMMDD'（或 'YYYY-MM-DD'）文本日期转换为整数天数，2440587.5 为 1970-01-01 的儒略日
+_TEXT_DATE_TO_DAY_SQL = '''
+    CAST(julianday(CASE WHEN length(date) = 8
+                        THEN substr(date, 1, 4) || '-' || substr(date, 5, 2) || '-' || substr(date, 7, 2)
+                        ELSE date END) - 2440587.5 AS INTEGER)
+'''
+
+_TABLE_SCHEMAS = {
+    'trade_records': '''
+        CREATE TABLE IF NOT EXISTS trade_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date INTEGER NOT NULL,
+            security_code TEXT,
+            security_name TEXT,
+            business_type TEXT,
+            trade_type TEXT,
+            price REAL,
+            quantity INTEGER,
+            amount REAL,
+            commission REAL,
+            stamp_tax REAL,
+            transfer_fee REAL,
+            clearing_fee REAL,
+            net_amount REAL,
+            balance REAL,
+            position INTEGER,
+            shareholder_code TEXT,
+            currency TEXT,
+            trade_id TEXT,
+            security_full_name TEXT,
+            remark TEXT,
+            record_type TEXT,
+            is_repo INTEGER,
+            total_fee REAL,
+            created_at TEXT,
+            UNIQUE(date, security_code, trade_type, quantity, amount, price, trade_id)
+        )
+    ''',
+    'daily_prices': '''
+        CREATE TABLE IF NOT EXISTS daily_prices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date INTEGER NOT NULL,
+            security_code TEXT NOT NULL,
+            close_price REAL,
+            created_at TEXT,
+            UNIQUE(date, security_code)
+        )
+    ''',
+    'daily_positions': '''
+        CREATE TABLE IF NOT EXISTS daily_positions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date INTEGER NOT NULL,
+            security_code TEXT NOT NULL,
+            security_name TEXT,
+            quantity INTEGER,
+            cost_price REAL,
+            close_price REAL,
+            market_value REAL,
+            created_at TEXT,
+            UNIQUE(date, security_code)
+        )
+    ''',
+    'daily_net_values': '''
+        CREATE TABLE IF NOT EXISTS daily_net_values (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date INTEGER NOT NULL UNIQUE,
+            cash_balance REAL,
+            repo_amount REAL,
+            stock_market_value REAL,
+            total_net_value REAL,
+            created_at TEXT
+        )
+    ''',
+    'security_summary': '''
+        CREATE TABLE IF NOT EXISTS security_summary (
+            security_code TEXT PRIMARY KEY,
+            security_name TEXT,
+            buy_count INTEGER,
+            buy_quantity INTEGER,
+            buy_amount REAL,
+            buy_fee REAL,
+            sell_count INTEGER,
+            sell_quantity INTEGER,
+            sell_amount REAL,
+            sell_fee REAL,
+            dividend_count INTEGER,
+            dividend_quantity INTEGER,
+            cash_dividend REAL,
+            first_trade_date INTEGER,
+            last_trade_date INTEGER,
+            first_buy_date INTEGER,
+            last_sell_date INTEGER,
+            realized_profit REAL,
+            updated_at TEXT
+        )
+    ''',
+}
+
+_INDEXES = [
+    # 日期范围 + 交易类型筛选（load_trade_records 的主要查询）
+    'CREATE INDEX IF NOT EXISTS idx_trade_records_date_type ON trade_records(date, trade_type)',
+    # 个股查询与 security_summary 刷新
+    'CREATE INDEX IF NOT EXISTS idx_trade_records_code_date ON trade_records(security_code, date)',
+    'CREATE INDEX IF NOT EXISTS idx_daily_prices_date ON daily_prices(date)',
+    # 覆盖索引：按证券读取收盘价序列 / 最新价时不回表
+    'CREATE INDEX IF NOT EXISTS idx_daily_prices_code_date ON daily_prices(security_code, date, close_price)',
+    'CREATE INDEX IF NOT EXISTS idx_daily_positions_date ON daily_positions(date)',
+]
+
+# 被上面的复合索引取代
+_OBSOLETE_INDEXES = ['idx_trade_records_date', 'idx_trade_records_code']
+
+_SUMMARY_DATE_COLUMNS = ('first_trade_date', 'last_trade_date', 'first_buy_date', 'last_sell_date')
+
 
 class DatabaseManager:
     """
     数据库管理器
     
-    使用 SQLite 存储清算数据，支持增量更新
+    使用 SQLite 存储清算数据，支持增量更新。
+    日期列存储为整数天数（距 1970-01-01），读写时在 datetime64 与天数之间按数组转换；
+    查询参数接受 'YYYYMMDD'、'YYYY-MM-DD' 或 Timestamp。
     """
     
     def __init__(self, db_path: str = None):
@@ -22,6 +156,7 @@ class DatabaseManager:
             db_path = DEFAULT_DB_PATH
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._columns: Dict[str, List[str]] = {}
         self._init_database()
     
     def _get_connection(self) -> sqlite3.Connection:
@@ -29,101 +164,187 @@ class DatabaseManager:
     
     def _init_database(self):
         conn = self._get_connection()
+        self._migrate(conn)
         cursor = conn.cursor()
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trade_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                security_code TEXT,
-                security_name TEXT,
-                business_type TEXT,
-                trade_type TEXT,
-                price REAL,
-                quantity INTEGER,
-                amount REAL,
-                commission REAL,
-                stamp_tax REAL,
-                transfer_fee REAL,
-                clearing_fee REAL,
-                net_amount REAL,
-                balance REAL,
-                position INTEGER,
-                shareholder_code TEXT,
-                currency TEXT,
-                trade_id TEXT,
-                security_full_name TEXT,
-                remark TEXT,
-                record_type TEXT,
-                is_repo INTEGER,
-                total_fee REAL,
-                created_at TEXT,
-                UNIQUE(date, security_code, trade_type, quantity, amount, price, trade_id)
-            )
-        ''')
+        for ddl in _TABLE_SCHEMAS.values():
+            cursor.execute(ddl)
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_trade_records_date 
-            ON trade_records(date)
-        ''')
+        for name in _OBSOLETE_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+        for ddl in _INDEXES:
+            cursor.execute(ddl)
         
+        # 数据版本：trade_records / daily_prices 每次写入（一个事务）对应计数加一，派生结果缓存以此判断是否失效；
+        # 早期版本用逐行触发器维护，批量写入时每行多一次 UPDATE，已改为在写入方法中更新
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_trade_records_code 
-            ON trade_records(security_code)
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_prices (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                security_code TEXT NOT NULL,
-                close_price REAL,
-                created_at TEXT,
-                UNIQUE(date, security_code)
+            CREATE TABLE IF NOT EXISTS data_version (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
             )
         ''')
+        for table in VERSIONED_TABLES:
+            cursor.execute('INSERT OR IGNORE INTO data_version (name, version) VALUES (?, 0)', (table,))
+            for event in ('insert', 'update', 'delete'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS trg_{table}_{event}_version')
+        cursor.execute(
+            'INSERT OR IGNORE INTO data_version (name, version) VALUES (?, ?)',
+            (DATABASE_ID_KEY, uuid.uuid4().int & ((1 << 63) - 1))
+        )
+        
+        # 旧数据库升级：汇总表为空但已有交易记录时，全量回填一次
+        cursor.execute('SELECT COUNT(*) FROM security_summary')
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT DISTINCT security_code FROM trade_records WHERE security_code != ''")
+            codes = [row[0] for row in cursor.fetchall()]
+            self._refresh_security_summary(cursor, codes)
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_daily_prices_date 
-            ON daily_prices(date)
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_positions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                security_code TEXT NOT NULL,
-                security_name TEXT,
-                quantity INTEGER,
-                cost_price REAL,
-                close_price REAL,
-                market_value REAL,
-                created_at TEXT,
-                UNIQUE(date, security_code)
-            )
-        ''')
+        conn.commit()
+        conn.close()
+    
+    def _migrate(self, conn: sqlite3.Connection):
+        """
+        按 PRAGMA user_version 升级旧数据库（在建表之前调用，整个升级在一个事务内完成）
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_daily_positions_date 
-            ON daily_positions(date)
-        ''')
+        版本 0 -> 1: 日期列由 'YYYYMMDD' TEXT 改为整数天数。SQLite 不能修改列类型，
+        旧表改名后按新结构建表、转换日期写回，再删除旧表（连同旧索引和触发器，随后重新创建）；
+        security_summary 直接删除，由 _init_database 的回填逻辑按新格式重建。
+        """
+        cursor = conn.cursor()
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            if version > SCHEMA_VERSION:
+                logger.warning(f"数据库结构版本 {version} 高于当前程序支持的版本 {SCHEMA_VERSION}")
+            return
+        
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        legacy = [
+            table for table in DATE_TABLES
+            if table in existing and self._declared_type(cursor, table, 'date') != 'INTEGER'
+        ]
+        
+        try:
+            cursor.execute('BEGIN')
+            for table in legacy:
+                old = f'{table}__v{version}'
+                cursor.execute(f'ALTER TABLE {table} RENAME TO {old}')
+                cursor.execute(_TABLE_SCHEMAS[table])
+                
+                bad = cursor.execute(f'SELECT COUNT(*) FROM {old} WHERE {_TEXT_DATE_TO_DAY_SQL} IS NULL').fetchone()[0]
+                if bad:
+                    raise ValueError(f"{table} 中有 {bad} 条记录的日期无法识别，无法升级数据库")
+                
+                columns = [row[1] for row in cursor.execute(f'PRAGMA table_info({old})')]
+                select = ', '.join(_TEXT_DATE_TO_DAY_SQL if col == 'date' else col for col in columns)
+                cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select} FROM {old}")
+                cursor.execute(f'DROP TABLE {old}')
+                logger.info(f"{table} 日期列已转换为整数天数")
+            
+            if legacy:
+                cursor.execute('DROP TABLE IF EXISTS security_summary')
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    @staticmethod
+    def _bump_data_version(cursor: sqlite3.Cursor, *tables: str):
+        """
+        在当前事务内将 tables 的数据版本加一
+        """
+        cursor.execute(
+            f"UPDATE data_version SET version = version + 1 WHERE name IN ({', '.join('?' * len(tables))})",
+            tables
+        )
+    
+    @staticmethod
+    def _declared_type(cursor: sqlite3.Cursor, table: str, column: str) -> Optional[str]:
+        for row in cursor.execute(f'PRAGMA table_info({table})'):
+            if row[1] == column:
+                return row[2].upper()
+        return None
+    
+    def _select_columns(self, table: str, columns: Optional[List[str]]) -> str:
+        """
+        列投影的 SELECT 列表，columns 为 None 时读取全部列
+        """
+        if columns is None:
+            return '*'
+        if table not in self._columns:
+            conn = self._get_connection()
+            self._columns[table] = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+            conn.close()
+        unknown = [col for col in columns if col not in self._columns[table]]
+        if unknown:
+            raise ValueError(f"{table} 中没有这些列: {unknown}")
+        return ', '.join(dict.fromkeys(columns))
+    
+    def _refresh_security_summary(self, cursor: sqlite3.Cursor, codes: List[str]):
+        """
+        重新汇总指定证券的交易统计（增量维护 security_summary）
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_net_values (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL UNIQUE,
-                cash_balance REAL,
-                repo_amount REAL,
-                stock_market_value REAL,
-                total_net_value REAL,
-                created_at TEXT
-            )
-        ''')
+        只重算本次写入涉及的证券，借助 security_code 索引，
+        与 trade_records 总量无关。
         
-        conn.commit()
-        conn.close()
+        Args:
+            cursor: 当前事务的游标（与写入在同一事务中提交）
+            codes: 需要刷新的证券代码列表
+        """
+        codes = [c for c in codes if c]
+        if not codes:
+            return
+        
+        updated_at = datetime.now().isoformat()
+        
+        # SQLite 默认最多 999 个绑定参数，分批处理
+        batch_size = 500
+        for i in range(0, len(codes), batch_size):
+            batch = codes[i:i + batch_size]
+            placeholders = ', '.join('?' * len(batch))
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO security_summary (
+                    security_code, security_name,
+                    buy_count, buy_quantity, buy_amount, buy_fee,
+                    sell_count, sell_quantity, sell_amount, sell_fee,
+                    dividend_count, dividend_quantity, cash_dividend,
+                    first_trade_date, last_trade_date, first_buy_date, last_sell_date,
+                    realized_profit, updated_at
+                )
+                SELECT
+                    t.security_code,
+                    (SELECT n.security_name FROM trade_records n
+                     WHERE n.security_code = t.security_code
+                       AND n.trade_type IN ('buy', 'sell', 'stock_dividend')
+                     ORDER BY n.date, n.id LIMIT 1),
+                    SUM(t.trade_type = 'buy'),
+                    SUM(CASE WHEN t.trade_type = 'buy' THEN t.quantity ELSE 0 END),
+                    SUM(CASE WHEN t.trade_type = 'buy' THEN t.amount ELSE 0 END),
+                    SUM(CASE WHEN t.trade_type = 'buy' THEN IFNULL(t.total_fee, 0) ELSE 0 END),
+                    SUM(t.trade_type = 'sell'),
+                    SUM(CASE WHEN t.trade_type = 'sell' THEN t.quantity ELSE 0 END),
+                    SUM(CASE WHEN t.trade_type = 'sell' THEN t.amount ELSE 0 END),
+                    SUM(CASE WHEN t.trade_type = 'sell' THEN IFNULL(t.total_fee, 0) ELSE 0 END),
+                    SUM(t.trade_type = 'stock_dividend'),
+                    SUM(CASE WHEN t.trade_type = 'stock_dividend' THEN t.quantity ELSE 0 END),
+                    SUM(CASE WHEN t.trade_type = 'dividend' THEN t.net_amount ELSE 0 END),
+                    MIN(CASE WHEN t.trade_type IN ('buy', 'sell', 'stock_dividend') THEN t.date END),
+                    MAX(CASE WHEN t.trade_type IN ('buy', 'sell', 'stock_dividend') THEN t.date END),
+                    MIN(CASE WHEN t.trade_type = 'buy' THEN t.date END),
+                    MAX(CASE WHEN t.trade_type = 'sell' THEN t.date END),
+                    SUM(CASE WHEN t.trade_type = 'sell' THEN t.amount
+                             WHEN t.trade_type = 'buy' THEN -t.amount ELSE 0 END),
+                    ?
+                FROM trade_records t
+                WHERE t.security_code IN ({placeholders})
+                  AND t.trade_type IN ('buy', 'sell', 'stock_dividend', 'dividend')
+                GROUP BY t.security_code
+            ''', [updated_at] + batch)
     
     def get_last_date(self) -> Optional[str]:
+        """
+        最后一个交割日 (YYYYMMDD)，没有记录时返回 None
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
@@ -131,57 +352,100 @@ class DatabaseManager:
         result = cursor.fetchone()
         conn.close()
         
-        return result[0] if result and result[0] else None
+        last = day_number_to_timestamp(result[0]) if result else None
+        return last.strftime('%Y%m%d') if last is not None else None
+    
+    # trade_records 写入列及缺失时的默认值
+    _TRADE_RECORD_TEXT_COLUMNS = {
+        'security_code': '', 'security_name': '', 'business_type': '', 'trade_type': '',
+        'shareholder_code': '', 'currency': '人民币', 'trade_id': '',
+        'security_full_name': '', 'remark': '', 'record_type': '',
+    }
+    _TRADE_RECORD_FLOAT_COLUMNS = [
+        'price', 'amount', 'commission', 'stamp_tax', 'transfer_fee', 'clearing_fee',
+        'net_amount', 'balance', 'total_fee',
+    ]
+    _TRADE_RECORD_INT_COLUMNS = ['quantity', 'position']
+    
+    def _trade_record_rows(self, df: pd.DataFrame) -> List[tuple]:
+        """
+        将交易记录 DataFrame 按列转换为 INSERT 参数元组
+        """
+        values = {'date': pd.Series(dates_to_day_numbers(df['date']), index=df.index)}
+        
+        for col, default in self._TRADE_RECORD_TEXT_COLUMNS.items():
+            values[col] = df[col].astype(str) if col in df.columns else pd.Series(default, index=df.index)
+        
+        for col in self._TRADE_RECORD_FLOAT_COLUMNS:
+            values[col] = df[col].astype(float) if col in df.columns else pd.Series(0.0, index=df.index)
+        
+        valid = pd.Series(True, index=df.index)
+        for col in self._TRADE_RECORD_INT_COLUMNS:
+            if col in df.columns:
+                numbers = pd.to_numeric(df[col], errors='coerce')
+                valid &= numbers.notna()
+                values[col] = numbers.fillna(0).astype('int64')
+            else:
+                values[col] = pd.Series(0, index=df.index)
+        
+        if 'is_repo' in df.columns:
+            values['is_repo'] = df['is_repo'].fillna(False).astype(bool).astype(int)
+        else:
+            values['is_repo'] = pd.Series(0, index=df.index)
+        
+        skipped = int((~valid).sum())
+        if skipped:
+            logger.warning(f"跳过 {skipped} 条数量无效的记录")
+        
+        created_at = datetime.now().isoformat()
+        columns = [
+            'date', 'security_code', 'security_name', 'business_type', 'trade_type',
+            'price', 'quantity', 'amount', 'commission', 'stamp_tax', 'transfer_fee',
+            'clearing_fee', 'net_amount', 'balance', 'position', 'shareholder_code',
+            'currency', 'trade_id', 'security_full_name', 'remark', 'record_type',
+            'is_repo', 'total_fee',
+        ]
+        frame = pd.DataFrame({col: values[col] for col in columns})[valid.values]
+        frame['created_at'] = created_at
+        # tolist() 转为 Python 原生类型，sqlite3 无法绑定 numpy 标量
+        return [tuple(row) for row in frame.astype(object).values.tolist()]
     
+    @profiled('db.insert_trade_records', nbytes=lambda result, self, df: frame_nbytes(df))
     def insert_trade_records(self, df: pd.DataFrame) -> int:
+        """
+        批量写入交易记录
+        
+        所有记录在一个事务内用 executemany 写入，唯一键冲突时覆盖旧记录。
+        
+        Args:
+            df: 清洗后的交易记录
+            
+        Returns:
+            写入的记录数
+        """
         if df.empty:
             return 0
         
+        rows = self._trade_record_rows(df)
+        
         conn = self._get_connection()
         cursor = conn.cursor()
         
-        inserted = 0
-        created_at = datetime.now().isoformat()
-        
-        for _, row in df.iterrows():
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO trade_records (
-                        date, security_code, security_name, business_type, trade_type,
-                        price, quantity, amount, commission, stamp_tax, transfer_fee,
-                        clearing_fee, net_amount, balance, position, shareholder_code,
-                        currency, trade_id, security_full_name, remark, record_type,
-                        is_repo, total_fee, created_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row['date'].strftime('%Y%m%d') if hasattr(row['date'], 'strftime') else str(row['date']),
-                    str(row.get('security_code', '')),
-                    str(row.get('security_name', '')),
-                    str(row.get('business_type', '')),
-                    str(row.get('trade_type', '')),
-                    float(row.get('price', 0)),
-                    int(row.get('quantity', 0)),
-                    float(row.get('amount', 0)),
-                    float(row.get('commission', 0)),
-                    float(row.get('stamp_tax', 0)),
-                    float(row.get('transfer_fee', 0)),
-                    float(row.get('clearing_fee', 0)),
-                    float(row.get('net_amount', 0)),
-                    float(row.get('balance', 0)),
-                    int(row.get('position', 0)),
-                    str(row.get('shareholder_code', '')),
-                    str(row.get('currency', '人民币')),
-                    str(row.get('trade_id', '')),
-                    str(row.get('security_full_name', '')),
-                    str(row.get('remark', '')),
-                    str(row.get('record_type', '')),
-                    1 if row.get('is_repo', False) else 0,
-                    float(row.get('total_fee', 0)),
-                    created_at
-                ))
-                inserted += 1
-            except Exception as e:
-                logger.warning(f"插入记录失败: {e}")
+        cursor.executemany('''
+            INSERT OR REPLACE INTO trade_records (
+                date, security_code, security_name, business_type, trade_type,
+                price, quantity, amount, commission, stamp_tax, transfer_fee,
+                clearing_fee, net_amount, balance, position, shareholder_code,
+                currency, trade_id, security_full_name, remark, record_type,
+                is_repo, total_fee, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        inserted = len(rows)
+        self._bump_data_version(cursor, 'trade_records')
+        
+        if 'security_code' in df.columns:
+            touched_codes = sorted(set(df['security_code'].astype(str)))
+            self._refresh_security_summary(cursor, touched_codes)
         
         conn.commit()
         conn.close()
@@ -189,33 +453,108 @@ class DatabaseManager:
         logger.info(f"成功插入 {inserted} 条记录")
         return inserted
     
-    def load_trade_records(self, start_date: str = None, end_date: str = None) -> pd.DataFrame:
-        conn = self._get_connection()
+    @profiled('db.load_trade_records', nbytes=frame_nbytes)
+    def load_trade_records(
+        self,
+        start_date: str = None,
+        end_date: str = None,
+        security_code: str = None,
+        columns: Optional[List[str]] = None,
+        trade_types: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        读取交易记录（按日期排序）
+        
+        日期范围和交易类型条件走 (date, trade_type) 索引，个股查询走 (security_code, date) 索引；
+        只需要部分列时用 columns 投影，少读数据也少做类型转换。
+        
+        Args:
+            start_date: 开始日期（含），'YYYYMMDD'、'YYYY-MM-DD' 或 Timestamp
+            end_date: 结束日期（含）
+            security_code: 只读取该证券
+            columns: 读取的列，None 表示全部
+            trade_types: 只读取这些交易类型
+            
+        Returns:
+            DataFrame，date 列为 datetime64
+        """
+        query = f"SELECT {self._select_columns('trade_records', columns)} FROM trade_records WHERE 1=1"
+        params: List[Any] = []
         
-        query = "SELECT * FROM trade_records WHERE 1=1"
-        params = []
+        if security_code:
+            query += " AND security_code = ?"
+            params.append(security_code)
         
         if start_date:
             query += " AND date >= ?"
-            params.append(start_date)
+            params.append(to_day_number(start_date))
         
         if end_date:
             query += " AND date <= ?"
-            params.append(end_date)
+            params.append(to_day_number(end_date))
         
-        query += " ORDER BY date"
+        if trade_types is not None:
+            query += f" AND trade_type IN ({', '.join('?' * len(trade_types))})"
+            params.extend(trade_types)
         
+        query += " ORDER BY date, id"
+        
+        conn = self._get_connection()
         df = pd.read_sql_query(query, conn, params=params)
         conn.close()
         
         if not df.empty:
-            df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
+            if 'date' in df.columns:
+                df['date'] = day_numbers_to_datetime(df['date'])
+            df = apply_trade_schema(df)
         
         return df
     
     def get_all_trade_records(self) -> pd.DataFrame:
         return self.load_trade_records()
     
+    def get_security_summary(self, security_code: str) -> Optional[Dict[str, Any]]:
+        """
+        获取单只证券的汇总统计（读取 security_summary 中的一行）
+        
+        Args:
+            security_code: 6位证券代码
+            
+        Returns:
+            汇总字典（日期字段为 Timestamp，没有对应记录时为 None），没有该证券的记录时返回 None
+        """
+        conn = self._get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM security_summary WHERE security_code = ?', (security_code,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        summary = dict(row)
+        for col in _SUMMARY_DATE_COLUMNS:
+            summary[col] = day_number_to_timestamp(summary[col])
+        return summary
+    
+    def get_traded_securities(self) -> pd.DataFrame:
+        """
+        获取所有有过买卖记录的证券
+        
+        Returns:
+            DataFrame 包含 security_code 和 security_name，按代码排序
+        """
+        conn = self._get_connection()
+        df = pd.read_sql_query('''
+            SELECT security_code, security_name FROM security_summary
+            WHERE buy_count + sell_count > 0
+            ORDER BY security_code
+        ''', conn)
+        conn.close()
+        return df
+    
+    @profiled('db.save_daily_prices')
     def save_daily_prices(self, prices: List[Dict[str, Any]]) -> int:
         if not prices:
             return 0
@@ -230,36 +569,47 @@ class DatabaseManager:
                 cursor.execute('''
                     INSERT OR REPLACE INTO daily_prices (date, security_code, close_price, created_at)
                     VALUES (?, ?, ?, ?)
-                ''', (p['date'], p['security_code'], p['close_price'], created_at))
+                ''', (to_day_number(p['date']), p['security_code'], p['close_price'], created_at))
                 inserted += 1
             except Exception as e:
                 logger.warning(f"保存价格失败: {e}")
         
+        if inserted:
+            self._bump_data_version(cursor, 'daily_prices')
         conn.commit()
         conn.close()
         return inserted
     
-    def get_daily_prices(self, security_code: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
-        conn = self._get_connection()
-        
-        query = "SELECT * FROM daily_prices WHERE security_code = ?"
-        params = [security_code]
+    @profiled('db.get_daily_prices', nbytes=frame_nbytes)
+    def get_daily_prices(
+        self,
+        security_code: str,
+        start_date: str = None,
+        end_date: str = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        单只证券的收盘价序列（按日期排序）；columns 为 ['date', 'close_price'] 时只读覆盖索引
+        """
+        query = f"SELECT {self._select_columns('daily_prices', columns)} FROM daily_prices WHERE security_code = ?"
+        params: List[Any] = [security_code]
         
         if start_date:
             query += " AND date >= ?"
-            params.append(start_date)
+            params.append(to_day_number(start_date))
         
         if end_date:
             query += " AND date <= ?"
-            params.append(end_date)
+            params.append(to_day_number(end_date))
         
-        query += " ORDER BY date"
+        query += " ORDER BY date, id"
         
+        conn = self._get_connection()
         df = pd.read_sql_query(query, conn, params=params)
         conn.close()
         
-        if not df.empty:
-            df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
+        if not df.empty and 'date' in df.columns:
+            df['date'] = day_numbers_to_datetime(df['date'])
         
         return df
 
@@ -312,6 +662,56 @@ class DatabaseManager:
 
         return {row[0]: row[1] for row in results if row[1] is not None}
 
+    @profiled('db.get_price_matrix', nbytes=frame_nbytes)
+    def get_price_matrix(
+        self,
+        security_codes: Optional[List[str]] = None,
+        start_date: str = None,
+        end_date: str = None
+    ) -> pd.DataFrame:
+        """
+        读取 daily_prices 中的收盘价，展开为 日期 x 证券代码 矩阵
+
+        Args:
+            security_codes: 证券代码列表，None 表示全部
+            start_date: 开始日期 (YYYYMMDD)
+            end_date: 结束日期 (YYYYMMDD)
+
+        Returns:
+            DataFrame，索引为日期，列为证券代码，没有价格的位置为 NaN
+        """
+        query = "SELECT date, security_code, close_price FROM daily_prices WHERE 1 = 1"
+        params: List[Any] = []
+
+        # SQLite 默认最多 999 个绑定参数，代码过多时读取后再筛选
+        filter_in_sql = security_codes is not None and len(security_codes) <= 500
+        if security_codes is not None and not security_codes:
+            return pd.DataFrame()
+        if filter_in_sql:
+            query += f" AND security_code IN ({', '.join('?' * len(security_codes))})"
+            params.extend(security_codes)
+
+        if start_date:
+            query += " AND date >= ?"
+            params.append(to_day_number(start_date))
+
+        if end_date:
+            query += " AND date <= ?"
+            params.append(to_day_number(end_date))
+
+        conn = self._get_connection()
+        df = pd.read_sql_query(query, conn, params=params)
+        conn.close()
+
+        if security_codes is not None and not filter_in_sql:
+            df = df[df['security_code'].isin(security_codes)]
+
+        if df.empty:
+            return pd.DataFrame()
+
+        df['date'] = day_numbers_to_datetime(df['date'])
+        return df.pivot_table(index='date', columns='security_code', values='close_price', aggfunc='last').sort_index()
+
     def save_daily_net_values(self, net_values: List[Dict[str, Any]]) -> int:
         if not net_values:
             return 0
@@ -328,7 +728,7 @@ class DatabaseManager:
                     (date, cash_balance, repo_amount, stock_market_value, total_net_value, created_at)
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (
-                    nv['date'], nv['cash_balance'], nv['repo_amount'],
+                    to_day_number(nv['date']), nv['cash_balance'], nv['repo_amount'],
                     nv['stock_market_value'], nv['total_net_value'], created_at
                 ))
                 inserted += 1
@@ -339,30 +739,64 @@ class DatabaseManager:
         conn.close()
         return inserted
     
-    def get_daily_net_values(self, start_date: str = None, end_date: str = None) -> pd.DataFrame:
-        conn = self._get_connection()
-        
-        query = "SELECT * FROM daily_net_values WHERE 1=1"
-        params = []
+    def get_daily_net_values(
+        self,
+        start_date: str = None,
+        end_date: str = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        query = f"SELECT {self._select_columns('daily_net_values', columns)} FROM daily_net_values WHERE 1=1"
+        params: List[Any] = []
         
         if start_date:
             query += " AND date >= ?"
-            params.append(start_date)
+            params.append(to_day_number(start_date))
         
         if end_date:
             query += " AND date <= ?"
-            params.append(end_date)
+            params.append(to_day_number(end_date))
         
-        query += " ORDER BY date"
+        query += " ORDER BY date, id"
         
+        conn = self._get_connection()
         df = pd.read_sql_query(query, conn, params=params)
         conn.close()
         
-        if not df.empty:
-            df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
+        if not df.empty and 'date' in df.columns:
+            df['date'] = day_numbers_to_datetime(df['date'])
         
         return df
     
+    def get_data_version(self, tables: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        读取数据版本号
+        
+        Args:
+            tables: 表名列表，None 表示 VERSIONED_TABLES 中的全部表
+            
+        Returns:
+            {表名: 版本号}，每次写入（insert_trade_records、save_daily_prices、clear_all_data）版本号加一
+        """
+        tables = list(tables or VERSIONED_TABLES)
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT name, version FROM data_version WHERE name IN ({', '.join('?' * len(tables))})",
+            tables
+        )
+        versions = dict(cursor.fetchall())
+        conn.close()
+        return {table: versions.get(table, 0) for table in tables}
+    
+    def get_database_id(self) -> str:
+        """
+        数据库标识：建库时生成的随机数（16 位十六进制），删除后重建的数据库标识不同
+        """
+        conn = self._get_connection()
+        row = conn.execute('SELECT version FROM data_version WHERE name = ?', (DATABASE_ID_KEY,)).fetchone()
+        conn.close()
+        return f'{row[0]:016x}'
+    
     def get_record_count(self) -> int:
         conn = self._get_connection()
         cursor = conn.cursor()
@@ -378,6 +812,8 @@ class DatabaseManager:
         cursor.execute('DELETE FROM daily_prices')
         cursor.execute('DELETE FROM daily_positions')
         cursor.execute('DELETE FROM daily_net_values')
+        cursor.execute('DELETE FROM security_summary')
+        self._bump_data_version(cursor, *VERSIONED_TABLES)
         conn.commit()
         conn.close()
         logger.info("数据库已清空")
@@ -5,7 +5,8 @@
     python -m trade_analysis.main
     或直接在 IDE 中运行此文件
 
-    程序会交互式询问用户需要进行什么操作
+    程序会交互式询问用户需要进行什么操作；带参数运行时为非交互命令行（见 cli.py），如
+    python -m trade_analysis.main analyze --mode stock --report xlsx,html
 """
 
 import sys
@@ -18,15 +19,23 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 import logging
+import shutil
 from datetime import datetime
 
 import pandas as pd
 
 from trade_analysis.db.database import DatabaseManager
+from trade_analysis.db.analytics import open_analytics
 from trade_analysis.services.analyzer import TradeAnalyzer, AnalysisConfig
 from trade_analysis.services.price_fetcher import PriceFetcher
+from trade_analysis.services.live_monitor import PortfolioMonitor, LiveMonitor
+from trade_analysis.services.result_cache import ResultCache
+from trade_analysis.services.importer import should_stream, stream_import_file, import_directory, list_settlement_files
 from trade_analysis.models.report_generator import ReportGenerator
+from trade_analysis.tools.visualization import Visualizer, ChartJob
 from trade_analysis.models.data_cleaner import DataCleaner
+from trade_analysis.models.profit_calculator import ProfitCalculator
+from trade_analysis.models.benchmark import DEFAULT_BENCHMARK
 
 logging.basicConfig(
     level=logging.INFO,
@@ -37,6 +46,7 @@ logger = logging.getLogger(__name__)
 DB_PATH = str(Path(__file__).parent / 'data' / 'trade_data.db')
 DATA_RAW_PATH = str(Path(__file__).parent / 'data' / 'raw')
 OUTPUT_PATH = str(Path(__file__).parent / 'output')
+CACHE_PATH = str(Path(__file__).parent / 'data' / 'cache')
 
 
 def get_user_input(prompt: str, options: list = None) -> str:
@@ -129,6 +139,24 @@ def import_new_data(db: DatabaseManager) -> bool:
     print(f"\n选择文件: {filepath}")
 
     try:
+        if should_stream(filepath):
+            # 大文件分块读取并直接写库，避免整表载入内存
+            print("\n文件较大，使用流式导入...")
+            stats = stream_import_file(
+                filepath, db,
+                progress_callback=lambda s: print(f"  已处理 {s.rows_parsed} 条 ({s.chunks} 块)")
+            )
+
+            if stats.rows_parsed == 0:
+                print("\n文件中没有可导入的记录")
+                return False
+
+            print(f"\n文件解析成功:")
+            print(f"  记录数: {stats.rows_parsed}")
+            print(f"  日期范围: {stats.start_date.strftime('%Y-%m-%d')} ~ {stats.end_date.strftime('%Y-%m-%d')}")
+            print(f"\n成功导入 {stats.rows_inserted} 条记录到数据库 (耗时 {stats.elapsed:.1f}s)")
+            return True
+
         cleaner = DataCleaner(filepath)
         df = cleaner.clean()
 
@@ -145,6 +173,47 @@ def import_new_data(db: DatabaseManager) -> bool:
         return False
 
 
+def import_directory_data(db: DatabaseManager) -> bool:
+    print("\n" + "=" * 50)
+    print("批量导入目录")
+    print("=" * 50)
+
+    directory = get_user_input(f"请输入清算文件目录（回车使用 {DATA_RAW_PATH}，输入r返回）: ")
+    if directory.lower() == 'r':
+        return False
+    if not directory:
+        directory = DATA_RAW_PATH
+    if not Path(directory).is_dir():
+        print("目录不存在")
+        return False
+
+    files = list_settlement_files(directory)
+    if not files:
+        print("\n目录中没有清算文件")
+        return False
+    print(f"\n找到 {len(files)} 个文件，开始并行解析...")
+
+    def on_file_parsed(file_stats):
+        name = Path(file_stats.filepath).name
+        if file_stats.error:
+            print(f"  {name}: 解析失败 ({file_stats.error})")
+        else:
+            print(f"  {name}: {file_stats.rows_parsed} 条, {file_stats.elapsed:.2f}s")
+
+    try:
+        result = import_directory(directory, db, progress_callback=on_file_parsed)
+    except Exception as e:
+        print(f"\n导入失败: {e}")
+        return False
+
+    print(f"\n解析完成: {result.rows_parsed} 条, 耗时 {result.parse_elapsed:.2f}s")
+    if result.failed_files:
+        print(f"  失败文件: {len(result.failed_files)} 个")
+    print(f"  跨文件重复: {result.duplicates} 条")
+    print(f"\n成功导入 {result.rows_inserted} 条记录到数据库 (写入耗时 {result.write_elapsed:.2f}s)")
+    return result.rows_inserted > 0
+
+
 def check_and_prompt_data_sources(price_fetcher: PriceFetcher) -> bool:
     """
     检查数据源可用性，并提示用户启动软件
@@ -223,11 +292,7 @@ def get_all_traded_stocks(db: DatabaseManager) -> pd.DataFrame:
         DataFrame 包含 security_code 和 security_name
     """
     try:
-        df = db.get_all_trade_records()
-        trade_df = df[df['trade_type'].isin(['buy', 'sell'])]
-        unique_stocks = trade_df[['security_code', 'security_name']].drop_duplicates()
-        unique_stocks = unique_stocks[unique_stocks['security_code'] != '']
-        return unique_stocks.sort_values('security_code')
+        return db.get_traded_securities()
     except Exception as e:
         print(f"\n无法获取股票列表: {e}")
         return pd.DataFrame()
@@ -247,9 +312,6 @@ def check_price_completeness(db: DatabaseManager) -> tuple:
     print("=" * 50)
     
     try:
-        # 获取所有交易记录
-        df = db.get_all_trade_records()
-        
         # 获取数据库中已有的价格
         conn = db._get_connection()
         cursor = conn.cursor()
@@ -258,7 +320,7 @@ def check_price_completeness(db: DatabaseManager) -> tuple:
         conn.close()
         
         # 获取所有交易过的股票
-        trade_stocks = set(df[df['trade_type'].isin(['buy', 'sell'])]['security_code'].unique())
+        trade_stocks = set(db.get_traded_securities()['security_code'])
         
         # 找出缺失价格的股票
         missing_stocks = trade_stocks - stocks_with_prices
@@ -345,8 +407,9 @@ def run_analysis_from_file(config: AnalysisConfig, price_fetcher: PriceFetcher):
         return None
 
 
-def run_analysis_from_db(db: DatabaseManager, config: AnalysisConfig, price_fetcher: PriceFetcher):
-    """从数据库进行分析"""
+def run_analysis_from_db(db: DatabaseManager, config: AnalysisConfig, price_fetcher: PriceFetcher,
+                         cache: ResultCache = None):
+    """从数据库进行分析，提供 cache 时读取的记录和派生结果按数据版本缓存"""
     record_count = db.get_record_count()
     if record_count == 0:
         print("\n数据库为空，请先导入数据")
@@ -357,10 +420,25 @@ def run_analysis_from_db(db: DatabaseManager, config: AnalysisConfig, price_fetc
     print(f"最新日期: {last_date}")
 
     try:
-        df = db.get_all_trade_records()
+        security_summary = None
+        if config.stock_code:
+            # 个股模式只读取该股票的记录，汇总统计直接取 security_summary
+            load = lambda: db.load_trade_records(security_code=config.stock_code)
+            if config.mode == 'stock':
+                security_summary = db.get_security_summary(config.stock_code)
+        else:
+            load = db.get_all_trade_records
+        df = cache.get_or_compute('trade_records', {'stock_code': config.stock_code}, load) if cache else load()
+
+        if df.empty:
+            print("\n没有符合条件的交易记录")
+            return None
+
         print(f"数据日期范围: {df['date'].min().strftime('%Y-%m-%d')} ~ {df['date'].max().strftime('%Y-%m-%d')}")
 
-        analyzer = TradeAnalyzer.from_dataframe(df, config)
+        analyzer = TradeAnalyzer.from_dataframe(
+            df, config, security_summary=security_summary, db=db, cache=cache, price_fetcher=price_fetcher
+        )
         result = analyzer.run_analysis()
         return result
     except Exception as e:
@@ -440,12 +518,21 @@ def run_analysis(db: DatabaseManager):
                 except ValueError:
                     print("  ❌ 格式错误，请使用: 代码=价格")
 
+    benchmark_code = get_user_input(f"\n基准指数代码 (回车默认 {DEFAULT_BENCHMARK}，输入n不对比，输入0返回): ")
+    if benchmark_code == '0':
+        return
+    if not benchmark_code:
+        benchmark_code = DEFAULT_BENCHMARK
+    elif benchmark_code.lower() == 'n':
+        benchmark_code = None
+
     config = AnalysisConfig(
         mode=mode,
         stock_code=stock_code,
         start_date=start_date,
         end_date=end_date,
-        manual_prices=manual_prices
+        manual_prices=manual_prices,
+        benchmark_code=benchmark_code
     )
 
     # 初始化价格获取器（无论是否需要获取价格，都需要初始化）
@@ -576,10 +663,12 @@ def run_analysis(db: DatabaseManager):
                     print("\n这些股票将使用数据库中的历史价格或按0计算")
 
     # 根据数据源选择进行分析
+    cache = None
     if source_choice == '1':
         result = run_analysis_from_file(config, price_fetcher)
     else:
-        result = run_analysis_from_db(db, config, price_fetcher)
+        cache = ResultCache(CACHE_PATH, db)
+        result = run_analysis_from_db(db, config, price_fetcher, cache=cache)
 
     if result is None or result is False:
         return
@@ -700,14 +789,81 @@ def run_analysis(db: DatabaseManager):
 
     # 生成报告
     print("\n生成报告...")
-    report_gen = ReportGenerator(OUTPUT_PATH)
-    output_files = report_gen.generate_from_result(result, formats=['excel', 'html'])
+    output_files = generate_reports(result, cache)
 
     if output_files.get('excel'):
         print(f"Excel报告: {output_files['excel']}")
     if output_files.get('html'):
         print(f"HTML报告: {output_files['html']}")
 
+    chart_jobs = []
+    if result.rolling_metrics is not None and not result.rolling_metrics.empty:
+        chart_jobs.append(('滚动指标图', ChartJob('plot_rolling_metrics', 'rolling_metrics.png', (result.rolling_metrics,))))
+    if result.position_history is not None and not result.position_history.empty:
+        chart_jobs.append(('月末持仓图', ChartJob('plot_position_history', 'position_history.png', (result.position_history,))))
+
+    if chart_jobs:
+        chart_paths = Visualizer(OUTPUT_PATH).render_batch([job for _, job in chart_jobs])
+        for label, job in chart_jobs:
+            if chart_paths.get(job.save_path):
+                print(f"{label}: {chart_paths[job.save_path]}")
+
+
+def generate_reports(result, cache: ResultCache = None) -> Dict[str, str]:
+    """
+    生成 Excel/HTML 报告到 OUTPUT_PATH
+
+    提供 cache 时报告按 (分析配置, 持仓现价, 数据版本) 缓存，命中时直接复制已生成的文件
+    """
+    formats = ['excel', 'html']
+    if cache is None:
+        return ReportGenerator(OUTPUT_PATH).generate_from_result(result, formats=formats)
+
+    # 现价来自实时行情而非数据库，需要作为参数的一部分
+    params = {
+        'config': result.config.__dict__,
+        'close_prices': {code: pos.get('close_price') for code, pos in result.positions.items()},
+        'formats': formats,
+    }
+    cached = cache.get_or_render(
+        'reports', params,
+        lambda directory: ReportGenerator(str(directory)).generate_from_result(result, formats=formats)
+    )
+
+    Path(OUTPUT_PATH).mkdir(parents=True, exist_ok=True)
+    output_files = {}
+    for name, path in cached.items():
+        target = Path(OUTPUT_PATH) / Path(path).name
+        shutil.copy2(path, target)
+        output_files[name] = str(target)
+    return output_files
+
+
+def run_live_monitor(db: DatabaseManager):
+    """实时持仓监控"""
+    df = db.get_all_trade_records()
+    if df.empty:
+        print("\n数据库为空，请先导入数据")
+        return
+
+    profit_summary = ProfitCalculator(df).calculate_account_profit()
+    if not profit_summary.positions:
+        print("\n当前没有持仓")
+        return
+
+    interval = get_user_input("\n看板刷新间隔秒数 (回车默认 5，输入0返回): ")
+    if interval == '0':
+        return
+    try:
+        interval = float(interval) if interval else 5.0
+    except ValueError:
+        interval = 5.0
+
+    print(f"\n监控 {len(profit_summary.positions)} 只持仓，按 Ctrl+C 停止")
+    monitor = PortfolioMonitor.from_profit_summary(profit_summary)
+    with PriceFetcher() as price_fetcher:
+        LiveMonitor(monitor, interval=interval).run(price_fetcher)
+
 
 def view_data_summary(db: DatabaseManager):
     print("\n" + "=" * 50)
@@ -722,12 +878,16 @@ def view_data_summary(db: DatabaseManager):
     print(f"  最新日期: {last_date if last_date else '无数据'}")
 
     if record_count > 0:
-        df = db.get_all_trade_records()
+        # 聚合在数据库侧完成（安装了 duckdb 时使用 DuckDB），不整表读入内存
+        with open_analytics(str(db.db_path)) as analytics:
+            overview = analytics.overview()
+            coverage = analytics.price_coverage()
         print(f"\n数据详情:")
-        print(f"  日期范围: {df['date'].min().strftime('%Y-%m-%d')} ~ {df['date'].max().strftime('%Y-%m-%d')}")
-        print(f"  买入记录: {len(df[df['trade_type'] == 'buy'])}")
-        print(f"  卖出记录: {len(df[df['trade_type'] == 'sell'])}")
-        print(f"  涉及股票: {df[df['security_code'] != '']['security_code'].nunique()} 只")
+        print(f"  日期范围: {overview['first_date'].strftime('%Y-%m-%d')} ~ {overview['last_date'].strftime('%Y-%m-%d')}")
+        print(f"  买入记录: {overview['buy_count']}")
+        print(f"  卖出记录: {overview['sell_count']}")
+        print(f"  涉及股票: {overview['securities']} 只")
+        print(f"  收盘价覆盖交易区间: {int(coverage['covered'].sum())}/{len(coverage)} 只")
 
 
 def clear_database(db: DatabaseManager):
@@ -752,9 +912,11 @@ def main():
         print("  2. 进行交易分析")
         print("  3. 查看数据库摘要")
         print("  4. 清空数据库")
+        print("  5. 批量导入目录中的清算文件")
+        print("  6. 实时持仓监控")
         print("  0. 退出")
 
-        choice = get_user_input("\n请选择", ['0', '1', '2', '3', '4'])
+        choice = get_user_input("\n请选择", ['0', '1', '2', '3', '4', '5', '6'])
 
         if choice == '0':
             print("\n再见!")
@@ -767,7 +929,15 @@ def main():
             view_data_summary(db)
         elif choice == '4':
             clear_database(db)
+        elif choice == '5':
+            import_directory_data(db)
+        elif choice == '6':
+            run_live_monitor(db)
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        # 带参数时按非交互命令行运行，见 cli.py
+        from trade_analysis.cli import main as cli_main
+        sys.exit(cli_main())
     main()
@@ -4,6 +4,16 @@ from .profit_calculator import ProfitCalculator
 from .report_generator import ReportGenerator
 from .record_parser import RecordParser, RecordType, TRADE_TYPE_MAP, REPO_CODES
 from .performance import PerformanceCalculator, PerformanceMetrics, TradeResult
+from .schema import apply_trade_schema, memory_report
+from .rolling_metrics import calculate_rolling_metrics
+from .drawdown import underwater_curve, drawdown_episodes, drawdown_summary
+from .bootstrap import bootstrap_performance, BootstrapResult
+from .benchmark import compare_with_benchmark, BenchmarkResult
+from .attribution import PnLAttribution, PnLCube
+from .counterfactual import CounterfactualEngine
+from .asof_index import AsOfPositionIndex
+from .repo import RepoEngine
+from .scenario import StressTester, Shock
 
 __all__ = [
     'DataCleaner',
@@ -17,4 +27,21 @@ __all__ = [
     'PerformanceCalculator',
     'PerformanceMetrics',
     'TradeResult',
+    'apply_trade_schema',
+    'memory_report',
+    'calculate_rolling_metrics',
+    'underwater_curve',
+    'drawdown_episodes',
+    'drawdown_summary',
+    'bootstrap_performance',
+    'BootstrapResult',
+    'compare_with_benchmark',
+    'BenchmarkResult',
+    'PnLAttribution',
+    'PnLCube',
+    'CounterfactualEngine',
+    'AsOfPositionIndex',
+    'RepoEngine',
+    'StressTester',
+    'Shock',
 ]
@@ -0,0 +1,168 @@
+"""
+按日期查询持仓与成本的索引
+
+从交易记录一次性构建：按 (证券, 日期) 排序的买入、卖出、红股事件，
+每只证券一段连续数组，保存事件后的累计持仓数量与累计净成本。
+查询任意日期时，对所有证券一次 searchsorted（键为 证券序号 x 日期），
+每只证券 O(log n)，无需从头回放。
+
+口径与 ProfitCalculator 一致：
+- 持仓 = 累计买入 + 累计红股 - 累计卖出
+- 成本价 = (累计买入金额 - 累计卖出金额 + 累计买卖费用) / 持仓（红股成本为 0）
+"""
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.date_utils import to_day_number
+
+POSITION_TYPES = ['buy', 'sell', 'stock_dividend']
+
+HOLDING_COLUMNS = ['date', 'security_code', 'security_name', 'quantity', 'cost_price', 'cost']
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+
+
+def _to_day(date: DateLike) -> np.int64:
+    """
+    日期转换为整数天数（支持 'YYYYMMDD'、'YYYY-MM-DD' 和 Timestamp），与数据库中日期列的存储格式相同
+    """
+    return np.int64(to_day_number(date))
+
+
+class AsOfPositionIndex:
+    """
+    持仓与成本的按日期查询索引
+
+    Attributes:
+        codes: 证券代码（按序号排列）
+        names: 每个事件后的证券名称
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        events = df[df['trade_type'].isin(POSITION_TYPES)]
+        trade_type = events['trade_type'].astype(str).to_numpy()
+        quantity = events['quantity'].to_numpy(dtype=float)
+        amount = events['amount'].to_numpy(dtype=float)
+        fee = events['total_fee'].to_numpy(dtype=float)
+
+        is_buy = trade_type == 'buy'
+        is_sell = trade_type == 'sell'
+        frame = pd.DataFrame({
+            'code': events['security_code'].astype(str).to_numpy(),
+            'day': events['date'].dt.normalize().to_numpy().astype('datetime64[D]').astype(np.int64),
+            'name': events['security_name'].astype(str).to_numpy(),
+            'quantity': np.where(is_sell, -quantity, quantity),
+            'cost': np.where(is_buy, amount, np.where(is_sell, -amount, 0.0)) + np.where(is_buy | is_sell, fee, 0.0),
+        })
+        # 稳定排序：同一天内保持原记录顺序
+        frame = frame.sort_values(['code', 'day'], kind='mergesort').reset_index(drop=True)
+
+        codes, code_index = np.unique(frame['code'].to_numpy(), return_inverse=True)
+        self.codes = pd.Index(codes)
+        self._code_index = code_index.astype(np.int64)
+        self._day = frame['day'].to_numpy()
+        self._quantity = frame.groupby('code', sort=False)['quantity'].cumsum().to_numpy()
+        self._cost = frame.groupby('code', sort=False)['cost'].cumsum().to_numpy()
+        self.names = frame['name'].to_numpy()
+
+        # 组合键：证券序号在高位、日期在低位，整体有序，可一次二分查找所有证券
+        self._span = np.int64(1) << 32
+        self._key = self._code_index * self._span + self._day
+        self._starts = np.searchsorted(self._code_index, np.arange(len(codes)))
+
+    @classmethod
+    def from_database(cls, db, security_code: Optional[str] = None) -> 'AsOfPositionIndex':
+        """
+        从数据库 trade_records 构建
+        """
+        return cls(db.load_trade_records(security_code=security_code))
+
+    def _lookup(self, date: DateLike) -> np.ndarray:
+        """
+        每只证券在 date 当天（含）之前最后一个事件的位置，没有事件时为 -1
+        """
+        day = _to_day(date)
+        targets = np.arange(len(self.codes), dtype=np.int64) * self._span + day
+        position = np.searchsorted(self._key, targets, side='right') - 1
+        return np.where(position >= self._starts, position, -1)
+
+    def holdings_as_of(self, date: DateLike, include_closed: bool = False) -> pd.DataFrame:
+        """
+        指定日期收盘后的持仓明细
+
+        Args:
+            date: 查询日期
+            include_closed: 是否包含持仓为 0 的证券
+
+        Returns:
+            DataFrame，列见 HOLDING_COLUMNS
+        """
+        position = self._lookup(date)
+        found = position >= 0
+        rows = position[found]
+
+        quantity = self._quantity[rows]
+        cost = self._cost[rows]
+        holdings = pd.DataFrame({
+            'date': pd.Timestamp(_to_day(date), unit='D'),
+            'security_code': self.codes[found],
+            'security_name': self.names[rows],
+            'quantity': quantity,
+            'cost_price': np.divide(cost, quantity, out=np.zeros_like(cost), where=quantity > 0),
+            'cost': cost,
+        }, columns=HOLDING_COLUMNS)
+
+        if not include_closed:
+            holdings = holdings[holdings['quantity'] > 0]
+        return holdings.reset_index(drop=True)
+
+    def positions_as_of(self, date: DateLike) -> Dict[str, Dict]:
+        """
+        指定日期收盘后的持仓，格式与 ProfitCalculator._calculate_positions 相同
+
+        Returns:
+            {证券代码: {'name', 'quantity', 'cost_price', 'close_price'}}
+        """
+        holdings = self.holdings_as_of(date)
+        return {
+            code: {
+                'name': name,
+                'quantity': int(quantity),
+                'cost_price': cost_price,
+                'close_price': 0,
+            }
+            for code, name, quantity, cost_price in zip(
+                holdings['security_code'], holdings['security_name'],
+                holdings['quantity'], holdings['cost_price']
+            )
+        }
+
+    def position_of(self, security_code: str, date: DateLike) -> Dict[str, float]:
+        """
+        单只证券在指定日期的持仓数量和成本价
+        """
+        index = self.codes.get_indexer([str(security_code)])[0]
+        if index < 0:
+            return {'quantity': 0, 'cost_price': 0.0}
+
+        start = self._starts[index]
+        end = self._starts[index + 1] if index + 1 < len(self._starts) else len(self._day)
+        row = start + np.searchsorted(self._day[start:end], _to_day(date), side='right') - 1
+        if row < start:
+            return {'quantity': 0, 'cost_price': 0.0}
+
+        quantity = self._quantity[row]
+        cost_price = self._cost[row] / quantity if quantity > 0 else 0.0
+        return {'quantity': int(quantity), 'cost_price': float(cost_price)}
+
+    def holdings_history(self, dates: List[DateLike]) -> pd.DataFrame:
+        """
+        多个日期的持仓明细（如每月末），按日期纵向拼接
+        """
+        frames = [self.holdings_as_of(date) for date in dates]
+        if not frames:
+            return pd.DataFrame(columns=HOLDING_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,284 @@
+"""
+盈亏归因
+
+在 日期 x 证券 的持仓、价格矩阵上计算逐日盯市盈亏，并拆分为：
+- realized: 已实现盈亏（卖出金额 - 移动平均成本）
+- unrealized: 浮动盈亏变动（市值 - 持仓成本 的日变动）
+- dividend: 现金红利（含红利差异扣税）
+- fee: 买卖及逆回购的佣金、印花税、过户费等（净发生额与成交金额之差，负数）
+- repo: 逆回购利息（到期金额 - 面值）
+- interest: 资金账户利息归本
+
+结果是一个 日期 x 证券 x 分项 的三维数组（PnLCube），可沿任意轴汇总：
+按证券、按日/月/年、按分项、按板块或自定义分组。
+成本与盈亏均按成交金额计算，费用单独列为 fee 分项，不计入成本。
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .record_parser import REPO_CODES
+from .repo import REPO_FACE_VALUE
+
+PNL_COMPONENTS = ['realized', 'unrealized', 'dividend', 'fee', 'repo', 'interest']
+
+# 资金账户利息归本没有证券代码，归入该键
+CASH_CODE = 'CASH'
+
+
+def board_of(code: str) -> str:
+    """
+    按代码前缀划分板块（没有行业数据时用作默认分组）
+    """
+    code = str(code)
+    if code == CASH_CODE:
+        return '现金'
+    if code in REPO_CODES or code.startswith(('1318', '204')):
+        return '逆回购'
+    if code.startswith(('688', '689')):
+        return '科创板'
+    if code.startswith(('300', '301')):
+        return '创业板'
+    if code.startswith('6'):
+        return '沪市主板'
+    if code.startswith(('000', '001', '002', '003')):
+        return '深市主板'
+    if code.startswith(('5', '15', '16', '18')):
+        return '基金'
+    if code.startswith(('4', '8', '92')):
+        return '北交所'
+    return '其他'
+
+
+@dataclass
+class PnLCube:
+    dates: pd.DatetimeIndex
+    securities: pd.Index
+    values: np.ndarray
+    components: List[str] = field(default_factory=lambda: list(PNL_COMPONENTS))
+    names: Dict[str, str] = field(default_factory=dict)
+
+    def total(self) -> float:
+        return float(self.values.sum())
+
+    def by_component(self) -> pd.Series:
+        """
+        各分项合计
+        """
+        return pd.Series(self.values.sum(axis=(0, 1)), index=self.components)
+
+    def _frame(self, values: np.ndarray, index: pd.Index) -> pd.DataFrame:
+        df = pd.DataFrame(values, index=index, columns=self.components)
+        df['total'] = values.sum(axis=1)
+        return df
+
+    def by_security(self) -> pd.DataFrame:
+        """
+        按证券汇总，按合计从高到低排序
+
+        Returns:
+            DataFrame: security_code, security_name, 各分项, total
+        """
+        df = self._frame(self.values.sum(axis=0), self.securities)
+        df.insert(0, 'security_name', [self.names.get(code, '') for code in self.securities])
+        df.index.name = 'security_code'
+        return df.sort_values('total', ascending=False).reset_index()
+
+    def by_date(self, freq: Optional[str] = None) -> pd.DataFrame:
+        """
+        按日期汇总
+
+        Args:
+            freq: None 为逐日；'M' 按月，'Y' 按年（索引为期间字符串）
+
+        Returns:
+            DataFrame，索引为日期或期间，列为各分项和 total
+        """
+        daily = self.values.sum(axis=1)
+        if freq is None:
+            return self._frame(daily, self.dates.rename('date'))
+
+        # 日期有序，期间变化处即为每组起点
+        periods = self.dates.to_period(freq).astype(str)
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        return self._frame(np.add.reduceat(daily, starts, axis=0), pd.Index(periods[starts], name='period'))
+
+    def by_group(
+        self,
+        groups: Union[Dict[str, str], Callable[[str], str]] = board_of,
+        freq: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        按证券分组（板块、行业等）汇总
+
+        Args:
+            groups: 证券代码 -> 分组名 的字典或函数，字典中没有的代码归入 '其他'
+            freq: None 时只按分组汇总；'M' / 'Y' 时按 期间 x 分组 汇总
+
+        Returns:
+            DataFrame：freq 为 None 时索引为分组；否则为 (period, group) 两级索引
+        """
+        mapper = groups if callable(groups) else (lambda code: groups.get(code, '其他'))
+        labels, group_names = pd.factorize(pd.Index([mapper(code) for code in self.securities]))
+        # 证券 -> 分组 的 0/1 矩阵，汇总即矩阵乘法
+        onehot = np.zeros((len(self.securities), len(group_names)))
+        onehot[np.arange(len(self.securities)), labels] = 1.0
+
+        if freq is None:
+            values = onehot.T @ self.values.sum(axis=0)
+            df = self._frame(values, pd.Index(group_names, name='group'))
+            return df.sort_values('total', ascending=False)
+
+        grouped = np.einsum('dsc,sg->dgc', self.values, onehot)
+        periods = self.dates.to_period(freq).astype(str)
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        rolled = np.add.reduceat(grouped, starts, axis=0)
+        index = pd.MultiIndex.from_product([periods[starts], group_names], names=['period', 'group'])
+        return self._frame(rolled.reshape(-1, len(self.components)), index)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        展开为长表（只保留非零项）：date, security_code, component, pnl
+        """
+        d, s, c = np.nonzero(self.values)
+        return pd.DataFrame({
+            'date': self.dates[d],
+            'security_code': self.securities[s],
+            'component': np.asarray(self.components)[c],
+            'pnl': self.values[d, s, c],
+        })
+
+
+class PnLAttribution:
+    """
+    盈亏归因计算器
+
+    价格默认使用该证券截至当日最后一笔成交价（与 PerformanceCalculator 的资产曲线一致），
+    也可以传入 日期 x 证券代码 的收盘价矩阵（如 daily_prices），缺失处回退到成交价。
+    """
+
+    def __init__(self, df: pd.DataFrame, prices: Optional[pd.DataFrame] = None):
+        self.df = df
+        self.prices = prices
+
+    def _matrix(self, frame: pd.DataFrame, column: str, days: pd.DatetimeIndex, codes: pd.Index) -> np.ndarray:
+        """
+        按 (日期, 证券) 汇总某列并展开为 日期 x 证券 矩阵
+        """
+        if frame.empty:
+            return np.zeros((len(days), len(codes)))
+        return (
+            frame.groupby(['day', 'code'])[column].sum()
+            .unstack(fill_value=0.0)
+            .reindex(index=days, columns=codes, fill_value=0.0)
+            .to_numpy(dtype=float)
+        )
+
+    def _price_matrix(self, trades: pd.DataFrame, days: pd.DatetimeIndex, codes: pd.Index) -> np.ndarray:
+        """
+        日期 x 证券 价格矩阵：外部收盘价优先，其次为截至当日最后一笔成交价
+        """
+        trade_price = (
+            trades.drop_duplicates(['day', 'code'], keep='last')
+            .set_index(['day', 'code'])['price']
+            .unstack()
+            .reindex(index=days, columns=codes)
+            .ffill()
+        )
+        if self.prices is not None and not self.prices.empty:
+            external = self.prices.copy()
+            external.index = pd.DatetimeIndex(external.index).normalize()
+            external = external.reindex(index=external.index.union(days)).ffill().reindex(index=days)
+            external = external.reindex(columns=codes)
+            trade_price = external.where(external.notna(), trade_price)
+        return trade_price.fillna(0.0).to_numpy(dtype=float)
+
+    def calculate(self) -> PnLCube:
+        """
+        计算盈亏立方体
+
+        Returns:
+            PnLCube，values 形状为 (日期数, 证券数, 分项数)
+        """
+        df = self.df.sort_values('date', kind='mergesort')
+        if df.empty:
+            return PnLCube(pd.DatetimeIndex([]), pd.Index([], dtype=object), np.zeros((0, 0, len(PNL_COMPONENTS))))
+
+        records = pd.DataFrame({
+            'day': df['date'].dt.normalize().values,
+            'code': df['security_code'].astype(str).values,
+            'type': df['trade_type'].astype(str).values,
+            'price': df['price'].to_numpy(dtype=float),
+            'quantity': df['quantity'].to_numpy(dtype=float),
+            'amount': df['amount'].to_numpy(dtype=float),
+            'net_amount': df['net_amount'].to_numpy(dtype=float),
+        })
+        records.loc[records['type'] == 'interest', 'code'] = CASH_CODE
+
+        days = pd.DatetimeIndex(records['day'].unique())
+        relevant = records[records['type'].isin(
+            ['buy', 'sell', 'stock_dividend', 'dividend', 'dividend_tax', 'repo_lend', 'repo_return', 'interest']
+        )]
+        codes = pd.Index(sorted(relevant['code'].unique()))
+        names = (
+            df.assign(code=records['code'].values)
+            .drop_duplicates('code', keep='last')
+            .set_index('code')['security_name'].astype(str).to_dict()
+        )
+
+        trades = records[records['type'].isin(['buy', 'sell'])]
+        buy = trades[trades['type'] == 'buy']
+        sell = trades[trades['type'] == 'sell']
+        bonus = records[records['type'] == 'stock_dividend']
+
+        buy_qty = self._matrix(buy, 'quantity', days, codes)
+        buy_amount = self._matrix(buy, 'amount', days, codes)
+        sell_qty = self._matrix(sell, 'quantity', days, codes)
+        sell_amount = self._matrix(sell, 'amount', days, codes)
+        bonus_qty = self._matrix(bonus, 'quantity', days, codes)
+        price = self._price_matrix(trades, days, codes)
+
+        # 沿时间轴递推持仓和移动平均成本，每一步对全部证券做向量运算；
+        # 日内按先买入（含红股）后卖出处理，卖出超过持仓的部分成本按卖出价计（不产生盈亏）
+        n_days, n_codes = len(days), len(codes)
+        realized = np.zeros((n_days, n_codes))
+        unrealized = np.zeros((n_days, n_codes))
+        position = np.zeros(n_codes)
+        cost = np.zeros(n_codes)
+        prev_gain = np.zeros(n_codes)
+
+        for t in range(n_days):
+            available = position + buy_qty[t] + bonus_qty[t]
+            cost_before = cost + buy_amount[t]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                avg_cost = np.where(available > 0, cost_before / available, 0.0)
+                sell_price = np.where(sell_qty[t] > 0, sell_amount[t] / sell_qty[t], 0.0)
+
+            covered = np.minimum(sell_qty[t], available)
+            realized[t] = covered * (sell_price - avg_cost)
+
+            position = available - covered
+            cost = np.where(position > 0, cost_before - covered * avg_cost, 0.0)
+            gain = position * price[t] - cost
+            unrealized[t] = gain - prev_gain
+            prev_gain = gain
+
+        dividend = self._matrix(records[records['type'].isin(['dividend', 'dividend_tax'])], 'net_amount', days, codes)
+
+        # 费用取 净发生额 与 成交金额 的差，包含 total_fee 之外的其他扣费
+        fee_records = records[records['type'].isin(['buy', 'sell', 'repo_lend', 'repo_return'])]
+        gross = np.where(fee_records['type'].isin(['buy', 'repo_lend']), -fee_records['amount'], fee_records['amount'])
+        fee = self._matrix(fee_records.assign(fee=fee_records['net_amount'] - gross), 'fee', days, codes)
+
+        repo_return = records[records['type'] == 'repo_return'].assign(
+            interest=lambda r: r['amount'] - r['quantity'] * REPO_FACE_VALUE
+        )
+        repo = self._matrix(repo_return, 'interest', days, codes)
+
+        interest = self._matrix(records[records['type'] == 'interest'], 'net_amount', days, codes)
+
+        values = np.stack([realized, unrealized, dividend, fee, repo, interest], axis=2)
+        return PnLCube(dates=days, securities=codes, values=values, components=list(PNL_COMPONENTS), names=names)
@@ -0,0 +1,228 @@
+"""
+基准对比分析
+
+将账户每日总资产与指数（如沪深300、中证500）的日收益率对齐后计算：
+- alpha（年化 Jensen alpha，%）、beta、相关系数
+- 跟踪误差（年化，%）、信息比率
+- 上行/下行捕获率（基准上涨/下跌日账户平均收益与基准平均收益之比，%）
+
+全区间和滚动窗口使用同一组累计和公式：各窗口只需 x、y、xy、x²、y²
+及上涨/下跌日的累计和相减，O(n) 完成全部窗口。
+输出列名为 <指标>_<窗口>，与 rolling_metrics 一致。
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .rolling_metrics import DEFAULT_WINDOWS, TRADING_DAYS_PER_YEAR, rolling_sum
+
+DEFAULT_BENCHMARK = '000300'
+
+BENCHMARK_NAMES = {
+    '000300': '沪深300',
+    '000905': '中证500',
+    '000852': '中证1000',
+    '000016': '上证50',
+    '000001': '上证指数',
+    '399001': '深证成指',
+    '399006': '创业板指',
+    '000688': '科创50',
+}
+
+BENCHMARK_METRICS = [
+    'alpha', 'beta', 'correlation', 'tracking_error', 'information_ratio',
+    'up_capture', 'down_capture', 'excess_return',
+]
+
+
+@dataclass
+class BenchmarkResult:
+    code: str
+    name: str
+    metrics: Dict[str, float] = field(default_factory=dict)
+    rolling: Optional[pd.DataFrame] = None
+
+
+def align_returns(equity: pd.Series, index_close: pd.Series) -> pd.DataFrame:
+    """
+    对齐账户与基准的日收益率
+
+    基准收盘价按账户日期向前填充（账户日期多于指数交易日时取最近收盘价），
+    任一方收益率无效（首日、资产为0、基准缺失）的日期记为 NaN。
+
+    Args:
+        equity: 每日总资产，索引为日期
+        index_close: 指数收盘价，索引为日期
+
+    Returns:
+        DataFrame: date, portfolio, benchmark
+    """
+    index_close = index_close[~index_close.index.duplicated(keep='last')].sort_index()
+    benchmark = index_close.reindex(index_close.index.union(equity.index)).ffill().reindex(equity.index)
+
+    values = equity.to_numpy(dtype=float)
+    bench = benchmark.to_numpy(dtype=float)
+    portfolio_returns = np.full(len(values), np.nan)
+    benchmark_returns = np.full(len(values), np.nan)
+    if len(values) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            portfolio_returns[1:] = values[1:] / values[:-1] - 1
+            benchmark_returns[1:] = bench[1:] / bench[:-1] - 1
+
+    valid = np.isfinite(portfolio_returns) & np.isfinite(benchmark_returns)
+    return pd.DataFrame({
+        'date': equity.index,
+        'portfolio': np.where(valid, portfolio_returns, np.nan),
+        'benchmark': np.where(valid, benchmark_returns, np.nan),
+    })
+
+
+def _return_sums(portfolio: np.ndarray, benchmark: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    逐日的各项被加数，无效日期为 0
+    """
+    valid = np.isfinite(portfolio) & np.isfinite(benchmark)
+    y = np.where(valid, portfolio, 0.0)
+    x = np.where(valid, benchmark, 0.0)
+    up = x > 0
+    down = x < 0
+    return {
+        'n': valid.astype(float),
+        'x': x,
+        'y': y,
+        'xx': x * x,
+        'yy': y * y,
+        'xy': x * y,
+        'n_up': up.astype(float),
+        'x_up': np.where(up, x, 0.0),
+        'y_up': np.where(up, y, 0.0),
+        'n_down': down.astype(float),
+        'x_down': np.where(down, x, 0.0),
+        'y_down': np.where(down, y, 0.0),
+    }
+
+
+def _metrics_from_sums(sums: Dict[str, np.ndarray], risk_free_rate: float) -> Dict[str, np.ndarray]:
+    """
+    由累计和计算基准对比指标（总体方差口径，与夏普比率一致）
+    """
+    n = sums['n']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = sums['x'] / n
+        mean_y = sums['y'] / n
+        var_x = np.clip(sums['xx'] / n - mean_x ** 2, 0.0, None)
+        var_y = np.clip(sums['yy'] / n - mean_y ** 2, 0.0, None)
+        cov = sums['xy'] / n - mean_x * mean_y
+
+        var_x = np.where(var_x < 1e-18, np.nan, var_x)
+        beta = cov / var_x
+        correlation = cov / np.sqrt(var_x * np.where(var_y < 1e-18, np.nan, var_y))
+
+        daily_rf = risk_free_rate / TRADING_DAYS_PER_YEAR
+        alpha = ((mean_y - daily_rf) - beta * (mean_x - daily_rf)) * TRADING_DAYS_PER_YEAR * 100
+
+        # 超额收益 d = y - x
+        mean_d = mean_y - mean_x
+        var_d = np.clip((sums['yy'] - 2 * sums['xy'] + sums['xx']) / n - mean_d ** 2, 0.0, None)
+        std_d = np.sqrt(var_d)
+        std_d = np.where(std_d < 1e-12, np.nan, std_d)
+        tracking_error = std_d * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+        information_ratio = mean_d * TRADING_DAYS_PER_YEAR / (std_d * np.sqrt(TRADING_DAYS_PER_YEAR))
+
+        up_capture = (sums['y_up'] / sums['n_up']) / (sums['x_up'] / sums['n_up']) * 100
+        down_capture = (sums['y_down'] / sums['n_down']) / (sums['x_down'] / sums['n_down']) * 100
+
+    return {
+        'alpha': alpha,
+        'beta': beta,
+        'correlation': correlation,
+        'tracking_error': tracking_error,
+        'information_ratio': information_ratio,
+        'up_capture': up_capture,
+        'down_capture': down_capture,
+        'excess_return': mean_d * TRADING_DAYS_PER_YEAR * 100,
+    }
+
+
+def benchmark_metrics(returns: pd.DataFrame, risk_free_rate: float = 0.03) -> Dict[str, float]:
+    """
+    全区间基准对比指标
+
+    Args:
+        returns: align_returns 的输出
+        risk_free_rate: 无风险利率，默认3%
+
+    Returns:
+        指标字典，键见 BENCHMARK_METRICS；无法计算的指标为 NaN
+    """
+    sums = _return_sums(returns['portfolio'].to_numpy(dtype=float), returns['benchmark'].to_numpy(dtype=float))
+    totals = {name: np.sum(values) for name, values in sums.items()}
+    if totals['n'] < 2:
+        return {name: np.nan for name in BENCHMARK_METRICS}
+
+    metrics = _metrics_from_sums(totals, risk_free_rate)
+    return {name: float(metrics[name]) for name in BENCHMARK_METRICS}
+
+
+def rolling_benchmark_metrics(
+    returns: pd.DataFrame,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    risk_free_rate: float = 0.03
+) -> pd.DataFrame:
+    """
+    滚动窗口基准对比指标
+
+    Args:
+        returns: align_returns 的输出
+        windows: 窗口长度（交易日）
+        risk_free_rate: 无风险利率，默认3%
+
+    Returns:
+        DataFrame，date 列加每个窗口的各项指标；窗口未满或有效日不足2天的行为 NaN
+    """
+    for window in windows:
+        if int(window) != window or window < 2:
+            raise ValueError(f"窗口长度必须是不小于2的整数: {window}")
+
+    sums = _return_sums(returns['portfolio'].to_numpy(dtype=float), returns['benchmark'].to_numpy(dtype=float))
+    result = pd.DataFrame({'date': returns['date']})
+    full_index = np.arange(len(result))
+
+    for window in windows:
+        window = int(window)
+        window_sums = {name: rolling_sum(values, window) for name, values in sums.items()}
+        metrics = _metrics_from_sums(window_sums, risk_free_rate)
+        enough = (full_index >= window) & (window_sums['n'] >= 2)
+        for name in BENCHMARK_METRICS:
+            result[f'{name}_{window}'] = np.where(enough, metrics[name], np.nan)
+
+    return result
+
+
+def compare_with_benchmark(
+    equity: pd.Series,
+    index_close: pd.Series,
+    code: str = DEFAULT_BENCHMARK,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    risk_free_rate: float = 0.03
+) -> BenchmarkResult:
+    """
+    账户与基准指数的全区间及滚动对比
+
+    Args:
+        equity: 每日总资产，索引为日期
+        index_close: 指数收盘价，索引为日期
+        code: 指数代码
+        windows: 滚动窗口长度（交易日）
+        risk_free_rate: 无风险利率，默认3%
+    """
+    returns = align_returns(equity, index_close)
+    return BenchmarkResult(
+        code=code,
+        name=BENCHMARK_NAMES.get(code, code),
+        metrics=benchmark_metrics(returns, risk_free_rate),
+        rolling=rolling_benchmark_metrics(returns, windows, risk_free_rate),
+    )
@@ -0,0 +1,289 @@
+"""
+绩效指标的自助法（Bootstrap）置信区间
+
+对 FIFO 配对得到的每笔交易盈亏和每日总资产的日收益率做有放回重采样，
+每批重采样是一个 (次数, 样本数) 的索引矩阵，指标沿 axis=1 一次算完：
+- 交易：胜率、盈亏比、平均盈亏、总盈亏
+- 日收益率：年化收益率、夏普比率、最大回撤，以及破产概率（路径上资产
+  曾跌破初始值的 ruin_level）和期末亏损概率
+
+日收益率支持块重采样（block_size > 1），保留相邻交易日之间的相关性。
+重采样次数较多时可用 max_workers 分到多个进程，每个进程使用
+SeedSequence.spawn 派生的独立随机数流，种子和进程数相同时结果可复现。
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .rolling_metrics import TRADING_DAYS_PER_YEAR
+
+DEFAULT_RESAMPLES = 5000
+
+DEFAULT_CONFIDENCE = 0.95
+
+# 单批重采样矩阵的元素上限，控制内存（float64 约 80MB）
+BATCH_ELEMENTS = 10_000_000
+
+TRADE_METRICS = ['win_rate', 'profit_loss_ratio', 'avg_profit', 'total_profit']
+
+RETURN_METRICS = ['annual_return', 'sharpe_ratio', 'max_drawdown']
+
+INTERVAL_COLUMNS = ['metric', 'estimate', 'mean', 'std', 'lower', 'upper']
+
+
+@dataclass
+class BootstrapResult:
+    n_resamples: int
+    confidence: float
+    intervals: pd.DataFrame
+    ruin: Dict[str, float] = field(default_factory=dict)
+
+
+def resample_indices(
+    n: int,
+    n_resamples: int,
+    rng: np.random.Generator,
+    block_size: int = 1
+) -> np.ndarray:
+    """
+    重采样索引矩阵 (n_resamples, n)
+
+    block_size > 1 时为移动块重采样：随机选取块起点，每块取连续 block_size 个样本。
+    """
+    if block_size <= 1 or n <= block_size:
+        return rng.integers(0, n, size=(n_resamples, n))
+
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n - block_size + 1, size=(n_resamples, n_blocks))
+    idx = starts[:, :, None] + np.arange(block_size)
+    return idx.reshape(n_resamples, -1)[:, :n]
+
+
+def trade_metrics(samples: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    按行计算交易指标，口径与 PerformanceCalculator 一致
+
+    Args:
+        samples: 每行一组交易盈亏
+    """
+    samples = np.atleast_2d(samples)
+    wins = samples > 0
+    losses = samples < 0
+    win_count = wins.sum(axis=1)
+    loss_count = losses.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_win = np.where(wins, samples, 0.0).sum(axis=1) / win_count
+        avg_loss = -np.where(losses, samples, 0.0).sum(axis=1) / loss_count
+        pl_ratio = np.where((win_count > 0) & (loss_count > 0), avg_win / avg_loss, 0.0)
+
+    return {
+        'win_rate': win_count / samples.shape[1] * 100,
+        'profit_loss_ratio': pl_ratio,
+        'avg_profit': samples.mean(axis=1),
+        'total_profit': samples.sum(axis=1),
+    }
+
+
+def return_metrics(
+    samples: np.ndarray,
+    risk_free_rate: float = 0.03,
+    ruin_level: float = 0.5
+) -> Dict[str, np.ndarray]:
+    """
+    按行计算日收益率路径的指标
+
+    Args:
+        samples: 每行一条日收益率路径
+        risk_free_rate: 无风险利率
+        ruin_level: 资产跌破初始值的该比例视为破产
+
+    Returns:
+        各指标数组，另含 ruined / final_loss 两个布尔数组
+    """
+    samples = np.atleast_2d(samples)
+    mean = samples.mean(axis=1)
+    std = samples.std(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annualized_std = std * np.sqrt(TRADING_DAYS_PER_YEAR)
+        sharpe = np.where(std > 0, (mean * TRADING_DAYS_PER_YEAR - risk_free_rate) / annualized_std, 0.0)
+
+    equity = np.cumprod(1 + samples, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    drawdown = ((peak - equity) / peak).max(axis=1) * 100
+
+    years = samples.shape[1] / TRADING_DAYS_PER_YEAR
+    final = equity[:, -1]
+    with np.errstate(invalid='ignore'):
+        annual_return = np.where(final > 0, final ** (1 / years) - 1, -1.0) * 100
+
+    return {
+        'annual_return': annual_return,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': drawdown,
+        'ruined': equity.min(axis=1) < ruin_level,
+        'final_loss': final < 1,
+    }
+
+
+def _bootstrap_worker(
+    values: np.ndarray,
+    kind: str,
+    n_resamples: int,
+    seed: np.random.SeedSequence,
+    block_size: int,
+    risk_free_rate: float,
+    ruin_level: float
+) -> Dict[str, np.ndarray]:
+    """
+    在一个随机数流上分批完成 n_resamples 次重采样（模块级函数，便于进程池序列化）
+    """
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_ELEMENTS // max(len(values), 1))
+
+    parts: Dict[str, List[np.ndarray]] = {}
+    done = 0
+    while done < n_resamples:
+        size = min(batch, n_resamples - done)
+        samples = values[resample_indices(len(values), size, rng, block_size)]
+        if kind == 'trades':
+            metrics = trade_metrics(samples)
+        else:
+            metrics = return_metrics(samples, risk_free_rate, ruin_level)
+        for name, array in metrics.items():
+            parts.setdefault(name, []).append(array)
+        done += size
+
+    return {name: np.concatenate(arrays) for name, arrays in parts.items()}
+
+
+def _run_bootstrap(
+    values: np.ndarray,
+    kind: str,
+    n_resamples: int,
+    seed: Optional[int],
+    max_workers: int,
+    block_size: int = 1,
+    risk_free_rate: float = 0.03,
+    ruin_level: float = 0.5
+) -> Dict[str, np.ndarray]:
+    """
+    将重采样次数按进程数切分，汇总各进程的指标分布
+    """
+    workers = max(1, min(max_workers or 1, n_resamples))
+    counts = np.full(workers, n_resamples // workers)
+    counts[:n_resamples % workers] += 1
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    args = [
+        (values, kind, int(count), child, block_size, risk_free_rate, ruin_level)
+        for count, child in zip(counts, seeds)
+    ]
+
+    if workers == 1:
+        results = [_bootstrap_worker(*args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_bootstrap_worker, *zip(*args)))
+
+    return {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+
+
+def confidence_intervals(
+    distributions: Dict[str, np.ndarray],
+    estimates: Dict[str, float],
+    confidence: float = DEFAULT_CONFIDENCE
+) -> pd.DataFrame:
+    """
+    百分位数置信区间
+
+    Returns:
+        DataFrame: metric, estimate（原样本的点估计）, mean, std, lower, upper
+    """
+    alpha = (1 - confidence) / 2
+    rows = []
+    for name, estimate in estimates.items():
+        values = distributions[name]
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            rows.append({'metric': name, 'estimate': estimate, 'mean': np.nan,
+                         'std': np.nan, 'lower': np.nan, 'upper': np.nan})
+            continue
+        lower, upper = np.quantile(values, [alpha, 1 - alpha])
+        rows.append({
+            'metric': name,
+            'estimate': estimate,
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'lower': float(lower),
+            'upper': float(upper),
+        })
+    return pd.DataFrame(rows, columns=INTERVAL_COLUMNS)
+
+
+def bootstrap_performance(
+    trade_profits: np.ndarray,
+    daily_returns: np.ndarray,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: Optional[int] = None,
+    max_workers: int = 1,
+    block_size: int = 5,
+    risk_free_rate: float = 0.03,
+    ruin_level: float = 0.5
+) -> BootstrapResult:
+    """
+    交易盈亏与日收益率的自助法置信区间
+
+    Args:
+        trade_profits: 每笔 FIFO 配对交易的盈亏
+        daily_returns: 每日总资产的日收益率
+        n_resamples: 重采样次数
+        confidence: 置信水平
+        seed: 随机种子，None 表示不固定
+        max_workers: 进程数，1 表示在当前进程内计算
+        block_size: 日收益率的块长度（交易日），1 为独立重采样
+        risk_free_rate: 无风险利率
+        ruin_level: 资产跌破初始值的该比例视为破产
+
+    Returns:
+        BootstrapResult；ruin 包含 ruin_probability、loss_probability
+    """
+    if n_resamples < 1:
+        raise ValueError(f"重采样次数必须为正数: {n_resamples}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"置信水平必须在 0 和 1 之间: {confidence}")
+
+    trade_profits = np.asarray(trade_profits, dtype=float)
+    daily_returns = np.asarray(daily_returns, dtype=float)
+    daily_returns = daily_returns[np.isfinite(daily_returns)]
+
+    # 交易与收益率使用不同的随机数流
+    trade_seed, return_seed = np.random.SeedSequence(seed).generate_state(2)
+
+    frames = []
+    ruin = {}
+
+    if len(trade_profits) > 0:
+        estimates = {k: float(v[0]) for k, v in trade_metrics(trade_profits).items()}
+        distributions = _run_bootstrap(trade_profits, 'trades', n_resamples, trade_seed, max_workers)
+        frames.append(confidence_intervals(distributions, estimates, confidence))
+
+    if len(daily_returns) >= 2:
+        point = return_metrics(daily_returns, risk_free_rate, ruin_level)
+        estimates = {k: float(point[k][0]) for k in RETURN_METRICS}
+        distributions = _run_bootstrap(daily_returns, 'returns', n_resamples, return_seed, max_workers,
+                                       block_size, risk_free_rate, ruin_level)
+        frames.append(confidence_intervals(distributions, estimates, confidence))
+        ruin = {
+            'ruin_probability': float(distributions['ruined'].mean() * 100),
+            'loss_probability': float(distributions['final_loss'].mean() * 100),
+        }
+
+    intervals = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=INTERVAL_COLUMNS)
+    return BootstrapResult(n_resamples=n_resamples, confidence=confidence, intervals=intervals, ruin=ruin)
@@ -0,0 +1,348 @@
+"""
+反事实（What-if）分析
+
+在 FIFO 配对后的交易列表上套用规则变换（延长持有、跳过小额交易、止损止盈等），
+用 日期 x 证券 收盘价矩阵重新估值，与实际盈亏对比。
+
+每笔交易表示为数组中的一行：证券列号、买入/卖出所在的价格矩阵行号、
+买卖价格、数量、费率。规则只改写这些数组，估值一次完成：
+    盈亏 = (卖出价 - 买入价) x 数量 - 费率 x (买入金额 + 卖出金额)
+费率由实际盈亏反推，恒等规则下的盈亏与实际盈亏完全一致。
+
+价格矩阵优先使用 daily_prices 中的收盘价（DatabaseManager.get_price_matrix），
+缺失处使用截至当日的最后成交价；只有成交价时，"交易日"即账户有记录的日期。
+
+参数网格（grid）可在进程池中并行评估，每个进程只接收一次引擎数据。
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import product
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+SCENARIO_COLUMNS = [
+    'scenario', 'trades', 'total_profit', 'win_rate', 'avg_profit',
+    'avg_holding_days', 'actual_profit', 'difference',
+]
+
+
+@dataclass
+class TradeSet:
+    code: np.ndarray
+    entry: np.ndarray
+    exit: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    quantity: np.ndarray
+    fee_rate: np.ndarray
+    active: np.ndarray
+
+
+def _price_at(close: np.ndarray, rows: np.ndarray, codes: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+    """
+    取价格矩阵中 (rows, codes) 处的价格，没有价格时使用 fallback
+    """
+    price = close[rows, codes]
+    return np.where(np.isfinite(price) & (price > 0), price, fallback)
+
+
+def _first_hit(mask: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+    每行在 [start, end] 区间内第一个为 True 的列号，没有时为 end
+    """
+    columns = np.arange(mask.shape[1])
+    window = mask & (columns >= start[:, None]) & (columns <= end[:, None])
+    hit = window.any(axis=1)
+    return np.where(hit, window.argmax(axis=1), end)
+
+
+@dataclass(frozen=True)
+class HoldLonger:
+    """每笔卖出推迟 sessions 个交易日（不超过最后一个交易日）"""
+    sessions: int = 20
+
+    def apply(self, trades: TradeSet, close: np.ndarray) -> TradeSet:
+        exit_row = np.minimum(trades.exit + self.sessions, len(close) - 1)
+        changed = exit_row != trades.exit
+        price = np.where(changed, _price_at(close, exit_row, trades.code, trades.exit_price), trades.exit_price)
+        return replace(trades, exit=exit_row, exit_price=price)
+
+
+@dataclass(frozen=True)
+class MaxHolding:
+    """持有不超过 sessions 个交易日，到期按收盘价卖出"""
+    sessions: int = 20
+
+    def apply(self, trades: TradeSet, close: np.ndarray) -> TradeSet:
+        exit_row = np.minimum(trades.exit, trades.entry + self.sessions)
+        changed = exit_row != trades.exit
+        price = np.where(changed, _price_at(close, exit_row, trades.code, trades.exit_price), trades.exit_price)
+        return replace(trades, exit=exit_row, exit_price=price)
+
+
+@dataclass(frozen=True)
+class DelayEntry:
+    """每笔买入推迟 sessions 个交易日（不晚于卖出日），按收盘价买入"""
+    sessions: int = 1
+
+    def apply(self, trades: TradeSet, close: np.ndarray) -> TradeSet:
+        entry_row = np.minimum(trades.entry + self.sessions, trades.exit)
+        changed = entry_row != trades.entry
+        price = np.where(changed, _price_at(close, entry_row, trades.code, trades.entry_price), trades.entry_price)
+        return replace(trades, entry=entry_row, entry_price=price)
+
+
+@dataclass(frozen=True)
+class SkipSmallTrades:
+    """跳过买入金额低于 min_amount 的交易"""
+    min_amount: float = 5000.0
+
+    def apply(self, trades: TradeSet, close: np.ndarray) -> TradeSet:
+        amount = trades.entry_price * trades.quantity
+        return replace(trades, active=trades.active & (amount >= self.min_amount))
+
+
+@dataclass(frozen=True)
+class StopLoss:
+    """持有期间收盘价跌破买入价 (1 - pct) 时按当日收盘价卖出"""
+    pct: float = 0.08
+
+    def apply(self, trades: TradeSet, close: np.ndarray) -> TradeSet:
+        path = close[:, trades.code].T
+        hit = path <= (trades.entry_price * (1 - self.pct))[:, None]
+        exit_row = _first_hit(hit, trades.entry + 1, trades.exit)
+        changed = exit_row != trades.exit
+        price = np.where(changed, _price_at(close, exit_row, trades.code, trades.exit_price), trades.exit_price)
+        return replace(trades, exit=exit_row, exit_price=price)
+
+
+@dataclass(frozen=True)
+class TakeProfit:
+    """持有期间收盘价涨过买入价 (1 + pct) 时按当日收盘价卖出"""
+    pct: float = 0.2
+
+    def apply(self, trades: TradeSet, close: np.ndarray) -> TradeSet:
+        path = close[:, trades.code].T
+        hit = path >= (trades.entry_price * (1 + self.pct))[:, None]
+        exit_row = _first_hit(hit, trades.entry + 1, trades.exit)
+        changed = exit_row != trades.exit
+        price = np.where(changed, _price_at(close, exit_row, trades.code, trades.exit_price), trades.exit_price)
+        return replace(trades, exit=exit_row, exit_price=price)
+
+
+def describe_rules(rules: Sequence[Any]) -> str:
+    """
+    规则组合的文字描述，如 HoldLonger(sessions=20) + SkipSmallTrades(min_amount=5000)
+    """
+    return ' + '.join(repr(rule) for rule in rules) if rules else '实际交易'
+
+
+def build_price_matrix(df: pd.DataFrame, prices: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    日期 x 证券 收盘价矩阵
+
+    Args:
+        df: 清洗后的交易记录（用于成交价和交易日）
+        prices: daily_prices 展开的收盘价矩阵，优先使用
+
+    Returns:
+        DataFrame，索引为交易日（账户记录日期与行情日期的并集），向前填充
+    """
+    trades = df[df['trade_type'].isin(['buy', 'sell'])]
+    trade_price = (
+        pd.DataFrame({
+            'day': trades['date'].dt.normalize().values,
+            'code': trades['security_code'].astype(str).values,
+            'price': trades['price'].to_numpy(dtype=float),
+        })
+        .drop_duplicates(['day', 'code'], keep='last')
+        .pivot(index='day', columns='code', values='price')
+    )
+
+    if prices is None or prices.empty:
+        return trade_price.sort_index().ffill()
+
+    external = prices.copy()
+    external.index = pd.DatetimeIndex(external.index).normalize()
+    days = trade_price.index.union(external.index)
+    codes = trade_price.columns.union(external.columns)
+    external = external.reindex(index=days, columns=codes)
+    merged = external.where(external.notna(), trade_price.reindex(index=days, columns=codes))
+    return merged.ffill()
+
+
+class CounterfactualEngine:
+    """
+    反事实分析引擎
+
+    Args:
+        trades: FIFO 配对结果，需包含 code, buy_date, sell_date, buy_price, sell_price, quantity, profit
+        prices: build_price_matrix 的输出
+    """
+
+    def __init__(self, trades: pd.DataFrame, prices: pd.DataFrame):
+        prices = prices.sort_index()
+        self.dates = pd.DatetimeIndex(prices.index)
+        self.codes = pd.Index(prices.columns.astype(str))
+        self.close = prices.to_numpy(dtype=float)
+
+        code = self.codes.get_indexer(trades['code'].astype(str))
+        known = code >= 0
+        trades = trades[known]
+        code = code[known]
+
+        buy_price = trades['buy_price'].to_numpy(dtype=float)
+        sell_price = trades['sell_price'].to_numpy(dtype=float)
+        quantity = trades['quantity'].to_numpy(dtype=float)
+        notional = (buy_price + sell_price) * quantity
+
+        # 实际费用 = 毛利 - 实际盈亏，按成交金额折算成费率
+        fee = (sell_price - buy_price) * quantity - trades['profit'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fee_rate = np.where(notional > 0, fee / notional, 0.0)
+
+        self.trades = TradeSet(
+            code=code,
+            entry=self._row_of(trades['buy_date']),
+            exit=self._row_of(trades['sell_date']),
+            entry_price=buy_price,
+            exit_price=sell_price,
+            quantity=quantity,
+            fee_rate=fee_rate,
+            active=np.ones(len(trades), dtype=bool),
+        )
+        self.actual = self._summarize(self.trades)
+
+    @classmethod
+    def from_records(cls, df: pd.DataFrame, prices: Optional[pd.DataFrame] = None) -> 'CounterfactualEngine':
+        """
+        从清洗后的交易记录创建（FIFO 配对使用 PerformanceCalculator）
+        """
+        from .performance import PerformanceCalculator
+
+        results = PerformanceCalculator(df)._calculate_trade_results()
+        trades = pd.DataFrame({
+            'code': [t.code for t in results],
+            'buy_date': [t.buy_date for t in results],
+            'sell_date': [t.sell_date for t in results],
+            'buy_price': [t.buy_price for t in results],
+            'sell_price': [t.sell_price for t in results],
+            'quantity': [t.quantity for t in results],
+            'profit': [t.profit for t in results],
+        })
+        return cls(trades, build_price_matrix(df, prices))
+
+    def _row_of(self, dates: pd.Series) -> np.ndarray:
+        """
+        日期对应的价格矩阵行号（取不晚于该日期的最后一行）
+        """
+        rows = self.dates.searchsorted(pd.DatetimeIndex(dates).normalize(), side='right') - 1
+        return np.clip(rows, 0, max(len(self.dates) - 1, 0))
+
+    def _summarize(self, trades: TradeSet) -> Dict[str, float]:
+        active = trades.active
+        entry_amount = trades.entry_price * trades.quantity
+        exit_amount = trades.exit_price * trades.quantity
+        profit = (exit_amount - entry_amount - trades.fee_rate * (entry_amount + exit_amount))[active]
+        holding = (self.dates[trades.exit[active]] - self.dates[trades.entry[active]]).days
+
+        count = int(active.sum())
+        return {
+            'trades': count,
+            'total_profit': float(profit.sum()),
+            'win_rate': float((profit > 0).mean() * 100) if count else 0.0,
+            'avg_profit': float(profit.mean()) if count else 0.0,
+            'avg_holding_days': float(np.mean(holding)) if count else 0.0,
+        }
+
+    def evaluate(self, rules: Sequence[Any]) -> Dict[str, float]:
+        """
+        依次套用规则并重新估值
+
+        Returns:
+            trades, total_profit, win_rate, avg_profit, avg_holding_days
+        """
+        trades = self.trades
+        for rule in rules:
+            trades = rule.apply(trades, self.close)
+        return self._summarize(trades)
+
+    def _row(self, name: str, summary: Dict[str, float]) -> Dict[str, Any]:
+        return {
+            'scenario': name,
+            **summary,
+            'actual_profit': self.actual['total_profit'],
+            'difference': summary['total_profit'] - self.actual['total_profit'],
+        }
+
+    def compare(self, scenarios: Dict[str, Sequence[Any]], max_workers: int = 1) -> pd.DataFrame:
+        """
+        对比多个规则组合与实际盈亏
+
+        Args:
+            scenarios: {场景名: 规则列表}
+            max_workers: 进程数，1 表示在当前进程内计算
+
+        Returns:
+            DataFrame，列见 SCENARIO_COLUMNS，第一行为实际交易
+        """
+        names = list(scenarios)
+        return self._compare(names, [list(scenarios[name]) for name in names], max_workers)
+
+    def _compare(self, names: List[str], rule_lists: List[List[Any]], max_workers: int) -> pd.DataFrame:
+        """
+        按顺序评估规则列表，场景名可以重复
+        """
+        if max_workers == 1 or len(rule_lists) <= 1:
+            summaries = [self.evaluate(rules) for rules in rule_lists]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(self,)) as executor:
+                summaries = list(executor.map(_evaluate_in_worker, rule_lists))
+
+        rows = [self._row('实际交易', self.actual)]
+        rows.extend(self._row(name, summary) for name, summary in zip(names, summaries))
+        return pd.DataFrame(rows, columns=SCENARIO_COLUMNS)
+
+    def grid(
+        self,
+        rule_factory: Callable[..., Any],
+        param_grid: Dict[str, Sequence[Any]],
+        base_rules: Sequence[Any] = (),
+        max_workers: int = 1
+    ) -> pd.DataFrame:
+        """
+        评估规则参数网格
+
+        Args:
+            rule_factory: 规则类或函数，如 HoldLonger
+            param_grid: {参数名: 取值列表}，如 {'sessions': [5, 10, 20]}
+            base_rules: 先于网格规则套用的规则
+            max_workers: 进程数
+
+        Returns:
+            DataFrame：每个参数组合一行，参数列在前，其余列见 SCENARIO_COLUMNS
+        """
+        keys = list(param_grid)
+        combos = [dict(zip(keys, values)) for values in product(*(param_grid[k] for k in keys))]
+        # 按组合顺序保留每一行；重复取值或描述相同的规则不能按场景名合并，否则与参数列错位
+        rule_lists = [list(base_rules) + [rule_factory(**params)] for params in combos]
+        names = [describe_rules(rules) for rules in rule_lists]
+
+        table = self._compare(names, rule_lists, max_workers).iloc[1:].reset_index(drop=True)
+        params = pd.DataFrame(combos, columns=keys)
+        return pd.concat([params, table], axis=1)
+
+
+_worker_engine: Optional[CounterfactualEngine] = None
+
+
+def _init_worker(engine: CounterfactualEngine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _evaluate_in_worker(rules: List[Any]) -> Dict[str, float]:
+    return _worker_engine.evaluate(rules)
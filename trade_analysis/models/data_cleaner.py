@@ -1,10 +1,33 @@
+import zipfile
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from pathlib import Path
 
 from .record_parser import RecordParser, RecordType, TRADE_TYPE_MAP, REPO_CODES
+from .schema import apply_trade_schema
+from ..utils.profiler import profiled, frame_nbytes, file_nbytes
+
+DEFAULT_CHUNK_SIZE = 50000
+DEFAULT_SNIFF_ROWS = 20
+
+# OLE2（.xls）和 zip（.xlsx）文件头
+EXCEL_MAGIC_BYTES = (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', b'PK\x03\x04')
+
+
+def excel_engine() -> Optional[str]:
+    """
+    选择 Excel 读取引擎
+    
+    安装了 python-calamine 时使用 calamine（Rust 实现，比 openpyxl/xlrd 快数倍），
+    否则返回 None，由 pandas 按扩展名选择 openpyxl（只读模式）或 xlrd。
+    """
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return None
 
 
 class DataCleaner:
@@ -21,6 +44,7 @@ class DataCleaner:
         self.parser = RecordParser()
         self.file_structure: Optional[Dict[str, Any]] = None
     
+    @profiled('cleaner.load', nbytes=lambda result, self: file_nbytes(self.filepath))
     def load_data(self) -> pd.DataFrame:
         """
         加载数据文件，自动检测格式
@@ -48,7 +72,10 @@ class DataCleaner:
         try:
             with open(self.filepath, 'rb') as f:
                 header = f.read(20)
-                # 真正的 Excel 文件以特定的二进制标记开头
+                # 真正的 Excel 文件以特定的二进制标记开头（.xls 为 OLE2，.xlsx 为 zip），
+                # 这些字节也可能恰好能被 GBK 解码，需要先排除
+                if header.startswith(EXCEL_MAGIC_BYTES):
+                    return False
                 # 文本文件则以可打印字符开头
                 try:
                     header.decode('gbk')
@@ -71,41 +98,44 @@ class DataCleaner:
         
         df = self._standardize_columns(df)
         
-        records = []
-        for idx, row in df.iterrows():
-            try:
-                record = self.parser.parse_record(row)
-                records.append(record)
-            except Exception as e:
-                print(f"Warning: Failed to parse row {idx}: {e}")
-        
-        self.raw_data = pd.DataFrame(records)
+        self.raw_data = self.parser.parse_frame(df)
         return self.raw_data
     
     def _load_excel(self) -> pd.DataFrame:
         """
         加载 Excel 文件，动态检测表头位置
+        
+        只解析一次工作表：不带表头读取后定位表头行，再切出数据部分。
         """
-        df_raw = pd.read_excel(self.filepath, header=None)
+        df_raw = pd.read_excel(self.filepath, header=None, engine=excel_engine())
         
         self.file_structure = self.parser.detect_file_structure(df_raw)
         header_row = self.file_structure['header_row']
         
-        df = pd.read_excel(self.filepath, header=header_row)
+        df = self._slice_header(df_raw, header_row)
+        del df_raw
         
         df = self._standardize_columns(df)
         
-        records = []
-        for idx, row in df.iterrows():
-            try:
-                record = self.parser.parse_record(row)
-                records.append(record)
-            except Exception as e:
-                print(f"Warning: Failed to parse row {idx}: {e}")
-        
-        self.raw_data = pd.DataFrame(records)
+        self.raw_data = self.parser.parse_frame(df)
         return self.raw_data
     
+    def _slice_header(self, df_raw: pd.DataFrame, header_row: int) -> pd.DataFrame:
+        """
+        以 header_row 行作为列名切出数据部分
+        
+        表头前的行被丢弃，空列名按 pandas 规则命名为 Unnamed: n，列类型按数据部分重新推断。
+        与 read_excel(header=header_row) 不同，单元格中的文本不会被转换为数值，
+        '000676' 这类证券代码保留前导零（RecordParser 对两种形式的解析结果相同）。
+        """
+        columns = [
+            f'Unnamed: {i}' if pd.isna(col) else col
+            for i, col in enumerate(df_raw.iloc[header_row].tolist())
+        ]
+        df = df_raw.iloc[header_row + 1:].reset_index(drop=True)
+        df.columns = columns
+        return df.infer_objects()
+    
     def _load_csv(self) -> pd.DataFrame:
         """
         加载 CSV 文件
@@ -119,15 +149,7 @@ class DataCleaner:
         
         df = self._standardize_columns(df)
         
-        records = []
-        for idx, row in df.iterrows():
-            try:
-                record = self.parser.parse_record(row)
-                records.append(record)
-            except Exception as e:
-                print(f"Warning: Failed to parse row {idx}: {e}")
-        
-        self.raw_data = pd.DataFrame(records)
+        self.raw_data = self.parser.parse_frame(df)
         return self.raw_data
     
     def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -150,6 +172,7 @@ class DataCleaner:
         
         return df
     
+    @profiled('cleaner.clean', nbytes=frame_nbytes)
     def clean(self) -> pd.DataFrame:
         """
         清洗数据
@@ -160,8 +183,13 @@ class DataCleaner:
         if self.raw_data is None:
             self.load_data()
         
-        df = self.raw_data.copy()
-        
+        self.cleaned_data = self._clean_frame(self.raw_data.copy())
+        return self.cleaned_data
+    
+    def _clean_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        清洗已解析的记录（整表和分块导入共用）
+        """
         df['date'] = pd.to_datetime(df['date'], format='%Y%m%d', errors='coerce')
         
         df = df.dropna(subset=['date'])
@@ -170,17 +198,136 @@ class DataCleaner:
         
         df['total_fee'] = df['commission'] + df['stamp_tax'] + df['transfer_fee'] + df['clearing_fee']
         
-        df = df.reset_index()
         # 不再去重，因为交割单中的每笔记录都是独立的交易
         # 即使是同一天、同股票、同类型的多笔交易，也应该保留
         # 如果确实有重复数据，应该由数据库的 UNIQUE 约束来处理
-        df = df.set_index('index')
-        df = df.sort_index()
+        return apply_trade_schema(df.reset_index(drop=True))
+    
+    def iter_clean_chunks(
+        self,
+        chunksize: int = DEFAULT_CHUNK_SIZE,
+        sniff_rows: int = DEFAULT_SNIFF_ROWS
+    ) -> Iterator[pd.DataFrame]:
+        """
+        分块读取并清洗数据（流式导入）
         
-        df = df.reset_index(drop=True)
+        只读取前 sniff_rows 行识别表头，其余数据按 chunksize 行分块读取、
+        解析和清洗，内存占用与文件大小无关。
         
-        self.cleaned_data = df
-        return df
+        Args:
+            chunksize: 每块行数
+            sniff_rows: 用于识别表头的行数
+            
+        Yields:
+            清洗后的数据块
+        """
+        for chunk in self._iter_raw_chunks(chunksize, sniff_rows):
+            chunk = self._standardize_columns(chunk)
+            parsed = self.parser.parse_frame(chunk)
+            if parsed.empty:
+                continue
+            cleaned = self._clean_frame(parsed)
+            if not cleaned.empty:
+                yield cleaned
+    
+    def _iter_raw_chunks(self, chunksize: int, sniff_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        按文件格式分块读取原始数据（已设置表头）
+        """
+        path = Path(self.filepath)
+        suffix = path.suffix.lower()
+        
+        if suffix in ['.xls', '.xlsx']:
+            if self._is_text_format():
+                yield from self._iter_text_chunks('gbk', chunksize, sniff_rows)
+            elif zipfile.is_zipfile(self.filepath):
+                yield from self._iter_xlsx_chunks(chunksize, sniff_rows)
+            else:
+                # 二进制 .xls（xlrd）不支持按行流式读取，整表读取后分块
+                df_raw = pd.read_excel(self.filepath, header=None, engine=excel_engine())
+                self.file_structure = self.parser.detect_file_structure(df_raw)
+                df = self._slice_header(df_raw, self.file_structure['header_row'])
+                del df_raw
+                for start in range(0, len(df), chunksize):
+                    yield df.iloc[start:start + chunksize]
+        elif suffix == '.csv':
+            yield from self._iter_text_chunks('utf-8', chunksize, sniff_rows)
+        else:
+            raise ValueError(f"不支持的文件格式: {suffix}")
+    
+    def _iter_text_chunks(self, encoding: str, chunksize: int, sniff_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        分块读取文本文件（CSV 或券商导出的制表符分隔 .xls）
+        """
+        is_tab_separated = encoding == 'gbk'
+        sep_options = [{'sep': '\t'}, {'sep': None, 'engine': 'python'}] if is_tab_separated else [{}]
+        
+        for i, options in enumerate(sep_options):
+            try:
+                sample = pd.read_csv(
+                    self.filepath, encoding=encoding, header=None,
+                    nrows=sniff_rows, **options
+                )
+                self.file_structure = self.parser.detect_file_structure(sample)
+                header_row = self.file_structure['header_row']
+                del sample
+                
+                reader = pd.read_csv(
+                    self.filepath, encoding=encoding, header=0,
+                    skiprows=header_row, chunksize=chunksize, **options
+                )
+                break
+            except (ValueError, pd.errors.ParserError):
+                if i == len(sep_options) - 1:
+                    raise
+        
+        with reader:
+            for chunk in reader:
+                yield chunk
+    
+    def _iter_xlsx_chunks(self, chunksize: int, sniff_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        使用 openpyxl 只读模式逐行读取 .xlsx
+        """
+        from openpyxl import load_workbook
+        
+        wb = load_workbook(self.filepath, read_only=True, data_only=True)
+        try:
+            rows = wb.worksheets[0].iter_rows(values_only=True)
+            
+            sample = []
+            for row in rows:
+                sample.append(row)
+                if len(sample) >= sniff_rows:
+                    break
+            
+            self.file_structure = self.parser.detect_file_structure(pd.DataFrame(sample))
+            header_row = self.file_structure['header_row']
+            header = list(sample[header_row])
+            
+            buffer = sample[header_row + 1:]
+            del sample
+            
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= chunksize:
+                    yield self._rows_to_frame(buffer, header)
+                    buffer = []
+            
+            if buffer:
+                yield self._rows_to_frame(buffer, header)
+        finally:
+            wb.close()
+    
+    def _rows_to_frame(self, rows: List[tuple], header: List[Any]) -> pd.DataFrame:
+        """
+        把 openpyxl 行元组转为 DataFrame，空单元格与 read_excel 一致记为 NaN
+        """
+        width = len(header)
+        rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+        df = pd.DataFrame(rows, columns=header)
+        df = df.dropna(how='all')
+        return df.fillna(np.nan).infer_objects()
     
     def filter_by_date(
         self, 
@@ -0,0 +1,150 @@
+"""
+回撤分析
+
+基于资产曲线（账户总资产或单只证券的累计盈亏）计算：
+- 回撤曲线：np.maximum.accumulate 得到历史高点，逐日回撤金额和回撤率
+- 最大回撤率
+- 回撤区间：按深度排序的前 N 个回撤，包含高点、谷底、恢复日期、深度和持续时间
+
+单条曲线用 Series 表示；多条曲线（例如每只证券一列）用 DataFrame 表示，
+由 drawdown_summary 逐列汇总。
+"""
+
+import numpy as np
+import pandas as pd
+
+EPISODE_COLUMNS = [
+    'peak_date', 'trough_date', 'recovery_date', 'peak_value', 'trough_value',
+    'depth', 'depth_pct', 'decline_days', 'recovery_days', 'duration_days', 'recovered',
+]
+
+
+def underwater_curve(equity: pd.Series) -> pd.DataFrame:
+    """
+    回撤曲线
+
+    Args:
+        equity: 资产曲线，索引为日期
+
+    Returns:
+        DataFrame: date, equity, peak, drawdown（金额）, drawdown_pct（%，高点不为正时为 0）
+    """
+    values = equity.to_numpy(dtype=float)
+    peak = np.maximum.accumulate(values) if len(values) else values
+    drawdown = peak - values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown_pct = np.where(peak > 0, drawdown / peak * 100, 0.0)
+
+    return pd.DataFrame({
+        'date': equity.index,
+        'equity': values,
+        'peak': peak,
+        'drawdown': drawdown,
+        'drawdown_pct': drawdown_pct,
+    })
+
+
+def max_drawdown(equity: pd.Series) -> float:
+    """
+    最大回撤率（%）
+
+    与逐日遍历的定义一致：只在历史高点为正时计算回撤率。
+    """
+    if len(equity) < 2:
+        return 0.0
+    return float(underwater_curve(equity)['drawdown_pct'].max())
+
+
+def drawdown_episodes(equity: pd.Series, top_n: int = 5, sort_by: str = 'depth') -> pd.DataFrame:
+    """
+    回撤区间（按回撤深度从大到小取前 top_n 个）
+
+    一个区间从创出高点的那一天开始，到重新回到该高点的那一天结束；
+    尚未恢复的区间 recovery_date 为 NaT，持续时间计算到最后一天。
+
+    Args:
+        equity: 资产曲线，索引为日期
+        top_n: 返回的区间数，None 返回全部
+        sort_by: 'depth' 按回撤金额排序，'depth_pct' 按回撤率排序
+
+    Returns:
+        DataFrame，列见 EPISODE_COLUMNS
+    """
+    curve = underwater_curve(equity)
+    underwater = (curve['drawdown'] > 0).to_numpy()
+
+    if not underwater.any():
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    # 每个不在水下的点开启一个新分组，水下的点归入其前一个高点所在的分组
+    group = np.cumsum(~underwater)
+    position = np.arange(len(curve))
+    curve['group'] = group
+    curve['position'] = position
+
+    grouped = curve[curve['group'].isin(np.unique(group[underwater]))].groupby('group', sort=True)
+    first = grouped['position'].min().to_numpy()
+    last = grouped['position'].max().to_numpy()
+    trough = grouped['drawdown'].idxmax().to_numpy()
+
+    dates = pd.DatetimeIndex(curve['date'])
+    recovered = last + 1 < len(curve)
+    recovery_position = np.where(recovered, last + 1, len(curve) - 1)
+
+    peak_date = dates[first]
+    trough_date = dates[trough]
+    end_date = dates[recovery_position]
+
+    episodes = pd.DataFrame({
+        'peak_date': peak_date,
+        'trough_date': trough_date,
+        'recovery_date': end_date.where(recovered, pd.NaT),
+        'peak_value': curve['peak'].to_numpy()[first],
+        'trough_value': curve['equity'].to_numpy()[trough],
+        'depth': curve['drawdown'].to_numpy()[trough],
+        'depth_pct': curve['drawdown_pct'].to_numpy()[trough],
+        'decline_days': (trough_date - peak_date).days,
+        'recovery_days': np.where(recovered, (end_date - trough_date).days, np.nan),
+        'duration_days': (end_date - peak_date).days,
+        'recovered': recovered,
+    })
+
+    episodes = episodes.sort_values(sort_by, ascending=False, kind='mergesort')
+    if top_n is not None:
+        episodes = episodes.head(top_n)
+    return episodes.reset_index(drop=True)
+
+
+def drawdown_summary(curves: pd.DataFrame) -> pd.DataFrame:
+    """
+    多条曲线的最大回撤汇总（每列一行）
+
+    Args:
+        curves: 资产曲线，索引为日期，每列一条曲线（如每只证券的累计盈亏）
+
+    Returns:
+        DataFrame: name, max_drawdown（金额）, max_drawdown_pct（同一区间的回撤率，高点不为正时为 0）,
+        peak_date, trough_date, recovery_date
+    """
+    columns = ['name', 'max_drawdown', 'max_drawdown_pct', 'peak_date', 'trough_date', 'recovery_date']
+    rows = []
+    for name in curves.columns:
+        episodes = drawdown_episodes(curves[name].dropna(), top_n=1)
+        if episodes.empty:
+            rows.append({'name': name, 'max_drawdown': 0.0, 'max_drawdown_pct': 0.0,
+                         'peak_date': pd.NaT, 'trough_date': pd.NaT, 'recovery_date': pd.NaT})
+            continue
+        episode = episodes.iloc[0]
+        rows.append({
+            'name': name,
+            'max_drawdown': episode['depth'],
+            'max_drawdown_pct': episode['depth_pct'],
+            'peak_date': episode['peak_date'],
+            'trough_date': episode['trough_date'],
+            'recovery_date': episode['recovery_date'],
+        })
+
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows, columns=columns).sort_values('max_drawdown', ascending=False).reset_index(drop=True)
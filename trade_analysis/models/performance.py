@@ -4,6 +4,17 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+from .rolling_metrics import calculate_rolling_metrics, DEFAULT_WINDOWS
+from .drawdown import underwater_curve, max_drawdown, drawdown_episodes, drawdown_summary
+from .bootstrap import bootstrap_performance, BootstrapResult, DEFAULT_RESAMPLES, DEFAULT_CONFIDENCE
+from .benchmark import compare_with_benchmark, BenchmarkResult, DEFAULT_BENCHMARK
+from .repo import RepoEngine
+from ..utils.profiler import profiled
+
+
+# 不属于证券持仓的 security_code
+NON_SECURITY_CODES = ['银行转证券', '证券转银行', '利息归本', '']
+
 
 @dataclass
 class PerformanceMetrics:
@@ -48,70 +59,112 @@ class PerformanceCalculator:
     def __init__(self, df: pd.DataFrame):
         self.df = df
         self._trade_results: Optional[List[TradeResult]] = None
+        self._daily_assets: Optional[pd.DataFrame] = None
+        self._security_curves: Optional[pd.DataFrame] = None
+        self._repo_engine: Optional[RepoEngine] = None
+    
+    @property
+    def repo_engine(self) -> RepoEngine:
+        """
+        逆回购配对与计息引擎（首次访问时构建）
+        """
+        if self._repo_engine is None:
+            self._repo_engine = RepoEngine(self.df)
+        return self._repo_engine
     
+    @profiled('performance.nav')
     def _calculate_daily_total_assets(self) -> pd.DataFrame:
         """
         计算每日总资产（现金 + 逆回购 + 持仓市值）
         
+        逆回购余额和应计利息来自 RepoEngine，各证券持仓由逐日累计和得到，持仓市值按 日期 x 证券 矩阵计算，
+        结果缓存在实例上，夏普比率、最大回撤和滚动指标共用同一条资产曲线。
+        
         Returns:
             DataFrame 包含日期和总资产
         """
+        if self._daily_assets is not None:
+            return self._daily_assets.copy()
+        
         if self.df.empty:
             return pd.DataFrame(columns=['date', 'total_assets'])
         
-        df = self.df.copy().sort_values('date')
-        
-        daily_data = []
-        
-        for date in sorted(df['date'].dt.date.unique()):
-            date_df = df[df['date'].dt.date == date]
-            
-            # 当日现金余额（取最后一笔的余额）
-            cash_balance = date_df['balance'].iloc[-1] if not date_df.empty else 0
-            
-            # 逆回购金额（当日发生的逆回购）
-            repo_lend = date_df[date_df['trade_type'] == 'repo_lend']['amount'].sum()
-            repo_return = date_df[date_df['trade_type'] == 'repo_return']['amount'].sum()
+        df = self.df.sort_values('date')
+        day = df['date'].dt.normalize().values
+        trade_type = df['trade_type'].astype(str).values
+        
+        # 每日最后一笔记录的位置
+        last_of_day = np.r_[day[1:] != day[:-1], True]
+        days = pd.DatetimeIndex(day[last_of_day])
+        
+        # 当日现金余额（取最后一笔的余额）
+        cash = df['balance'].values[last_of_day]
+        
+        # 逆回购本金余额与应计利息（按出借、购回配对后的日序列）
+        repo = self.repo_engine.balances(days)
+        repo_balance = repo['outstanding'].to_numpy()
+        repo_interest = repo['accrued_interest'].to_numpy()
+        
+        # 计算每日持仓市值
+        code = df['security_code'].astype(str).values
+        is_security = ~np.isin(code, NON_SECURITY_CODES)
+        position_value = np.zeros(len(days))
+        self._security_curves = pd.DataFrame(index=days)
+        
+        if is_security.any():
+            quantity = df['quantity'].values[is_security].astype(float)
+            sec_type = trade_type[is_security]
+            is_trade = np.isin(sec_type, ['buy', 'sell'])
+            sec = pd.DataFrame({
+                'day': day[is_security],
+                'code': code[is_security],
+                'quantity': np.where(sec_type == 'buy', quantity, np.where(sec_type == 'sell', -quantity, 0.0)),
+                'price': df['price'].values[is_security],
+                'cash_flow': np.where(is_trade, df['net_amount'].values[is_security], 0.0),
+            })
             
-            # 累计逆回购余额（需要计算所有历史逆回购）
-            prev_df = df[df['date'].dt.date <= date]
-            total_repo_lend = prev_df[prev_df['trade_type'] == 'repo_lend']['amount'].sum()
-            total_repo_return = prev_df[prev_df['trade_type'] == 'repo_return']['amount'].sum()
-            repo_balance = total_repo_lend - total_repo_return
+            # 持仓 = 累计买入 - 累计卖出
+            position = (
+                sec.groupby(['day', 'code'])['quantity'].sum()
+                .unstack(fill_value=0.0)
+                .reindex(days, fill_value=0.0)
+                .cumsum()
+            )
             
-            # 计算当日持仓市值
-            position_value = 0.0
-            for code in prev_df['security_code'].unique():
-                if not code or code in ['银行转证券', '证券转银行', '利息归本', '']:
-                    continue
-                
-                code_df = prev_df[prev_df['security_code'] == code]
-                buy_qty = code_df[code_df['trade_type'] == 'buy']['quantity'].sum()
-                sell_qty = code_df[code_df['trade_type'] == 'sell']['quantity'].sum()
-                position = buy_qty - sell_qty
-                
-                if position > 0:
-                    # 使用当日该股票最后一笔交易价格作为当前价格
-                    code_today = date_df[date_df['security_code'] == code]
-                    if not code_today.empty:
-                        price = code_today['price'].iloc[-1]
-                    else:
-                        # 如果没有当日交易，使用之前最后一次交易价格
-                        price = code_df['price'].iloc[-1] if not code_df.empty else 0
-                    position_value += position * price
+            # 使用该股票截至当日最后一笔交易价格作为当前价格
+            price = (
+                sec.drop_duplicates(['day', 'code'], keep='last')
+                .set_index(['day', 'code'])['price']
+                .unstack()
+                .reindex(index=days, columns=position.columns)
+                .ffill()
+                .fillna(0.0)
+            )
             
-            # 当日总资产 = 现金 + 逆回购余额 + 持仓市值
-            total_assets = cash_balance + repo_balance + position_value
+            market_value = position.where(position > 0, 0.0) * price
+            position_value = market_value.sum(axis=1).values
             
-            daily_data.append({
-                'date': pd.Timestamp(date),
-                'cash': cash_balance,
-                'repo_balance': repo_balance,
-                'position_value': position_value,
-                'total_assets': total_assets
-            })
-        
-        return pd.DataFrame(daily_data)
+            # 单只证券累计盈亏 = 买卖累计净发生额 + 持仓市值（只保留有买卖记录的证券）
+            traded = sorted(set(sec['code'][is_trade]))
+            cash_flow = (
+                sec.groupby(['day', 'code'])['cash_flow'].sum()
+                .unstack(fill_value=0.0)
+                .reindex(index=days, columns=traded, fill_value=0.0)
+                .cumsum()
+            )
+            self._security_curves = cash_flow + market_value[traded]
+        
+        # 当日总资产 = 现金 + 逆回购余额 + 应计利息 + 持仓市值
+        self._daily_assets = pd.DataFrame({
+            'date': days,
+            'cash': cash,
+            'repo_balance': repo_balance,
+            'repo_interest': repo_interest,
+            'position_value': position_value,
+            'total_assets': cash + repo_balance + repo_interest + position_value,
+        })
+        
+        return self._daily_assets.copy()
     
     def calculate_all_metrics(self) -> PerformanceMetrics:
         """
@@ -255,26 +308,134 @@ class PerformanceCalculator:
         if daily_assets.empty:
             return 0.0
         
-        total_assets = daily_assets['total_assets'].tolist()
+        return max_drawdown(daily_assets.set_index('date')['total_assets'])
+    
+    def get_drawdown_curve(self) -> pd.DataFrame:
+        """
+        获取账户总资产的回撤曲线
+        """
+        daily_assets = self._calculate_daily_total_assets()
         
-        if not total_assets or len(total_assets) < 2:
-            return 0.0
+        if daily_assets.empty:
+            return pd.DataFrame()
         
-        # 计算最大回撤
-        max_drawdown = 0.0
-        peak = total_assets[0]
+        return underwater_curve(daily_assets.set_index('date')['total_assets'])
+    
+    def get_drawdown_episodes(self, top_n: int = 5) -> pd.DataFrame:
+        """
+        获取账户总资产回撤最深的 top_n 个区间（按回撤率排序）
+        """
+        daily_assets = self._calculate_daily_total_assets()
         
-        for assets in total_assets:
-            if assets > peak:
-                peak = assets
-            
-            if peak > 0:
-                drawdown = (peak - assets) / peak
-                if drawdown > max_drawdown:
-                    max_drawdown = drawdown
+        if daily_assets.empty:
+            return pd.DataFrame()
+        
+        return drawdown_episodes(daily_assets.set_index('date')['total_assets'], top_n, sort_by='depth_pct')
+    
+    def get_security_equity_curves(self) -> pd.DataFrame:
+        """
+        获取每只证券的累计盈亏曲线（日期 x 证券代码）
+        
+        累计盈亏 = 买卖累计净发生额（含费用）+ 持仓 x 截至当日最后成交价
+        """
+        self._calculate_daily_total_assets()
+        
+        if self._security_curves is None:
+            return pd.DataFrame()
         
-        return max_drawdown * 100
+        return self._security_curves.copy()
+    
+    def get_security_drawdowns(self) -> pd.DataFrame:
+        """
+        获取每只证券累计盈亏曲线的最大回撤（按回撤金额排序）
+        """
+        curves = self.get_security_equity_curves()
+        
+        if curves.empty:
+            return pd.DataFrame()
+        
+        return drawdown_summary(curves).rename(columns={'name': 'security_code'})
+    
+    def get_rolling_metrics(
+        self,
+        windows: Tuple[int, ...] = DEFAULT_WINDOWS,
+        risk_free_rate: float = 0.03
+    ) -> pd.DataFrame:
+        """
+        获取滚动窗口绩效指标（基于每日总资产）
+        
+        Args:
+            windows: 窗口长度（交易日），默认 20/60/250
+            risk_free_rate: 无风险利率，默认3%
+        """
+        daily_assets = self._calculate_daily_total_assets()
+        
+        if daily_assets.empty:
+            return pd.DataFrame()
+        
+        equity = daily_assets.set_index('date')['total_assets']
+        return calculate_rolling_metrics(equity, windows, risk_free_rate)
+    
+    def get_benchmark_comparison(
+        self,
+        index_close: pd.Series,
+        code: str = DEFAULT_BENCHMARK,
+        windows: Tuple[int, ...] = DEFAULT_WINDOWS,
+        risk_free_rate: float = 0.03
+    ) -> Optional[BenchmarkResult]:
+        """
+        获取账户总资产相对基准指数的 alpha、beta、跟踪误差、信息比率和上下行捕获率
+        
+        Args:
+            index_close: 指数收盘价，索引为日期
+            code: 指数代码
+            windows: 滚动窗口长度（交易日）
+            risk_free_rate: 无风险利率，默认3%
+        """
+        daily_assets = self._calculate_daily_total_assets()
+        
+        if daily_assets.empty or index_close is None or index_close.empty:
+            return None
+        
+        equity = daily_assets.set_index('date')['total_assets']
+        return compare_with_benchmark(equity, index_close, code, windows, risk_free_rate)
+    
+    def get_bootstrap(
+        self,
+        n_resamples: int = DEFAULT_RESAMPLES,
+        confidence: float = DEFAULT_CONFIDENCE,
+        seed: Optional[int] = None,
+        max_workers: int = 1,
+        risk_free_rate: float = 0.03
+    ) -> BootstrapResult:
+        """
+        获取胜率、盈亏比、夏普比率、最大回撤等指标的自助法置信区间和破产概率
+        
+        Args:
+            n_resamples: 重采样次数
+            confidence: 置信水平，默认95%
+            seed: 随机种子
+            max_workers: 进程数
+            risk_free_rate: 无风险利率，默认3%
+        """
+        profits = np.array([t.profit for t in self._calculate_trade_results()], dtype=float)
+        
+        daily_assets = self._calculate_daily_total_assets()
+        if daily_assets.empty:
+            returns = np.array([], dtype=float)
+        else:
+            returns = daily_assets['total_assets'].pct_change().to_numpy(dtype=float)[1:]
+        
+        return bootstrap_performance(
+            profits, returns,
+            n_resamples=n_resamples,
+            confidence=confidence,
+            seed=seed,
+            max_workers=max_workers,
+            risk_free_rate=risk_free_rate
+        )
     
+    @profiled('performance.fifo')
     def _calculate_trade_results(self) -> List[TradeResult]:
         """
         计算每笔交易的结果
@@ -5,6 +5,9 @@ from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 import akshare as ak
 
+from .asof_index import AsOfPositionIndex
+from .repo import RepoEngine
+
 
 @dataclass
 class ProfitSummary:
@@ -21,6 +24,8 @@ class ProfitSummary:
 class ProfitCalculator:
     def __init__(self, df: pd.DataFrame):
         self.df = df
+        self._position_index = None
+        self._repo_engine = None
 
     def calculate_account_profit(self, close_prices: Dict[str, float] = None) -> ProfitSummary:
         net_transfer = self._calculate_net_transfer()
@@ -60,51 +65,23 @@ class ProfitCalculator:
         return transfer_in - transfer_out
 
     def _calculate_repo_amount(self) -> float:
-        last_date = self.df['date'].max()
-        last_day_lend = self.df[(self.df['date'] == last_date) & (self.df['trade_type'] == 'repo_lend')]
-        return last_day_lend['amount'].sum()
+        return self.repo_engine.outstanding_as_of(self.df['date'].max())
 
     def _calculate_positions(self) -> Dict[str, Dict]:
-        # 包含买入、卖出和红股入账
-        trade_df = self.df[self.df['trade_type'].isin(['buy', 'sell', 'stock_dividend'])].copy()
-
-        positions = {}
-        for code in trade_df['security_code'].unique():
-            sec_df = trade_df[trade_df['security_code'] == code].sort_values('date')
-
-            if len(sec_df) == 0:
-                continue
-
-            # 正确计算持仓：买入累计 + 红股累计 - 卖出累计
-            buy_df = sec_df[sec_df['trade_type'] == 'buy']
-            sell_df = sec_df[sec_df['trade_type'] == 'sell']
-            dividend_df = sec_df[sec_df['trade_type'] == 'stock_dividend']
-
-            total_buy_quantity = buy_df['quantity'].sum()
-            total_sell_quantity = sell_df['quantity'].sum()
-            total_dividend_quantity = dividend_df['quantity'].sum()
-            current_position = total_buy_quantity + total_dividend_quantity - total_sell_quantity
+        # 包含买入、卖出和红股入账；红股成本为0，不增加成本但增加股数
+        return self.position_index.positions_as_of(self.df['date'].max())
 
-            if current_position > 0:
-                last_record = sec_df.iloc[-1]
-                sec_name = last_record['security_name']
+    @property
+    def position_index(self) -> AsOfPositionIndex:
+        if self._position_index is None:
+            self._position_index = AsOfPositionIndex(self.df)
+        return self._position_index
 
-                total_buy_amount = buy_df['amount'].sum()
-                total_sell_amount = sell_df['amount'].sum()
-                total_buy_fee = buy_df['total_fee'].sum()
-                total_sell_fee = sell_df['total_fee'].sum()
-
-                # 成本计算：红股成本为0，不增加成本但增加股数
-                cost_price = (total_buy_amount - total_sell_amount + total_buy_fee + total_sell_fee) / current_position
-
-                positions[code] = {
-                    'name': sec_name,
-                    'quantity': int(current_position),
-                    'cost_price': cost_price,
-                    'close_price': 0
-                }
-
-        return positions
+    @property
+    def repo_engine(self) -> RepoEngine:
+        if self._repo_engine is None:
+            self._repo_engine = RepoEngine(self.df)
+        return self._repo_engine
 
     def _calculate_market_value(self, positions: Dict[str, Dict], close_prices: Dict[str, float]) -> float:
         total_value = 0
@@ -149,22 +126,7 @@ class ProfitCalculator:
         }
 
     def _calculate_repo_profit(self) -> float:
-        lend_df = self.df[self.df['trade_type'] == 'repo_lend']
-        return_df = self.df[self.df['trade_type'] == 'repo_return']
-        
-        lend_amount = lend_df['amount'].sum()
-        return_amount = return_df['amount'].sum()
-        lend_commission = lend_df['commission'].sum()
-        
-        unmatched = len(lend_df) - len(return_df)
-        if unmatched > 0:
-            lend_df_sorted = lend_df.sort_values('date')
-            unmatched_amount = lend_df_sorted.tail(unmatched)['amount'].sum()
-            matched_lend = lend_amount - unmatched_amount
-        else:
-            matched_lend = lend_amount
-        
-        return return_amount - matched_lend - lend_commission
+        return self.repo_engine.repo_profit()
 
     def get_monthly_summary(self) -> pd.DataFrame:
         df = self.df.copy()
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
@@ -35,12 +36,22 @@ REPO_CODES = ['131810', '204001', '204002', '204003', '204004', '204007', '20401
 
 TRANSFER_KEYWORDS = ['银行转证券', '证券转银行']
 INTEREST_KEYWORDS = ['利息归本']
+CURRENCY_KEYWORDS = ['人民币', 'RMB', 'CNY']
+
+PARSED_COLUMNS = [
+    'date', 'security_code', 'security_name', 'business_type', 'trade_type',
+    'price', 'quantity', 'amount', 'commission', 'stamp_tax', 'transfer_fee',
+    'clearing_fee', 'net_amount', 'balance', 'position', 'shareholder_code',
+    'currency', 'trade_id', 'security_full_name', 'remark', 'record_type',
+]
 
 
 class RecordParser:
     """
     交易记录解析器
     
+    按列整体解析（向量化），一次处理整个 DataFrame。
+    
     支持解析以下类型的记录：
     - 证券买入/卖出
     - 融券回购/购回（国债逆回购）
@@ -100,393 +111,200 @@ class RecordParser:
         
         raise ValueError("无法识别文件格式：未找到有效表头")
     
-    def identify_record_type(self, row: pd.Series) -> str:
+    def identify_record_types(self, df: pd.DataFrame) -> pd.Series:
         """
-        识别单条记录的类型
+        识别整表记录类型
         
         Args:
-            row: 数据行
+            df: 数据（已映射列名）
             
         Returns:
-            记录类型字符串
+            与 df 同索引的记录类型 Series
         """
-        security_code = str(row.get('security_code', ''))
-        business_type = str(row.get('business_type', ''))
-        
-        # 检查银行转账（通过 security_code 或 business_type）
-        if security_code in ['银行转证券', '证券转银行']:
-            return RecordType.TRANSFER
+        security_code = self._text(df['security_code'])
+        business_type = self._text(df['business_type'])
         
-        if business_type in ['银行转证券', '证券转银行']:
-            return RecordType.TRANSFER
+        # 条件按优先级排列，np.select 取第一个命中的条件
+        conditions = [
+            # 银行转账（通过 security_code 或 business_type）
+            security_code.isin(TRANSFER_KEYWORDS),
+            business_type.isin(TRANSFER_KEYWORDS),
+            security_code.isin(INTEREST_KEYWORDS),
+            business_type.isin(INTEREST_KEYWORDS),
+            business_type.isin(['0', '0.0']),
+            business_type.isin(['证券买入', '证券卖出']),
+            business_type.isin(['融券回购', '融券购回']),
+            business_type == '红利入账',
+            business_type == '红股入账',
+            business_type == '股息红利差异扣税',
+            business_type.isin(['指定交易', '指定登记']),
+        ]
+        choices = [
+            RecordType.TRANSFER,
+            RecordType.TRANSFER,
+            RecordType.INTEREST,
+            RecordType.INTEREST,
+            RecordType.UNKNOWN,
+            RecordType.TRADE,
+            RecordType.REPO,
+            RecordType.DIVIDEND,
+            RecordType.STOCK_DIVIDEND,
+            RecordType.DIVIDEND_TAX,
+            RecordType.DESIGNATE,
+        ]
         
-        if security_code == '利息归本':
-            return RecordType.INTEREST
+        return pd.Series(
+            np.select(conditions, choices, default=RecordType.UNKNOWN),
+            index=df.index,
+            dtype=object
+        )
+    
+    def parse_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        解析整表记录，返回标准化格式
         
-        if business_type == '利息归本':
-            return RecordType.INTEREST
+        各字段按记录类型用布尔掩码选取：先按原值解析整列，
+        再把该类型不适用的字段置为默认值。
         
-        if business_type == '0' or business_type == '0.0':
-            if security_code in ['银行转证券', '证券转银行']:
-                return RecordType.TRANSFER
-            return RecordType.UNKNOWN
+        Args:
+            df: 数据（已映射列名）
+            
+        Returns:
+            标准化的记录 DataFrame，列顺序同 PARSED_COLUMNS
+        """
+        if df.empty:
+            return pd.DataFrame(columns=PARSED_COLUMNS)
         
-        if business_type in ['证券买入', '证券卖出']:
-            return RecordType.TRADE
+        record_type = self.identify_record_types(df)
         
-        if business_type in ['融券回购', '融券购回']:
-            return RecordType.REPO
+        is_transfer = (record_type == RecordType.TRANSFER).to_numpy()
+        is_interest = (record_type == RecordType.INTEREST).to_numpy()
+        is_trade = (record_type == RecordType.TRADE).to_numpy()
+        is_repo = (record_type == RecordType.REPO).to_numpy()
+        is_dividend = (record_type == RecordType.DIVIDEND).to_numpy()
+        is_stock_dividend = (record_type == RecordType.STOCK_DIVIDEND).to_numpy()
+        is_dividend_tax = (record_type == RecordType.DIVIDEND_TAX).to_numpy()
+        is_designate = (record_type == RecordType.DESIGNATE).to_numpy()
+        is_unknown = (record_type == RecordType.UNKNOWN).to_numpy()
         
-        if business_type == '红利入账':
-            return RecordType.DIVIDEND
+        # 银行转账/利息归本没有证券信息
+        is_cash = is_transfer | is_interest
+        # 成交类记录（买卖、回购、未识别）保留全部原始字段
+        is_deal = is_trade | is_repo | is_unknown
         
-        if business_type == '红股入账':
-            return RecordType.STOCK_DIVIDEND
+        def text(col: str) -> np.ndarray:
+            return self._text(df[col]).to_numpy(dtype=object)
         
-        if business_type == '股息红利差异扣税':
-            return RecordType.DIVIDEND_TAX
+        def num(col: str) -> np.ndarray:
+            return self._to_float(df[col]).to_numpy()
         
-        if business_type in ['指定交易', '指定登记']:
-            return RecordType.DESIGNATE
+        raw_code = text('security_code')
+        raw_business_type = text('business_type')
         
-        return RecordType.UNKNOWN
-    
-    def parse_record(self, row: pd.Series) -> Dict[str, Any]:
-        """
-        解析单条记录，返回标准化格式
+        business_type = raw_business_type.copy()
+        transfer_business = np.where(raw_code == '银行转证券', '银行转证券', '证券转银行')
+        business_type[is_transfer] = transfer_business[is_transfer]
+        business_type[is_interest] = '利息归本'
+        business_type[is_dividend] = '红利入账'
+        business_type[is_stock_dividend] = '红股入账'
+        business_type[is_dividend_tax] = '股息红利差异扣税'
+        business_type[is_designate] = '指定交易'
         
-        Args:
-            row: 数据行（已映射列名）
-            
-        Returns:
-            标准化的记录字典
-        """
-        record_type = self.identify_record_type(row)
+        trade_type = pd.Series(business_type, index=df.index).map(TRADE_TYPE_MAP)
+        trade_type[is_repo & trade_type.isna().to_numpy()] = 'repo'
+        trade_type[is_unknown] = 'unknown'
+        trade_type = trade_type.fillna('unknown').to_numpy(dtype=object)
         
-        if record_type == RecordType.TRANSFER:
-            return self._parse_transfer(row)
-        elif record_type == RecordType.INTEREST:
-            return self._parse_interest(row)
-        elif record_type == RecordType.TRADE:
-            return self._parse_trade(row)
-        elif record_type == RecordType.REPO:
-            return self._parse_repo(row)
-        elif record_type == RecordType.DIVIDEND:
-            return self._parse_dividend(row)
-        elif record_type == RecordType.STOCK_DIVIDEND:
-            return self._parse_stock_dividend(row)
-        elif record_type == RecordType.DIVIDEND_TAX:
-            return self._parse_dividend_tax(row)
-        elif record_type == RecordType.DESIGNATE:
-            return self._parse_designate(row)
-        else:
-            return self._parse_unknown(row)
-    
-    def _parse_transfer(self, row: pd.Series) -> Dict[str, Any]:
-        transfer_type = str(row.get('security_code', ''))
-        business_type = '银行转证券' if transfer_type == '银行转证券' else '证券转银行'
+        net_amount_fixed, balance_fixed, currency_fixed = self._detect_misaligned_fields(df)
         
-        net_amount, balance, currency = self._detect_misaligned_fields(row)
+        quantity = self._to_int(df['quantity']).to_numpy()
+        position = self._to_int(df['position']).to_numpy()
         
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': '',
-            'security_name': '',
+        parsed = {
+            'date': text('date'),
+            'security_code': np.where(is_cash, '', self._format_codes(df['security_code']).to_numpy(dtype=object)),
+            'security_name': np.where(is_cash, '', text('security_name')),
             'business_type': business_type,
-            'trade_type': TRADE_TYPE_MAP.get(business_type, 'unknown'),
-            'price': 0.0,
-            'quantity': 0,
-            'amount': 0.0,
-            'commission': 0.0,
-            'stamp_tax': 0.0,
-            'transfer_fee': 0.0,
-            'clearing_fee': 0.0,
-            'net_amount': net_amount,
-            'balance': balance,
-            'position': 0,
-            'shareholder_code': '',
-            'currency': currency,
-            'trade_id': '',
-            'security_full_name': '',
-            'remark': '',
-            'record_type': RecordType.TRANSFER,
+            'trade_type': trade_type,
+            'price': np.where(is_deal, num('price'), 0.0),
+            'quantity': np.where(is_deal | is_dividend | is_stock_dividend, quantity, 0),
+            'amount': np.where(is_deal | is_dividend, num('amount'), 0.0),
+            'commission': np.where(is_deal, num('commission'), 0.0),
+            'stamp_tax': np.where(is_deal, num('stamp_tax'), 0.0),
+            'transfer_fee': np.where(is_deal | is_dividend_tax, num('transfer_fee'), 0.0),
+            'clearing_fee': np.where(is_deal, num('clearing_fee'), 0.0),
+            'net_amount': np.where(
+                is_cash, net_amount_fixed,
+                np.where(is_deal | is_dividend, num('net_amount'), 0.0)
+            ),
+            'balance': np.where(
+                is_cash, balance_fixed,
+                np.where(is_designate, 0.0, num('balance'))
+            ),
+            'position': np.where(is_trade | is_unknown | is_stock_dividend, position, 0),
+            'shareholder_code': np.where(is_cash, '', text('shareholder_code')),
+            'currency': np.where(is_cash, currency_fixed, text('currency')),
+            'trade_id': np.where(is_deal | is_designate, text('trade_id'), ''),
+            'security_full_name': np.where(is_cash, '', text('security_full_name')),
+            'remark': np.where(
+                is_interest, text('balance'),
+                np.where(is_deal, text('remark'), '')
+            ),
+            'record_type': record_type.to_numpy(dtype=object),
         }
-    
-    def _parse_interest(self, row: pd.Series) -> Dict[str, Any]:
-        net_amount, balance, currency = self._detect_misaligned_fields(row)
         
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': '',
-            'security_name': '',
-            'business_type': '利息归本',
-            'trade_type': 'interest',
-            'price': 0.0,
-            'quantity': 0,
-            'amount': 0.0,
-            'commission': 0.0,
-            'stamp_tax': 0.0,
-            'transfer_fee': 0.0,
-            'clearing_fee': 0.0,
-            'net_amount': net_amount,
-            'balance': balance,
-            'position': 0,
-            'shareholder_code': '',
-            'currency': currency,
-            'trade_id': '',
-            'security_full_name': '',
-            'remark': str(row.get('balance', '')),
-            'record_type': RecordType.INTEREST,
-        }
+        return pd.DataFrame(parsed, columns=PARSED_COLUMNS).reset_index(drop=True)
     
-    def _detect_misaligned_fields(self, row: pd.Series) -> Tuple[float, float, str]:
+    def _detect_misaligned_fields(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        自动检测错位字段，返回 (发生金额, 剩余金额, 币种)
+        自动检测错位字段，返回 (发生金额, 剩余金额, 币种) 三列
         
         银行转账/利息归本记录可能存在字段错位：
         - 正常情况: 发生金额在 net_amount 字段
         - 错位情况: 发生金额在 stamp_tax 字段，币种在 net_amount 字段
         """
-        net_amount = 0.0
-        balance = 0.0
-        currency = '人民币'
-        
+        currency = np.full(len(df), '人民币', dtype=object)
         for col in ['net_amount', 'stamp_tax', 'transfer_fee', 'clearing_fee']:
-            val = row.get(col)
-            if val is not None:
-                val_str = str(val).strip()
-                if val_str in ['人民币', 'RMB', 'CNY']:
-                    currency = val_str
-                elif self._is_numeric(val):
-                    num_val = self._safe_float(val)
-                    if col == 'net_amount' and num_val != 0:
-                        pass
-                    elif col == 'stamp_tax' and abs(num_val) >= 1:
-                        net_amount = num_val
-                    elif col == 'transfer_fee' and abs(num_val) >= 1:
-                        balance = num_val
+            values = self._text(df[col]).str.strip()
+            is_currency = (values.isin(CURRENCY_KEYWORDS) & df[col].notna()).to_numpy()
+            currency[is_currency] = values.to_numpy(dtype=object)[is_currency]
+        
+        stamp_tax = self._to_float(df['stamp_tax']).to_numpy()
+        transfer_fee = self._to_float(df['transfer_fee']).to_numpy()
+        net_amount = np.where(np.abs(stamp_tax) >= 1, stamp_tax, 0.0)
+        balance = np.where(np.abs(transfer_fee) >= 1, transfer_fee, 0.0)
         
-        if net_amount == 0:
-            net_amount = self._safe_float(row.get('net_amount', 0))
-        if balance == 0:
-            balance = self._safe_float(row.get('balance', 0))
+        net_amount = np.where(net_amount == 0, self._to_float(df['net_amount']).to_numpy(), net_amount)
+        balance = np.where(balance == 0, self._to_float(df['balance']).to_numpy(), balance)
         
         return net_amount, balance, currency
     
-    def _is_numeric(self, value) -> bool:
-        if value is None:
-            return False
-        try:
-            float(str(value).replace(',', '').strip())
-            return True
-        except (ValueError, TypeError):
-            return False
-    
-    def _parse_trade(self, row: pd.Series) -> Dict[str, Any]:
-        business_type = str(row.get('business_type', ''))
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': self._format_code(row.get('security_code', '')),
-            'security_name': str(row.get('security_name', '')),
-            'business_type': business_type,
-            'trade_type': TRADE_TYPE_MAP.get(business_type, 'unknown'),
-            'price': self._safe_float(row.get('price', 0)),
-            'quantity': self._safe_int(row.get('quantity', 0)),
-            'amount': self._safe_float(row.get('amount', 0)),
-            'commission': self._safe_float(row.get('commission', 0)),
-            'stamp_tax': self._safe_float(row.get('stamp_tax', 0)),
-            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
-            'clearing_fee': self._safe_float(row.get('clearing_fee', 0)),
-            'net_amount': self._safe_float(row.get('net_amount', 0)),
-            'balance': self._safe_float(row.get('balance', 0)),
-            'position': self._safe_int(row.get('position', 0)),
-            'shareholder_code': str(row.get('shareholder_code', '')),
-            'currency': str(row.get('currency', '人民币')),
-            'trade_id': str(row.get('trade_id', '')),
-            'security_full_name': str(row.get('security_full_name', '')),
-            'remark': str(row.get('remark', '')),
-            'record_type': RecordType.TRADE,
-        }
-    
-    def _parse_repo(self, row: pd.Series) -> Dict[str, Any]:
-        business_type = str(row.get('business_type', ''))
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': self._format_code(row.get('security_code', '')),
-            'security_name': str(row.get('security_name', '')),
-            'business_type': business_type,
-            'trade_type': TRADE_TYPE_MAP.get(business_type, 'repo'),
-            'price': self._safe_float(row.get('price', 0)),
-            'quantity': self._safe_int(row.get('quantity', 0)),
-            'amount': self._safe_float(row.get('amount', 0)),
-            'commission': self._safe_float(row.get('commission', 0)),
-            'stamp_tax': self._safe_float(row.get('stamp_tax', 0)),
-            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
-            'clearing_fee': self._safe_float(row.get('clearing_fee', 0)),
-            'net_amount': self._safe_float(row.get('net_amount', 0)),
-            'balance': self._safe_float(row.get('balance', 0)),
-            'position': 0,
-            'shareholder_code': str(row.get('shareholder_code', '')),
-            'currency': str(row.get('currency', '人民币')),
-            'trade_id': str(row.get('trade_id', '')),
-            'security_full_name': str(row.get('security_full_name', '')),
-            'remark': str(row.get('remark', '')),
-            'record_type': RecordType.REPO,
-        }
-    
-    def _parse_dividend(self, row: pd.Series) -> Dict[str, Any]:
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': self._format_code(row.get('security_code', '')),
-            'security_name': str(row.get('security_name', '')),
-            'business_type': '红利入账',
-            'trade_type': 'dividend',
-            'price': 0.0,
-            'quantity': self._safe_int(row.get('quantity', 0)),
-            'amount': self._safe_float(row.get('amount', 0)),
-            'commission': 0.0,
-            'stamp_tax': 0.0,
-            'transfer_fee': 0.0,
-            'clearing_fee': 0.0,
-            'net_amount': self._safe_float(row.get('net_amount', 0)),
-            'balance': self._safe_float(row.get('balance', 0)),
-            'position': 0,
-            'shareholder_code': str(row.get('shareholder_code', '')),
-            'currency': str(row.get('currency', '人民币')),
-            'trade_id': '',
-            'security_full_name': str(row.get('security_full_name', '')),
-            'remark': '',
-            'record_type': RecordType.DIVIDEND,
-        }
-    
-    def _parse_stock_dividend(self, row: pd.Series) -> Dict[str, Any]:
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': self._format_code(row.get('security_code', '')),
-            'security_name': str(row.get('security_name', '')),
-            'business_type': '红股入账',
-            'trade_type': 'stock_dividend',
-            'price': 0.0,
-            'quantity': self._safe_int(row.get('quantity', 0)),
-            'amount': 0.0,
-            'commission': 0.0,
-            'stamp_tax': 0.0,
-            'transfer_fee': 0.0,
-            'clearing_fee': 0.0,
-            'net_amount': 0.0,
-            'balance': self._safe_float(row.get('balance', 0)),
-            'position': self._safe_int(row.get('position', 0)),
-            'shareholder_code': str(row.get('shareholder_code', '')),
-            'currency': str(row.get('currency', '人民币')),
-            'trade_id': '',
-            'security_full_name': str(row.get('security_full_name', '')),
-            'remark': '',
-            'record_type': RecordType.STOCK_DIVIDEND,
-        }
-    
-    def _parse_dividend_tax(self, row: pd.Series) -> Dict[str, Any]:
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': self._format_code(row.get('security_code', '')),
-            'security_name': str(row.get('security_name', '')),
-            'business_type': '股息红利差异扣税',
-            'trade_type': 'dividend_tax',
-            'price': 0.0,
-            'quantity': 0,
-            'amount': 0.0,
-            'commission': 0.0,
-            'stamp_tax': 0.0,
-            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
-            'clearing_fee': 0.0,
-            'net_amount': 0.0,
-            'balance': self._safe_float(row.get('balance', 0)),
-            'position': 0,
-            'shareholder_code': str(row.get('shareholder_code', '')),
-            'currency': str(row.get('currency', '人民币')),
-            'trade_id': '',
-            'security_full_name': str(row.get('security_full_name', '')),
-            'remark': '',
-            'record_type': RecordType.DIVIDEND_TAX,
-        }
-    
-    def _parse_designate(self, row: pd.Series) -> Dict[str, Any]:
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': self._format_code(row.get('security_code', '')),
-            'security_name': str(row.get('security_name', '')),
-            'business_type': '指定交易',
-            'trade_type': 'designate',
-            'price': 0.0,
-            'quantity': 0,
-            'amount': 0.0,
-            'commission': 0.0,
-            'stamp_tax': 0.0,
-            'transfer_fee': 0.0,
-            'clearing_fee': 0.0,
-            'net_amount': 0.0,
-            'balance': 0.0,
-            'position': 0,
-            'shareholder_code': str(row.get('shareholder_code', '')),
-            'currency': str(row.get('currency', '人民币')),
-            'trade_id': str(row.get('trade_id', '')),
-            'security_full_name': str(row.get('security_full_name', '')),
-            'remark': '',
-            'record_type': RecordType.DESIGNATE,
-        }
-    
-    def _parse_unknown(self, row: pd.Series) -> Dict[str, Any]:
-        return {
-            'date': str(row.get('date', '')),
-            'security_code': self._format_code(row.get('security_code', '')),
-            'security_name': str(row.get('security_name', '')),
-            'business_type': str(row.get('business_type', '')),
-            'trade_type': 'unknown',
-            'price': self._safe_float(row.get('price', 0)),
-            'quantity': self._safe_int(row.get('quantity', 0)),
-            'amount': self._safe_float(row.get('amount', 0)),
-            'commission': self._safe_float(row.get('commission', 0)),
-            'stamp_tax': self._safe_float(row.get('stamp_tax', 0)),
-            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
-            'clearing_fee': self._safe_float(row.get('clearing_fee', 0)),
-            'net_amount': self._safe_float(row.get('net_amount', 0)),
-            'balance': self._safe_float(row.get('balance', 0)),
-            'position': self._safe_int(row.get('position', 0)),
-            'shareholder_code': str(row.get('shareholder_code', '')),
-            'currency': str(row.get('currency', '人民币')),
-            'trade_id': str(row.get('trade_id', '')),
-            'security_full_name': str(row.get('security_full_name', '')),
-            'remark': str(row.get('remark', '')),
-            'record_type': RecordType.UNKNOWN,
-        }
+    @staticmethod
+    def _text(series: pd.Series) -> pd.Series:
+        """整列转为字符串（与 str(value) 一致，缺失值为 'nan'）"""
+        return pd.Series(
+            series.to_numpy(dtype=object).astype(str).astype(object),
+            index=series.index,
+            dtype=object
+        )
     
-    def _format_code(self, code) -> str:
-        if code is None:
-            return ''
-        code_str = str(code).strip()
-        if code_str == '' or code_str == 'nan':
-            return ''
-        if '.' in code_str:
-            code_str = code_str.split('.')[0]
-        if code_str.isdigit():
-            return code_str.zfill(6)
-        return code_str
+    def _format_codes(self, series: pd.Series) -> pd.Series:
+        """整列格式化证券代码：去掉小数部分，纯数字补足6位"""
+        codes = self._text(series).str.strip()
+        codes = codes.where(~codes.isin(['', 'nan', 'None']), '')
+        codes = codes.str.split('.', n=1).str[0]
+        is_digit = codes.str.isdigit().fillna(False).astype(bool)
+        return codes.where(~is_digit, codes.str.zfill(6))
     
-    def _safe_float(self, value) -> float:
-        if value is None:
-            return 0.0
-        try:
-            if isinstance(value, str):
-                value = value.replace(',', '').strip()
-            return float(value)
-        except (ValueError, TypeError):
-            return 0.0
+    def _to_float(self, series: pd.Series) -> pd.Series:
+        """整列转为浮点数，去掉千分位逗号，无法解析或缺失时为 0"""
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series.astype(float).fillna(0.0)
+        cleaned = self._text(series).str.replace(',', '', regex=False).str.strip()
+        return pd.to_numeric(cleaned, errors='coerce').fillna(0.0)
     
-    def _safe_int(self, value) -> int:
-        if value is None:
-            return 0
-        try:
-            if isinstance(value, str):
-                value = value.replace(',', '').strip()
-            return int(float(value))
-        except (ValueError, TypeError):
-            return 0
+    def _to_int(self, series: pd.Series) -> pd.Series:
+        """整列转为整数（向零截断），无法解析或缺失时为 0"""
+        values = np.trunc(self._to_float(series).to_numpy())
+        values[~np.isfinite(values)] = 0
+        return pd.Series(values.astype(np.int64), index=series.index)
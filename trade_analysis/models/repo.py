@@ -0,0 +1,222 @@
+"""
+逆回购配对与计息
+
+每笔融券回购（出借）按代码期限找到对应的融券购回（到期）：
+同一代码、同一数量，到期日不早于 出借日 + 期限 的第一笔购回（merge_asof 向前匹配，
+节假日顺延自然落在后一个交易日）。多笔出借争用同一笔购回时，最早的出借优先，
+其余出借对剩下的购回重新匹配。
+
+利息按实际占用天数逐日计提，逆回购余额和应计利息由差分数组累加得到日序列，
+可直接用于资产曲线与绩效计算。
+
+金额口径：
+- 本金 = 出借成交金额（数量 x 面值 100）
+- 利息 = 到期金额 - 本金；尚未到期的按 本金 x 年化利率 x 期限 / 365 预估
+- 费用 = 出借、到期时 |净发生额| 与成交金额之差
+"""
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+REPO_FACE_VALUE = 100
+
+DAYS_PER_YEAR = 365
+
+# 代码 -> 期限（自然日）
+REPO_TENORS: Dict[str, int] = {
+    '204001': 1, '204002': 2, '204003': 3, '204004': 4, '204007': 7,
+    '204014': 14, '204028': 28, '204091': 91, '204182': 182,
+    '131810': 1, '131811': 2, '131800': 3, '131809': 4, '131801': 7,
+    '131802': 14, '131803': 28, '131805': 91, '131806': 182,
+}
+
+CONTRACT_COLUMNS = [
+    'security_code', 'tenor', 'lend_date', 'due_date', 'return_date', 'quantity',
+    'principal', 'rate', 'interest', 'fee', 'days', 'matched',
+]
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+
+
+def repo_tenor(code: str) -> int:
+    """
+    逆回购代码对应的期限天数，未知代码按 1 天
+    """
+    return REPO_TENORS.get(str(code), 1)
+
+
+class RepoEngine:
+    """
+    逆回购配对与计息引擎
+
+    Attributes:
+        contracts: 每笔出借一行，列见 CONTRACT_COLUMNS
+        unmatched_returns: 找不到对应出借的购回记录数（如数据区间截断）
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        repo = df[df['trade_type'].isin(['repo_lend', 'repo_return'])]
+        records = pd.DataFrame({
+            'security_code': repo['security_code'].astype(str).to_numpy(),
+            'trade_type': repo['trade_type'].astype(str).to_numpy(),
+            'date': repo['date'].dt.normalize().to_numpy(),
+            'quantity': repo['quantity'].to_numpy(dtype=float),
+            'rate': repo['price'].to_numpy(dtype=float),
+            'amount': repo['amount'].to_numpy(dtype=float),
+            'fee': (repo['net_amount'].abs() - repo['amount']).abs().to_numpy(dtype=float),
+        })
+        lends = records[records['trade_type'] == 'repo_lend'].reset_index(drop=True)
+        returns = records[records['trade_type'] == 'repo_return'].reset_index(drop=True)
+
+        self._last_day = np.int64(df['date'].max().normalize().value // 86_400_000_000_000) if len(df) else np.int64(0)
+        self.contracts = self._match(lends, returns)
+        self.unmatched_returns = len(returns) - int(self.contracts['matched'].sum())
+
+    def _match(self, lends: pd.DataFrame, returns: pd.DataFrame) -> pd.DataFrame:
+        """
+        出借与购回配对
+        """
+        lends = lends.assign(
+            tenor=lends['security_code'].map(repo_tenor).astype(np.int64),
+            lend_id=np.arange(len(lends)),
+        )
+        # 加 Timedelta 在 pandas 2 下得到 datetime64[ns]，转回与购回日期相同的精度，否则 merge_asof 报键类型不一致
+        lends['due_date'] = (lends['date'] + pd.to_timedelta(lends['tenor'], unit='D')).astype(returns['date'].dtype)
+        returns = returns.assign(return_id=np.arange(len(returns)))
+
+        matched = np.full(len(lends), -1, dtype=np.int64)
+        pending = lends
+        available = returns
+        while len(pending) and len(available):
+            pairs = pd.merge_asof(
+                pending.sort_values('due_date')[['lend_id', 'due_date', 'date', 'security_code', 'quantity']],
+                available.sort_values('date')[['return_id', 'date', 'security_code', 'quantity']]
+                .rename(columns={'date': 'return_date'}),
+                left_on='due_date', right_on='return_date',
+                by=['security_code', 'quantity'], direction='forward',
+            ).dropna(subset=['return_id'])
+            if pairs.empty:
+                break
+
+            # 同一笔购回只配给最早的出借
+            pairs = pairs.sort_values(['date', 'lend_id'], kind='mergesort').drop_duplicates('return_id')
+            matched[pairs['lend_id'].to_numpy()] = pairs['return_id'].to_numpy(dtype=np.int64)
+            pending = pending[~pending['lend_id'].isin(pairs['lend_id'])]
+            available = available[~available['return_id'].isin(pairs['return_id'])]
+
+        is_matched = matched >= 0
+        back = returns.reindex(np.where(is_matched, matched, len(returns))).reset_index(drop=True)
+
+        principal = lends['amount'].to_numpy()
+        tenor = lends['tenor'].to_numpy()
+        expected = principal * lends['rate'].to_numpy() / 100 * tenor / DAYS_PER_YEAR
+        return_date = pd.Series(back['date'].to_numpy(), dtype='datetime64[ns]')
+        end_date = return_date.where(is_matched, lends['due_date'])
+
+        return pd.DataFrame({
+            'security_code': lends['security_code'],
+            'tenor': tenor,
+            'lend_date': lends['date'],
+            'due_date': lends['due_date'],
+            'return_date': return_date,
+            'quantity': lends['quantity'],
+            'principal': principal,
+            'rate': lends['rate'],
+            'interest': np.where(is_matched, back['amount'].to_numpy() - principal, expected),
+            'fee': lends['fee'].to_numpy() + np.where(is_matched, back['fee'].to_numpy(), 0.0),
+            'days': (end_date - lends['date']).dt.days.to_numpy(),
+            'matched': is_matched,
+        }, columns=CONTRACT_COLUMNS)
+
+    def balances(self, dates: Optional[List[DateLike]] = None) -> pd.DataFrame:
+        """
+        每日收盘后的逆回购余额与应计利息
+
+        出借当天计入余额，购回当天转回现金；未配对的出借保留到数据截止日之后。
+        应计利息 = 利息 x 已占用天数 / 总天数，按 斜率 x 日期 - 斜率 x 出借日 的差分累加，
+        到期日之后按全额利息计入。
+
+        Args:
+            dates: 查询日期，默认为出借首日到最后到期日的每个自然日
+
+        Returns:
+            DataFrame，索引为日期，列 outstanding（本金余额）、accrued_interest（应计利息）
+        """
+        contracts = self.contracts
+        if contracts.empty:
+            index = pd.DatetimeIndex(dates if dates is not None else [], name='date').normalize()
+            return pd.DataFrame({'outstanding': 0.0, 'accrued_interest': 0.0}, index=index)
+
+        start = contracts['lend_date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        due = contracts['return_date'].fillna(contracts['due_date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+        # 未配对的出借在数据截止日之后才视为到期，之前一直计入余额
+        end = np.where(contracts['matched'].to_numpy(), due, np.maximum(due, self._last_day + 1))
+        slope = contracts['interest'].to_numpy() / np.maximum(due - start, 1)
+        principal = contracts['principal'].to_numpy()
+
+        first = start.min()
+        size = int(end.max() - first) + 2
+        open_at, due_at, close_at = start - first, due - first, end - first
+
+        def _running(values: np.ndarray, since: np.ndarray, until: np.ndarray) -> np.ndarray:
+            delta = np.zeros(size)
+            np.add.at(delta, since, values)
+            np.add.at(delta, until, -values)
+            return np.cumsum(delta)
+
+        # 以首个出借日为原点，减小 斜率 x 日期 的量级；到期日之后利息不再增加
+        grid = np.arange(size)
+        outstanding = _running(principal, open_at, close_at)
+        accrued = (
+            _running(slope, open_at, due_at) * grid
+            - _running(slope * open_at, open_at, due_at)
+            + _running(contracts['interest'].to_numpy(), due_at, close_at)
+        )
+
+        if dates is None:
+            index = pd.DatetimeIndex((first + grid[:-1]).astype('datetime64[D]'), name='date')
+            return pd.DataFrame({
+                'outstanding': outstanding[:-1],
+                'accrued_interest': accrued[:-1],
+            }, index=index)
+
+        index = pd.DatetimeIndex(dates, name='date').normalize()
+        position = index.to_numpy().astype('datetime64[D]').astype(np.int64) - first
+        inside = (position >= 0) & (position < size)
+        position = np.clip(position, 0, size - 1)
+        return pd.DataFrame({
+            'outstanding': np.where(inside, outstanding[position], 0.0),
+            'accrued_interest': np.where(inside, accrued[position], 0.0),
+        }, index=index)
+
+    def outstanding_as_of(self, date: DateLike) -> float:
+        """
+        指定日期收盘后的逆回购本金余额
+        """
+        return float(self.balances([date])['outstanding'].iloc[0])
+
+    def repo_profit(self) -> float:
+        """
+        已到期逆回购的利息收入减去全部出借、到期费用
+        """
+        contracts = self.contracts
+        return float(contracts.loc[contracts['matched'], 'interest'].sum() - contracts['fee'].sum())
+
+    def summary_by_code(self) -> pd.DataFrame:
+        """
+        按代码汇总：笔数、平均本金、平均年化利率、利息、费用
+        """
+        contracts = self.contracts[self.contracts['matched']]
+        summary = contracts.groupby('security_code').agg(
+            tenor=('tenor', 'first'),
+            count=('principal', 'size'),
+            avg_principal=('principal', 'mean'),
+            avg_rate=('rate', 'mean'),
+            interest=('interest', 'sum'),
+            fee=('fee', 'sum'),
+            days=('days', 'sum'),
+        )
+        summary['net_income'] = summary['interest'] - summary['fee']
+        return summary.reset_index()
@@ -1,16 +1,108 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import Optional, List, Dict, Any, TYPE_CHECKING
+from typing import Optional, List, Dict, Any, Iterator, Tuple, TYPE_CHECKING
 from pathlib import Path
 import os
 
+from .rolling_metrics import ROLLING_METRICS
+from .benchmark import BENCHMARK_METRICS
+from .attribution import PNL_COMPONENTS
+from ..utils.profiler import profiled, file_nbytes
+
 if TYPE_CHECKING:
     from ..services.analyzer import AnalysisResult
 
+ROLLING_METRIC_LABELS = {
+    'sharpe': '夏普比率',
+    'volatility': '年化波动率(%)',
+    'drawdown': '回撤(%)',
+    'max_drawdown': '最大回撤(%)',
+    'calmar': '卡玛比率',
+    'win_rate': '胜率(%)',
+}
+
+DRAWDOWN_EPISODE_LABELS = {
+    'peak_date': '高点日期',
+    'trough_date': '谷底日期',
+    'recovery_date': '恢复日期',
+    'peak_value': '高点资产',
+    'trough_value': '谷底资产',
+    'depth': '回撤金额',
+    'depth_pct': '回撤率(%)',
+    'decline_days': '下跌天数',
+    'recovery_days': '恢复天数',
+    'duration_days': '持续天数',
+}
+
+SECURITY_DRAWDOWN_LABELS = {
+    'security_code': '证券代码',
+    'max_drawdown': '最大回撤金额',
+    'max_drawdown_pct': '最大回撤率(%)',
+    'peak_date': '高点日期',
+    'trough_date': '谷底日期',
+    'recovery_date': '恢复日期',
+}
+
+BOOTSTRAP_METRIC_LABELS = {
+    'win_rate': '胜率(%)',
+    'profit_loss_ratio': '盈亏比',
+    'avg_profit': '平均每笔盈亏',
+    'total_profit': '总盈亏',
+    'annual_return': '年化收益率(%)',
+    'sharpe_ratio': '夏普比率',
+    'max_drawdown': '最大回撤(%)',
+}
+
+BENCHMARK_METRIC_LABELS = {
+    'alpha': 'Alpha(%)',
+    'beta': 'Beta',
+    'correlation': '相关系数',
+    'tracking_error': '跟踪误差(%)',
+    'information_ratio': '信息比率',
+    'up_capture': '上行捕获率(%)',
+    'down_capture': '下行捕获率(%)',
+    'excess_return': '年化超额收益(%)',
+}
+
+PNL_COMPONENT_LABELS = {
+    'realized': '已实现盈亏',
+    'unrealized': '浮动盈亏',
+    'dividend': '红利',
+    'fee': '费用',
+    'repo': '逆回购利息',
+    'interest': '利息归本',
+    'total': '合计',
+}
+
+POSITION_HISTORY_LABELS = {
+    'date': '日期',
+    'security_code': '证券代码',
+    'security_name': '证券名称',
+    'quantity': '持仓数量',
+    'cost_price': '成本价',
+    'cost': '持仓成本',
+}
+
+SCENARIO_LABELS = {
+    'scenario': '情景',
+    'pnl': '盈亏',
+    'pnl_pct': '占总资产(%)',
+    'market_value': '持仓市值',
+    'shocked_value': '冲击后市值',
+    'nav_after': '冲击后总资产',
+}
+
+# 交易明细超过该行数时 Excel 报告自动使用只写模式
+EXCEL_STREAMING_ROWS = 50_000
+
+# 只写模式下每批转换的行数
+EXCEL_BATCH_ROWS = 10_000
+
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
     from openpyxl.utils.dataframe import dataframe_to_rows
     HAS_OPENPYXL = True
 except ImportError:
@@ -78,9 +170,126 @@ class ReportGenerator:
             'trade_results': result.trade_results,
             'monthly_performance': result.monthly_performance,
             'stock_performance': result.stock_performance,
+            'rolling_metrics': result.rolling_metrics,
+            'drawdown_episodes': result.drawdown_episodes,
+            'security_drawdowns': result.security_drawdowns,
+            'bootstrap': result.bootstrap,
+            'benchmark': result.benchmark,
+            'pnl_attribution': result.pnl_attribution,
+            'position_history': result.position_history,
+            'stress_test': result.stress_test,
+            'stress_replay': result.stress_replay,
         }
         return data
     
+    def _has_attribution(self, data: Dict[str, Any]) -> bool:
+        cube = data.get('pnl_attribution')
+        return cube is not None and cube.values.size > 0
+    
+    def _format_attribution(self, df: pd.DataFrame, labels: Dict[str, str]) -> pd.DataFrame:
+        """
+        盈亏归因汇总表转换为报告用的中文列名
+        """
+        df = df.reset_index() if df.index.name or isinstance(df.index, pd.MultiIndex) else df
+        df = df.rename(columns={**labels, **PNL_COMPONENT_LABELS}).round(2)
+        return df.astype(object).where(df.notna(), None)
+    
+    def _has_benchmark(self, data: Dict[str, Any]) -> bool:
+        return data.get('benchmark') is not None
+    
+    def _format_benchmark_metrics(self, benchmark) -> pd.DataFrame:
+        """
+        全区间基准对比指标表：指标、数值
+        """
+        df = pd.DataFrame({
+            '指标': [BENCHMARK_METRIC_LABELS[m] for m in BENCHMARK_METRICS],
+            '数值': [benchmark.metrics.get(m) for m in BENCHMARK_METRICS],
+        }).round(4)
+        return df.astype(object).where(df.notna(), None)
+    
+    def _format_rolling_benchmark(self, rolling_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        滚动基准对比指标转换为报告用的中文列名
+        """
+        columns = {'date': '日期'}
+        windows = [int(col.rsplit('_', 1)[1]) for col in rolling_df.columns if col.startswith('beta_')]
+        for window in windows:
+            for metric in BENCHMARK_METRICS:
+                columns[f'{metric}_{window}'] = f'{BENCHMARK_METRIC_LABELS[metric]}_{window}日'
+        df = rolling_df[list(columns)].rename(columns=columns)
+        df['日期'] = pd.to_datetime(df['日期']).dt.strftime('%Y-%m-%d')
+        df = df.round(4)
+        return df.astype(object).where(df.notna(), None)
+    
+    def _has_bootstrap(self, data: Dict[str, Any]) -> bool:
+        bootstrap = data.get('bootstrap')
+        return bootstrap is not None and not bootstrap.intervals.empty
+    
+    def _format_bootstrap(self, bootstrap) -> pd.DataFrame:
+        """
+        置信区间表：指标、点估计、均值、标准差、下限、上限
+        """
+        level = f"{bootstrap.confidence * 100:g}%"
+        df = bootstrap.intervals.copy()
+        df['metric'] = df['metric'].map(BOOTSTRAP_METRIC_LABELS).fillna(df['metric'])
+        df = df.rename(columns={
+            'metric': '指标',
+            'estimate': '点估计',
+            'mean': '均值',
+            'std': '标准差',
+            'lower': f'{level}下限',
+            'upper': f'{level}上限',
+        }).round(4)
+        return df.astype(object).where(df.notna(), None)
+    
+    def _format_dated_table(self, df: pd.DataFrame, labels: Dict[str, str]) -> pd.DataFrame:
+        """
+        选取并重命名列，日期格式化为字符串，空值写为空单元格
+        """
+        df = df[[col for col in labels if col in df.columns]].copy()
+        for col in df.columns:
+            if col == 'date' or col.endswith('_date'):
+                df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d')
+        df = df.rename(columns=labels).round(4)
+        return df.astype(object).where(df.notna(), None)
+    
+    def _rolling_windows(self, rolling_df: pd.DataFrame) -> List[int]:
+        """
+        从滚动指标列名（sharpe_20 等）中提取窗口长度
+        """
+        return [int(col.rsplit('_', 1)[1]) for col in rolling_df.columns if col.startswith('sharpe_')]
+    
+    def _format_rolling_metrics(self, rolling_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        滚动指标转换为报告用的中文列名
+        """
+        columns = {'date': '日期'}
+        for window in self._rolling_windows(rolling_df):
+            for metric in ROLLING_METRICS:
+                columns[f'{metric}_{window}'] = f'{ROLLING_METRIC_LABELS[metric]}[{window}日]'
+        df = rolling_df[list(columns)].rename(columns=columns)
+        df['日期'] = pd.to_datetime(df['日期']).dt.strftime('%Y-%m-%d')
+        df = df.round(4)
+        # 窗口未满的 NaN 写为空单元格
+        return df.astype(object).where(df.notna(), None)
+    
+    def _latest_rolling_metrics(self, rolling_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        各窗口最新一日的滚动指标，每个窗口一行
+        """
+        last = rolling_df.iloc[-1]
+        rows = []
+        for window in self._rolling_windows(rolling_df):
+            row = {'窗口(日)': window}
+            for metric in ROLLING_METRICS:
+                row[ROLLING_METRIC_LABELS[metric]] = last[f'{metric}_{window}']
+            rows.append(row)
+        return pd.DataFrame(rows)
+    
+    def _has_rolling_metrics(self, data: Dict[str, Any]) -> bool:
+        rolling_df = data.get('rolling_metrics')
+        return rolling_df is not None and not rolling_df.empty
+    
     def generate_console_report(self, data: Dict[str, Any]) -> str:
         lines = []
         lines.append("=" * 60)
@@ -130,6 +339,48 @@ class ReportGenerator:
             lines.append(f"  平均盈利: {pm.avg_profit:,.2f} 元")
             lines.append(f"  平均亏损: {pm.avg_loss:,.2f} 元")
         
+        if self._has_rolling_metrics(data):
+            lines.append("\n【滚动指标（最新）】")
+            for _, row in self._latest_rolling_metrics(data['rolling_metrics']).iterrows():
+                values = ", ".join(
+                    f"{ROLLING_METRIC_LABELS[m]} {row[ROLLING_METRIC_LABELS[m]]:.2f}" for m in ROLLING_METRICS
+                )
+                lines.append(f"  {int(row['窗口(日)'])}日: {values}")
+        
+        if self._has_attribution(data):
+            lines.append("\n【盈亏归因】")
+            totals = data['pnl_attribution'].by_component()
+            for component in PNL_COMPONENTS:
+                lines.append(f"  {PNL_COMPONENT_LABELS[component]}: {totals[component]:,.2f} 元")
+            lines.append(f"  {PNL_COMPONENT_LABELS['total']}: {totals.sum():,.2f} 元")
+        
+        if self._has_benchmark(data):
+            benchmark = data['benchmark']
+            lines.append(f"\n【基准对比（{benchmark.name} {benchmark.code}）】")
+            for metric in BENCHMARK_METRICS:
+                value = benchmark.metrics.get(metric)
+                text = '-' if value is None or pd.isna(value) else f"{value:.2f}"
+                lines.append(f"  {BENCHMARK_METRIC_LABELS[metric]}: {text}")
+        
+        if self._has_bootstrap(data):
+            bootstrap = data['bootstrap']
+            lines.append(f"\n【置信区间（{bootstrap.confidence * 100:g}%，重采样 {bootstrap.n_resamples} 次）】")
+            for _, row in bootstrap.intervals.iterrows():
+                label = BOOTSTRAP_METRIC_LABELS.get(row['metric'], row['metric'])
+                lines.append(f"  {label}: {row['estimate']:,.2f} [{row['lower']:,.2f}, {row['upper']:,.2f}]")
+            if bootstrap.ruin:
+                lines.append(f"  破产概率: {bootstrap.ruin['ruin_probability']:.2f}%")
+                lines.append(f"  期末亏损概率: {bootstrap.ruin['loss_probability']:.2f}%")
+        
+        if data.get('stress_test') is not None and not data['stress_test'].empty:
+            lines.append("\n【压力测试】")
+            for _, row in data['stress_test'].iterrows():
+                lines.append(f"  {row['scenario']}: {row['pnl']:,.2f} 元 ({row['pnl_pct']:.2f}%)")
+            replay = data.get('stress_replay')
+            if replay is not None and not replay.empty:
+                worst = replay.iloc[0]
+                lines.append(f"  历史最差单日（{worst['scenario']}，共 {len(replay)} 个交易日）: {worst['pnl']:,.2f} 元 ({worst['pnl_pct']:.2f}%)")
+        
         if 'positions' in data and data['positions']:
             lines.append("\n【期末持仓】")
             for code, pos in data['positions'].items():
@@ -139,75 +390,121 @@ class ReportGenerator:
         lines.append("\n" + "=" * 60)
         return "\n".join(lines)
     
-    def generate_excel_report(self, data: Dict[str, Any], filename: str = 'trade_report.xlsx') -> str:
+    @profiled('report.excel', nbytes=lambda result, *args, **kwargs: file_nbytes(result))
+    def generate_excel_report(
+        self,
+        data: Dict[str, Any],
+        filename: str = 'trade_report.xlsx',
+        streaming: Optional[bool] = None
+    ) -> str:
+        """
+        生成 Excel 报告
+        
+        Args:
+            data: 报告数据
+            filename: 文件名
+            streaming: 是否使用 openpyxl 只写模式逐批写出（内存占用与行数无关），
+                       None 表示交易明细超过 EXCEL_STREAMING_ROWS 行时自动启用
+        """
         if not HAS_OPENPYXL:
             raise ImportError("openpyxl is required for Excel export")
         
+        if streaming is None:
+            trade_results = data.get('trade_results')
+            streaming = trade_results is not None and len(trade_results) > EXCEL_STREAMING_ROWS
+        
         filepath = self.output_dir / filename
-        wb = Workbook()
+        wb = Workbook(write_only=streaming)
         
-        ws = wb.active
-        ws.title = "汇总"
-        self._write_summary_sheet(ws, data)
+        if streaming:
+            styles = self._stream_styles(wb)
+            ws = wb.create_sheet("汇总")
+            self._stream_rows(ws, self._summary_rows(data), styles)
+        else:
+            ws = wb.active
+            ws.title = "汇总"
+            self._write_summary_sheet(ws, data)
         
         if 'performance_metrics' in data and data['performance_metrics']:
             ws_perf = wb.create_sheet("绩效指标")
-            self._write_performance_sheet(ws_perf, data['performance_metrics'])
-        
-        if 'trade_results' in data and data['trade_results'] is not None and not data['trade_results'].empty:
-            ws_trades = wb.create_sheet("交易明细")
-            self._write_dataframe(ws_trades, data['trade_results'])
-        
-        if 'monthly_performance' in data and data['monthly_performance'] is not None and not data['monthly_performance'].empty:
-            ws_monthly = wb.create_sheet("月度绩效")
-            self._write_dataframe(ws_monthly, data['monthly_performance'])
-        
-        if 'stock_performance' in data and data['stock_performance'] is not None and not data['stock_performance'].empty:
-            ws_stock = wb.create_sheet("股票绩效")
-            self._write_dataframe(ws_stock, data['stock_performance'])
+            if streaming:
+                self._stream_rows(ws_perf, self._performance_rows(data['performance_metrics']), styles)
+            else:
+                self._write_performance_sheet(ws_perf, data['performance_metrics'])
+        
+        for title, df in self._excel_tables(data):
+            ws_table = wb.create_sheet(title)
+            if streaming:
+                self._stream_dataframe(ws_table, df, styles)
+            else:
+                self._write_dataframe(ws_table, df)
         
         wb.save(filepath)
         return str(filepath)
     
-    def _write_summary_sheet(self, ws, data: Dict[str, Any]):
-        header_font = Font(bold=True, size=14)
-        title_font = Font(bold=True, size=11)
-        
-        ws['A1'] = "交易分析报告"
-        ws['A1'].font = header_font
-        ws.merge_cells('A1:D1')
-        
-        row = 3
+    def _excel_tables(self, data: Dict[str, Any]) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        依次产生 (工作表名, DataFrame)，按需格式化，两种写出模式共用
+        """
+        for key, title in [('trade_results', "交易明细"), ('monthly_performance', "月度绩效"), ('stock_performance', "股票绩效")]:
+            if data.get(key) is not None and not data[key].empty:
+                yield title, data[key]
+        
+        if data.get('drawdown_episodes') is not None and not data['drawdown_episodes'].empty:
+            yield "回撤区间", self._format_dated_table(data['drawdown_episodes'], DRAWDOWN_EPISODE_LABELS)
+        
+        if data.get('security_drawdowns') is not None and not data['security_drawdowns'].empty:
+            yield "个股回撤", self._format_dated_table(data['security_drawdowns'], SECURITY_DRAWDOWN_LABELS)
+        
+        if data.get('position_history') is not None and not data['position_history'].empty:
+            yield "月末持仓", self._format_dated_table(data['position_history'], POSITION_HISTORY_LABELS)
+        
+        if self._has_attribution(data):
+            cube = data['pnl_attribution']
+            yield "证券盈亏归因", self._format_attribution(
+                cube.by_security(), {'security_code': '证券代码', 'security_name': '证券名称'})
+            yield "月度盈亏归因", self._format_attribution(cube.by_date('M'), {'period': '月份'})
+            yield "板块盈亏归因", self._format_attribution(cube.by_group(), {'group': '板块'})
+        
+        if self._has_benchmark(data):
+            yield "基准对比", self._format_benchmark_metrics(data['benchmark'])
+            rolling_benchmark = data['benchmark'].rolling
+            if rolling_benchmark is not None and not rolling_benchmark.empty:
+                yield "滚动基准对比", self._format_rolling_benchmark(rolling_benchmark)
+        
+        if data.get('stress_test') is not None and not data['stress_test'].empty:
+            yield "压力测试", self._format_dated_table(data['stress_test'], SCENARIO_LABELS)
+            if data.get('stress_replay') is not None and not data['stress_replay'].empty:
+                yield "历史回放", self._format_dated_table(data['stress_replay'], SCENARIO_LABELS)
+        
+        if self._has_bootstrap(data):
+            yield "置信区间", self._format_bootstrap(data['bootstrap'])
+        
+        if self._has_rolling_metrics(data):
+            yield "滚动指标", self._format_rolling_metrics(data['rolling_metrics'])
+    
+    def _summary_rows(self, data: Dict[str, Any]) -> List[Tuple[str, list]]:
+        """
+        汇总表的行：(样式, 单元格值)，样式为 header/title/row/blank
+        """
+        rows = [('header', ["交易分析报告"]), ('blank', [])]
         
         if 'summary' in data:
             s = data['summary']
-            ws[f'A{row}'] = "分析配置"
-            ws[f'A{row}'].font = title_font
-            row += 1
-            ws[f'A{row}'] = "分析模式"
-            ws[f'B{row}'] = s.get('mode', 'full')
-            row += 1
+            rows.append(('title', ["分析配置"]))
+            rows.append(('row', ["分析模式", s.get('mode', 'full')]))
             if s.get('stock_code'):
-                ws[f'A{row}'] = "股票代码"
-                ws[f'B{row}'] = s.get('stock_code')
-                row += 1
+                rows.append(('row', ["股票代码", s.get('stock_code')]))
             if s.get('start_date'):
-                ws[f'A{row}'] = "开始日期"
-                ws[f'B{row}'] = s.get('start_date')
-                row += 1
+                rows.append(('row', ["开始日期", s.get('start_date')]))
             if s.get('end_date'):
-                ws[f'A{row}'] = "结束日期"
-                ws[f'B{row}'] = s.get('end_date')
-                row += 1
-            row += 1
+                rows.append(('row', ["结束日期", s.get('end_date')]))
+            rows.append(('blank', []))
         
         if 'profit_summary' in data and data['profit_summary']:
             p = data['profit_summary']
-            ws[f'A{row}'] = "账户概况"
-            ws[f'A{row}'].font = title_font
-            row += 1
-            
-            items = [
+            rows.append(('title', ["账户概况"]))
+            rows.extend(('row', [label, float(value)]) for label, value in [
                 ("账户净转入", p.net_transfer),
                 ("现金余额", p.cash_balance),
                 ("逆回购出借", p.repo_amount),
@@ -215,49 +512,26 @@ class ReportGenerator:
                 ("账户总资产", p.total_assets),
                 ("账户总盈亏", p.total_profit),
                 ("收益率(%)", p.profit_rate),
-            ]
-            
-            for label, value in items:
-                ws[f'A{row}'] = label
-                ws[f'B{row}'] = value
-                ws[f'B{row}'].number_format = '#,##0.00'
-                row += 1
-            row += 1
+            ])
+            rows.append(('blank', []))
         
         if 'positions' in data and data['positions']:
-            ws[f'A{row}'] = "期末持仓"
-            ws[f'A{row}'].font = title_font
-            row += 1
-            ws[f'A{row}'] = "证券代码"
-            ws[f'B{row}'] = "证券名称"
-            ws[f'C{row}'] = "持仓数量"
-            ws[f'D{row}'] = "成本价"
-            ws[f'E{row}'] = "收盘价"
-            ws[f'F{row}'] = "市值"
-            row += 1
-            
+            rows.append(('title', ["期末持仓"]))
+            rows.append(('row', ["证券代码", "证券名称", "持仓数量", "成本价", "收盘价", "市值"]))
             for code, pos in data['positions'].items():
-                ws[f'A{row}'] = code
-                ws[f'B{row}'] = pos['name']
-                ws[f'C{row}'] = pos['quantity']
-                ws[f'D{row}'] = pos['cost_price']
-                ws[f'E{row}'] = pos.get('close_price', 0)
-                ws[f'F{row}'] = pos['quantity'] * pos.get('close_price', 0)
-                row += 1
+                rows.append(('row', [
+                    code, pos['name'], pos['quantity'], pos['cost_price'],
+                    pos.get('close_price', 0), pos['quantity'] * pos.get('close_price', 0),
+                ]))
         
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 25
+        return rows
     
-    def _write_performance_sheet(self, ws, pm):
-        header_font = Font(bold=True, size=14)
-        title_font = Font(bold=True, size=11)
-        
-        ws['A1'] = "绩效指标"
-        ws['A1'].font = header_font
-        ws.merge_cells('A1:D1')
-        
-        row = 3
-        items = [
+    def _performance_rows(self, pm) -> List[Tuple[str, list]]:
+        """
+        绩效指标表的行，格式同 _summary_rows
+        """
+        rows = [('header', ["绩效指标"]), ('blank', [])]
+        rows.extend(('row', [label, value]) for label, value in [
             ("总交易次数", pm.total_trades),
             ("盈利次数", pm.winning_trades),
             ("亏损次数", pm.losing_trades),
@@ -269,18 +543,34 @@ class ReportGenerator:
             ("平均亏损(元)", pm.avg_loss),
             ("总盈利(元)", pm.total_profit),
             ("总亏损(元)", pm.total_loss),
-        ]
-        
-        for label, value in items:
-            ws[f'A{row}'] = label
-            ws[f'B{row}'] = value
-            if isinstance(value, float):
-                ws[f'B{row}'].number_format = '#,##0.00'
-            row += 1
+        ])
+        return rows
+    
+    def _write_rows(self, ws, rows: List[Tuple[str, list]]):
+        """
+        按 _summary_rows 格式写入普通工作表：B 列小数按千分位格式
+        """
+        for r_idx, (style, values) in enumerate(rows, 1):
+            for c_idx, value in enumerate(values, 1):
+                cell = ws.cell(row=r_idx, column=c_idx, value=value)
+                if style == 'header':
+                    cell.font = Font(bold=True, size=14)
+                elif style == 'title':
+                    cell.font = Font(bold=True, size=11)
+                elif c_idx == 2 and isinstance(value, float):
+                    cell.number_format = '#,##0.00'
+            if style == 'header':
+                ws.merge_cells(start_row=r_idx, start_column=1, end_row=r_idx, end_column=4)
         
         ws.column_dimensions['A'].width = 20
         ws.column_dimensions['B'].width = 25
     
+    def _write_summary_sheet(self, ws, data: Dict[str, Any]):
+        self._write_rows(ws, self._summary_rows(data))
+    
+    def _write_performance_sheet(self, ws, pm):
+        self._write_rows(ws, self._performance_rows(pm))
+    
     def _write_dataframe(self, ws, df: pd.DataFrame):
         for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
             for c_idx, value in enumerate(row, 1):
@@ -290,6 +580,56 @@ class ReportGenerator:
                     cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
                     cell.font = Font(bold=True, color="FFFFFF")
     
+    def _stream_styles(self, wb) -> Dict[str, 'NamedStyle']:
+        """
+        只写模式下的单元格样式，每个工作簿注册一次，写出时按名称引用
+        """
+        styles = {
+            'header': NamedStyle(name='report_header', font=Font(bold=True, size=14)),
+            'title': NamedStyle(name='report_title', font=Font(bold=True, size=11)),
+            'amount': NamedStyle(name='report_amount', number_format='#,##0.00'),
+            'column': NamedStyle(
+                name='report_column',
+                font=Font(bold=True, color="FFFFFF"),
+                fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+            ),
+        }
+        for style in styles.values():
+            wb.add_named_style(style)
+        return styles
+    
+    def _styled_cell(self, ws, value, style: 'NamedStyle') -> 'WriteOnlyCell':
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style.name
+        return cell
+    
+    def _stream_rows(self, ws, rows: List[Tuple[str, list]], styles: Dict[str, 'NamedStyle']):
+        """
+        按 _summary_rows 格式写入只写工作表（只写模式不支持合并单元格）
+        """
+        ws.column_dimensions['A'].width = 20
+        ws.column_dimensions['B'].width = 25
+        for style, values in rows:
+            if style in ('header', 'title'):
+                ws.append([self._styled_cell(ws, value, styles[style]) for value in values])
+            else:
+                ws.append([
+                    self._styled_cell(ws, value, styles['amount']) if c_idx == 1 and isinstance(value, float) else value
+                    for c_idx, value in enumerate(values)
+                ])
+    
+    def _stream_dataframe(self, ws, df: pd.DataFrame, styles: Dict[str, 'NamedStyle'], batch_rows: int = EXCEL_BATCH_ROWS):
+        """
+        DataFrame 按批转换为 Python 值后逐行追加，单批之外不保留任何行
+        """
+        ws.append([self._styled_cell(ws, str(col), styles['column']) for col in df.columns])
+        for start in range(0, len(df), batch_rows):
+            batch = df.iloc[start:start + batch_rows].astype(object)
+            batch = batch.where(batch.notna(), None)
+            for row in batch.itertuples(index=False, name=None):
+                ws.append(row)
+    
+    @profiled('report.html', nbytes=lambda result, *args, **kwargs: file_nbytes(result))
     def generate_html_report(self, data: Dict[str, Any], filename: str = 'trade_report.html') -> str:
         html_content = self._generate_html_content(data)
         filepath = self.output_dir / filename
@@ -426,6 +766,43 @@ class ReportGenerator:
         </div>
 """
         
+        if self._has_rolling_metrics(data):
+            latest = self._latest_rolling_metrics(data['rolling_metrics'])
+            html += """
+        <h2>📉 滚动指标（最新）</h2>
+        <table>
+            <tr>
+"""
+            for col in latest.columns:
+                html += f"                <th>{col}</th>\n"
+            html += "            </tr>\n"
+            for _, row in latest.iterrows():
+                html += "            <tr>\n"
+                html += f"                <td>{int(row['窗口(日)'])}</td>\n"
+                for col in latest.columns[1:]:
+                    value = row[col]
+                    html += f"                <td>{'-' if pd.isna(value) else f'{value:.2f}'}</td>\n"
+                html += "            </tr>\n"
+            html += "        </table>\n"
+        
+        if self._has_benchmark(data):
+            benchmark = data['benchmark']
+            html += f"""
+        <h2>📊 基准对比（{benchmark.name} {benchmark.code}）</h2>
+        <table>
+            <tr>
+                <th>指标</th>
+                <th>数值</th>
+            </tr>
+"""
+            for metric in BENCHMARK_METRICS:
+                value = benchmark.metrics.get(metric)
+                html += "            <tr>\n"
+                html += f"                <td>{BENCHMARK_METRIC_LABELS[metric]}</td>\n"
+                html += f"                <td>{'-' if value is None or pd.isna(value) else f'{value:.2f}'}</td>\n"
+                html += "            </tr>\n"
+            html += "        </table>\n"
+        
         if 'positions' in data and data['positions']:
             html += """
         <h2>� 期末持仓</h2>
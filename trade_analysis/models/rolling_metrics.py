@@ -0,0 +1,196 @@
+"""
+滚动窗口绩效指标
+
+基于每日总资产曲线，对每个窗口（默认 20/60/250 个交易日）计算：
+- 滚动夏普比率、年化波动率（收益率及其平方的累计和，O(n)）
+- 滚动回撤（单调队列求窗口最大值，O(n)）
+- 窗口最大回撤：峰值从窗口首日起累计，不计窗口开始前的高点（分块 + 单调栈，O(n)）
+- 滚动卡玛比率（窗口年化收益率 / 窗口最大回撤）
+- 滚动胜率（日收益率为正的比例）
+
+输出列名为 <指标>_<窗口>，例如 sharpe_20、max_drawdown_250；
+百分比指标（volatility、drawdown、max_drawdown、win_rate）以 % 表示，
+与 PerformanceMetrics 一致。
+"""
+
+from collections import deque
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOWS = (20, 60, 250)
+
+TRADING_DAYS_PER_YEAR = 252
+
+ROLLING_METRICS = ['sharpe', 'volatility', 'drawdown', 'max_drawdown', 'calmar', 'win_rate']
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    窗口求和（累计和相减），不足一个窗口的位置为 NaN
+    """
+    result = np.full(len(values), np.nan)
+    if len(values) < window:
+        return result
+    cumsum = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+    result[window - 1:] = cumsum[window:] - cumsum[:-window]
+    return result
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    窗口最大值（单调递减队列），窗口不足时取已有数据的最大值
+    """
+    result = np.empty(len(values))
+    candidates = deque()
+    for i, value in enumerate(values):
+        while candidates and values[candidates[-1]] <= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        result[i] = values[candidates[0]]
+    return result
+
+
+def rolling_max_drawdown(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    窗口内最大回撤（%），每个窗口的峰值从窗口第一个值起累计，不足一个窗口的位置为 NaN
+
+    按窗口长度分块，非对齐窗口 = 前一块的后缀 + 当前块的前缀，O(n)：
+    - 后缀内的最大回撤由单调栈逆序求得（每个点作为峰值覆盖到下一个不低于它的点，之后沿用该点的结果）
+    - 前缀内的点：前缀峰值低于后缀最大值 M 时以 M 为峰值，只需前缀最小值；
+      否则回撤与块内前缀回撤相同。窗口右移时 M 不增，分界点只会左移，区间最大值可增量维护
+    """
+    n = len(values)
+    result = np.full(n, np.nan)
+    if n < window:
+        return result
+    values = np.asarray(values, dtype=float)
+
+    def _drawdown(peak: float, value: float) -> float:
+        return (peak - value) / peak * 100 if peak > 0 else 0.0
+
+    # 块内后缀：最大值、从该点起的最大回撤
+    suffix_max = np.empty(n)
+    suffix_drawdown = np.empty(n)
+    # 块内前缀：峰值、相对前缀峰值的回撤、最小值
+    prefix_max = np.empty(n)
+    prefix_drawdown = np.empty(n)
+    prefix_min = np.empty(n)
+    for start in range(0, n, window):
+        end = min(start + window, n)
+        stack = []  # (位置, 该点作为峰值覆盖区间的最小值)
+        for i in range(end - 1, start - 1, -1):
+            value = values[i]
+            low = value
+            while stack and values[stack[-1][0]] < value:
+                low = min(low, stack.pop()[1])
+            # 下一个不低于它的点之后，峰值与从该点起算相同
+            suffix_drawdown[i] = _drawdown(value, low)
+            if stack:
+                suffix_drawdown[i] = max(suffix_drawdown[i], suffix_drawdown[stack[-1][0]])
+            stack.append((i, low))
+            suffix_max[i] = value if i == end - 1 else max(value, suffix_max[i + 1])
+        peak, low = -np.inf, np.inf
+        for i in range(start, end):
+            peak, low = max(peak, values[i]), min(low, values[i])
+            prefix_max[i], prefix_min[i] = peak, low
+            prefix_drawdown[i] = _drawdown(peak, values[i])
+
+    for t in range(window - 1, n):
+        first = t - window + 1
+        if first % window == 0:
+            result[t] = suffix_drawdown[first]
+            continue
+        block = t - t % window
+        if t == block:
+            # 新的一块：分界点 split 之后（含）的前缀峰值不低于 M
+            split = min(block + window - 1, n)
+            best = -np.inf
+        top = suffix_max[first]
+        while split > block and prefix_max[split - 1] >= top:
+            split -= 1
+            if split <= t:
+                best = max(best, prefix_drawdown[split])
+        if split <= t:
+            best = max(best, prefix_drawdown[t])
+        drawdown = max(suffix_drawdown[first], best)
+        if split > block:
+            drawdown = max(drawdown, _drawdown(top, prefix_min[min(split, t + 1) - 1]))
+        result[t] = drawdown
+    return result
+
+
+def calculate_rolling_metrics(
+    equity: pd.Series,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+    risk_free_rate: float = 0.03
+) -> pd.DataFrame:
+    """
+    计算滚动窗口绩效指标
+
+    Args:
+        equity: 每日总资产，索引为日期
+        windows: 窗口长度（交易日）
+        risk_free_rate: 无风险利率，默认3%
+
+    Returns:
+        DataFrame，date 列加每个窗口的各项指标；窗口未满的行为 NaN
+    """
+    for window in windows:
+        if int(window) != window or window < 2:
+            raise ValueError(f"窗口长度必须是不小于2的整数: {window}")
+
+    values = equity.to_numpy(dtype=float)
+    result = pd.DataFrame({'date': equity.index})
+
+    # 日收益率，首日及资产为0导致的 inf 视为无效
+    returns = np.full(len(values), np.nan)
+    if len(values) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[1:] = values[1:] / values[:-1] - 1
+    valid = np.isfinite(returns)
+    clean_returns = np.where(valid, returns, 0.0)
+
+    for window in windows:
+        window = int(window)
+
+        count = rolling_sum(valid.astype(float), window)
+        total = rolling_sum(clean_returns, window)
+        total_sq = rolling_sum(clean_returns ** 2, window)
+        wins = rolling_sum((clean_returns > 0).astype(float), window)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            std = np.sqrt(np.clip(total_sq / count - mean ** 2, 0.0, None))
+            std[std < 1e-12] = np.nan
+            full = np.arange(len(values)) >= window
+            enough = full & (count >= 2)
+
+            annualized_std = std * np.sqrt(TRADING_DAYS_PER_YEAR)
+            sharpe = (mean * TRADING_DAYS_PER_YEAR - risk_free_rate) / annualized_std
+
+            # window 个日收益率对应 window + 1 个资产值
+            peak = rolling_max(values, window + 1)
+            drawdown = np.where(peak > 0, (peak - values) / peak * 100, 0.0)
+            max_drawdown = rolling_max_drawdown(values, window + 1)
+
+            # 窗口年化收益率：窗口内 window 个交易日的资产变化
+            start_values = np.full(len(values), np.nan)
+            start_values[window:] = values[:-window]
+            growth = np.where(start_values > 0, values / start_values, np.nan)
+            annualized_return = (growth ** (TRADING_DAYS_PER_YEAR / window) - 1) * 100
+            calmar = np.where(max_drawdown > 0, annualized_return / max_drawdown, np.nan)
+
+            win_rate = wins / count * 100
+
+        result[f'sharpe_{window}'] = np.where(enough, sharpe, np.nan)
+        result[f'volatility_{window}'] = np.where(enough, annualized_std * 100, np.nan)
+        result[f'drawdown_{window}'] = np.where(full, drawdown, np.nan)
+        result[f'max_drawdown_{window}'] = np.where(full, max_drawdown, np.nan)
+        result[f'calmar_{window}'] = np.where(full, calmar, np.nan)
+        result[f'win_rate_{window}'] = np.where(full & (count > 0), win_rate, np.nan)
+
+    return result
@@ -0,0 +1,168 @@
+"""
+持仓情景与压力测试
+
+以 ProfitCalculator 计算出的当前持仓为基础，对持仓市值施加冲击：
+情景 x 证券 的冲击矩阵与市值向量一次矩阵乘法得到所有情景的盈亏，
+可以同时计算上千个历史回放情景（价格缓存中每个交易日的涨跌幅）。
+
+冲击以收益率表示，-0.05 表示下跌 5%；同一情景中多个冲击对同一证券叠加相加。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .attribution import board_of
+
+SCENARIO_TABLE_COLUMNS = ['scenario', 'pnl', 'pnl_pct', 'market_value', 'shocked_value', 'nav_after']
+
+
+@dataclass(frozen=True)
+class Shock:
+    """
+    单个冲击
+
+    Attributes:
+        pct: 涨跌幅（-0.1 表示下跌 10%）
+        board: 只作用于该板块（见 attribution.board_of），None 表示全部持仓
+        codes: 只作用于这些证券代码，与 board 同时给出时取交集
+    """
+    pct: float
+    board: Optional[str] = None
+    codes: Optional[Tuple[str, ...]] = None
+
+    def vector(self, codes: np.ndarray, boards: np.ndarray) -> np.ndarray:
+        """
+        展开为按持仓顺序排列的冲击向量
+        """
+        mask = np.ones(len(codes), dtype=bool)
+        if self.board is not None:
+            mask &= boards == self.board
+        if self.codes is not None:
+            mask &= np.isin(codes, list(self.codes))
+        return np.where(mask, self.pct, 0.0)
+
+
+def sector_shock(sectors: Dict[str, str], sector: str, pct: float) -> Shock:
+    """
+    行业冲击：sectors 为 证券代码 -> 行业 的映射
+    """
+    return Shock(pct, codes=tuple(code for code, name in sectors.items() if name == sector))
+
+
+STANDARD_SCENARIOS: Dict[str, List[Shock]] = {
+    '全部持仓 -5%': [Shock(-0.05)],
+    '全部持仓 -10%': [Shock(-0.10)],
+    '创业板 -10%': [Shock(-0.10, board='创业板')],
+    '科创板 -10%': [Shock(-0.10, board='科创板')],
+    '主板 -5%，创业板/科创板 -10%': [
+        Shock(-0.05, board='沪市主板'), Shock(-0.05, board='深市主板'),
+        Shock(-0.10, board='创业板'), Shock(-0.10, board='科创板'),
+    ],
+    '全部持仓 +5%': [Shock(0.05)],
+}
+
+
+class StressTester:
+    """
+    持仓压力测试
+
+    Attributes:
+        codes: 持仓证券代码
+        market_value: 按当前价格计算的持仓市值
+        nav: 账户总资产，用于计算冲击占比
+    """
+
+    def __init__(self, positions: Dict[str, Dict], nav: Optional[float] = None):
+        self.codes = np.array(list(positions), dtype=object)
+        self.names = np.array([pos.get('name', '') for pos in positions.values()], dtype=object)
+        self.boards = np.array([board_of(code) for code in self.codes], dtype=object)
+
+        quantity = np.array([pos['quantity'] for pos in positions.values()], dtype=float)
+        # 没有收盘价时按成本价估值
+        price = np.array([
+            pos.get('close_price') or pos.get('cost_price', 0.0) for pos in positions.values()
+        ], dtype=float)
+        self.market_value = quantity * price
+        self.nav = float(nav) if nav else float(self.market_value.sum())
+
+    @classmethod
+    def from_profit_summary(cls, summary) -> 'StressTester':
+        """
+        由 ProfitSummary 构建（使用其中的持仓和总资产）
+        """
+        return cls(summary.positions, nav=summary.total_assets)
+
+    def shock_matrix(self, scenarios: Dict[str, Sequence[Shock]]) -> pd.DataFrame:
+        """
+        情景 x 证券 的冲击矩阵
+        """
+        matrix = np.zeros((len(scenarios), len(self.codes)))
+        for i, shocks in enumerate(scenarios.values()):
+            for shock in shocks:
+                matrix[i] += shock.vector(self.codes, self.boards)
+        return pd.DataFrame(matrix, index=list(scenarios), columns=self.codes)
+
+    def revalue(self, shocks: pd.DataFrame) -> pd.DataFrame:
+        """
+        按冲击矩阵重估持仓，返回按亏损从大到小排序的情景表
+
+        Args:
+            shocks: 索引为情景名，列为证券代码；缺少的持仓按 0 冲击
+
+        Returns:
+            DataFrame，列见 SCENARIO_TABLE_COLUMNS
+        """
+        matrix = shocks.reindex(columns=self.codes).fillna(0.0).to_numpy(dtype=float)
+        pnl = matrix @ self.market_value
+        total = self.market_value.sum()
+
+        table = pd.DataFrame({
+            'scenario': shocks.index,
+            'pnl': pnl,
+            'pnl_pct': pnl / self.nav * 100 if self.nav else 0.0,
+            'market_value': total,
+            'shocked_value': total + pnl,
+            'nav_after': self.nav + pnl,
+        }, columns=SCENARIO_TABLE_COLUMNS)
+        return table.sort_values('pnl', kind='mergesort').reset_index(drop=True)
+
+    def run(self, scenarios: Optional[Dict[str, Sequence[Shock]]] = None) -> pd.DataFrame:
+        """
+        计算一组自定义情景，默认 STANDARD_SCENARIOS
+        """
+        return self.revalue(self.shock_matrix(scenarios or STANDARD_SCENARIOS))
+
+    def replay(self, price_matrix: pd.DataFrame, horizon: int = 1) -> pd.DataFrame:
+        """
+        历史回放：价格缓存中每个交易日（或 horizon 日）的实际涨跌幅作为一个情景
+
+        Args:
+            price_matrix: 日期 x 证券代码 收盘价矩阵（DatabaseManager.get_price_matrix）
+            horizon: 涨跌幅区间的交易日数
+
+        Returns:
+            与 revalue 相同的情景表，scenario 为区间结束日期 (YYYY-MM-DD)
+        """
+        close = price_matrix.reindex(columns=self.codes).sort_index()
+        returns = close / close.shift(horizon) - 1
+        returns = returns.iloc[horizon:].dropna(how='all')
+        returns.index = pd.DatetimeIndex(returns.index).strftime('%Y-%m-%d')
+        return self.revalue(returns)
+
+    def contributions(self, shocks: Sequence[Shock]) -> pd.DataFrame:
+        """
+        单个情景下每只持仓的盈亏贡献，按亏损从大到小排序
+        """
+        pct = self.shock_matrix({'scenario': shocks}).iloc[0].to_numpy()
+        table = pd.DataFrame({
+            'security_code': self.codes,
+            'security_name': self.names,
+            'board': self.boards,
+            'market_value': self.market_value,
+            'shock': pct,
+            'pnl': pct * self.market_value,
+        })
+        return table.sort_values('pnl', kind='mergesort').reset_index(drop=True)
@@ -0,0 +1,113 @@
+"""
+交易记录数据类型约定
+
+清洗后的交易记录和从数据库读出的交易记录统一使用以下类型：
+- 低基数文本列（证券代码、名称、交易类型等）使用 category
+- 数量列使用 int32，超出 int32 范围时保留 int64
+- 日期使用 datetime64[s]
+
+使用方法:
+    df = apply_trade_schema(df)
+    print(memory_report(raw_df, df))
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_COLUMNS = [
+    'security_code', 'security_name', 'trade_type', 'business_type', 'currency', 'record_type',
+]
+
+INT32_COLUMNS = ['quantity', 'position']
+
+DATE_COLUMNS = ['date']
+
+DATE_DTYPE = 'datetime64[s]'
+
+_INT32_INFO = np.iinfo(np.int32)
+
+
+def apply_trade_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将交易记录转换为约定的数据类型
+
+    缺少的列会被跳过；不修改传入的 DataFrame。
+
+    Args:
+        df: 交易记录
+
+    Returns:
+        转换后的 DataFrame
+    """
+    df = df.copy()
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col in INT32_COLUMNS:
+        if col not in df.columns or df[col].dtype == np.int32:
+            continue
+        values = pd.to_numeric(df[col], errors='coerce')
+        if values.isna().any():
+            continue
+        if values.empty or (values.min() >= _INT32_INFO.min and values.max() <= _INT32_INFO.max):
+            df[col] = values.astype(np.int32)
+        else:
+            logger.warning(f"{col} 超出 int32 范围，保留 {values.dtype}")
+
+    for col in DATE_COLUMNS:
+        if col in df.columns and df[col].dtype != DATE_DTYPE:
+            df[col] = pd.to_datetime(df[col]).astype(DATE_DTYPE)
+
+    return df
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """
+    DataFrame 占用的内存字节数（含对象列的实际内容）
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(before: pd.DataFrame, after: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    对比应用类型约定前后各列的内存占用
+
+    Args:
+        before: 原始交易记录
+        after: 转换后的交易记录，None 时对 before 应用 apply_trade_schema
+
+    Returns:
+        DataFrame，每列一行，最后一行为合计
+    """
+    if after is None:
+        after = apply_trade_schema(before)
+
+    before_usage = before.memory_usage(deep=True, index=False)
+    after_usage = after.memory_usage(deep=True, index=False)
+
+    report = pd.DataFrame({
+        '列名': before.columns,
+        '原类型': [str(before[col].dtype) for col in before.columns],
+        '原占用(KB)': [before_usage[col] / 1024 for col in before.columns],
+        '新类型': [str(after[col].dtype) if col in after.columns else '' for col in before.columns],
+        '新占用(KB)': [after_usage.get(col, 0) / 1024 for col in before.columns],
+    })
+
+    total = pd.DataFrame([{
+        '列名': '合计',
+        '原类型': '',
+        '原占用(KB)': report['原占用(KB)'].sum(),
+        '新类型': '',
+        '新占用(KB)': report['新占用(KB)'].sum(),
+    }])
+    report = pd.concat([report, total], ignore_index=True)
+    report['压缩比'] = report['原占用(KB)'] / report['新占用(KB)'].replace(0, np.nan)
+
+    return report
@@ -1,5 +1,9 @@
 from .price_fetcher import PriceFetcher
 from .analyzer import TradeAnalyzer, AnalysisConfig, AnalysisResult, analyze
+from .importer import ImportStats, DirectoryImportStats, stream_import_file, import_directory
+from .live_monitor import PortfolioMonitor, LiveMonitor
+from .result_cache import ResultCache, MemoryResultCache
+from .api_server import AnalysisService, make_server, serve
 
 __all__ = [
     'PriceFetcher',
@@ -7,4 +11,15 @@ __all__ = [
     'AnalysisConfig',
     'AnalysisResult',
     'analyze',
+    'ImportStats',
+    'stream_import_file',
+    'DirectoryImportStats',
+    'import_directory',
+    'PortfolioMonitor',
+    'LiveMonitor',
+    'ResultCache',
+    'MemoryResultCache',
+    'AnalysisService',
+    'make_server',
+    'serve',
 ]
@@ -7,8 +7,14 @@ import logging
 from ..models.data_cleaner import DataCleaner
 from ..models.profit_calculator import ProfitCalculator, ProfitSummary
 from ..models.performance import PerformanceCalculator, PerformanceMetrics
+from ..models.rolling_metrics import DEFAULT_WINDOWS
+from ..models.bootstrap import BootstrapResult
+from ..models.benchmark import BenchmarkResult
+from ..models.attribution import PnLAttribution, PnLCube
+from ..models.scenario import StressTester
 from ..services.price_fetcher import PriceFetcher
 from ..utils.code_formatter import normalize_user_code
+from ..utils.profiler import PROFILER, profiled
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,11 @@ class AnalysisConfig:
     include_dividend: bool = True
     price_source: str = 'akshare'
     manual_prices: Dict[str, float] = field(default_factory=dict)
+    rolling_windows: List[int] = field(default_factory=lambda: list(DEFAULT_WINDOWS))
+    bootstrap_resamples: int = 2000
+    bootstrap_seed: Optional[int] = None
+    bootstrap_workers: int = 1
+    benchmark_code: Optional[str] = None
 
 
 @dataclass
@@ -41,6 +52,62 @@ class AnalysisResult:
     trade_results: Optional[pd.DataFrame] = None
     monthly_performance: Optional[pd.DataFrame] = None
     stock_performance: Optional[pd.DataFrame] = None
+    rolling_metrics: Optional[pd.DataFrame] = None
+    drawdown_episodes: Optional[pd.DataFrame] = None
+    security_drawdowns: Optional[pd.DataFrame] = None
+    bootstrap: Optional[BootstrapResult] = None
+    benchmark: Optional[BenchmarkResult] = None
+    pnl_attribution: Optional[PnLCube] = None
+    position_history: Optional[pd.DataFrame] = None
+    stress_test: Optional[pd.DataFrame] = None
+    stress_replay: Optional[pd.DataFrame] = None
+    daily_assets: Optional[pd.DataFrame] = None
+
+
+def load_benchmark(
+    code: str,
+    start: datetime,
+    end: datetime,
+    price_fetcher: PriceFetcher,
+    db=None
+) -> Optional[pd.Series]:
+    """
+    读取基准指数收盘价
+    
+    优先使用 daily_prices 中的缓存（security_code 为 sh000300 格式，避免与股票代码重复），
+    缓存未覆盖分析区间时从 price_fetcher 获取并写回缓存；price_fetcher 没有可用数据源时只读缓存
+    
+    Returns:
+        收盘价，索引为日期；无法获取时为 None
+    """
+    symbol = price_fetcher.get_index_symbol(code)
+    start_date = start.strftime('%Y%m%d')
+    end_date = end.strftime('%Y%m%d')
+    
+    if db is not None:
+        cached = db.get_daily_prices(symbol, start_date, end_date)
+        # 首尾允许相差几天（节假日、分析区间起止日非交易日）
+        tolerance = pd.Timedelta(days=7)
+        if not cached.empty and cached['date'].min() <= start + tolerance and cached['date'].max() >= end - tolerance:
+            logger.info(f"使用缓存的基准指数行情 {symbol}，共 {len(cached)} 条")
+            return cached.set_index('date')['close_price'].astype(float)
+    
+    if not price_fetcher.get_available_sources():
+        logger.warning(f"daily_prices 中没有基准指数 {symbol} 的完整行情且没有可用数据源，跳过基准对比")
+        return None
+    
+    history = price_fetcher.get_index_history(code, start_date, end_date)
+    if history is None or history.empty:
+        logger.warning(f"无法获取基准指数 {code} 的行情，跳过基准对比")
+        return None
+    
+    if db is not None:
+        db.save_daily_prices([
+            {'date': d.strftime('%Y%m%d'), 'security_code': symbol, 'close_price': float(c)}
+            for d, c in zip(history['date'], history['close'])
+        ])
+    
+    return history.set_index('date')['close'].astype(float)
 
 
 class TradeAnalyzer:
@@ -48,24 +115,46 @@ class TradeAnalyzer:
     交易分析器
     """
     
-    def __init__(self, filepath: str, config: AnalysisConfig = None):
+    def __init__(self, filepath: str, config: AnalysisConfig = None, db=None):
         self.filepath = filepath
         self.config = config or AnalysisConfig()
+        self.db = db
+        self.cache = None
 
         self.cleaner = DataCleaner(filepath)
         self.price_fetcher = PriceFetcher()
 
         self._df: Optional[pd.DataFrame] = None
         self._result: Optional[AnalysisResult] = None
+        self._security_summary: Optional[Dict[str, Any]] = None
+        self._benchmark_close: Optional[pd.Series] = None
     
     @classmethod
-    def from_dataframe(cls, df: pd.DataFrame, config: AnalysisConfig = None) -> 'TradeAnalyzer':
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        config: AnalysisConfig = None,
+        security_summary: Optional[Dict[str, Any]] = None,
+        db=None,
+        cache=None,
+        price_fetcher: Optional[PriceFetcher] = None,
+        benchmark_close: Optional[pd.Series] = None
+    ) -> 'TradeAnalyzer':
         """
         从 DataFrame 创建分析器
         
         Args:
             df: 已清洗的数据
             config: 分析配置
+            security_summary: 个股模式下数据库 security_summary 中的汇总行，
+                              提供时个股统计直接读取汇总值，不再逐笔累加
+            db: DatabaseManager，提供时基准指数行情优先读取 daily_prices 缓存
+            cache: ResultCache，提供时绩效计算和盈亏归因按数据版本缓存；
+                   df 须是数据库中按当前配置读取的记录
+            price_fetcher: 价格获取器，None 时新建（按默认配置连接各数据源）；
+                           批处理和常驻服务传入 DataSourceConfig.disabled() 的实例
+            benchmark_close: 调用方预先读取的基准指数收盘价（见 load_benchmark），
+                             提供时按分析区间截取，不再读取缓存或数据源
             
         Returns:
             TradeAnalyzer 实例
@@ -73,41 +162,84 @@ class TradeAnalyzer:
         instance = cls.__new__(cls)
         instance.filepath = None
         instance.config = config or AnalysisConfig()
+        instance.db = db
+        instance.cache = cache
         instance.cleaner = None
-        instance.price_fetcher = PriceFetcher()
+        instance.price_fetcher = price_fetcher if price_fetcher is not None else PriceFetcher()
 
         instance._df = df.copy()
         instance._result = None
+        instance._security_summary = security_summary
+        instance._benchmark_close = benchmark_close
 
         return instance
     
+    @profiled('analyzer.run_analysis')
     def run_analysis(self) -> AnalysisResult:
         logger.info(f"开始分析，模式: {self.config.mode}")
         
         if self._df is None:
             self._df = self.cleaner.clean()
         
-        df = self._apply_filters()
-        
-        summary = self._get_summary(df)
+        with PROFILER.span('analyzer.filter'):
+            df = self._apply_filters()
+            summary = self._get_summary(df)
         
         profit_calculator = ProfitCalculator(df)
         
-        positions = profit_calculator._calculate_positions()
-        close_prices = self._fetch_prices(positions)
+        with PROFILER.span('analyzer.positions'):
+            positions = profit_calculator._calculate_positions()
+        with PROFILER.span('analyzer.fetch_prices'):
+            close_prices = self._fetch_prices(positions)
         
         for code, pos in positions.items():
             if code in close_prices:
                 pos['close_price'] = close_prices[code]
         
-        profit_summary = profit_calculator.calculate_account_profit(close_prices)
-        
-        perf_calculator = PerformanceCalculator(df)
-        performance_metrics = perf_calculator.calculate_all_metrics()
+        with PROFILER.span('analyzer.account_profit'):
+            profit_summary = profit_calculator.calculate_account_profit(close_prices)
+        
+        with PROFILER.span('analyzer.stress_test'):
+            stress_test, stress_replay = self._run_stress_test(profit_summary)
+        
+        with PROFILER.span('analyzer.position_history'):
+            month_ends = df.groupby(df['date'].dt.to_period('M'))['date'].max().tolist()
+            position_history = profit_calculator.position_index.holdings_history(month_ends)
+        
+        with PROFILER.span('analyzer.performance'):
+            (
+                perf_calculator, performance_metrics, trade_results, monthly_perf,
+                stock_perf, rolling_metrics, drawdown_episodes, security_drawdowns
+            ) = self._cached(
+                'performance',
+                lambda: self._calculate_performance(df),
+                rolling_windows=list(self.config.rolling_windows)
+            )
+        
+        bootstrap = None
+        if self.config.bootstrap_resamples > 0:
+            with PROFILER.span('analyzer.bootstrap'):
+                bootstrap = perf_calculator.get_bootstrap(
+                    n_resamples=self.config.bootstrap_resamples,
+                    seed=self.config.bootstrap_seed,
+                    max_workers=self.config.bootstrap_workers
+                )
         
-        trade_results = perf_calculator.get_trade_results_df()
-        monthly_perf = perf_calculator.get_monthly_performance()
-        stock_perf = perf_calculator.get_stock_performance()
+        with PROFILER.span('analyzer.attribution'):
+            pnl_attribution = self._cached('pnl_attribution', lambda: PnLAttribution(df).calculate())
+        
+        benchmark = None
+        if self.config.benchmark_code and not df.empty:
+            with PROFILER.span('analyzer.benchmark'):
+                if self._benchmark_close is not None:
+                    index_close = self._benchmark_close.loc[df['date'].min():df['date'].max()]
+                else:
+                    index_close = self._load_benchmark(df['date'].min(), df['date'].max())
+                benchmark = perf_calculator.get_benchmark_comparison(
+                    index_close,
+                    code=self.config.benchmark_code,
+                    windows=tuple(self.config.rolling_windows)
+                )
         
         self._result = AnalysisResult(
             config=self.config,
@@ -117,12 +249,57 @@ class TradeAnalyzer:
             positions=positions,
             trade_results=trade_results,
             monthly_performance=monthly_perf,
-            stock_performance=stock_perf
+            stock_performance=stock_perf,
+            rolling_metrics=rolling_metrics,
+            drawdown_episodes=drawdown_episodes,
+            security_drawdowns=security_drawdowns,
+            bootstrap=bootstrap,
+            benchmark=benchmark,
+            pnl_attribution=pnl_attribution,
+            position_history=position_history,
+            stress_test=stress_test,
+            stress_replay=stress_replay,
+            daily_assets=perf_calculator._calculate_daily_total_assets()
         )
         
         logger.info("分析完成")
         return self._result
     
+    def _calculate_performance(self, df: pd.DataFrame) -> tuple:
+        """
+        FIFO 配对、每日资产曲线及由其派生的绩效表
+
+        PerformanceCalculator 本身一并返回（缓存），bootstrap 和基准对比复用其中的日收益率
+        """
+        perf_calculator = PerformanceCalculator(df)
+        performance_metrics = perf_calculator.calculate_all_metrics()
+        return (
+            perf_calculator,
+            performance_metrics,
+            perf_calculator.get_trade_results_df(),
+            perf_calculator.get_monthly_performance(),
+            perf_calculator.get_stock_performance(),
+            perf_calculator.get_rolling_metrics(tuple(self.config.rolling_windows)),
+            perf_calculator.get_drawdown_episodes(),
+            perf_calculator.get_security_drawdowns(),
+        )
+    
+    def _cached(self, artefact: str, compute, **params):
+        """
+        未设置 cache 时直接计算；否则以筛选条件和额外参数为键，依赖 trade_records 的数据版本
+        """
+        if self.cache is None:
+            return compute()
+        key = {
+            'stock_code': self.config.stock_code,
+            'start_date': self.config.start_date,
+            'end_date': self.config.end_date,
+            'include_repo': self.config.include_repo,
+            'include_dividend': self.config.include_dividend,
+            **params,
+        }
+        return self.cache.get_or_compute(artefact, key, compute, depends=('trade_records',))
+    
     def _apply_filters(self) -> pd.DataFrame:
         df = self._df.copy()
         
@@ -186,6 +363,16 @@ class TradeAnalyzer:
         if len(trade_df) == 0:
             return {}
         
+        # 汇总表只覆盖全部历史且包含红股入账，限定了时间段或排除分红时仍需逐笔统计
+        use_summary = (
+            self._security_summary is not None
+            and not self.config.start_date
+            and not self.config.end_date
+            and self.config.include_dividend
+        )
+        if use_summary:
+            return self._stock_stats_from_summary(self._security_summary, trade_df)
+        
         # 买入统计
         buy_df = trade_df[trade_df['trade_type'] == 'buy']
         total_buy_quantity = buy_df['quantity'].sum()
@@ -240,6 +427,55 @@ class TradeAnalyzer:
             'trade_records': self._get_trade_records(trade_df),
         }
     
+    def _stock_stats_from_summary(self, summary: Dict[str, Any], trade_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        基于 security_summary 汇总行生成个股交易统计
+        
+        Args:
+            summary: DatabaseManager.get_security_summary 返回的汇总字典
+            trade_df: 该股票的买卖及红股记录（仅用于明细展示）
+        """
+        total_buy_quantity = summary['buy_quantity'] or 0
+        total_sell_quantity = summary['sell_quantity'] or 0
+        total_dividend_quantity = summary['dividend_quantity'] or 0
+        total_buy_amount = summary['buy_amount'] or 0.0
+        total_sell_amount = summary['sell_amount'] or 0.0
+        
+        current_position = total_buy_quantity + total_dividend_quantity - total_sell_quantity
+        realized_profit = summary['realized_profit'] or 0.0
+        profit_rate = (realized_profit / total_buy_amount * 100) if total_buy_amount > 0 else 0
+        has_short_selling = total_sell_quantity > (total_buy_quantity + total_dividend_quantity)
+        
+        # 持股时长：首次买入到最后卖出（未卖出则到当前）
+        avg_holding_days = 0
+        if summary['first_buy_date'] is not None:
+            first_buy_date = summary['first_buy_date']
+            if summary['last_sell_date'] is not None:
+                last_date = summary['last_sell_date']
+            else:
+                last_date = pd.Timestamp.now()
+            avg_holding_days = max(0, (last_date - first_buy_date).days)
+        
+        return {
+            'stock_code': self.config.stock_code,
+            'stock_name': summary['security_name'] or '',
+            'total_buy_quantity': int(total_buy_quantity),
+            'total_sell_quantity': int(total_sell_quantity),
+            'total_dividend_quantity': int(total_dividend_quantity),
+            'current_position': int(current_position),
+            'total_buy_amount': float(total_buy_amount),
+            'total_sell_amount': float(total_sell_amount),
+            'realized_profit': float(realized_profit),
+            'profit_rate': float(profit_rate),
+            'buy_count': int(summary['buy_count'] or 0),
+            'sell_count': int(summary['sell_count'] or 0),
+            'dividend_count': int(summary['dividend_count'] or 0),
+            'has_short_selling': has_short_selling,
+            'short_selling_quantity': int(total_sell_quantity - total_buy_quantity - total_dividend_quantity) if has_short_selling else 0,
+            'avg_holding_days': avg_holding_days,
+            'trade_records': self._get_trade_records(trade_df),
+        }
+    
     def _get_trade_records(self, df: pd.DataFrame) -> List[Dict]:
         """
         获取交易记录列表（用于显示）
@@ -296,6 +532,30 @@ class TradeAnalyzer:
 
         return close_prices
     
+    def _run_stress_test(self, profit_summary: ProfitSummary):
+        """
+        期末持仓压力测试：标准情景，以及价格缓存中逐日涨跌幅的历史回放
+        """
+        if not profit_summary.positions:
+            return None, None
+        
+        tester = StressTester.from_profit_summary(profit_summary)
+        stress_test = tester.run()
+        
+        stress_replay = None
+        if self.db is not None:
+            price_matrix = self.db.get_price_matrix(list(profit_summary.positions))
+            if len(price_matrix) > 1:
+                stress_replay = tester.replay(price_matrix)
+        
+        return stress_test, stress_replay
+    
+    def _load_benchmark(self, start: datetime, end: datetime) -> Optional[pd.Series]:
+        """
+        读取基准指数收盘价，见 load_benchmark
+        """
+        return load_benchmark(self.config.benchmark_code, start, end, self.price_fetcher, self.db)
+    
     def get_result(self) -> Optional[AnalysisResult]:
         return self._result
     
@@ -0,0 +1,418 @@
+"""
+本地只读分析服务
+
+常驻内存保存交易记录、TradeAnalyzer 分析结果、按日期查询的持仓索引和收盘价矩阵，
+以 HTTP/JSON 回答查询，省去每次查询的导入、读库和 FIFO / 资产曲线计算。
+
+刷新：请求到达时检查数据库的数据版本（至多每 refresh_interval 秒一次）
+- trade_records 变化：只有新增记录时从最早的新增日期起增量读取并拼接，否则整表重读；
+  重建持仓索引并重新分析
+- 只有 daily_prices 变化：重读收盘价矩阵并重新估值，FIFO、资产曲线和盈亏归因取自进程内缓存
+刷新期间其它请求继续使用旧结果，新结果整体替换。服务不写数据库，也不访问行情数据源
+（分析器使用关闭全部数据源的 PriceFetcher，整个进程只创建一个）：
+持仓现价取 daily_prices 中的最新收盘价（可用 manual_prices 覆盖），基准指数只读 daily_prices 缓存。
+
+接口（GET，返回 JSON）:
+    /health                       数据版本、加载时间、刷新次数
+    /summary                      数据概览、账户盈亏、绩效指标
+    /positions[?date=YYYYMMDD]    期末持仓；指定日期时为该日收盘后的持仓和当日收盘价
+    /stocks                       逐股绩效
+    /stocks/<代码>                 单只证券的绩效、持仓和配对交易
+    /nav[?start=&end=]            每日资产曲线
+    /monthly                      月度绩效
+
+使用方法:
+    python -m trade_analysis.cli serve --port 8765
+    curl http://127.0.0.1:8765/positions?date=20250630
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, asdict, is_dataclass, replace
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from ..db.database import DatabaseManager
+from ..models.asof_index import AsOfPositionIndex
+from ..models.schema import apply_trade_schema
+from ..utils.code_formatter import normalize_user_code
+from ..utils.date_utils import to_day_number, day_number_to_timestamp
+from .analyzer import TradeAnalyzer, AnalysisConfig, AnalysisResult
+from .price_fetcher import PriceFetcher, DataSourceConfig
+from .result_cache import MemoryResultCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+@dataclass
+class ServiceState:
+    """
+    某一数据版本下的常驻数据，刷新时整体替换
+
+    Attributes:
+        versions: 加载时的数据版本
+        records: 全部交易记录
+        max_id: records 中最大的 trade_records.id（判断是否只有新增）
+        index: 按日期查询的持仓索引
+        prices: 收盘价矩阵（日期 x 证券代码）
+        close_prices: 各证券现价
+        result: 分析结果
+        loaded_at: 加载完成时间
+        seconds: 本次加载耗时
+    """
+    versions: Dict[str, int]
+    records: pd.DataFrame
+    max_id: int
+    index: AsOfPositionIndex
+    prices: pd.DataFrame
+    close_prices: Dict[str, float]
+    result: AnalysisResult
+    loaded_at: datetime
+    seconds: float
+
+
+def _jsonable(value: Any) -> Any:
+    """
+    转换为可 JSON 序列化的对象：日期输出 YYYY-MM-DD，NaN / inf 输出 null
+    """
+    if isinstance(value, pd.DataFrame):
+        return _frame_records(value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return _jsonable(asdict(value))
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime('%Y-%m-%d') if value == value.replace(hour=0, minute=0, second=0, microsecond=0) else value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is pd.NaT:
+        return None
+    return value
+
+
+def _frame_records(df: pd.DataFrame) -> list:
+    if df is None or df.empty:
+        return []
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime('%Y-%m-%d')
+    return json.loads(df.to_json(orient='records', force_ascii=False, double_precision=10))
+
+
+class AnalysisService:
+    """
+    常驻分析服务（与 HTTP 无关，可直接调用查询方法）
+
+    Args:
+        db_path: 数据库路径
+        config: 分析配置（筛选条件、滚动窗口等），bootstrap 默认关闭
+        manual_prices: 手动现价，覆盖 daily_prices 中的收盘价
+        refresh_interval: 两次检查数据版本的最小间隔（秒），0 表示每个请求都检查
+
+    Attributes:
+        refreshes: 加载/刷新次数
+    """
+
+    def __init__(
+        self,
+        db_path: str = None,
+        config: Optional[AnalysisConfig] = None,
+        manual_prices: Optional[Dict[str, float]] = None,
+        refresh_interval: float = 1.0
+    ):
+        self.db = DatabaseManager(db_path)
+        self.config = config or AnalysisConfig(bootstrap_resamples=0)
+        self.manual_prices = dict(manual_prices or {})
+        self.refresh_interval = refresh_interval
+        self.cache = MemoryResultCache(self.db)
+        self.price_fetcher = PriceFetcher(DataSourceConfig.disabled())
+        self.refreshes = 0
+
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._state: Optional[ServiceState] = None
+        self._state = self._load(self._state)
+
+    # ---- 加载与刷新 ----
+
+    def state(self) -> ServiceState:
+        """
+        当前状态；距上次检查超过 refresh_interval 时检查数据版本，变化则刷新。
+        其它线程正在刷新时直接返回旧状态
+        """
+        if time.monotonic() - self._checked_at >= self.refresh_interval and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at = time.monotonic()
+                if self.db.get_data_version() != self._state.versions:
+                    self._state = self._load(self._state)
+            finally:
+                self._lock.release()
+        return self._state
+
+    def refresh(self) -> ServiceState:
+        """
+        立即检查数据版本并按需刷新
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self.db.get_data_version() != self._state.versions:
+                self._state = self._load(self._state)
+        return self._state
+
+    def _load(self, previous: Optional[ServiceState]) -> ServiceState:
+        started = time.perf_counter()
+        versions = self.db.get_data_version()
+
+        if previous is None or versions['trade_records'] != previous.versions['trade_records']:
+            records = self._load_records(previous, versions)
+            index = AsOfPositionIndex(records)
+        else:
+            records, index = previous.records, previous.index
+
+        if previous is None or versions['daily_prices'] != previous.versions['daily_prices']:
+            prices = self.db.get_price_matrix()
+        else:
+            prices = previous.prices
+
+        if records.empty:
+            raise ValueError("数据库中没有交易记录")
+
+        # 每只证券的现价都以 manual_prices 给出（没有收盘价时为 0），分析过程不访问行情数据源
+        latest = prices.ffill().iloc[-1].dropna().to_dict() if not prices.empty else {}
+        close_prices = {
+            code: float(self.manual_prices.get(code, latest.get(code, 0.0)))
+            for code in records['security_code'].astype(str).unique()
+        }
+
+        # FIFO、资产曲线等只依赖 trade_records，行情变化时命中进程内缓存
+        config = replace(self.config, manual_prices=close_prices)
+        result = TradeAnalyzer.from_dataframe(
+            records, config, db=self.db, cache=self.cache, price_fetcher=self.price_fetcher
+        ).run_analysis()
+
+        self.refreshes += 1
+        seconds = time.perf_counter() - started
+        logger.info(f"分析服务已加载数据版本 {versions}，用时 {seconds:.2f}s")
+        return ServiceState(
+            versions=versions,
+            records=records,
+            max_id=int(records['id'].max()),
+            index=index,
+            prices=prices,
+            close_prices=close_prices,
+            result=result,
+            loaded_at=datetime.now(),
+            seconds=seconds,
+        )
+
+    def _load_records(self, previous: Optional[ServiceState], versions: Dict[str, int]) -> pd.DataFrame:
+        """
+        读取交易记录：上次加载后只有新增时，从最早的新增日期起读取并替换缓存中该日期之后的部分
+
+        判断只有新增：旧记录一条不少，且数据版本的增量不超过新增记录数（每次写入至少新增一条）；
+        版本增量更大说明期间还有原地更新等其它写入，整表重读
+        """
+        if previous is not None:
+            conn = self.db._get_connection()
+            try:
+                kept = conn.execute('SELECT COUNT(*) FROM trade_records WHERE id <= ?', (previous.max_id,)).fetchone()[0]
+                added, first_new = conn.execute(
+                    'SELECT COUNT(*), MIN(date) FROM trade_records WHERE id > ?', (previous.max_id,)
+                ).fetchone()
+            finally:
+                conn.close()
+
+            writes = versions['trade_records'] - previous.versions['trade_records']
+            if kept == len(previous.records) and first_new is not None and writes <= added:
+                since = day_number_to_timestamp(first_new)
+                head = previous.records[previous.records['date'] < since]
+                tail = self.db.load_trade_records(start_date=since)
+                logger.info(f"增量读取 {since:%Y-%m-%d} 起的 {len(tail)} 条交易记录")
+                return apply_trade_schema(pd.concat([head, tail], ignore_index=True))
+
+        return self.db.get_all_trade_records()
+
+    # ---- 查询 ----
+
+    def health(self) -> Dict[str, Any]:
+        state = self.state()
+        return {
+            'status': 'ok',
+            'versions': state.versions,
+            'records': len(state.records),
+            'loaded_at': state.loaded_at.isoformat(timespec='seconds'),
+            'load_seconds': round(state.seconds, 3),
+            'refreshes': self.refreshes,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        result = self.state().result
+        profit = asdict(result.profit_summary) if result.profit_summary else {}
+        profit.pop('positions', None)
+        return _jsonable({
+            'summary': result.summary,
+            'profit': profit,
+            'performance': result.performance_metrics,
+        })
+
+    def positions(self, date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        持仓；date 为 None 时返回期末持仓（分析结果中的现价），否则按持仓索引查询该日持仓并以当日收盘价估值
+        """
+        state = self.state()
+        if date is None:
+            rows = [
+                {'security_code': code, **pos, 'market_value': pos['quantity'] * pos.get('close_price', 0)}
+                for code, pos in state.result.positions.items()
+            ]
+            return _jsonable({'date': state.records['date'].max(), 'positions': rows})
+
+        day = day_number_to_timestamp(to_day_number(date))
+        holdings = state.index.holdings_as_of(day)
+        if not state.prices.empty:
+            close = state.prices.loc[:day].ffill()
+            close = close.iloc[-1] if not close.empty else pd.Series(dtype=float)
+        else:
+            close = pd.Series(dtype=float)
+        holdings['close_price'] = holdings['security_code'].map(close).astype(float)
+        holdings['market_value'] = holdings['quantity'] * holdings['close_price']
+        return _jsonable({'date': day, 'positions': holdings.drop(columns='date')})
+
+    def stocks(self) -> list:
+        return _frame_records(self.state().result.stock_performance)
+
+    def stock(self, code: str) -> Dict[str, Any]:
+        """
+        单只证券的绩效、期末持仓和配对交易
+
+        Raises:
+            KeyError: 没有该证券的交易记录
+        """
+        state = self.state()
+        code = normalize_user_code(code)
+        if code not in set(state.records['security_code'].astype(str)):
+            raise KeyError(code)
+
+        result = state.result
+        performance = result.stock_performance
+        trades = result.trade_results
+        row = performance[performance['证券代码'] == code] if performance is not None and not performance.empty else pd.DataFrame()
+        matched = trades[trades['证券代码'] == code] if trades is not None and not trades.empty else pd.DataFrame()
+        return _jsonable({
+            'security_code': code,
+            'performance': _frame_records(row)[0] if not row.empty else None,
+            'position': result.positions.get(code),
+            'trades': matched,
+        })
+
+    def nav(self, start: Optional[str] = None, end: Optional[str] = None) -> list:
+        assets = self.state().result.daily_assets
+        if assets is None or assets.empty:
+            return []
+        mask = pd.Series(True, index=assets.index)
+        if start:
+            mask &= assets['date'] >= day_number_to_timestamp(to_day_number(start))
+        if end:
+            mask &= assets['date'] <= day_number_to_timestamp(to_day_number(end))
+        return _frame_records(assets[mask])
+
+    def monthly(self) -> list:
+        return _frame_records(self.state().result.monthly_performance)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'TradeAnalysis/1.0'
+
+    def _routes(self) -> Dict[str, Callable[[Dict[str, str]], Any]]:
+        service: AnalysisService = self.server.service
+        return {
+            '/health': lambda q: service.health(),
+            '/summary': lambda q: service.summary(),
+            '/positions': lambda q: service.positions(q.get('date')),
+            '/stocks': lambda q: service.stocks(),
+            '/nav': lambda q: service.nav(q.get('start'), q.get('end')),
+            '/monthly': lambda q: service.monthly(),
+        }
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            if path.startswith('/stocks/'):
+                payload = self.server.service.stock(unquote(path[len('/stocks/'):]))
+            else:
+                handler = self._routes().get(path)
+                if handler is None:
+                    return self._send(404, {'error': f'未知路径: {path}'})
+                payload = handler(query)
+        except KeyError as e:
+            return self._send(404, {'error': f'未找到: {e.args[0] if e.args else path}'})
+        except ValueError as e:
+            return self._send(400, {'error': str(e)})
+        except Exception as e:
+            logger.exception(f"处理请求 {self.path} 失败")
+            return self._send(500, {'error': str(e)})
+        self._send(200, payload)
+
+    def _send(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def make_server(service: AnalysisService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    创建 HTTP 服务（未启动）；port 为 0 时由系统分配端口，见 server.server_address
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(
+    db_path: str = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    config: Optional[AnalysisConfig] = None,
+    manual_prices: Optional[Dict[str, float]] = None,
+    refresh_interval: float = 1.0
+) -> None:
+    """
+    加载数据并启动服务，阻塞直到 Ctrl+C
+    """
+    service = AnalysisService(db_path, config=config, manual_prices=manual_prices, refresh_interval=refresh_interval)
+    server = make_server(service, host, port)
+    state = service.state()
+    print(f"已加载 {len(state.records)} 条交易记录，用时 {state.seconds:.2f}s")
+    print(f"分析服务: http://{server.server_address[0]}:{server.server_address[1]}/summary （Ctrl+C 退出）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,247 @@
+"""
+清算数据导入模块
+
+流式导入：分块读取、清洗并直接写入数据库，适合覆盖多个账户、多年的大文件。
+目录导入：多进程并行解析目录下的全部清算文件，合并去重后一次性写入数据库。
+
+使用方法:
+    db = DatabaseManager()
+    stats = stream_import_file('data/raw/settlement.xlsx', db)
+    print(stats.rows_inserted)
+
+    result = import_directory('data/raw/archive', db)
+    for file_stats in result.files:
+        print(file_stats.filepath, file_stats.rows_parsed, file_stats.elapsed)
+"""
+
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Callable, List, Tuple
+
+import pandas as pd
+
+from ..db.database import DatabaseManager
+from ..models.data_cleaner import DataCleaner, DEFAULT_CHUNK_SIZE, DEFAULT_SNIFF_ROWS
+
+logger = logging.getLogger(__name__)
+
+# 超过该大小的文件在交互导入时自动使用流式模式
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
+
+SETTLEMENT_FILE_PATTERNS = ['*.xls', '*.xlsx', '*.csv']
+
+# 与 trade_records 表的 UNIQUE 约束一致
+UNIQUE_KEY_COLUMNS = ['date', 'security_code', 'trade_type', 'quantity', 'amount', 'price', 'trade_id']
+
+
+@dataclass
+class ImportStats:
+    """
+    导入统计
+    """
+    filepath: str
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    chunks: int = 0
+    start_date: Optional[pd.Timestamp] = None
+    end_date: Optional[pd.Timestamp] = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class DirectoryImportStats:
+    """
+    目录导入统计
+    """
+    directory: str
+    files: List[ImportStats] = field(default_factory=list)
+    rows_parsed: int = 0
+    duplicates: int = 0
+    rows_inserted: int = 0
+    parse_elapsed: float = 0.0
+    write_elapsed: float = 0.0
+
+    @property
+    def failed_files(self) -> List[ImportStats]:
+        return [f for f in self.files if f.error]
+
+
+def should_stream(filepath: str) -> bool:
+    """
+    判断文件是否应使用流式导入
+    """
+    try:
+        return Path(filepath).stat().st_size >= STREAMING_THRESHOLD_BYTES
+    except OSError:
+        return False
+
+
+def stream_import_file(
+    filepath: str,
+    db: DatabaseManager,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    sniff_rows: int = DEFAULT_SNIFF_ROWS,
+    progress_callback: Optional[Callable[[ImportStats], None]] = None
+) -> ImportStats:
+    """
+    流式导入清算文件
+
+    每个数据块清洗后立即写入数据库并释放，峰值内存只与 chunksize 有关。
+
+    Args:
+        filepath: 清算文件路径
+        db: 数据库管理器
+        chunksize: 每块行数
+        sniff_rows: 用于识别表头的行数
+        progress_callback: 每写入一块后回调，参数为当前累计统计
+
+    Returns:
+        ImportStats 导入统计
+    """
+    stats = ImportStats(filepath=str(filepath))
+    started = time.perf_counter()
+
+    cleaner = DataCleaner(filepath)
+    for chunk in cleaner.iter_clean_chunks(chunksize=chunksize, sniff_rows=sniff_rows):
+        stats.chunks += 1
+        stats.rows_parsed += len(chunk)
+        stats.rows_inserted += db.insert_trade_records(chunk)
+
+        chunk_start = chunk['date'].min()
+        chunk_end = chunk['date'].max()
+        if stats.start_date is None or chunk_start < stats.start_date:
+            stats.start_date = chunk_start
+        if stats.end_date is None or chunk_end > stats.end_date:
+            stats.end_date = chunk_end
+
+        logger.debug(f"已导入第 {stats.chunks} 块，累计 {stats.rows_inserted} 条")
+        if progress_callback:
+            progress_callback(stats)
+
+    stats.elapsed = time.perf_counter() - started
+    logger.info(f"流式导入完成: {stats.rows_inserted} 条，{stats.chunks} 块，耗时 {stats.elapsed:.2f}s")
+    return stats
+
+
+def list_settlement_files(directory: str) -> List[Path]:
+    """
+    列出目录下的清算文件（按文件名排序）
+    """
+    dir_path = Path(directory)
+    files = set()
+    for pattern in SETTLEMENT_FILE_PATTERNS:
+        files.update(p for p in dir_path.glob(pattern) if not p.name.startswith('~$'))
+    return sorted(files)
+
+
+def parse_settlement_file(filepath: str) -> Tuple[Optional[pd.DataFrame], ImportStats]:
+    """
+    解析并清洗单个清算文件（供进程池调用，必须是模块级函数）
+
+    Returns:
+        (清洗后的数据, 文件统计)，解析失败时数据为 None，错误信息记录在统计中
+    """
+    stats = ImportStats(filepath=str(filepath))
+    started = time.perf_counter()
+
+    try:
+        cleaner = DataCleaner(filepath)
+        cleaner.load_data()
+        df = cleaner.clean()
+    except Exception as e:
+        stats.error = str(e)
+        stats.elapsed = time.perf_counter() - started
+        return None, stats
+
+    stats.rows_parsed = len(df)
+    stats.chunks = 1
+    if not df.empty:
+        stats.start_date = df['date'].min()
+        stats.end_date = df['date'].max()
+    stats.elapsed = time.perf_counter() - started
+    return df, stats
+
+
+def merge_settlement_frames(frames: List[pd.DataFrame]) -> Tuple[pd.DataFrame, int]:
+    """
+    合并多个文件的清洗结果
+
+    按日期稳定排序（同日保持文件内原有顺序），并按唯一键去重；
+    重复记录保留最后出现的一条，与 INSERT OR REPLACE 的覆盖语义一致。
+
+    Returns:
+        (合并后的数据, 去除的重复记录数)
+    """
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame(), 0
+
+    merged = pd.concat(frames, ignore_index=True)
+    key_columns = [col for col in UNIQUE_KEY_COLUMNS if col in merged.columns]
+    duplicated = merged.duplicated(subset=key_columns, keep='last')
+    merged = merged[~duplicated]
+    merged = merged.sort_values('date', kind='mergesort').reset_index(drop=True)
+    return merged, int(duplicated.sum())
+
+
+def import_directory(
+    directory: str,
+    db: DatabaseManager,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[ImportStats], None]] = None
+) -> DirectoryImportStats:
+    """
+    并行导入目录下的全部清算文件
+
+    各文件在进程池中解析清洗，主进程合并、去重后用一次批量写入提交。
+
+    Args:
+        directory: 清算文件目录
+        db: 数据库管理器
+        max_workers: 进程数，None 表示使用 CPU 核数
+        progress_callback: 每个文件解析完成后回调，参数为该文件的统计
+
+    Returns:
+        DirectoryImportStats 目录导入统计
+    """
+    result = DirectoryImportStats(directory=str(directory))
+    files = list_settlement_files(directory)
+    if not files:
+        return result
+
+    started = time.perf_counter()
+    frames = []
+    paths = [str(f) for f in files]
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers != 1 and len(files) > 1 else None
+    try:
+        # map 按提交顺序返回结果，保证合并时文件顺序稳定
+        parsed = executor.map(parse_settlement_file, paths) if executor else map(parse_settlement_file, paths)
+        for df, file_stats in parsed:
+            frames.append(df)
+            result.files.append(file_stats)
+            if progress_callback:
+                progress_callback(file_stats)
+    finally:
+        if executor:
+            executor.shutdown()
+    result.parse_elapsed = time.perf_counter() - started
+
+    for file_stats in result.failed_files:
+        logger.warning(f"文件解析失败 {file_stats.filepath}: {file_stats.error}")
+
+    merged, result.duplicates = merge_settlement_frames(frames)
+    result.rows_parsed = sum(f.rows_parsed for f in result.files)
+
+    started = time.perf_counter()
+    result.rows_inserted = db.insert_trade_records(merged)
+    result.write_elapsed = time.perf_counter() - started
+
+    logger.info(
+        f"目录导入完成: {len(result.files)} 个文件，{result.rows_inserted} 条，"
+        f"去重 {result.duplicates} 条，解析 {result.parse_elapsed:.2f}s，写入 {result.write_elapsed:.2f}s"
+    )
+    return result
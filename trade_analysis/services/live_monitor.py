@@ -0,0 +1,242 @@
+"""
+实时持仓监控
+
+订阅所有持仓的实时行情（PriceFetcher.subscribe_quotes，Wind wsq 或 Bloomberg //blp/mktdata），
+每个 tick 只更新该证券一项：市值、浮动盈亏、板块敞口、总资产峰值和日内回撤都以增量维护，
+单个 tick 的计算量与持仓数量无关。看板按固定间隔节流输出。
+
+没有流式数据源时按间隔轮询最新价；测试和复盘可以直接回放 tick 序列，不需要行情终端。
+
+使用方法:
+    monitor = PortfolioMonitor.from_profit_summary(summary)
+    LiveMonitor(monitor, interval=5).replay(ticks)
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from ..models.attribution import board_of
+
+logger = logging.getLogger(__name__)
+
+# (证券代码, 最新价, 时间)
+Tick = Tuple[str, float, datetime]
+
+
+@dataclass
+class MonitorSnapshot:
+    """
+    监控状态快照
+    """
+    timestamp: Optional[datetime]
+    nav: float
+    market_value: float
+    unrealized_pnl: float
+    day_pnl: float
+    exposure: float
+    peak_nav: float
+    drawdown: float
+    max_drawdown: float
+    tick_count: int
+    board_exposure: Dict[str, float]
+
+
+class PortfolioMonitor:
+    """
+    持仓实时状态（增量更新）
+
+    Attributes:
+        codes: 持仓证券代码
+        cash: 现金（含逆回购等非证券资产）
+    """
+
+    def __init__(self, positions: Dict[str, Dict], cash: float = 0.0):
+        self.codes = list(positions)
+        self.names = {code: pos.get('name', '') for code, pos in positions.items()}
+        self.cash = float(cash)
+
+        self._quantity = {code: float(pos['quantity']) for code, pos in positions.items()}
+        self._cost = {code: float(pos.get('cost_price', 0.0)) for code, pos in positions.items()}
+        self._board = {code: board_of(code) for code in positions}
+        # 开盘前参考价：昨收，没有时用成本价
+        self._reference = {
+            code: float(pos.get('close_price') or pos.get('cost_price', 0.0))
+            for code, pos in positions.items()
+        }
+        self._price = dict(self._reference)
+
+        self.market_value = sum(self._quantity[code] * self._price[code] for code in self.codes)
+        self.cost_value = sum(self._quantity[code] * self._cost[code] for code in self.codes)
+        self.reference_value = self.market_value
+        self.board_value: Dict[str, float] = {}
+        for code in self.codes:
+            board = self._board[code]
+            self.board_value[board] = self.board_value.get(board, 0.0) + self._quantity[code] * self._price[code]
+
+        self.peak_nav = self.nav
+        self.max_drawdown = 0.0
+        self.tick_count = 0
+        self.last_tick: Optional[datetime] = None
+
+    @classmethod
+    def from_profit_summary(cls, summary) -> 'PortfolioMonitor':
+        """
+        由 ProfitSummary 构建：持仓取 positions，现金 = 现金余额 + 逆回购
+        """
+        return cls(summary.positions, cash=summary.cash_balance + summary.repo_amount)
+
+    @property
+    def nav(self) -> float:
+        return self.cash + self.market_value
+
+    def on_tick(self, code: str, price: float, timestamp: Optional[datetime] = None) -> bool:
+        """
+        处理一个 tick，O(1)
+
+        Returns:
+            是否为持仓证券的有效报价
+        """
+        old = self._price.get(code)
+        if old is None or price is None or not price > 0:
+            return False
+
+        delta = self._quantity[code] * (price - old)
+        self._price[code] = price
+        self.market_value += delta
+        self.board_value[self._board[code]] += delta
+
+        nav = self.nav
+        if nav > self.peak_nav:
+            self.peak_nav = nav
+        elif self.peak_nav > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak_nav - nav) / self.peak_nav * 100)
+
+        self.tick_count += 1
+        self.last_tick = timestamp
+        return True
+
+    def snapshot(self) -> MonitorSnapshot:
+        """
+        当前状态
+        """
+        nav = self.nav
+        return MonitorSnapshot(
+            timestamp=self.last_tick,
+            nav=nav,
+            market_value=self.market_value,
+            unrealized_pnl=self.market_value - self.cost_value,
+            day_pnl=self.market_value - self.reference_value,
+            exposure=self.market_value / nav * 100 if nav else 0.0,
+            peak_nav=self.peak_nav,
+            drawdown=(self.peak_nav - nav) / self.peak_nav * 100 if self.peak_nav > 0 else 0.0,
+            max_drawdown=self.max_drawdown,
+            tick_count=self.tick_count,
+            board_exposure={
+                board: value / nav * 100 if nav else 0.0 for board, value in self.board_value.items()
+            },
+        )
+
+    def dashboard(self) -> str:
+        """
+        文本看板（逐只持仓，只在输出时计算）
+        """
+        s = self.snapshot()
+        stamp = s.timestamp.strftime('%H:%M:%S') if s.timestamp else '--:--:--'
+        lines = [
+            f"[{stamp}] 总资产 {s.nav:,.2f}  持仓市值 {s.market_value:,.2f}  仓位 {s.exposure:.1f}%",
+            f"  浮动盈亏 {s.unrealized_pnl:,.2f}  当日盈亏 {s.day_pnl:,.2f}  "
+            f"日内回撤 {s.drawdown:.2f}% (最大 {s.max_drawdown:.2f}%)  tick {s.tick_count}",
+            "  板块敞口: " + ", ".join(f"{board} {pct:.1f}%" for board, pct in sorted(s.board_exposure.items())),
+        ]
+        for code in self.codes:
+            price = self._price[code]
+            reference = self._reference[code]
+            change = (price / reference - 1) * 100 if reference else 0.0
+            pnl = self._quantity[code] * (price - self._cost[code])
+            lines.append(f"  {code} {self.names[code]}: {price:.3f} ({change:+.2f}%)  浮动盈亏 {pnl:,.2f}")
+        return "\n".join(lines)
+
+
+class LiveMonitor:
+    """
+    实时监控驱动：接收 tick、节流输出看板
+
+    Args:
+        monitor: PortfolioMonitor
+        interval: 看板最短输出间隔（秒）
+        printer: 看板输出函数
+        clock: 时钟函数，回放时可传入按 tick 时间计时的函数
+    """
+
+    def __init__(
+        self,
+        monitor: PortfolioMonitor,
+        interval: float = 5.0,
+        printer: Callable[[str], None] = print,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.monitor = monitor
+        self.interval = interval
+        self.printer = printer
+        self.clock = clock
+        self._last_print: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def on_tick(self, code: str, price: float, timestamp: Optional[datetime] = None) -> None:
+        """
+        行情回调（可能在数据源线程中调用）
+        """
+        with self._lock:
+            if not self.monitor.on_tick(code, price, timestamp or datetime.now()):
+                return
+            now = self.clock()
+            if self._last_print is None or now - self._last_print >= self.interval:
+                self._last_print = now
+                self.printer(self.monitor.dashboard())
+
+    def replay(self, ticks: Iterable[Tick]) -> MonitorSnapshot:
+        """
+        回放 tick 序列，节流按 tick 自带时间计算
+        """
+        current = {'time': 0.0}
+        self.clock = lambda: current['time']
+        for code, price, timestamp in ticks:
+            current['time'] = timestamp.timestamp()
+            self.on_tick(code, price, timestamp)
+        return self.monitor.snapshot()
+
+    def run(self, price_fetcher, duration: Optional[float] = None, poll_interval: float = 3.0) -> MonitorSnapshot:
+        """
+        订阅实时行情并运行，Ctrl+C 或到达 duration 秒后停止
+
+        没有可用的流式数据源时，按 poll_interval 轮询 get_latest_price
+        """
+        codes = self.monitor.codes
+        unsubscribe = price_fetcher.subscribe_quotes(codes, self.on_tick)
+        if unsubscribe is None:
+            logger.info("没有可用的实时行情订阅，改为轮询最新价")
+
+        self.printer(self.monitor.dashboard())
+        started = time.monotonic()
+        try:
+            while duration is None or time.monotonic() - started < duration:
+                if unsubscribe is None:
+                    for code in codes:
+                        price = price_fetcher.get_latest_price(code)
+                        if price is not None:
+                            self.on_tick(code, price)
+                    time.sleep(poll_interval)
+                else:
+                    time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if unsubscribe is not None:
+                unsubscribe()
+
+        self.printer(self.monitor.dashboard())
+        return self.monitor.snapshot()
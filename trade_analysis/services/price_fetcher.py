@@ -14,11 +14,13 @@
 """
 
 import pandas as pd
-from typing import Optional, Dict, List, Tuple
+from typing import Callable, Optional, Dict, List, Tuple
 from datetime import datetime
 import logging
 import time
 
+from ..utils.profiler import profiled, frame_nbytes
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +44,18 @@ class DataSourceConfig:
         
         # 超时配置
         self.timeout = 30  # 秒
+    
+    @classmethod
+    def disabled(cls) -> 'DataSourceConfig':
+        """
+        关闭全部数据源的配置（离线批处理、常驻服务），PriceFetcher 不建立任何连接
+        """
+        config = cls()
+        config.wind_enabled = False
+        config.bloomberg_enabled = False
+        config.workspace_enabled = False
+        config.akshare_enabled = False
+        return config
 
 
 class PriceFetcher:
@@ -230,6 +244,7 @@ class PriceFetcher:
         exchange = self._get_exchange(code)
         return f"{code}.{exchange}"
     
+    @profiled('prices.get_latest_price')
     def get_latest_price(self, code: str) -> Optional[float]:
         """
         获取最新价格
@@ -367,6 +382,77 @@ class PriceFetcher:
         logger.error(error_msg)
         return None
     
+    def get_index_symbol(self, code: str) -> str:
+        """
+        获取指数代码的带交易所前缀格式（如 sh000300、sz399006）
+        
+        指数代码与股票代码会重复（如 000001），不能使用 _get_exchange 判断：
+        399 开头为深交所指数，其余为上交所/中证指数
+        """
+        code = self._normalize_code(code)
+        exchange = 'sz' if code.startswith('399') else 'sh'
+        return f"{exchange}{code}"
+    
+    @profiled('prices.get_index_history', nbytes=frame_nbytes)
+    def get_index_history(
+        self, 
+        code: str, 
+        start_date: str, 
+        end_date: str
+    ) -> Optional[pd.DataFrame]:
+        """
+        获取指数历史收盘价
+        
+        按优先级尝试：Wind -> AkShare
+        
+        Args:
+            code: 指数代码（如 000300）
+            start_date: 开始日期 (YYYYMMDD)
+            end_date: 结束日期 (YYYYMMDD)
+            
+        Returns:
+            DataFrame 包含 date, close 列
+            失败返回 None
+        """
+        symbol = self.get_index_symbol(code)
+        errors = []
+        
+        if self._wind_available and self._wind_conn is not None:
+            try:
+                wind_code = f"{symbol[2:]}.{symbol[:2].upper()}"
+                start = f"{start_date[:4]}-{start_date[4:6]}-{start_date[6:]}"
+                end = f"{end_date[:4]}-{end_date[4:6]}-{end_date[6:]}"
+                result = self._wind_conn.wsd(wind_code, "close", start, end)
+                if result.ErrorCode == 0 and result.Data:
+                    df = pd.DataFrame({'date': pd.to_datetime(result.Times), 'close': result.Data[0]})
+                    df = df.dropna(subset=['close'])
+                    if not df.empty:
+                        logger.debug(f"从 Wind 获取指数 {code} 历史行情成功")
+                        return df
+            except Exception as e:
+                errors.append(f"Wind: {e}")
+                logger.debug(f"Wind 获取指数 {code} 历史行情失败: {e}")
+        
+        if self._akshare_available:
+            try:
+                import akshare as ak
+                
+                df = ak.stock_zh_index_daily(symbol=symbol)
+                if df is not None and not df.empty:
+                    df['date'] = pd.to_datetime(df['date'])
+                    start = pd.to_datetime(start_date, format='%Y%m%d')
+                    end = pd.to_datetime(end_date, format='%Y%m%d')
+                    df = df[(df['date'] >= start) & (df['date'] <= end)].dropna(subset=['close'])
+                    if not df.empty:
+                        logger.debug(f"从 AkShare 获取指数 {code} 历史行情成功")
+                        return df[['date', 'close']].reset_index(drop=True)
+            except Exception as e:
+                errors.append(f"AkShare: {e}")
+                logger.debug(f"AkShare 获取指数 {code} 历史行情失败: {e}")
+        
+        logger.error(f"无法获取指数 {code} 的历史行情。错误: {'; '.join(errors)}")
+        return None
+    
     def _get_price_from_wind(self, code: str) -> Optional[float]:
         """从 Wind 获取最新价格"""
         if not self._wind_available or self._wind_conn is None:
@@ -758,6 +844,102 @@ class PriceFetcher:
         
         return None
     
+    def subscribe_quotes(
+        self,
+        codes: List[str],
+        callback: Callable[[str, float, datetime], None]
+    ) -> Optional[Callable[[], None]]:
+        """
+        订阅实时行情，每个报价调用 callback(代码, 最新价, 时间)
+
+        按优先级使用 Wind wsq 回调订阅或 Bloomberg //blp/mktdata 订阅。
+        回调在数据源线程中执行，应尽快返回。
+
+        Args:
+            codes: 6 位证券代码列表
+            callback: 报价回调
+
+        Returns:
+            取消订阅函数；没有支持订阅的数据源或订阅失败时返回 None
+        """
+        codes = [self._normalize_code(code) for code in codes]
+        if not codes:
+            return None
+
+        if self._wind_available:
+            try:
+                return self._subscribe_wind(codes, callback)
+            except Exception as e:
+                logger.warning(f"Wind 实时行情订阅失败: {e}")
+
+        if self._bloomberg_available:
+            try:
+                return self._subscribe_bloomberg(codes, callback)
+            except Exception as e:
+                logger.warning(f"Bloomberg 实时行情订阅失败: {e}")
+
+        return None
+
+    def _subscribe_wind(self, codes: List[str], callback) -> Optional[Callable[[], None]]:
+        """Wind wsq 回调订阅"""
+        wind_codes = {self._get_wind_code(code): code for code in codes}
+
+        def on_quote(indata):
+            if indata.ErrorCode != 0 or not indata.Data:
+                return
+            timestamp = indata.Times[0] if indata.Times else datetime.now()
+            for wind_code, price in zip(indata.Codes, indata.Data[0]):
+                code = wind_codes.get(wind_code)
+                if code is not None and price is not None and price > 0:
+                    callback(code, float(price), timestamp)
+
+        result = self._wind_conn.wsq(",".join(wind_codes), "rt_last", func=on_quote)
+        if result.ErrorCode != 0:
+            logger.warning(f"Wind 实时行情订阅失败: {result.Data}")
+            return None
+
+        request_id = result.RequestID
+        logger.info(f"Wind 已订阅 {len(codes)} 只证券的实时行情")
+        return lambda: self._wind_conn.cancelRequest(request_id)
+
+    def _subscribe_bloomberg(self, codes: List[str], callback) -> Optional[Callable[[], None]]:
+        """Bloomberg //blp/mktdata 订阅"""
+        import blpapi
+
+        def on_event(event, session):
+            if event.eventType() != blpapi.Event.SUBSCRIPTION_DATA:
+                return
+            for msg in event:
+                if msg.hasElement("LAST_PRICE"):
+                    price = msg.getElementAsFloat("LAST_PRICE")
+                    if price > 0:
+                        callback(msg.correlationIds()[0].value(), price, datetime.now())
+
+        options = blpapi.SessionOptions()
+        options.setServerHost("localhost")
+        options.setServerPort(8194)
+
+        session = blpapi.Session(options, on_event)
+        if not session.start():
+            logger.debug("Bloomberg 会话启动失败")
+            return None
+        if not session.openService("//blp/mktdata"):
+            logger.debug("Bloomberg 无法打开 mktdata 服务")
+            session.stop()
+            return None
+
+        subscriptions = blpapi.SubscriptionList()
+        for code in codes:
+            subscriptions.add(f"{code} CH Equity", "LAST_PRICE", "", blpapi.CorrelationId(code))
+        session.subscribe(subscriptions)
+        logger.info(f"Bloomberg 已订阅 {len(codes)} 只证券的实时行情")
+
+        def unsubscribe():
+            session.unsubscribe(subscriptions)
+            session.stop()
+
+        return unsubscribe
+
     def get_available_sources(self) -> List[str]:
         """
         获取可用的数据源列表
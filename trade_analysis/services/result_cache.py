@@ -0,0 +1,241 @@
+"""
+派生结果缓存
+
+清洗后的交易记录、FIFO 配对结果、每日资产曲线、绩效指标、生成的报告等派生结果
+按 (名称, 参数, 数据版本) 存放在磁盘上。数据版本由 DatabaseManager 的写入方法维护
+（get_data_version），每个结果只登记它依赖的表：
+写入 daily_prices 不会使只依赖 trade_records 的结果失效，反之亦然。
+数据版本还包含数据库路径和建库时生成的数据库标识，写入次数相同的不同数据库不会共用结果。
+
+缓存文件布局:
+    <cache_dir>/<名称>/<参数哈希>.<版本哈希>.pkl     对象结果（pickle）
+    <cache_dir>/<名称>/<参数哈希>.<版本哈希>/        文件结果（如报告），附 manifest.pkl
+
+同一参数的旧版本在写入新版本时删除，缓存目录大小与参数组合数成正比。
+
+使用方法:
+    cache = ResultCache('data/cache', db)
+    df = cache.get_or_compute('trade_records', {}, db.get_all_trade_records)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from ..db.database import VERSIONED_TABLES
+from ..utils.profiler import PROFILER, file_nbytes
+
+logger = logging.getLogger(__name__)
+
+# 派生结果的计算逻辑变化时递增，使旧缓存全部失效
+RESULT_CACHE_VERSION = 1
+
+MANIFEST_NAME = 'manifest.pkl'
+
+
+def _digest(value: Any) -> str:
+    """
+    参数的稳定哈希（dict 按键排序，不可序列化的值按 str 处理）
+    """
+    text = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _version_key(db, depends: Sequence[str]) -> str:
+    """
+    数据版本哈希：数据库路径、数据库标识和依赖表的版本号
+    """
+    return _digest({
+        'db_path': str(Path(db.db_path).resolve()),
+        'database_id': db.get_database_id(),
+        'versions': db.get_data_version(list(depends)),
+    })
+
+
+class ResultCache:
+    """
+    以数据版本为键的派生结果缓存
+
+    Args:
+        cache_dir: 缓存目录
+        db: DatabaseManager，提供 get_data_version
+
+    Attributes:
+        hits: 命中次数
+        misses: 未命中（重新计算）次数
+    """
+
+    def __init__(self, cache_dir: str, db):
+        self.cache_dir = Path(cache_dir)
+        self.db = db
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, artefact: str, params: Dict[str, Any], depends: Sequence[str]) -> Tuple[str, str]:
+        """
+        (参数哈希, 版本哈希)
+        """
+        return _digest([RESULT_CACHE_VERSION, artefact, params]), _version_key(self.db, depends)
+
+    def _prune(self, directory: Path, params_key: str, keep: str) -> None:
+        """
+        删除同一参数的其它版本
+        """
+        for path in directory.glob(f'{params_key}.*'):
+            if path.name.startswith(keep):
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+    def get_or_compute(
+        self,
+        artefact: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        depends: Sequence[str] = ('trade_records',)
+    ) -> Any:
+        """
+        读取缓存结果，不存在或数据版本已变化时计算并写入
+
+        Args:
+            artefact: 结果名称
+            params: 影响结果的参数（需可 JSON 序列化或可 str）
+            compute: 计算函数，返回值需可 pickle
+            depends: 结果依赖的表，见 VERSIONED_TABLES
+
+        Returns:
+            结果对象
+        """
+        params_key, version_key = self._key(artefact, params, depends)
+        directory = self.cache_dir / artefact
+        path = directory / f'{params_key}.{version_key}.pkl'
+
+        if path.exists():
+            try:
+                with PROFILER.span('cache.read', file_nbytes(path)), open(path, 'rb') as f:
+                    value = pickle.load(f)
+                self.hits += 1
+                logger.info(f"使用缓存结果 {artefact}")
+                return value
+            except Exception as e:
+                logger.warning(f"读取缓存 {path} 失败，重新计算: {e}")
+
+        self.misses += 1
+        value = compute()
+
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再替换，中断时不会留下不完整的缓存
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with PROFILER.span('cache.write') as span, os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                span.add_bytes(f.tell())
+            os.replace(tmp, path)
+            self._prune(directory, params_key, keep=f'{params_key}.{version_key}.pkl')
+        except Exception as e:
+            logger.warning(f"写入缓存 {artefact} 失败: {e}")
+
+        return value
+
+    def get_or_render(
+        self,
+        artefact: str,
+        params: Dict[str, Any],
+        render: Callable[[Path], Dict[str, str]],
+        depends: Sequence[str] = VERSIONED_TABLES
+    ) -> Dict[str, str]:
+        """
+        文件类结果（报告等）：render 把文件写入给定目录并返回 {名称: 路径}
+
+        Returns:
+            {名称: 缓存目录中的文件路径}
+        """
+        params_key, version_key = self._key(artefact, params, depends)
+        directory = self.cache_dir / artefact
+        target = directory / f'{params_key}.{version_key}'
+        manifest = target / MANIFEST_NAME
+
+        if manifest.exists():
+            try:
+                with open(manifest, 'rb') as f:
+                    names = pickle.load(f)
+                files = {name: str(target / filename) for name, filename in names.items()}
+                if all(Path(p).exists() for p in files.values()):
+                    self.hits += 1
+                    logger.info(f"使用缓存结果 {artefact}")
+                    return files
+            except Exception as e:
+                logger.warning(f"读取缓存 {manifest} 失败，重新生成: {e}")
+
+        self.misses += 1
+        directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=directory, suffix='.tmp'))
+        try:
+            produced = render(staging)
+            names = {name: Path(p).name for name, p in produced.items() if p}
+            with open(staging / MANIFEST_NAME, 'wb') as f:
+                pickle.dump(names, f)
+            if target.exists():
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._prune(directory, params_key, keep=f'{params_key}.{version_key}')
+        return {name: str(target / filename) for name, filename in names.items()}
+
+    def clear(self, artefact: Optional[str] = None) -> None:
+        """
+        删除缓存，artefact 为 None 时删除全部
+        """
+        path = self.cache_dir / artefact if artefact else self.cache_dir
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class MemoryResultCache:
+    """
+    进程内的派生结果缓存，接口与 ResultCache.get_or_compute 相同（供常驻服务使用）
+
+    每个 (名称, 参数) 只保留最新数据版本的一份结果，不写磁盘。
+
+    Attributes:
+        hits: 命中次数
+        misses: 未命中（重新计算）次数
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.hits = 0
+        self.misses = 0
+        self._values: Dict[Tuple[str, str], Tuple[str, Any]] = {}
+
+    def get_or_compute(
+        self,
+        artefact: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        depends: Sequence[str] = ('trade_records',)
+    ) -> Any:
+        key = (artefact, _digest([RESULT_CACHE_VERSION, artefact, params]))
+        version_key = _version_key(self.db, depends)
+        cached = self._values.get(key)
+        if cached is not None and cached[0] == version_key:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        value = compute()
+        self._values[key] = (version_key, value)
+        return value
+
+    def clear(self) -> None:
+        self._values.clear()
@@ -0,0 +1,148 @@
+"""
+聚合查询后端测试
+
+各后端的结果必须与 ProfitCalculator / PerformanceCalculator / AsOfPositionIndex 一致；
+未安装 duckdb 时只测试 pandas 后端。
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.db.analytics import HAS_DUCKDB, PandasAnalytics, open_analytics, export_parquet
+
+if HAS_DUCKDB:
+    import duckdb
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.models.asof_index import AsOfPositionIndex
+from trade_analysis.models.data_cleaner import DataCleaner
+from trade_analysis.models.performance import PerformanceCalculator
+from trade_analysis.models.profit_calculator import ProfitCalculator
+from trade_analysis.tools.settlement_generator import SyntheticConfig, generate_settlement, write_settlement
+
+
+
+def duckdb_reads_sqlite() -> bool:
+    """DuckDB 能否 ATTACH SQLite（离线且未预装 sqlite 扩展时不能）"""
+    if not HAS_DUCKDB:
+        return False
+    con = duckdb.connect()
+    try:
+        con.execute("ATTACH ':memory:' AS probe (TYPE sqlite)")
+        return True
+    except duckdb.Error:
+        return False
+    finally:
+        con.close()
+
+
+HAS_DUCKDB_SQLITE = duckdb_reads_sqlite()
+needs_duckdb_sqlite = pytest.mark.skipif(not HAS_DUCKDB_SQLITE, reason='未安装 duckdb 或无法加载 sqlite 扩展')
+
+ENGINES = ['pandas', pytest.param('duckdb', marks=needs_duckdb_sqlite)]
+
+
+@pytest.fixture(scope='module')
+def database(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp('analytics')
+    path = write_settlement(generate_settlement(SyntheticConfig(records=2000, securities=15, seed=3)), str(tmp / 'synthetic.xls'))
+    cleaner = DataCleaner(path)
+    cleaner.load_data()
+    db = DatabaseManager(str(tmp / 'trade.db'))
+    db.insert_trade_records(cleaner.clean())
+    return db
+
+
+@pytest.fixture(scope='module')
+def records(database):
+    return database.get_all_trade_records()
+
+
+@pytest.fixture(params=ENGINES)
+def analytics(request, database):
+    with open_analytics(str(database.db_path), engine=request.param) as analytics:
+        yield analytics
+
+
+class TestAnalytics:
+    def test_overview(self, analytics, records):
+        overview = analytics.overview()
+        assert overview['records'] == len(records)
+        assert overview['first_date'] == records['date'].min()
+        assert overview['last_date'] == records['date'].max()
+        assert overview['buy_count'] == (records['trade_type'] == 'buy').sum()
+
+    def test_monthly_and_yearly_summary(self, analytics, records):
+        calculator = ProfitCalculator(records)
+        pd.testing.assert_frame_equal(analytics.monthly_summary(), calculator.get_monthly_summary(), check_dtype=False)
+        pd.testing.assert_frame_equal(analytics.yearly_summary(), calculator.get_yearly_summary(), check_dtype=False)
+
+    def test_positions(self, analytics, records):
+        index = AsOfPositionIndex(records)
+        middle = records['date'].iloc[len(records) // 2]
+        for as_of, expected in ((None, records['date'].max()), (middle.strftime('%Y%m%d'), middle)):
+            pd.testing.assert_frame_equal(analytics.positions(as_of), index.holdings_as_of(expected), check_dtype=False)
+
+    def test_performance(self, analytics, records):
+        calculator = PerformanceCalculator(records)
+        trade_results = calculator.get_trade_results_df()
+
+        pd.testing.assert_frame_equal(
+            analytics.monthly_performance(trade_results), calculator.get_monthly_performance(), check_dtype=False
+        )
+        expected = calculator.get_stock_performance().sort_values('证券代码').reset_index(drop=True)
+        actual = analytics.stock_performance(trade_results)
+        assert actual['总盈亏'].is_monotonic_decreasing
+        pd.testing.assert_frame_equal(actual.sort_values('证券代码').reset_index(drop=True), expected, check_dtype=False)
+
+    def test_price_coverage(self, database, records):
+        traded = records[records['trade_type'].isin(['buy', 'sell'])]
+        first, second = traded['security_code'].unique()[:2]
+        window = traded[traded['security_code'] == first]['date']
+        database.save_daily_prices([
+            {'date': d.strftime('%Y%m%d'), 'security_code': first, 'close_price': 10.0}
+            for d in pd.date_range(window.min(), window.max(), freq='D')
+        ] + [{'date': window.max().strftime('%Y%m%d'), 'security_code': second, 'close_price': 5.0}])
+
+        for engine in ['pandas'] + (['duckdb'] if HAS_DUCKDB_SQLITE else []):
+            with open_analytics(str(database.db_path), engine=engine) as analytics:
+                coverage = analytics.price_coverage().set_index('security_code')
+            assert coverage.loc[first, 'covered']
+            assert coverage.loc[first, 'price_days'] == (window.max() - window.min()).days + 1
+            assert coverage.loc[second, 'price_days'] == 1
+            assert coverage['price_days'].sum() == coverage.loc[[first, second], 'price_days'].sum()
+
+    def test_empty_trade_results(self, analytics):
+        assert analytics.stock_performance(pd.DataFrame()).empty
+
+
+class TestOpenAnalytics:
+    def test_engine_selection(self, database):
+        assert isinstance(open_analytics(str(database.db_path), engine='pandas'), PandasAnalytics)
+        # sqlite 扩展不可用时自动改用 pandas
+        assert open_analytics(str(database.db_path)).engine == ('duckdb' if HAS_DUCKDB_SQLITE else 'pandas')
+        with pytest.raises(ValueError):
+            open_analytics(str(database.db_path), engine='spark')
+
+    @pytest.mark.skipif(HAS_DUCKDB, reason='已安装 duckdb')
+    def test_duckdb_missing(self, database, tmp_path):
+        with pytest.raises(ImportError):
+            open_analytics(str(database.db_path), engine='duckdb')
+        with pytest.raises(ImportError):
+            export_parquet(str(database.db_path), str(tmp_path))
+
+    @pytest.mark.skipif(not HAS_DUCKDB or HAS_DUCKDB_SQLITE, reason='需要安装 duckdb 且 sqlite 扩展不可用')
+    def test_explicit_duckdb_without_sqlite_extension(self, database):
+        with pytest.raises(duckdb.Error):
+            open_analytics(str(database.db_path), engine='duckdb')
+
+    @needs_duckdb_sqlite
+    def test_parquet_snapshot(self, database, tmp_path):
+        export_parquet(str(database.db_path), str(tmp_path))
+        with open_analytics(parquet_dir=str(tmp_path)) as snapshot, open_analytics(str(database.db_path)) as live:
+            pd.testing.assert_frame_equal(snapshot.monthly_summary(), live.monthly_summary())
+            pd.testing.assert_frame_equal(snapshot.positions(), live.positions())
@@ -0,0 +1,74 @@
+"""
+TradeAnalyzer 测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.services.analyzer import TradeAnalyzer, AnalysisConfig
+from trade_analysis.services.price_fetcher import PriceFetcher, DataSourceConfig
+
+
+def make_records() -> pd.DataFrame:
+    """买入 1000 股、红股入账 200 股、卖出 500 股"""
+    rows = [
+        ('2024-01-02', 'buy', 10.0, 1000, -10005.0),
+        ('2024-03-01', 'stock_dividend', 0.0, 200, 0.0),
+        ('2024-04-01', 'sell', 12.0, 500, 5990.0),
+    ]
+    return pd.DataFrame([{
+        'date': pd.Timestamp(date), 'security_code': '600519', 'security_name': '贵州茅台',
+        'business_type': trade_type, 'trade_type': trade_type, 'price': price, 'quantity': quantity,
+        'amount': price * quantity, 'commission': 5.0, 'stamp_tax': 0.0, 'transfer_fee': 0.0,
+        'clearing_fee': 0.0, 'net_amount': net_amount, 'balance': 0.0, 'position': 0,
+        'trade_id': str(i), 'total_fee': 5.0,
+    } for i, (date, trade_type, price, quantity, net_amount) in enumerate(rows)])
+
+
+class TestStockStats:
+    def test_summary_path_matches_row_path(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        db.insert_trade_records(make_records())
+        df = db.get_all_trade_records()
+        summary = db.get_security_summary('600519')
+
+        for include_dividend, position in ((True, 700), (False, 500)):
+            config = AnalysisConfig(mode='stock', stock_code='600519', include_dividend=include_dividend)
+            fast = TradeAnalyzer.from_dataframe(df, config, security_summary=summary)
+            slow = TradeAnalyzer.from_dataframe(df, config)
+            filtered = fast._apply_filters()
+
+            fast_stats = fast._calculate_stock_stats(filtered)
+            slow_stats = slow._calculate_stock_stats(filtered)
+            assert fast_stats['current_position'] == slow_stats['current_position'] == position
+            assert fast_stats['total_dividend_quantity'] == slow_stats['total_dividend_quantity']
+
+
+class TestInjectedSources:
+    def test_benchmark_close_and_offline_fetcher(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        db.insert_trade_records(make_records())
+        df = db.get_all_trade_records()
+        before = db.get_data_version()
+
+        dates = pd.bdate_range('2023-12-01', '2024-05-31')
+        index_close = pd.Series(3500.0 + np.arange(len(dates)), index=dates)
+        fetcher = PriceFetcher(DataSourceConfig.disabled())
+        config = AnalysisConfig(benchmark_code='000300', bootstrap_resamples=0, manual_prices={'600519': 11.0})
+
+        result = TradeAnalyzer.from_dataframe(
+            df, config, db=db, price_fetcher=fetcher, benchmark_close=index_close
+        ).run_analysis()
+        assert result.benchmark is not None
+        assert result.positions['600519']['close_price'] == 11.0
+
+        # 没有缓存、没有可用数据源时跳过基准对比，不写 daily_prices
+        result = TradeAnalyzer.from_dataframe(df, config, db=db, price_fetcher=fetcher).run_analysis()
+        assert result.benchmark is None
+        assert db.get_data_version() == before
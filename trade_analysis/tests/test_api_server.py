@@ -0,0 +1,214 @@
+"""
+本地只读分析服务测试
+
+HTTP 接口返回与分析结果一致的 JSON；数据库变化后按数据版本刷新：
+新增交易记录增量读取，只有行情变化时 FIFO、资产曲线取自进程内缓存。
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.models.data_cleaner import DataCleaner
+from trade_analysis.services.analyzer import AnalysisConfig
+from trade_analysis.services.api_server import AnalysisService, make_server
+from trade_analysis.services.result_cache import MemoryResultCache
+from trade_analysis.tools.settlement_generator import SyntheticConfig, generate_settlement, write_settlement
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = write_settlement(generate_settlement(SyntheticConfig(records=1500, securities=10, seed=5)), str(tmp_path / 'synthetic.xls'))
+    cleaner = DataCleaner(path)
+    cleaner.load_data()
+    db = DatabaseManager(str(tmp_path / 'trade.db'))
+    db.insert_trade_records(cleaner.clean())
+    return str(db.db_path)
+
+
+@pytest.fixture
+def service(db_path):
+    return AnalysisService(db_path, refresh_interval=0)
+
+
+@pytest.fixture
+def server(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def get(base: str, path: str):
+    try:
+        with urllib.request.urlopen(base + path, timeout=30) as response:
+            return response.status, json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read().decode('utf-8'))
+
+
+def append_buy(db_path: str, days: int = 1) -> pd.Series:
+    """在最后一个交易日之后追加一笔已有证券的买入"""
+    db = DatabaseManager(db_path)
+    records = db.get_all_trade_records()
+    row = records[records['trade_type'] == 'buy'].tail(1).drop(columns='id').copy()
+    row['date'] = records['date'].max() + pd.Timedelta(days=days)
+    row['trade_id'] = f'new{days}'
+    db.insert_trade_records(row)
+    return row.iloc[0]
+
+
+class TestEndpoints:
+    def test_health_and_summary(self, server, service):
+        status, health = get(server, '/health')
+        assert status == 200
+        assert health['records'] == len(service.state().records)
+        assert set(health['versions']) >= {'trade_records', 'daily_prices'}
+
+        status, summary = get(server, '/summary')
+        assert status == 200
+        result = service.state().result
+        assert summary['summary']['total_records'] == result.summary['total_records']
+        assert summary['performance']['total_trades'] == result.performance_metrics.total_trades
+
+    def test_positions(self, server, service):
+        state = service.state()
+        status, current = get(server, '/positions')
+        assert status == 200
+        assert {p['security_code'] for p in current['positions']} == set(state.result.positions)
+
+        middle = state.records['date'].iloc[len(state.records) // 2]
+        status, as_of = get(server, f"/positions?date={middle:%Y%m%d}")
+        assert status == 200
+        assert as_of['date'] == f"{middle:%Y-%m-%d}"
+        expected = state.index.holdings_as_of(middle)
+        assert [p['security_code'] for p in as_of['positions']] == expected['security_code'].tolist()
+        assert [p['quantity'] for p in as_of['positions']] == expected['quantity'].tolist()
+
+        assert get(server, '/positions?date=notadate')[0] == 400
+
+    def test_stocks(self, server, service):
+        result = service.state().result
+        status, stocks = get(server, '/stocks')
+        assert status == 200
+        assert len(stocks) == len(result.stock_performance)
+
+        code = result.stock_performance['证券代码'].iloc[0]
+        status, stock = get(server, f'/stocks/{code}')
+        assert status == 200
+        assert stock['performance']['证券代码'] == code
+        assert len(stock['trades']) == (result.trade_results['证券代码'] == code).sum()
+
+        assert get(server, '/stocks/999999')[0] == 404
+
+    def test_nav_and_monthly(self, server, service):
+        result = service.state().result
+        status, nav = get(server, '/nav')
+        assert status == 200
+        assert len(nav) == len(result.daily_assets)
+        assert nav[-1]['total_assets'] == pytest.approx(result.daily_assets['total_assets'].iloc[-1])
+
+        start, end = result.daily_assets['date'].iloc[[10, 20]]
+        status, window = get(server, f"/nav?start={start:%Y%m%d}&end={end:%Y%m%d}")
+        assert [row['date'] for row in window] == [f"{d:%Y-%m-%d}" for d in result.daily_assets['date'].iloc[10:21]]
+
+        status, monthly = get(server, '/monthly')
+        assert status == 200
+        assert len(monthly) == len(result.monthly_performance)
+
+    def test_unknown_path(self, server):
+        assert get(server, '/trades')[0] == 404
+
+
+class TestRefresh:
+    def test_appended_records_are_loaded_incrementally(self, service, db_path):
+        before = service.state()
+        row = append_buy(db_path)
+
+        state = service.state()
+        assert state is not before
+        assert len(state.records) == len(before.records) + 1
+        assert state.records['date'].iloc[-1] == row['date']
+        expected = DatabaseManager(db_path).get_all_trade_records()
+        assert state.records['id'].tolist() == expected['id'].tolist()
+        assert state.records['amount'].tolist() == expected['amount'].tolist()
+        assert state.result.summary['total_records'] == len(expected)
+
+    def test_deleted_records_trigger_full_reload(self, service, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute('DELETE FROM trade_records WHERE id = (SELECT MAX(id) FROM trade_records)')
+        conn.commit()
+        conn.close()
+        append_buy(db_path)
+
+        state = service.state()
+        expected = DatabaseManager(db_path).get_all_trade_records()
+        assert state.records['id'].tolist() == expected['id'].tolist()
+
+    def test_updated_rows_trigger_full_reload(self, service, db_path):
+        before = service.state()
+        first_id = int(before.records['id'].iloc[0])
+        # 原地更新一条旧记录（数据版本加一），随后追加一条新记录
+        conn = sqlite3.connect(db_path)
+        conn.execute('UPDATE trade_records SET amount = amount + 1 WHERE id = ?', (first_id,))
+        conn.execute("UPDATE data_version SET version = version + 1 WHERE name = 'trade_records'")
+        conn.commit()
+        conn.close()
+        append_buy(db_path)
+
+        state = service.state()
+        expected = DatabaseManager(db_path).get_all_trade_records()
+        assert len(state.records) == len(before.records) + 1
+        assert state.records['amount'].tolist() == expected['amount'].tolist()
+        assert state.records['amount'].iloc[0] == before.records['amount'].iloc[0] + 1
+
+    def test_price_change_reuses_cached_analysis(self, service, db_path):
+        before = service.state()
+        code = next(iter(before.result.positions))
+        hits = service.cache.hits
+
+        DatabaseManager(db_path).save_daily_prices([
+            {'date': before.records['date'].max().strftime('%Y%m%d'), 'security_code': code, 'close_price': 12.34}
+        ])
+        state = service.state()
+        assert state.records is before.records
+        assert state.result.positions[code]['close_price'] == 12.34
+        assert service.cache.hits == hits + 2
+
+    def test_no_data_source_or_writes(self, db_path):
+        service = AnalysisService(db_path, config=AnalysisConfig(bootstrap_resamples=0, benchmark_code='000300'))
+        assert service.price_fetcher.get_available_sources() == []
+        assert service.state().result.benchmark is None
+        assert service.db.get_data_version()['daily_prices'] == 0
+
+    def test_unchanged_version_keeps_state(self, service):
+        before = service.state()
+        assert service.refresh() is before
+        assert service.refreshes == 1
+
+
+class TestMemoryResultCache:
+    def test_version_invalidation(self, db_path):
+        cache = MemoryResultCache(DatabaseManager(db_path))
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+
+        assert cache.get_or_compute('x', {'a': 1}, compute) == 1
+        assert cache.get_or_compute('x', {'a': 1}, compute) == 1
+        assert cache.get_or_compute('x', {'a': 2}, compute) == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        append_buy(db_path)
+        assert cache.get_or_compute('x', {'a': 1}, compute) == 3
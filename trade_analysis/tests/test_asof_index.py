@@ -0,0 +1,72 @@
+"""
+按日期持仓索引测试
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.asof_index import AsOfPositionIndex
+from trade_analysis.models.profit_calculator import ProfitCalculator
+
+
+@pytest.fixture
+def records():
+    rows = [
+        ('2024-01-02', '600000', '浦发银行', 'buy', 100, 1000.0, 5.0),
+        ('2024-01-03', '000001', '平安银行', 'buy', 200, 2000.0, 5.0),
+        ('2024-01-05', '600000', '浦发银行', 'buy', 100, 1200.0, 5.0),
+        ('2024-01-08', '600000', '浦发银行', 'sell', 150, 1950.0, 10.0),
+        ('2024-01-09', '000001', '平安银行', 'sell', 200, 2100.0, 10.0),
+        ('2024-01-10', '600000', '浦发银行', 'stock_dividend', 10, 0.0, 0.0),
+        ('2024-01-10', '', '', 'transfer_in', 0, 10000.0, 0.0),
+    ]
+    df = pd.DataFrame(rows, columns=['date', 'security_code', 'security_name', 'trade_type', 'quantity', 'amount', 'total_fee'])
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+class TestAsOfPositionIndex:
+    """按日期持仓索引测试"""
+
+    def test_positions_as_of(self, records):
+        index = AsOfPositionIndex(records)
+
+        assert index.positions_as_of('20240101') == {}
+        assert set(index.positions_as_of('20240104')) == {'600000', '000001'}
+
+        position = index.positions_as_of('2024-01-08')['600000']
+        assert position['quantity'] == 50
+        assert position['cost_price'] == pytest.approx((1000 + 1200 - 1950 + 20) / 50)
+
+        # 平安银行已清仓，红股只增加股数
+        final = index.positions_as_of('2024-12-31')
+        assert list(final) == ['600000']
+        assert final['600000']['quantity'] == 60
+        assert final['600000']['cost_price'] == pytest.approx(270 / 60)
+
+    def test_position_of(self, records):
+        index = AsOfPositionIndex(records)
+
+        assert index.position_of('600000', '2024-01-04') == {'quantity': 100, 'cost_price': pytest.approx(10.05)}
+        assert index.position_of('600000', '2024-01-01')['quantity'] == 0
+        assert index.position_of('999999', '2024-01-04')['quantity'] == 0
+
+    def test_matches_truncated_records(self, records):
+        index = AsOfPositionIndex(records)
+
+        for date in records['date'].unique():
+            expected = ProfitCalculator(records[records['date'] <= date])._calculate_positions()
+            assert index.positions_as_of(date) == expected
+            assert index.holdings_as_of(date)['quantity'].sum() == sum(p['quantity'] for p in expected.values())
+
+    def test_holdings_history(self, records):
+        history = AsOfPositionIndex(records).holdings_history(['2024-01-03', '2024-01-09'])
+
+        assert history.groupby('date').size().tolist() == [2, 1]
+        closed = AsOfPositionIndex(records).holdings_as_of('2024-01-09', include_closed=True)
+        assert closed.set_index('security_code').loc['000001', 'quantity'] == 0
@@ -0,0 +1,105 @@
+"""
+盈亏归因测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.attribution import PnLAttribution, board_of, CASH_CODE
+
+
+def make_records(rows) -> pd.DataFrame:
+    """rows: (date, code, trade_type, price, quantity, amount, net_amount)"""
+    df = pd.DataFrame(rows, columns=['date', 'security_code', 'trade_type', 'price', 'quantity', 'amount', 'net_amount'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['security_name'] = df['security_code']
+    df['total_fee'] = (df['net_amount'].abs() - df['amount']).abs()
+    return df
+
+
+@pytest.fixture
+def records():
+    return make_records([
+        ('2024-01-02', '600000', 'buy', 10.0, 100, 1000.0, -1005.0),
+        ('2024-01-03', '600000', 'buy', 12.0, 100, 1200.0, -1205.0),
+        ('2024-01-04', '600000', 'sell', 13.0, 150, 1950.0, 1940.0),
+        ('2024-01-04', '131810', 'repo_lend', 2.0, 10, 1000.0, -1000.1),
+        ('2024-01-05', '131810', 'repo_return', 2.0, 10, 1000.5, 1000.5),
+        ('2024-02-01', '600000', 'dividend', 0.0, 0, 20.0, 20.0),
+        ('2024-02-02', '600000', 'sell', 14.0, 20, 280.0, 278.0),
+        ('2024-03-20', '', 'interest', 0.0, 0, 0.0, 3.0),
+    ])
+
+
+class TestAttribution:
+    """盈亏归因测试"""
+
+    def test_components(self, records):
+        cube = PnLAttribution(records).calculate()
+        totals = cube.by_component()
+
+        # 平均成本 11：150 股卖出 13 元，20 股卖出 14 元
+        assert totals['realized'] == pytest.approx(150 * 2 + 20 * 3)
+        # 剩余 30 股按最后成交价 14 元，成本 11 元
+        assert totals['unrealized'] == pytest.approx(30 * 3)
+        assert totals['dividend'] == pytest.approx(20.0)
+        assert totals['fee'] == pytest.approx(-5 - 5 - 10 - 0.1 - 2)
+        assert totals['repo'] == pytest.approx(0.5)
+        assert totals['interest'] == pytest.approx(3.0)
+
+    def test_total_reconciles_with_cash_flows(self, records):
+        cube = PnLAttribution(records).calculate()
+
+        # 盈亏合计 = 净发生额合计 + 期末市值（逆回购已到期）
+        assert cube.total() == pytest.approx(records['net_amount'].sum() + 30 * 14)
+
+    def test_daily_unrealized_marks_to_price(self, records):
+        cube = PnLAttribution(records).calculate()
+        daily = cube.by_date()
+
+        assert daily.loc['2024-01-02', 'unrealized'] == pytest.approx(0.0)
+        # 第二天成交价 12 元，第一笔 100 股浮盈 200 元
+        assert daily.loc['2024-01-03', 'unrealized'] == pytest.approx(200.0)
+
+    def test_external_prices(self, records):
+        prices = pd.DataFrame({'600000': [15.0]}, index=pd.to_datetime(['2024-02-02']))
+        cube = PnLAttribution(records, prices=prices).calculate()
+
+        assert cube.by_component()['unrealized'] == pytest.approx(30 * 4)
+
+    def test_rollups_are_consistent(self, records):
+        cube = PnLAttribution(records).calculate()
+
+        monthly = cube.by_date('M')
+        assert monthly.index.tolist() == ['2024-01', '2024-02', '2024-03']
+        assert monthly['total'].sum() == pytest.approx(cube.total())
+
+        by_security = cube.by_security().set_index('security_code')
+        assert by_security.loc[CASH_CODE, 'interest'] == pytest.approx(3.0)
+        assert by_security['total'].sum() == pytest.approx(cube.total())
+
+        boards = cube.by_group()
+        assert set(boards.index) == {'沪市主板', '逆回购', '现金'}
+        assert boards['total'].sum() == pytest.approx(cube.total())
+
+        yearly = cube.by_group({'600000': '银行'}, freq='Y')
+        assert yearly.loc[('2024', '银行'), 'realized'] == pytest.approx(360.0)
+
+    def test_to_frame(self, records):
+        long = PnLAttribution(records).calculate().to_frame()
+
+        assert set(long.columns) == {'date', 'security_code', 'component', 'pnl'}
+        assert (long['pnl'] != 0).all()
+
+    def test_board_of(self):
+        assert board_of('688111') == '科创板'
+        assert board_of('300750') == '创业板'
+        assert board_of('000001') == '深市主板'
+        assert board_of('131811') == '逆回购'
+        assert board_of('518880') == '基金'
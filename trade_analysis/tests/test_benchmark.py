@@ -0,0 +1,87 @@
+"""
+基准对比分析测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.benchmark import (
+    align_returns, benchmark_metrics, rolling_benchmark_metrics, compare_with_benchmark
+)
+
+
+def make_series(returns, start=100.0) -> pd.Series:
+    values = start * np.cumprod(np.concatenate([[1.0], 1 + np.asarray(returns)]))
+    return pd.Series(values, index=pd.bdate_range('2024-01-01', periods=len(values)))
+
+
+class TestBenchmark:
+    """基准对比分析测试"""
+
+    def test_linear_portfolio(self):
+        rng = np.random.default_rng(0)
+        bench_returns = rng.normal(0.0005, 0.01, 300)
+        port_returns = 0.0002 + 1.5 * bench_returns
+
+        returns = align_returns(make_series(port_returns), make_series(bench_returns, 4000))
+        metrics = benchmark_metrics(returns, risk_free_rate=0.0)
+
+        assert metrics['beta'] == pytest.approx(1.5)
+        assert metrics['correlation'] == pytest.approx(1.0)
+        assert metrics['alpha'] == pytest.approx(0.0002 * 252 * 100)
+
+    def test_capture_ratios(self):
+        bench = np.array([0.01, -0.02, 0.03, -0.01])
+        port = np.array([0.02, -0.01, 0.03, -0.02])
+
+        metrics = benchmark_metrics(align_returns(make_series(port), make_series(bench)))
+
+        assert metrics['up_capture'] == pytest.approx(0.025 / 0.02 * 100)
+        assert metrics['down_capture'] == pytest.approx(0.015 / 0.015 * 100)
+
+    def test_tracking_error_matches_pandas(self):
+        rng = np.random.default_rng(1)
+        bench = rng.normal(0, 0.01, 200)
+        port = rng.normal(0.001, 0.015, 200)
+
+        metrics = benchmark_metrics(align_returns(make_series(port), make_series(bench)))
+        diff = pd.Series(port - bench)
+
+        assert metrics['tracking_error'] == pytest.approx(diff.std(ddof=0) * np.sqrt(252) * 100)
+        assert metrics['information_ratio'] == pytest.approx(diff.mean() / diff.std(ddof=0) * np.sqrt(252))
+
+    def test_rolling_matches_window_slice(self):
+        rng = np.random.default_rng(2)
+        returns = align_returns(make_series(rng.normal(0, 0.02, 120)), make_series(rng.normal(0, 0.01, 120)))
+
+        rolling = rolling_benchmark_metrics(returns, windows=(20,))
+        expected = benchmark_metrics(returns.iloc[-20:])
+
+        assert rolling['beta_20'].iloc[:20].isna().all()
+        for metric in ['alpha', 'beta', 'tracking_error', 'up_capture']:
+            assert rolling[f'{metric}_20'].iloc[-1] == pytest.approx(expected[metric])
+
+    def test_benchmark_forward_filled_on_missing_dates(self):
+        equity = make_series([0.01, 0.02, -0.01])
+        index_close = pd.Series([10.0, 11.0, 12.1], index=equity.index[[0, 1, 3]])
+
+        returns = align_returns(equity, index_close)
+
+        assert returns['benchmark'].iloc[2] == 0.0
+        assert returns['benchmark'].iloc[3] == pytest.approx(0.1)
+
+    def test_compare_with_benchmark(self):
+        rng = np.random.default_rng(3)
+        result = compare_with_benchmark(make_series(rng.normal(0, 0.01, 80)),
+                                        make_series(rng.normal(0, 0.01, 80)),
+                                        code='000905', windows=(20, 60))
+
+        assert result.name == '中证500'
+        assert 'information_ratio_60' in result.rolling.columns
+        assert len(result.rolling) == 81
@@ -0,0 +1,84 @@
+"""
+自助法置信区间测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.bootstrap import (
+    resample_indices, trade_metrics, return_metrics, bootstrap_performance
+)
+
+
+class TestBootstrap:
+    """自助法置信区间测试"""
+
+    def test_trade_metrics_point_estimate(self):
+        profits = np.array([100.0, -50.0, 200.0, -25.0, 0.0])
+        metrics = trade_metrics(profits)
+
+        assert metrics['win_rate'][0] == pytest.approx(40.0)
+        assert metrics['profit_loss_ratio'][0] == pytest.approx(150 / 37.5)
+        assert metrics['total_profit'][0] == pytest.approx(225.0)
+
+    def test_trade_metrics_without_losses(self):
+        metrics = trade_metrics(np.array([[10.0, 20.0], [-5.0, 5.0]]))
+        assert metrics['profit_loss_ratio'].tolist() == [0.0, 1.0]
+
+    def test_block_resample_is_contiguous(self):
+        idx = resample_indices(100, 50, np.random.default_rng(0), block_size=10)
+
+        assert idx.shape == (50, 100)
+        assert idx.min() >= 0 and idx.max() < 100
+        blocks = idx.reshape(50, 10, 10)
+        assert (np.diff(blocks, axis=2) == 1).all()
+
+    def test_return_metrics_ruin(self):
+        path = np.array([[0.1, -0.6, 0.05], [0.01, 0.01, 0.01]])
+        metrics = return_metrics(path, ruin_level=0.5)
+
+        assert metrics['ruined'].tolist() == [True, False]
+        assert metrics['final_loss'].tolist() == [True, False]
+        assert metrics['max_drawdown'][0] == pytest.approx(60.0)
+
+    def test_seeded_result_is_reproducible(self):
+        rng = np.random.default_rng(1)
+        profits = rng.normal(10, 100, 300)
+        returns = rng.normal(0.0005, 0.01, 500)
+
+        first = bootstrap_performance(profits, returns, n_resamples=500, seed=7)
+        second = bootstrap_performance(profits, returns, n_resamples=500, seed=7)
+
+        assert first.intervals.equals(second.intervals)
+        assert first.ruin == second.ruin
+
+    def test_interval_covers_estimate(self):
+        rng = np.random.default_rng(2)
+        profits = rng.normal(10, 100, 300)
+        returns = rng.normal(0.0005, 0.01, 500)
+
+        result = bootstrap_performance(profits, returns, n_resamples=1000, seed=0)
+        intervals = result.intervals.set_index('metric')
+
+        for metric in ['win_rate', 'profit_loss_ratio', 'avg_profit', 'sharpe_ratio']:
+            row = intervals.loc[metric]
+            assert row['lower'] <= row['estimate'] <= row['upper']
+        assert 0 <= result.ruin['ruin_probability'] <= 100
+
+    def test_process_pool_splits_resamples(self):
+        rng = np.random.default_rng(3)
+        result = bootstrap_performance(rng.normal(0, 1, 50), rng.normal(0, 0.01, 60),
+                                       n_resamples=301, seed=0, max_workers=2)
+
+        assert result.n_resamples == 301
+        assert len(result.intervals) == 7
+
+    def test_empty_input(self):
+        result = bootstrap_performance(np.array([]), np.array([]), n_resamples=10)
+        assert result.intervals.empty
+        assert result.ruin == {}
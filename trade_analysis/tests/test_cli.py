@@ -0,0 +1,129 @@
+"""
+非交互命令行测试
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.cli import build_jobs, build_parser, main, offline_price_fetcher, parse_manual_prices
+from trade_analysis.db.database import DatabaseManager
+
+
+def make_records() -> pd.DataFrame:
+    rows = [
+        ('2024-01-02', '600000', '浦发银行', 'buy', 10.0, 1000),
+        ('2024-01-10', '600000', '浦发银行', 'sell', 11.0, 1000),
+        ('2024-01-03', '000001', '平安银行', 'buy', 12.0, 500),
+        ('2024-02-01', '000001', '平安银行', 'sell', 11.5, 200),
+    ]
+    df = pd.DataFrame(rows, columns=['date', 'security_code', 'security_name', 'trade_type', 'price', 'quantity'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['amount'] = df['price'] * df['quantity']
+    df['net_amount'] = df['amount'].where(df['trade_type'] == 'sell', -df['amount'])
+    df['balance'] = 100000.0 + df['net_amount'].cumsum()
+    df['trade_id'] = [str(i) for i in range(len(df))]
+    return df
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'trade.db')
+    DatabaseManager(path).insert_trade_records(make_records())
+    return path
+
+
+class TestArguments:
+    def test_defaults(self):
+        args = build_parser().parse_args(['analyze'])
+        assert args.mode == 'all'
+        assert args.report == 'xlsx,html'
+        assert args.bootstrap == 0
+
+    def test_manual_prices(self):
+        assert parse_manual_prices(['600000=10.5', '1=2']) == {'600000': 10.5, '000001': 2.0}
+        with pytest.raises(ValueError):
+            parse_manual_prices(['600000'])
+
+
+class TestAnalyze:
+    def test_stock_fan_out(self, db_path, tmp_path):
+        output = tmp_path / 'out'
+        code = main([
+            'analyze', '--db', db_path, '--mode', 'stock', '--offline', '--no-cache',
+            '--report', 'html', '--workers', '1', '--output', str(output),
+        ])
+        assert code == 0
+
+        summary = pd.read_csv(output / 'batch_summary.csv', dtype={'security_code': str})
+        assert sorted(summary['security_code']) == ['000001', '600000']
+        assert summary['error'].isna().all()
+        assert (output / 'trade_report_600000.html').exists()
+        row = summary.set_index('security_code').loc['000001']
+        assert row['current_position'] == 300
+
+    def test_codes_and_unknown_format(self, db_path, tmp_path):
+        output = tmp_path / 'out'
+        args = ['analyze', '--db', db_path, '--mode', 'stock', '--codes', '600000', '--offline', '--no-cache',
+                '--workers', '1', '--output', str(output)]
+        assert main(args + ['--report', 'html']) == 0
+        assert len(pd.read_csv(output / 'batch_summary.csv')) == 1
+        assert main(args + ['--report', 'pdf']) == 2
+
+    def test_missing_database(self, tmp_path):
+        assert main(['analyze', '--db', str(tmp_path / 'missing.db')]) == 2
+
+    def test_process_pool_matches_serial(self, db_path, tmp_path):
+        summaries = {}
+        for workers in (1, 2):
+            output = tmp_path / f'out{workers}'
+            assert main([
+                'analyze', '--db', db_path, '--mode', 'stock', '--offline', '--no-cache',
+                '--report', 'html', '--workers', str(workers), '--output', str(output),
+            ]) == 0
+            summary = pd.read_csv(output / 'batch_summary.csv', dtype={'security_code': str})
+            summaries[workers] = summary.drop(columns=['seconds', 'files'])
+            assert (output / 'trade_report_000001.html').exists()
+        pd.testing.assert_frame_equal(summaries[1], summaries[2])
+
+    def test_cache_dir_follows_database(self, db_path, tmp_path):
+        output = tmp_path / 'out'
+        assert main(['analyze', '--db', db_path, '--offline', '--report', 'html',
+                     '--workers', '1', '--output', str(output)]) == 0
+        assert any((Path(db_path).parent / 'cache').iterdir())
+
+
+class TestBuildJobs:
+    def test_benchmark_resolved_once_without_writes(self, db_path):
+        db = DatabaseManager(db_path)
+        db.save_daily_prices([
+            {'date': d.strftime('%Y%m%d'), 'security_code': 'sh000300', 'close_price': 3500.0 + i}
+            for i, d in enumerate(pd.bdate_range('2023-12-25', '2024-02-08'))
+        ])
+        df = db.get_all_trade_records()
+        before = db.get_data_version()
+
+        args = build_parser().parse_args(['analyze', '--db', db_path, '--mode', 'stock', '--offline',
+                                          '--benchmark', '000300'])
+        jobs = build_jobs(args, df, db)
+        assert len(jobs) == 2
+        assert all(job.config.benchmark_code == '000300' for job in jobs)
+        assert jobs[0].benchmark_close is jobs[1].benchmark_close
+        assert jobs[0].benchmark_close.index.min() <= df['date'].min()
+        assert db.get_data_version() == before
+
+    def test_missing_benchmark_is_skipped_offline(self, db_path):
+        db = DatabaseManager(db_path)
+        args = build_parser().parse_args(['analyze', '--db', db_path, '--offline', '--benchmark', '000300'])
+        job, = build_jobs(args, db.get_all_trade_records(), db)
+        assert job.benchmark_close is None
+        assert job.config.benchmark_code is None
+
+    def test_jobs_use_offline_fetcher(self):
+        fetcher = offline_price_fetcher()
+        assert fetcher is offline_price_fetcher()
+        assert fetcher.get_available_sources() == []
@@ -0,0 +1,125 @@
+"""
+反事实分析测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.counterfactual import (
+    CounterfactualEngine, HoldLonger, MaxHolding, DelayEntry, SkipSmallTrades,
+    StopLoss, TakeProfit, build_price_matrix
+)
+
+
+@pytest.fixture
+def engine():
+    dates = pd.bdate_range('2024-01-01', periods=10)
+    prices = pd.DataFrame({
+        'A': [10, 11, 12, 9, 13, 14, 15, 16, 17, 18],
+        'B': [50, 50, 48, 45, 40, 42, 44, 46, 48, 50],
+    }, index=dates, dtype=float)
+    trades = pd.DataFrame({
+        'code': ['A', 'B', 'A'],
+        'buy_date': [dates[0], dates[1], dates[5]],
+        'sell_date': [dates[2], dates[6], dates[6]],
+        'buy_price': [10.0, 50.0, 14.0],
+        'sell_price': [12.0, 44.0, 15.0],
+        'quantity': [1000, 100, 100],
+        'profit': [1990.0, -610.0, 95.0],
+    })
+    return CounterfactualEngine(trades, prices)
+
+
+class TestCounterfactual:
+    """反事实分析测试"""
+
+    def test_identity_matches_actual(self, engine):
+        result = engine.evaluate([])
+
+        assert result['trades'] == 3
+        assert result['total_profit'] == pytest.approx(1990 - 610 + 95)
+        assert result['win_rate'] == pytest.approx(200 / 3)
+
+    def test_hold_longer(self, engine):
+        result = engine.evaluate([HoldLonger(2)])
+        fee_a = 10 / (22 * 1000)
+
+        # A 第一笔改在第 5 个交易日按 13 元卖出
+        first = (13 - 10) * 1000 - fee_a * (10 + 13) * 1000
+        assert result['total_profit'] == pytest.approx(
+            first + (48 - 50) * 100 - 10 / 9400 * 9800 + (17 - 14) * 100 - 5 / 2900 * 3100
+        )
+
+    def test_hold_longer_caps_at_last_day(self, engine):
+        result = engine.evaluate([HoldLonger(100)])
+        assert result['avg_holding_days'] > 0
+
+    def test_skip_small_trades(self, engine):
+        result = engine.evaluate([SkipSmallTrades(min_amount=5000)])
+
+        assert result['trades'] == 2
+        assert result['total_profit'] == pytest.approx(1990 - 610)
+
+    def test_stop_loss_exits_on_first_breach(self, engine):
+        trades = StopLoss(0.1).apply(engine.trades, engine.close)
+
+        # B 在第 4 个交易日收盘 45 元，跌破 50 x 0.9
+        assert trades.exit[1] == 3
+        assert trades.exit_price[1] == 45.0
+        # A 第一笔没有触发
+        assert trades.exit[0] == 2
+
+    def test_take_profit_and_max_holding(self, engine):
+        take = TakeProfit(0.15).apply(engine.trades, engine.close)
+        assert take.exit[0] == 2
+
+        capped = MaxHolding(1).apply(engine.trades, engine.close)
+        assert capped.exit.tolist() == [1, 2, 6]
+        assert capped.exit_price[0] == 11.0
+
+        delayed = DelayEntry(1).apply(engine.trades, engine.close)
+        assert delayed.entry_price.tolist() == [11.0, 48.0, 15.0]
+
+    def test_compare_and_grid(self, engine):
+        table = engine.compare({'延长持有': [HoldLonger(2)], '跳过小额': [SkipSmallTrades(5000)]})
+
+        assert table['scenario'].tolist() == ['实际交易', '延长持有', '跳过小额']
+        assert table.loc[0, 'difference'] == 0
+        assert (table['actual_profit'] == table.loc[0, 'total_profit']).all()
+
+        grid = engine.grid(HoldLonger, {'sessions': [0, 1, 2]})
+        assert grid['sessions'].tolist() == [0, 1, 2]
+        assert grid.loc[0, 'difference'] == pytest.approx(0.0)
+
+    def test_grid_keeps_duplicate_values(self, engine):
+        grid = engine.grid(HoldLonger, {'sessions': [2, 0, 2]})
+
+        assert grid['sessions'].tolist() == [2, 0, 2]
+        assert grid.loc[1, 'difference'] == pytest.approx(0.0)
+        assert grid.loc[0, 'total_profit'] == grid.loc[2, 'total_profit']
+        assert grid['scenario'].notna().all()
+
+    def test_grid_in_process_pool(self, engine):
+        serial = engine.grid(StopLoss, {'pct': [0.05, 0.1]})
+        parallel = engine.grid(StopLoss, {'pct': [0.05, 0.1]}, max_workers=2)
+
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_build_price_matrix_prefers_external_prices(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-02', '2024-01-04']),
+            'security_code': ['A', 'A'],
+            'trade_type': ['buy', 'sell'],
+            'price': [10.0, 12.0],
+        })
+        external = pd.DataFrame({'A': [10.5]}, index=pd.to_datetime(['2024-01-03']))
+
+        matrix = build_price_matrix(df, external)
+
+        assert matrix['A'].tolist() == [10.0, 10.5, 12.0]
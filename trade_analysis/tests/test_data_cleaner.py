@@ -0,0 +1,146 @@
+"""
+DataCleaner 读取测试
+
+iter_clean_chunks 拼接后的结果必须与一次性 clean() 的结果一致；
+Excel 文件按文件头识别，单遍读取切出的数据与按表头行重读一致，证券代码保留前导零。
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.data_cleaner import DataCleaner
+
+RAW_DIR = Path(__file__).parent.parent / 'data' / 'raw'
+
+HEADER = ['交割日期', '证券代码', '证券名称', '业务类型', '成交价格', '成交数量', '成交金额',
+          '佣金', '印花税', '过户费', '清算费（B股）', '发生金额', '剩余金额', '证券数量',
+          '股东代码', '币种', '成交编号', '证券全称', '备注']
+
+
+def write_text_xls(path: Path, n_rows: int):
+    """写出券商导出的制表符分隔 .xls（GBK 编码）"""
+    lines = ['\t'.join(HEADER)]
+    for i in range(n_rows):
+        day = 20240102 + i % 20
+        lines.append('\t'.join([
+            str(day), '600519', '贵州茅台', '证券买入', '1500', '100', '150000', '5', '0',
+            '1.5', '0', '-150006.5', '100000', str(100 * (i + 1)),
+            'A000000001', '人民币', f'{i:010d}', '贵州茅台', '证券买入',
+        ]))
+    path.write_bytes(('\n'.join(lines) + '\n').encode('gbk'))
+
+
+def assert_same_frames(chunked: pd.DataFrame, full: pd.DataFrame):
+    assert len(chunked) == len(full)
+    assert (chunked['date'].values == full['date'].values).all()
+    for col in full.columns:
+        if col == 'date':
+            continue
+        a, b = chunked[col], full[col]
+        if a.dtype.kind in 'fi' and b.dtype.kind in 'fi':
+            assert np.allclose(a.astype(float), b.astype(float), equal_nan=True), col
+        else:
+            assert a.astype(str).tolist() == b.astype(str).tolist(), col
+
+
+class TestIterCleanChunks:
+    """分块清洗测试"""
+
+    @pytest.mark.parametrize('chunksize', [7, 50, 1000])
+    def test_text_xls_matches_clean(self, tmp_path, chunksize):
+        path = tmp_path / 'settlement.xls'
+        write_text_xls(path, 120)
+
+        full = DataCleaner(str(path))
+        full.load_data()
+        expected = full.clean()
+
+        chunks = list(DataCleaner(str(path)).iter_clean_chunks(chunksize=chunksize))
+        assert all(len(c) <= chunksize for c in chunks)
+        assert_same_frames(pd.concat(chunks, ignore_index=True), expected)
+
+    @pytest.mark.parametrize('filename', ['23_26_交割单查询.xls', '23_26_settlement.xlsx'])
+    def test_real_settlement_files(self, filename):
+        path = RAW_DIR / filename
+        if not path.exists():
+            pytest.skip(f'样例文件不存在: {filename}')
+
+        full = DataCleaner(str(path))
+        full.load_data()
+        expected = full.clean()
+
+        chunks = list(DataCleaner(str(path)).iter_clean_chunks(chunksize=500))
+        assert_same_frames(pd.concat(chunks, ignore_index=True), expected)
+
+
+def write_xlsx(path: Path, n_rows: int, preamble: int = 2):
+    """写出带说明行的 .xlsx，证券代码为文本单元格"""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    for i in range(preamble):
+        ws.append([f'交割单查询 第{i + 1}行说明'])
+    ws.append(HEADER)
+    for i in range(n_rows):
+        code = '000676' if i % 2 else '600519'
+        ws.append([
+            20240102 + i, code, '智度股份' if i % 2 else '贵州茅台', '证券买入', 10.5, 100, 1050.0,
+            5, 0, 0.1, 0, -1055.1, 100000.0 - i, 100 * (i + 1), 'A000000001', '人民币',
+            f'{i:08d}', None, '证券买入',
+        ])
+    wb.save(path)
+
+
+class TestExcelLoading:
+    """Excel 读取测试"""
+
+    def test_magic_bytes_are_not_text(self, tmp_path):
+        xlsx = tmp_path / 'settlement.xlsx'
+        write_xlsx(xlsx, 3)
+        assert not DataCleaner(str(xlsx))._is_text_format()
+
+        ole2 = tmp_path / 'binary.xls'
+        ole2.write_bytes(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1' + b'\x00' * 504)
+        assert not DataCleaner(str(ole2))._is_text_format()
+
+        text = tmp_path / 'text.xls'
+        write_text_xls(text, 3)
+        assert DataCleaner(str(text))._is_text_format()
+
+    def test_slice_header_matches_two_pass_read(self, tmp_path):
+        path = tmp_path / 'settlement.xlsx'
+        write_xlsx(path, 20, preamble=3)
+
+        cleaner = DataCleaner(str(path))
+        df_raw = pd.read_excel(path, header=None)
+        header_row = cleaner.parser.detect_file_structure(df_raw)['header_row']
+        assert header_row == 3
+
+        sliced = cleaner._slice_header(df_raw, header_row)
+        expected = pd.read_excel(path, header=header_row)
+        assert list(sliced.columns) == list(expected.columns)
+        # 两遍读取时 pandas 把纯数字文本转成数值（'000676' 变为 676），切片保留原文本
+        text_columns = ['证券代码', '成交编号']
+        assert sliced['证券代码'].iloc[1] == '000676'
+        for col in text_columns:
+            assert pd.to_numeric(sliced[col]).tolist() == expected[col].tolist(), col
+        pd.testing.assert_frame_equal(
+            sliced.drop(columns=text_columns), expected.drop(columns=text_columns), check_dtype=False
+        )
+
+    def test_codes_keep_leading_zeros(self, tmp_path):
+        path = tmp_path / 'settlement.xlsx'
+        write_xlsx(path, 6)
+
+        cleaner = DataCleaner(str(path))
+        cleaner.load_data()
+        df = cleaner.clean()
+        assert len(df) == 6
+        assert set(df['security_code'].astype(str)) == {'000676', '600519'}
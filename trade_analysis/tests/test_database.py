@@ -0,0 +1,175 @@
+"""
+数据库日期存储与按列读取测试
+
+日期以整数天数存储；旧版 'YYYYMMDD' 文本日期的数据库打开时自动升级。
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.db.database import DatabaseManager, SCHEMA_VERSION
+from trade_analysis.utils.date_utils import to_day_number
+
+
+def make_records(n_days: int = 10) -> pd.DataFrame:
+    dates = pd.date_range('2024-01-02', periods=n_days, freq='D')
+    rows = []
+    for i, date in enumerate(dates):
+        trade_type = 'buy' if i % 2 == 0 else 'sell'
+        rows.append({
+            'date': date, 'security_code': '600519', 'security_name': '贵州茅台',
+            'business_type': '证券买入' if trade_type == 'buy' else '证券卖出', 'trade_type': trade_type,
+            'price': 100.0 + i, 'quantity': 100, 'amount': (100.0 + i) * 100,
+            'commission': 5.0, 'stamp_tax': 0.0, 'transfer_fee': 0.0, 'clearing_fee': 0.0,
+            'net_amount': -(100.0 + i) * 100 if trade_type == 'buy' else (100.0 + i) * 100,
+            'balance': 1e6, 'position': 100 if trade_type == 'buy' else 0,
+            'trade_id': f'{i:08d}', 'total_fee': 5.0,
+        })
+    return pd.DataFrame(rows)
+
+
+def create_legacy_database(path: Path, records: pd.DataFrame):
+    """按升级前的表结构（TEXT 日期）建库"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE trade_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, security_code TEXT,
+            security_name TEXT, trade_type TEXT, price REAL, quantity INTEGER, amount REAL,
+            net_amount REAL, total_fee REAL, trade_id TEXT,
+            UNIQUE(date, security_code, trade_type, quantity, amount, price, trade_id)
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_trade_records_date ON trade_records(date)')
+    conn.execute('''
+        CREATE TABLE daily_prices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, security_code TEXT NOT NULL,
+            close_price REAL, created_at TEXT, UNIQUE(date, security_code)
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO trade_records (date, security_code, security_name, trade_type, price, quantity, amount, '
+        'net_amount, total_fee, trade_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [
+            (r.date.strftime('%Y%m%d'), r.security_code, r.security_name, r.trade_type, r.price,
+             r.quantity, r.amount, r.net_amount, r.total_fee, r.trade_id)
+            for r in records.itertuples()
+        ]
+    )
+    conn.execute("INSERT INTO daily_prices (date, security_code, close_price) VALUES ('20240105', '600519', 101.5)")
+    conn.commit()
+    conn.close()
+
+
+class TestIntegerDates:
+    def test_round_trip(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        records = make_records()
+        db.insert_trade_records(records)
+
+        conn = sqlite3.connect(db.db_path)
+        stored = conn.execute('SELECT typeof(date), MIN(date) FROM trade_records').fetchone()
+        conn.close()
+        assert stored == ('integer', to_day_number('20240102'))
+
+        loaded = db.load_trade_records()
+        assert (loaded['date'].values == records['date'].values).all()
+        assert db.get_last_date() == '20240111'
+
+    def test_range_projection_and_types(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        db.insert_trade_records(make_records())
+
+        df = db.load_trade_records('20240103', pd.Timestamp('2024-01-08'), columns=['date', 'amount'], trade_types=['buy'])
+        assert list(df.columns) == ['date', 'amount']
+        assert list(df['date'].dt.day) == [4, 6, 8]
+
+        with pytest.raises(ValueError):
+            db.load_trade_records(columns=['date', 'no_such_column'])
+
+    def test_same_day_rows_keep_insertion_order(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        records = make_records(4)
+        # 同一天先卖后买：(date, trade_type) 索引会把 buy 排在 sell 前面
+        records['date'] = pd.Timestamp('2024-01-02')
+        records = records.iloc[[1, 0, 3, 2]].reset_index(drop=True)
+        db.insert_trade_records(records)
+
+        loaded = db.load_trade_records()
+        assert loaded['trade_id'].tolist() == records['trade_id'].tolist()
+        assert loaded['trade_type'].tolist() == ['sell', 'buy', 'sell', 'buy']
+        assert loaded['id'].is_monotonic_increasing
+
+    def test_prices_and_net_values(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        db.save_daily_prices([
+            {'date': '20240102', 'security_code': '600519', 'close_price': 100.0},
+            {'date': pd.Timestamp('2024-01-03'), 'security_code': '600519', 'close_price': 101.0},
+        ])
+        prices = db.get_daily_prices('600519', start_date='2024-01-03', columns=['date', 'close_price'])
+        assert list(prices.columns) == ['date', 'close_price']
+        assert prices['date'].tolist() == [pd.Timestamp('2024-01-03')]
+        assert db.get_latest_price('600519') == 101.0
+        assert list(db.get_price_matrix(['600519']).index) == list(pd.to_datetime(['2024-01-02', '2024-01-03']))
+
+        db.save_daily_net_values([{
+            'date': '20240102', 'cash_balance': 1.0, 'repo_amount': 0.0,
+            'stock_market_value': 2.0, 'total_net_value': 3.0,
+        }])
+        net_values = db.get_daily_net_values(end_date='20240102', columns=['date', 'total_net_value'])
+        assert net_values.iloc[0].tolist() == [pd.Timestamp('2024-01-02'), 3.0]
+
+    def test_summary_dates(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        db.insert_trade_records(make_records())
+        summary = db.get_security_summary('600519')
+        assert summary['first_buy_date'] == pd.Timestamp('2024-01-02')
+        assert summary['last_sell_date'] == pd.Timestamp('2024-01-11')
+
+
+class TestMigration:
+    def test_upgrade_legacy_text_dates(self, tmp_path):
+        path = tmp_path / 'legacy.db'
+        records = make_records()
+        create_legacy_database(path, records)
+
+        db = DatabaseManager(str(path))
+        conn = sqlite3.connect(path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM trade_records WHERE typeof(date) != 'integer'").fetchone()[0] == 0
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert 'idx_trade_records_date_type' in indexes
+        assert 'idx_trade_records_date' not in indexes
+
+        loaded = db.load_trade_records()
+        assert (loaded['date'].values == records['date'].values).all()
+        assert db.get_daily_prices('600519')['date'].tolist() == [pd.Timestamp('2024-01-05')]
+        assert db.get_security_summary('600519')['buy_count'] == 5
+
+        # 升级后写入照常更新数据版本，重复打开不再升级
+        before = db.get_data_version()['trade_records']
+        db.insert_trade_records(make_records(12).tail(2))
+        assert db.get_data_version()['trade_records'] == before + 1
+        assert len(DatabaseManager(str(path)).load_trade_records()) == 12
+
+    def test_invalid_dates_abort_upgrade(self, tmp_path):
+        path = tmp_path / 'legacy.db'
+        create_legacy_database(path, make_records(2))
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE trade_records SET date = 'bad' WHERE id = 1")
+        conn.commit()
+        conn.close()
+
+        with pytest.raises(ValueError):
+            DatabaseManager(str(path))
+
+        conn = sqlite3.connect(path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+        assert conn.execute('SELECT COUNT(*) FROM trade_records').fetchone()[0] == 2
+        conn.close()
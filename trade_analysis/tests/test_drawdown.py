@@ -0,0 +1,106 @@
+"""
+回撤分析测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.drawdown import (
+    underwater_curve, max_drawdown, drawdown_episodes, drawdown_summary
+)
+from trade_analysis.models.performance import PerformanceCalculator
+
+
+def loop_max_drawdown(values) -> float:
+    """原 calculate_max_drawdown 的逐日遍历实现"""
+    max_dd = 0.0
+    peak = values[0]
+    for value in values:
+        if value > peak:
+            peak = value
+        if peak > 0:
+            max_dd = max(max_dd, (peak - value) / peak)
+    return max_dd * 100
+
+
+def make_curve(values) -> pd.Series:
+    return pd.Series(values, index=pd.date_range('2024-01-01', periods=len(values)), dtype=float)
+
+
+class TestDrawdown:
+    """回撤分析测试"""
+
+    def test_max_drawdown_matches_loop(self):
+        rng = np.random.default_rng(3)
+        for _ in range(20):
+            values = 100 * np.cumprod(1 + rng.normal(0, 0.03, 200))
+            assert max_drawdown(make_curve(values)) == pytest.approx(loop_max_drawdown(values))
+
+    def test_underwater_curve(self):
+        curve = underwater_curve(make_curve([100, 120, 90, 130, 65]))
+
+        assert curve['peak'].tolist() == [100, 120, 120, 130, 130]
+        assert curve['drawdown'].tolist() == [0, 0, 30, 0, 65]
+        assert curve['drawdown_pct'].tolist() == pytest.approx([0, 0, 25, 0, 50])
+
+    def test_episodes(self):
+        equity = make_curve([100, 120, 90, 100, 125, 110, 80, 100])
+
+        episodes = drawdown_episodes(equity, top_n=None)
+
+        assert len(episodes) == 2
+        deepest = episodes.iloc[0]
+        assert deepest['peak_date'] == pd.Timestamp('2024-01-05')
+        assert deepest['trough_date'] == pd.Timestamp('2024-01-07')
+        assert pd.isna(deepest['recovery_date'])
+        assert not deepest['recovered']
+        assert deepest['depth'] == 45
+        assert deepest['duration_days'] == 3
+
+        recovered = episodes.iloc[1]
+        assert recovered['peak_date'] == pd.Timestamp('2024-01-02')
+        assert recovered['trough_date'] == pd.Timestamp('2024-01-03')
+        assert recovered['recovery_date'] == pd.Timestamp('2024-01-05')
+        assert recovered['depth_pct'] == pytest.approx(25)
+        assert recovered['recovery_days'] == 2
+
+    def test_no_drawdown(self):
+        assert drawdown_episodes(make_curve([1, 2, 3])).empty
+        assert max_drawdown(make_curve([5])) == 0.0
+
+    def test_summary_per_curve(self):
+        curves = pd.DataFrame({
+            'A': [0, 100, 40, 120],
+            'B': [0, 10, 20, 30],
+        }, index=pd.date_range('2024-01-01', periods=4), dtype=float)
+
+        summary = drawdown_summary(curves)
+
+        assert summary['name'].tolist() == ['A', 'B']
+        assert summary.loc[0, 'max_drawdown'] == 60
+        assert summary.loc[0, 'recovery_date'] == pd.Timestamp('2024-01-04')
+        assert summary.loc[1, 'max_drawdown'] == 0
+
+    def test_security_equity_curves(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']),
+            'security_code': ['600519', '600519', '600519', '131810'],
+            'trade_type': ['buy', 'buy', 'sell', 'repo_lend'],
+            'quantity': [100, 100, 200, 10],
+            'price': [10.0, 8.0, 9.5, 1.8],
+            'amount': [1000.0, 800.0, 1900.0, 1000.0],
+            'net_amount': [-1005.0, -805.0, 1895.0, -1000.0],
+            'balance': [0.0] * 4,
+        })
+
+        curves = PerformanceCalculator(df).get_security_equity_curves()
+
+        assert list(curves.columns) == ['600519']
+        # 持仓按当日最后成交价估值，卖出后只剩已实现盈亏
+        assert curves['600519'].tolist() == pytest.approx([-5.0, -210.0, 85.0, 85.0])
@@ -0,0 +1,65 @@
+"""
+目录导入测试
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.services.importer import import_directory, merge_settlement_frames
+
+HEADER = ['交割日期', '证券代码', '证券名称', '业务类型', '成交价格', '成交数量', '成交金额',
+          '佣金', '印花税', '过户费', '清算费（B股）', '发生金额', '剩余金额', '证券数量',
+          '股东代码', '币种', '成交编号', '证券全称', '备注']
+
+
+def write_text_xls(path: Path, days):
+    """每个交易日写一条买入记录，成交编号取日期，便于构造跨文件重复"""
+    lines = ['\t'.join(HEADER)]
+    for day in days:
+        lines.append('\t'.join([
+            str(day), '600519', '贵州茅台', '证券买入', '1500', '100', '150000', '5', '0',
+            '1.5', '0', '-150006.5', '100000', '100', 'A000000001', '人民币', str(day),
+            '贵州茅台', '证券买入',
+        ]))
+    path.write_bytes(('\n'.join(lines) + '\n').encode('gbk'))
+
+
+class TestImportDirectory:
+    """目录导入测试"""
+
+    def test_merge_dedupes_and_sorts(self):
+        a = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-03', '2024-01-02']),
+            'security_code': ['600519', '600519'], 'trade_type': ['buy', 'buy'],
+            'quantity': [100, 100], 'amount': [1.0, 1.0], 'price': [1.0, 1.0],
+            'trade_id': ['2', '1'], 'remark': ['a', 'a'],
+        })
+        b = a.iloc[[0]].assign(remark='b')
+
+        merged, duplicates = merge_settlement_frames([a, None, b])
+
+        assert duplicates == 1
+        assert merged['trade_id'].tolist() == ['1', '2']
+        # 重复记录保留后出现的文件
+        assert merged.loc[merged['trade_id'] == '2', 'remark'].item() == 'b'
+
+    def test_overlapping_files(self, tmp_path):
+        write_text_xls(tmp_path / '2024_01.xls', [20240102, 20240103, 20240104])
+        write_text_xls(tmp_path / '2024_01_补.xls', [20240104, 20240105])
+        (tmp_path / 'notes.csv').write_text('not a settlement file\n', encoding='utf-8')
+
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        result = import_directory(str(tmp_path), db, max_workers=2)
+
+        assert len(result.files) == 3
+        assert len(result.failed_files) == 1
+        assert result.rows_parsed == 5
+        assert result.duplicates == 1
+        assert result.rows_inserted == 4
+        assert db.get_record_count() == 4
+        assert db.get_security_summary('600519')['buy_count'] == 4
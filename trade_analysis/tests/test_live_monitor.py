@@ -0,0 +1,82 @@
+"""
+实时持仓监控测试（回放 tick 序列）
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.services.live_monitor import PortfolioMonitor, LiveMonitor
+
+
+@pytest.fixture
+def monitor():
+    positions = {
+        '600000': {'name': '浦发银行', 'quantity': 1000, 'cost_price': 9.0, 'close_price': 10.0},
+        '300750': {'name': '宁德时代', 'quantity': 100, 'cost_price': 210.0, 'close_price': 200.0},
+    }
+    return PortfolioMonitor(positions, cash=70000.0)
+
+
+def make_ticks(rows, start=datetime(2024, 1, 2, 9, 30)):
+    return [(code, price, start + timedelta(seconds=second)) for second, code, price in rows]
+
+
+class TestLiveMonitor:
+    """实时持仓监控测试"""
+
+    def test_initial_state(self, monitor):
+        snapshot = monitor.snapshot()
+
+        assert snapshot.nav == pytest.approx(100000.0)
+        assert snapshot.unrealized_pnl == pytest.approx(1000 - 1000)
+        assert snapshot.exposure == pytest.approx(30.0)
+        assert snapshot.board_exposure == pytest.approx({'沪市主板': 10.0, '创业板': 20.0})
+
+    def test_incremental_updates(self, monitor):
+        ticks = make_ticks([
+            (0, '600000', 10.5),
+            (1, '300750', 190.0),
+            (2, '999999', 1.0),
+            (3, '600000', 0.0),
+            (4, '300750', 205.0),
+        ])
+        snapshot = LiveMonitor(monitor, printer=lambda text: None).replay(ticks)
+
+        assert snapshot.tick_count == 3
+        assert snapshot.market_value == pytest.approx(10500 + 20500)
+        assert snapshot.unrealized_pnl == pytest.approx(1500 - 500)
+        assert snapshot.day_pnl == pytest.approx(500 + 500)
+        assert snapshot.peak_nav == pytest.approx(101000.0)
+        assert snapshot.drawdown == pytest.approx(0.0)
+        # 峰值 100500 后跌到 99500
+        assert snapshot.max_drawdown == pytest.approx(1000 / 100500 * 100)
+        assert snapshot.board_exposure['创业板'] == pytest.approx(20500 / 101000 * 100)
+
+    def test_dashboard_is_throttled(self, monitor):
+        printed = []
+        ticks = make_ticks([(0, '600000', 10.1), (1, '600000', 10.2), (6, '600000', 10.3), (7, '600000', 10.4)])
+
+        LiveMonitor(monitor, interval=5, printer=printed.append).replay(ticks)
+
+        assert len(printed) == 2
+        assert printed[-1].startswith('[09:30:06] 总资产 100,300.00')
+        assert '600000 浦发银行: 10.300 (+3.00%)' in printed[-1]
+
+    def test_run_polls_without_subscription(self, monitor):
+        class PollingFetcher:
+            def subscribe_quotes(self, codes, callback):
+                return None
+
+            def get_latest_price(self, code):
+                return {'600000': 11.0, '300750': None}[code]
+
+        printed = []
+        snapshot = LiveMonitor(monitor, printer=printed.append).run(PollingFetcher(), duration=0.01, poll_interval=0.01)
+
+        assert snapshot.market_value == pytest.approx(11000 + 20000)
+        assert len(printed) >= 2
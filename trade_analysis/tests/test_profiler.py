@@ -0,0 +1,95 @@
+"""
+阶段计时器测试
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.utils.profiler import Profiler, PROFILER, profiled, frame_nbytes
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    yield profiler
+    profiler.disable()
+
+
+class TestProfiler:
+    def test_disabled_records_nothing(self, profiler):
+        with profiler.span('stage') as span:
+            span.add_bytes(10)
+        assert profiler.report().empty
+
+    def test_calls_and_bytes(self, profiler):
+        profiler.enable()
+        for n in (10, 20):
+            with profiler.span('stage', n):
+                pass
+        with profiler.span('other') as span:
+            span.add_bytes(5)
+
+        table = profiler.report().set_index('stage')
+        assert table.loc['stage', 'calls'] == 2
+        assert table.loc['stage', 'bytes'] == 30
+        assert table.loc['other', 'bytes'] == 5
+        assert table.loc['stage', 'max_seconds'] <= table.loc['stage', 'total_seconds']
+
+    def test_nested_peak_memory(self, profiler):
+        profiler.enable(memory=True)
+        with profiler.span('outer'):
+            with profiler.span('inner'):
+                block = bytearray(4_000_000)
+                del block
+            small = bytearray(1000)
+
+        table = profiler.report().set_index('stage')
+        assert table.loc['inner', 'peak_memory'] >= 4_000_000
+        # 外层峰值包含内层期间的分配
+        assert table.loc['outer', 'peak_memory'] >= 4_000_000
+        del small
+
+    def test_merge_and_json(self, profiler, tmp_path):
+        profiler.enable()
+        with profiler.span('stage'):
+            pass
+        other = Profiler()
+        other.enable()
+        with other.span('stage', 7):
+            pass
+        profiler.merge(other.snapshot())
+
+        path = profiler.dump_json(str(tmp_path / 'profile.json'))
+        with open(path, encoding='utf-8') as f:
+            payload = json.load(f)
+        assert payload['stages'][0]['stage'] == 'stage'
+        assert payload['stages'][0]['calls'] == 2
+        assert payload['stages'][0]['bytes'] == 7
+        assert 'stage' in profiler.format_table()
+
+
+class TestProfiled:
+    def test_decorator_uses_global_profiler(self):
+        @profiled('test.frame', nbytes=frame_nbytes)
+        def make_frame():
+            return pd.DataFrame({'a': range(100)})
+
+        PROFILER.reset()
+        make_frame()
+        assert PROFILER.report().empty
+
+        PROFILER.enable()
+        try:
+            make_frame()
+            row = PROFILER.report().set_index('stage').loc['test.frame']
+            assert row['calls'] == 1
+            assert row['bytes'] >= 800
+        finally:
+            PROFILER.disable()
+            PROFILER.reset()
@@ -0,0 +1,529 @@
+"""
+RecordParser 向量化解析测试
+
+ReferenceRecordParser 保留了逐行解析的原始实现，仅作为对照：
+向量化的 RecordParser.parse_frame 必须与其逐行结果一致。
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.record_parser import (
+    RecordParser, RecordType, TRADE_TYPE_MAP, PARSED_COLUMNS
+)
+
+RAW_DIR = Path(__file__).parent.parent / 'data' / 'raw'
+
+NUMERIC_COLUMNS = [
+    'price', 'quantity', 'amount', 'commission', 'stamp_tax', 'transfer_fee',
+    'clearing_fee', 'net_amount', 'balance', 'position',
+]
+
+
+class ReferenceRecordParser:
+    """逐行解析的参考实现（原 RecordParser.parse_record）"""
+    
+    def identify_record_type(self, row: pd.Series) -> str:
+        """
+        识别单条记录的类型
+        
+        Args:
+            row: 数据行
+            
+        Returns:
+            记录类型字符串
+        """
+        security_code = str(row.get('security_code', ''))
+        business_type = str(row.get('business_type', ''))
+        
+        # 检查银行转账（通过 security_code 或 business_type）
+        if security_code in ['银行转证券', '证券转银行']:
+            return RecordType.TRANSFER
+        
+        if business_type in ['银行转证券', '证券转银行']:
+            return RecordType.TRANSFER
+        
+        if security_code == '利息归本':
+            return RecordType.INTEREST
+        
+        if business_type == '利息归本':
+            return RecordType.INTEREST
+        
+        if business_type == '0' or business_type == '0.0':
+            if security_code in ['银行转证券', '证券转银行']:
+                return RecordType.TRANSFER
+            return RecordType.UNKNOWN
+        
+        if business_type in ['证券买入', '证券卖出']:
+            return RecordType.TRADE
+        
+        if business_type in ['融券回购', '融券购回']:
+            return RecordType.REPO
+        
+        if business_type == '红利入账':
+            return RecordType.DIVIDEND
+        
+        if business_type == '红股入账':
+            return RecordType.STOCK_DIVIDEND
+        
+        if business_type == '股息红利差异扣税':
+            return RecordType.DIVIDEND_TAX
+        
+        if business_type in ['指定交易', '指定登记']:
+            return RecordType.DESIGNATE
+        
+        return RecordType.UNKNOWN
+    
+    def parse_record(self, row: pd.Series) -> Dict[str, Any]:
+        """
+        解析单条记录，返回标准化格式
+        
+        Args:
+            row: 数据行（已映射列名）
+            
+        Returns:
+            标准化的记录字典
+        """
+        record_type = self.identify_record_type(row)
+        
+        if record_type == RecordType.TRANSFER:
+            return self._parse_transfer(row)
+        elif record_type == RecordType.INTEREST:
+            return self._parse_interest(row)
+        elif record_type == RecordType.TRADE:
+            return self._parse_trade(row)
+        elif record_type == RecordType.REPO:
+            return self._parse_repo(row)
+        elif record_type == RecordType.DIVIDEND:
+            return self._parse_dividend(row)
+        elif record_type == RecordType.STOCK_DIVIDEND:
+            return self._parse_stock_dividend(row)
+        elif record_type == RecordType.DIVIDEND_TAX:
+            return self._parse_dividend_tax(row)
+        elif record_type == RecordType.DESIGNATE:
+            return self._parse_designate(row)
+        else:
+            return self._parse_unknown(row)
+    
+    def _parse_transfer(self, row: pd.Series) -> Dict[str, Any]:
+        transfer_type = str(row.get('security_code', ''))
+        business_type = '银行转证券' if transfer_type == '银行转证券' else '证券转银行'
+        
+        net_amount, balance, currency = self._detect_misaligned_fields(row)
+        
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': '',
+            'security_name': '',
+            'business_type': business_type,
+            'trade_type': TRADE_TYPE_MAP.get(business_type, 'unknown'),
+            'price': 0.0,
+            'quantity': 0,
+            'amount': 0.0,
+            'commission': 0.0,
+            'stamp_tax': 0.0,
+            'transfer_fee': 0.0,
+            'clearing_fee': 0.0,
+            'net_amount': net_amount,
+            'balance': balance,
+            'position': 0,
+            'shareholder_code': '',
+            'currency': currency,
+            'trade_id': '',
+            'security_full_name': '',
+            'remark': '',
+            'record_type': RecordType.TRANSFER,
+        }
+    
+    def _parse_interest(self, row: pd.Series) -> Dict[str, Any]:
+        net_amount, balance, currency = self._detect_misaligned_fields(row)
+        
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': '',
+            'security_name': '',
+            'business_type': '利息归本',
+            'trade_type': 'interest',
+            'price': 0.0,
+            'quantity': 0,
+            'amount': 0.0,
+            'commission': 0.0,
+            'stamp_tax': 0.0,
+            'transfer_fee': 0.0,
+            'clearing_fee': 0.0,
+            'net_amount': net_amount,
+            'balance': balance,
+            'position': 0,
+            'shareholder_code': '',
+            'currency': currency,
+            'trade_id': '',
+            'security_full_name': '',
+            'remark': str(row.get('balance', '')),
+            'record_type': RecordType.INTEREST,
+        }
+    
+    def _detect_misaligned_fields(self, row: pd.Series) -> Tuple[float, float, str]:
+        """
+        自动检测错位字段，返回 (发生金额, 剩余金额, 币种)
+        
+        银行转账/利息归本记录可能存在字段错位：
+        - 正常情况: 发生金额在 net_amount 字段
+        - 错位情况: 发生金额在 stamp_tax 字段，币种在 net_amount 字段
+        """
+        net_amount = 0.0
+        balance = 0.0
+        currency = '人民币'
+        
+        for col in ['net_amount', 'stamp_tax', 'transfer_fee', 'clearing_fee']:
+            val = row.get(col)
+            if val is not None:
+                val_str = str(val).strip()
+                if val_str in ['人民币', 'RMB', 'CNY']:
+                    currency = val_str
+                elif self._is_numeric(val):
+                    num_val = self._safe_float(val)
+                    if col == 'net_amount' and num_val != 0:
+                        pass
+                    elif col == 'stamp_tax' and abs(num_val) >= 1:
+                        net_amount = num_val
+                    elif col == 'transfer_fee' and abs(num_val) >= 1:
+                        balance = num_val
+        
+        if net_amount == 0:
+            net_amount = self._safe_float(row.get('net_amount', 0))
+        if balance == 0:
+            balance = self._safe_float(row.get('balance', 0))
+        
+        return net_amount, balance, currency
+    
+    def _is_numeric(self, value) -> bool:
+        if value is None:
+            return False
+        try:
+            float(str(value).replace(',', '').strip())
+            return True
+        except (ValueError, TypeError):
+            return False
+    
+    def _parse_trade(self, row: pd.Series) -> Dict[str, Any]:
+        business_type = str(row.get('business_type', ''))
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': self._format_code(row.get('security_code', '')),
+            'security_name': str(row.get('security_name', '')),
+            'business_type': business_type,
+            'trade_type': TRADE_TYPE_MAP.get(business_type, 'unknown'),
+            'price': self._safe_float(row.get('price', 0)),
+            'quantity': self._safe_int(row.get('quantity', 0)),
+            'amount': self._safe_float(row.get('amount', 0)),
+            'commission': self._safe_float(row.get('commission', 0)),
+            'stamp_tax': self._safe_float(row.get('stamp_tax', 0)),
+            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
+            'clearing_fee': self._safe_float(row.get('clearing_fee', 0)),
+            'net_amount': self._safe_float(row.get('net_amount', 0)),
+            'balance': self._safe_float(row.get('balance', 0)),
+            'position': self._safe_int(row.get('position', 0)),
+            'shareholder_code': str(row.get('shareholder_code', '')),
+            'currency': str(row.get('currency', '人民币')),
+            'trade_id': str(row.get('trade_id', '')),
+            'security_full_name': str(row.get('security_full_name', '')),
+            'remark': str(row.get('remark', '')),
+            'record_type': RecordType.TRADE,
+        }
+    
+    def _parse_repo(self, row: pd.Series) -> Dict[str, Any]:
+        business_type = str(row.get('business_type', ''))
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': self._format_code(row.get('security_code', '')),
+            'security_name': str(row.get('security_name', '')),
+            'business_type': business_type,
+            'trade_type': TRADE_TYPE_MAP.get(business_type, 'repo'),
+            'price': self._safe_float(row.get('price', 0)),
+            'quantity': self._safe_int(row.get('quantity', 0)),
+            'amount': self._safe_float(row.get('amount', 0)),
+            'commission': self._safe_float(row.get('commission', 0)),
+            'stamp_tax': self._safe_float(row.get('stamp_tax', 0)),
+            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
+            'clearing_fee': self._safe_float(row.get('clearing_fee', 0)),
+            'net_amount': self._safe_float(row.get('net_amount', 0)),
+            'balance': self._safe_float(row.get('balance', 0)),
+            'position': 0,
+            'shareholder_code': str(row.get('shareholder_code', '')),
+            'currency': str(row.get('currency', '人民币')),
+            'trade_id': str(row.get('trade_id', '')),
+            'security_full_name': str(row.get('security_full_name', '')),
+            'remark': str(row.get('remark', '')),
+            'record_type': RecordType.REPO,
+        }
+    
+    def _parse_dividend(self, row: pd.Series) -> Dict[str, Any]:
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': self._format_code(row.get('security_code', '')),
+            'security_name': str(row.get('security_name', '')),
+            'business_type': '红利入账',
+            'trade_type': 'dividend',
+            'price': 0.0,
+            'quantity': self._safe_int(row.get('quantity', 0)),
+            'amount': self._safe_float(row.get('amount', 0)),
+            'commission': 0.0,
+            'stamp_tax': 0.0,
+            'transfer_fee': 0.0,
+            'clearing_fee': 0.0,
+            'net_amount': self._safe_float(row.get('net_amount', 0)),
+            'balance': self._safe_float(row.get('balance', 0)),
+            'position': 0,
+            'shareholder_code': str(row.get('shareholder_code', '')),
+            'currency': str(row.get('currency', '人民币')),
+            'trade_id': '',
+            'security_full_name': str(row.get('security_full_name', '')),
+            'remark': '',
+            'record_type': RecordType.DIVIDEND,
+        }
+    
+    def _parse_stock_dividend(self, row: pd.Series) -> Dict[str, Any]:
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': self._format_code(row.get('security_code', '')),
+            'security_name': str(row.get('security_name', '')),
+            'business_type': '红股入账',
+            'trade_type': 'stock_dividend',
+            'price': 0.0,
+            'quantity': self._safe_int(row.get('quantity', 0)),
+            'amount': 0.0,
+            'commission': 0.0,
+            'stamp_tax': 0.0,
+            'transfer_fee': 0.0,
+            'clearing_fee': 0.0,
+            'net_amount': 0.0,
+            'balance': self._safe_float(row.get('balance', 0)),
+            'position': self._safe_int(row.get('position', 0)),
+            'shareholder_code': str(row.get('shareholder_code', '')),
+            'currency': str(row.get('currency', '人民币')),
+            'trade_id': '',
+            'security_full_name': str(row.get('security_full_name', '')),
+            'remark': '',
+            'record_type': RecordType.STOCK_DIVIDEND,
+        }
+    
+    def _parse_dividend_tax(self, row: pd.Series) -> Dict[str, Any]:
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': self._format_code(row.get('security_code', '')),
+            'security_name': str(row.get('security_name', '')),
+            'business_type': '股息红利差异扣税',
+            'trade_type': 'dividend_tax',
+            'price': 0.0,
+            'quantity': 0,
+            'amount': 0.0,
+            'commission': 0.0,
+            'stamp_tax': 0.0,
+            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
+            'clearing_fee': 0.0,
+            'net_amount': 0.0,
+            'balance': self._safe_float(row.get('balance', 0)),
+            'position': 0,
+            'shareholder_code': str(row.get('shareholder_code', '')),
+            'currency': str(row.get('currency', '人民币')),
+            'trade_id': '',
+            'security_full_name': str(row.get('security_full_name', '')),
+            'remark': '',
+            'record_type': RecordType.DIVIDEND_TAX,
+        }
+    
+    def _parse_designate(self, row: pd.Series) -> Dict[str, Any]:
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': self._format_code(row.get('security_code', '')),
+            'security_name': str(row.get('security_name', '')),
+            'business_type': '指定交易',
+            'trade_type': 'designate',
+            'price': 0.0,
+            'quantity': 0,
+            'amount': 0.0,
+            'commission': 0.0,
+            'stamp_tax': 0.0,
+            'transfer_fee': 0.0,
+            'clearing_fee': 0.0,
+            'net_amount': 0.0,
+            'balance': 0.0,
+            'position': 0,
+            'shareholder_code': str(row.get('shareholder_code', '')),
+            'currency': str(row.get('currency', '人民币')),
+            'trade_id': str(row.get('trade_id', '')),
+            'security_full_name': str(row.get('security_full_name', '')),
+            'remark': '',
+            'record_type': RecordType.DESIGNATE,
+        }
+    
+    def _parse_unknown(self, row: pd.Series) -> Dict[str, Any]:
+        return {
+            'date': str(row.get('date', '')),
+            'security_code': self._format_code(row.get('security_code', '')),
+            'security_name': str(row.get('security_name', '')),
+            'business_type': str(row.get('business_type', '')),
+            'trade_type': 'unknown',
+            'price': self._safe_float(row.get('price', 0)),
+            'quantity': self._safe_int(row.get('quantity', 0)),
+            'amount': self._safe_float(row.get('amount', 0)),
+            'commission': self._safe_float(row.get('commission', 0)),
+            'stamp_tax': self._safe_float(row.get('stamp_tax', 0)),
+            'transfer_fee': self._safe_float(row.get('transfer_fee', 0)),
+            'clearing_fee': self._safe_float(row.get('clearing_fee', 0)),
+            'net_amount': self._safe_float(row.get('net_amount', 0)),
+            'balance': self._safe_float(row.get('balance', 0)),
+            'position': self._safe_int(row.get('position', 0)),
+            'shareholder_code': str(row.get('shareholder_code', '')),
+            'currency': str(row.get('currency', '人民币')),
+            'trade_id': str(row.get('trade_id', '')),
+            'security_full_name': str(row.get('security_full_name', '')),
+            'remark': str(row.get('remark', '')),
+            'record_type': RecordType.UNKNOWN,
+        }
+    
+    def _format_code(self, code) -> str:
+        if code is None:
+            return ''
+        code_str = str(code).strip()
+        if code_str == '' or code_str == 'nan':
+            return ''
+        if '.' in code_str:
+            code_str = code_str.split('.')[0]
+        if code_str.isdigit():
+            return code_str.zfill(6)
+        return code_str
+    
+    def _safe_float(self, value) -> float:
+        if value is None:
+            return 0.0
+        try:
+            if isinstance(value, str):
+                value = value.replace(',', '').strip()
+            return float(value)
+        except (ValueError, TypeError):
+            return 0.0
+    
+    def _safe_int(self, value) -> int:
+        if value is None:
+            return 0
+        try:
+            if isinstance(value, str):
+                value = value.replace(',', '').strip()
+            return int(float(value))
+        except (ValueError, TypeError):
+            return 0
+
+
+def reference_parse(df: pd.DataFrame) -> pd.DataFrame:
+    parser = ReferenceRecordParser()
+    records = [parser.parse_record(row) for _, row in df.iterrows()]
+    return pd.DataFrame(records, columns=PARSED_COLUMNS)
+
+
+def assert_same_records(actual: pd.DataFrame, expected: pd.DataFrame):
+    """
+    比较两种解析结果
+
+    逐行实现对缺失的数值保留 NaN，向量化实现统一按 0 处理，
+    因此数值列比较前先把 NaN 视为 0。
+    """
+    assert list(actual.columns) == PARSED_COLUMNS
+    assert len(actual) == len(expected)
+    for col in PARSED_COLUMNS:
+        if col in NUMERIC_COLUMNS:
+            np.testing.assert_allclose(
+                actual[col].astype(float).to_numpy(),
+                expected[col].astype(float).fillna(0.0).to_numpy(),
+                err_msg=col
+            )
+        else:
+            assert actual[col].astype(str).tolist() == expected[col].astype(str).tolist(), col
+
+
+def make_frame(rows) -> pd.DataFrame:
+    columns = list(RecordParser.COLUMN_MAPPING.values())
+    return pd.DataFrame([{col: row.get(col) for col in columns} for row in rows], columns=columns)
+
+
+class TestRecordParser:
+    """向量化解析与逐行参考实现对照"""
+
+    def setup_method(self):
+        self.parser = RecordParser()
+
+    def test_record_types(self):
+        """测试各业务类型识别"""
+        df = make_frame([
+            {'business_type': '证券买入', 'security_code': '2050'},
+            {'business_type': '证券卖出', 'security_code': '600519'},
+            {'business_type': '融券回购', 'security_code': '204001'},
+            {'business_type': '融券购回', 'security_code': '131810'},
+            {'business_type': '红利入账', 'security_code': '603533'},
+            {'business_type': '红股入账', 'security_code': '688516'},
+            {'business_type': '股息红利差异扣税', 'security_code': '603533'},
+            {'business_type': '指定登记', 'security_code': '799999'},
+            {'business_type': '利息归本'},
+            {'business_type': '0', 'security_code': '银行转证券'},
+            {'business_type': '0.0', 'security_code': '000001'},
+            {'business_type': '新股申购'},
+        ])
+        expected = [ReferenceRecordParser().identify_record_type(row) for _, row in df.iterrows()]
+        assert self.parser.identify_record_types(df).tolist() == expected
+
+    def test_trade_fields(self):
+        """测试买卖记录字段解析（千分位、小数代码、缺失值）"""
+        df = make_frame([
+            {'date': 20240102, 'security_code': 2050.0, 'security_name': '三花智控',
+             'business_type': '证券买入', 'price': '25.10', 'quantity': '1,000',
+             'amount': '25,100.00', 'commission': 5.0, 'stamp_tax': np.nan,
+             'net_amount': -25105.0, 'balance': 1000.0, 'position': 1000},
+            {'date': 20240103, 'security_code': '600519', 'business_type': '证券卖出',
+             'price': 1700.5, 'quantity': 100, 'amount': 170050.0, 'stamp_tax': 85.03,
+             'net_amount': 169960.0, 'balance': 170960.0, 'remark': '卖出'},
+        ])
+        assert_same_records(self.parser.parse_frame(df), reference_parse(df))
+
+    def test_misaligned_transfer(self):
+        """测试银行转账/利息归本的错位字段"""
+        df = make_frame([
+            {'date': 20230522, 'security_code': '银行转证券', 'business_type': '0',
+             'net_amount': '人民币', 'stamp_tax': 600000.0, 'transfer_fee': 600000.0},
+            {'date': 20230614, 'business_type': '证券转银行',
+             'net_amount': -10000.0, 'balance': 82.26, 'currency': '人民币'},
+            {'date': 20230620, 'security_code': '利息归本', 'business_type': '0',
+             'net_amount': 'RMB', 'stamp_tax': 18.29, 'transfer_fee': 307679.56},
+            {'date': 20230621, 'business_type': '利息归本', 'net_amount': 0.5, 'balance': 10.0},
+        ])
+        assert_same_records(self.parser.parse_frame(df), reference_parse(df))
+
+    def test_empty_frame(self):
+        """测试空表"""
+        parsed = self.parser.parse_frame(make_frame([]))
+        assert parsed.empty
+        assert list(parsed.columns) == PARSED_COLUMNS
+
+    @pytest.mark.parametrize('filename', ['23_26_交割单查询.xls', '23_26_settlement.xlsx'])
+    def test_real_settlement_files(self, filename):
+        """测试真实交割单与参考实现一致"""
+        from trade_analysis.models.data_cleaner import DataCleaner
+
+        path = RAW_DIR / filename
+        if not path.exists():
+            pytest.skip(f"缺少样例文件 {filename}")
+
+        cleaner = DataCleaner(str(path))
+        if path.suffix == '.xls':
+            df = pd.read_csv(path, encoding='gbk', sep='\t', header=0)
+        else:
+            df = pd.read_excel(path, header=0)
+        df = cleaner._standardize_columns(df)
+
+        assert_same_records(self.parser.parse_frame(df), reference_parse(df))
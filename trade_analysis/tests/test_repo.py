@@ -0,0 +1,90 @@
+"""
+逆回购配对与计息测试
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.repo import RepoEngine, repo_tenor
+from trade_analysis.models.schema import apply_trade_schema
+
+
+def make_records(rows) -> pd.DataFrame:
+    """rows: (date, code, trade_type, rate, quantity, amount, fee)"""
+    df = pd.DataFrame(rows, columns=['date', 'security_code', 'trade_type', 'price', 'quantity', 'amount', 'fee'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['net_amount'] = df['amount'].where(df['trade_type'] == 'repo_return', -df['amount']) - df['fee']
+    # 与清洗后、从数据库读出的记录相同的类型（datetime64[s] 日期、category 代码）
+    return apply_trade_schema(df.drop(columns='fee'))
+
+
+@pytest.fixture
+def records():
+    return make_records([
+        # 周五出借 1 天期，周一购回
+        ('2024-01-05', '204001', 'repo_lend', 2.0, 1000, 100000.0, 1.0),
+        ('2024-01-08', '204001', 'repo_return', 2.0, 1000, 100016.44, 0.0),
+        # 同日两笔 1 天期同数量，以及一笔 7 天期
+        ('2024-01-08', '131810', 'repo_lend', 1.8, 100, 10000.0, 0.1),
+        ('2024-01-08', '131801', 'repo_lend', 2.5, 100, 10000.0, 0.1),
+        ('2024-01-09', '131810', 'repo_return', 1.8, 100, 10000.49, 0.0),
+        ('2024-01-09', '131810', 'repo_lend', 1.8, 100, 10000.0, 0.1),
+        ('2024-01-10', '131810', 'repo_return', 1.8, 100, 10000.49, 0.0),
+        ('2024-01-15', '131801', 'repo_return', 2.5, 100, 10004.79, 0.0),
+        # 期末未到期
+        ('2024-01-15', '131810', 'repo_lend', 3.65, 200, 20000.0, 0.2),
+    ])
+
+
+class TestRepoEngine:
+    """逆回购配对与计息测试"""
+
+    def test_matching_by_tenor(self, records):
+        contracts = RepoEngine(records).contracts
+
+        assert contracts['matched'].tolist() == [True, True, True, True, False]
+        assert contracts['return_date'].dt.strftime('%m-%d').tolist()[:4] == ['01-08', '01-09', '01-15', '01-10']
+        assert contracts['days'].tolist() == [3, 1, 7, 1, 1]
+        assert contracts.loc[0, 'interest'] == pytest.approx(16.44)
+        assert contracts.loc[0, 'fee'] == pytest.approx(1.0)
+        # 未到期按年化利率预估
+        assert contracts.loc[4, 'interest'] == pytest.approx(20000 * 0.0365 / 365)
+
+    def test_repo_profit(self, records):
+        engine = RepoEngine(records)
+
+        assert engine.repo_profit() == pytest.approx(16.44 + 0.49 + 4.79 + 0.49 - 1.5)
+        assert engine.unmatched_returns == 0
+
+    def test_balances(self, records):
+        balances = RepoEngine(records).balances()
+
+        assert balances.loc['2024-01-05', 'outstanding'] == 100000
+        assert balances.loc['2024-01-05', 'accrued_interest'] == pytest.approx(0.0)
+        assert balances.loc['2024-01-06', 'accrued_interest'] == pytest.approx(16.44 / 3)
+        assert balances.loc['2024-01-08', 'outstanding'] == 20000
+        assert balances.loc['2024-01-12', 'accrued_interest'] == pytest.approx(4.79 * 4 / 7)
+        assert balances.loc['2024-01-15', 'outstanding'] == 20000
+
+    def test_unmatched_stays_open_until_data_ends(self, records):
+        later = make_records([('2024-01-18', '', 'transfer_in', 0.0, 0, 5000.0, 0.0)])
+        engine = RepoEngine(pd.concat([records, later], ignore_index=True))
+        balances = engine.balances(['2024-01-04', '2024-01-15', '2024-01-18', '2024-01-19'])
+
+        # 预计 01-16 到期但一直没有购回记录，保留到数据截止日
+        assert balances['outstanding'].tolist() == [0, 20000, 20000, 0]
+        assert balances['accrued_interest'].tolist() == pytest.approx([0.0, 0.0, 2.0, 0.0])
+
+    def test_tenor_and_empty(self):
+        assert repo_tenor('204007') == 7
+        assert repo_tenor('131811') == 2
+
+        empty = RepoEngine(make_records([]).astype({'date': 'datetime64[ns]'}))
+        assert empty.contracts.empty
+        assert empty.repo_profit() == 0
+        assert empty.balances(['2024-01-02'])['outstanding'].tolist() == [0.0]
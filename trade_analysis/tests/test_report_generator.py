@@ -0,0 +1,69 @@
+"""
+Excel 报告写出测试
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from trade_analysis.models.report_generator import ReportGenerator
+
+
+@pytest.fixture
+def data():
+    trade_results = pd.DataFrame({
+        '证券代码': ['600000', '000001', '300750'],
+        '买入日期': pd.to_datetime(['2024-01-02', '2024-01-03', None]),
+        '盈亏': [100.5, -20.0, None],
+    })
+    return {
+        'summary': {'mode': 'full', 'start_date': '20240101'},
+        'positions': {'600000': {'name': '浦发银行', 'quantity': 100, 'cost_price': 9.5, 'close_price': 10.0}},
+        'trade_results': trade_results,
+        'monthly_performance': pd.DataFrame(),
+    }
+
+
+def read_sheets(path):
+    wb = openpyxl.load_workbook(path)
+    return {name: [[cell.value for cell in row] for row in wb[name].iter_rows()] for name in wb.sheetnames}
+
+
+class TestExcelReport:
+    """Excel 报告写出测试"""
+
+    def test_streaming_matches_normal(self, tmp_path, data):
+        generator = ReportGenerator(str(tmp_path))
+        normal = read_sheets(generator.generate_excel_report(data, 'normal.xlsx', streaming=False))
+        stream = read_sheets(generator.generate_excel_report(data, 'stream.xlsx', streaming=True))
+
+        assert list(stream) == list(normal) == ['汇总', '交易明细']
+        assert stream['交易明细'] == normal['交易明细']
+        assert stream['交易明细'][3] == ['300750', None, None]
+        # 普通模式标题合并到 D 列，只写模式不合并，只比较前两列
+        assert [row[:2] for row in stream['汇总']] == [row[:2] for row in normal['汇总']]
+
+    def test_streaming_styles(self, tmp_path, data):
+        path = ReportGenerator(str(tmp_path)).generate_excel_report(data, 'stream.xlsx', streaming=True)
+        wb = openpyxl.load_workbook(path)
+
+        assert wb['汇总']['A1'].font.b
+        assert wb['交易明细']['A1'].fill.fgColor.rgb.endswith('4472C4')
+        assert wb['交易明细']['A2'].font.b is not True
+
+    def test_auto_streaming_threshold(self, tmp_path, data, monkeypatch):
+        import trade_analysis.models.report_generator as report_generator
+        monkeypatch.setattr(report_generator, 'EXCEL_STREAMING_ROWS', 2)
+        calls = []
+        monkeypatch.setattr(ReportGenerator, '_stream_dataframe',
+                            lambda self, ws, df, styles: calls.append(len(df)))
+
+        ReportGenerator(str(tmp_path)).generate_excel_report(data, 'auto.xlsx')
+
+        assert calls == [3]
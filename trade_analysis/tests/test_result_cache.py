@@ -0,0 +1,141 @@
+"""
+数据版本与派生结果缓存测试
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.services.result_cache import ResultCache
+
+
+def make_records(*dates: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': pd.to_datetime(list(dates)),
+        'security_code': '600000',
+        'trade_type': 'buy',
+        'price': 10.0,
+        'quantity': 100,
+        'amount': 1000.0,
+        'net_amount': -1000.0,
+        'trade_id': [str(i) for i in range(len(dates))],
+    })
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseManager(str(tmp_path / 'trade.db'))
+
+
+@pytest.fixture
+def cache(tmp_path, db):
+    return ResultCache(str(tmp_path / 'cache'), db)
+
+
+class TestDataVersion:
+    def test_writes_bump_only_their_table(self, db):
+        assert db.get_data_version() == {'trade_records': 0, 'daily_prices': 0}
+
+        db.save_daily_prices([{'date': '20240102', 'security_code': '600000', 'close_price': 10.0}])
+        assert db.get_data_version() == {'trade_records': 0, 'daily_prices': 1}
+
+        # 一次写入只加一，与行数无关
+        db.insert_trade_records(make_records('2024-01-02', '2024-01-03'))
+        assert db.get_data_version(['trade_records']) == {'trade_records': 1}
+        db.insert_trade_records(make_records('2024-01-04'))
+        assert db.get_data_version() == {'trade_records': 2, 'daily_prices': 1}
+
+    def test_legacy_row_triggers_are_dropped(self, tmp_path):
+        path = tmp_path / 'trade.db'
+        DatabaseManager(str(path))
+        conn = sqlite3.connect(path)
+        conn.execute('''
+            CREATE TRIGGER trg_trade_records_insert_version AFTER INSERT ON trade_records
+            BEGIN UPDATE data_version SET version = version + 1 WHERE name = 'trade_records'; END
+        ''')
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(str(path))
+        db.insert_trade_records(make_records('2024-01-02', '2024-01-03'))
+        assert db.get_data_version(['trade_records']) == {'trade_records': 1}
+
+    def test_database_id(self, tmp_path):
+        a = DatabaseManager(str(tmp_path / 'a.db'))
+        assert a.get_database_id() == DatabaseManager(str(tmp_path / 'a.db')).get_database_id()
+        assert a.get_database_id() != DatabaseManager(str(tmp_path / 'b.db')).get_database_id()
+
+    def test_clear_bumps(self, db):
+        db.insert_trade_records(make_records('2024-01-02'))
+        before = db.get_data_version()['trade_records']
+        db.clear_all_data()
+        assert db.get_data_version()['trade_records'] > before
+
+
+class TestResultCache:
+    def test_hit_until_dependency_changes(self, db, cache):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_compute('count', {'a': 1}, compute) == 1
+        assert cache.get_or_compute('count', {'a': 1}, compute) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # 不相关的表写入不失效
+        db.save_daily_prices([{'date': '20240102', 'security_code': '600000', 'close_price': 10.0}])
+        assert cache.get_or_compute('count', {'a': 1}, compute) == 1
+
+        db.insert_trade_records(make_records('2024-01-02'))
+        assert cache.get_or_compute('count', {'a': 1}, compute) == 2
+
+    def test_databases_do_not_share_results(self, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        a = DatabaseManager(str(tmp_path / 'a.db'))
+        b = DatabaseManager(str(tmp_path / 'b.db'))
+        records = make_records('2024-01-02', '2024-01-03')
+        a.insert_trade_records(records)
+        b.insert_trade_records(records.assign(price=20.0))
+        assert a.get_data_version() == b.get_data_version()
+
+        load = lambda db: lambda: db.get_all_trade_records()['price'].tolist()
+        assert ResultCache(cache_dir, a).get_or_compute('trade_records', {}, load(a)) == [10.0, 10.0]
+        assert ResultCache(cache_dir, b).get_or_compute('trade_records', {}, load(b)) == [20.0, 20.0]
+
+        # 删除后重建、写入次数相同的数据库
+        Path(a.db_path).unlink()
+        rebuilt = DatabaseManager(str(tmp_path / 'a.db'))
+        rebuilt.insert_trade_records(records.assign(price=30.0))
+        assert ResultCache(cache_dir, rebuilt).get_or_compute('trade_records', {}, load(rebuilt)) == [30.0, 30.0]
+
+    def test_params_are_separate_and_old_versions_pruned(self, db, cache, tmp_path):
+        cache.get_or_compute('value', {'a': 1}, lambda: 'one')
+        cache.get_or_compute('value', {'a': 2}, lambda: 'two')
+        assert cache.get_or_compute('value', {'a': 1}, lambda: 'changed') == 'one'
+
+        db.insert_trade_records(make_records('2024-01-02'))
+        assert cache.get_or_compute('value', {'a': 1}, lambda: 'new') == 'new'
+        assert len(list((tmp_path / 'cache' / 'value').glob('*.pkl'))) == 2
+
+    def test_render_files(self, db, cache):
+        def render(directory: Path):
+            path = directory / 'report.txt'
+            path.write_text('report')
+            return {'text': str(path)}
+
+        first = cache.get_or_render('reports', {'x': 1}, render)
+        assert Path(first['text']).read_text() == 'report'
+        assert cache.get_or_render('reports', {'x': 1}, lambda d: pytest.fail('应命中缓存')) == first
+
+        db.save_daily_prices([{'date': '20240102', 'security_code': '600000', 'close_price': 10.0}])
+        second = cache.get_or_render('reports', {'x': 1}, render)
+        assert second != first
+        assert not Path(first['text']).exists()
@@ -0,0 +1,121 @@
+"""
+滚动窗口绩效指标测试
+
+累计和 / 单调队列实现与逐窗口直接计算的结果对照。
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.performance import PerformanceCalculator
+from trade_analysis.models.rolling_metrics import (
+    calculate_rolling_metrics, rolling_max, rolling_max_drawdown, rolling_sum
+)
+
+
+def make_equity(n: int = 300, seed: int = 7) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    values = 1_000_000 * np.cumprod(1 + rng.normal(0.0005, 0.012, n))
+    return pd.Series(values, index=pd.bdate_range('2023-01-02', periods=n))
+
+
+def naive_window(values: np.ndarray, t: int, window: int, risk_free_rate: float = 0.03) -> dict:
+    """直接对窗口 values[t-window..t] 计算各项指标"""
+    segment = values[t - window:t + 1]
+    returns = segment[1:] / segment[:-1] - 1
+    std = np.std(returns)
+    running_peak = np.maximum.accumulate(segment)
+    drawdowns = (running_peak - segment) / running_peak * 100
+    annualized_return = ((segment[-1] / segment[0]) ** (252 / window) - 1) * 100
+    return {
+        'sharpe': (np.mean(returns) * 252 - risk_free_rate) / (std * np.sqrt(252)),
+        'volatility': std * np.sqrt(252) * 100,
+        'drawdown': drawdowns[-1],
+        'max_drawdown': drawdowns.max(),
+        'calmar': annualized_return / drawdowns.max(),
+        'win_rate': (returns > 0).mean() * 100,
+    }
+
+
+class TestRollingMetrics:
+    """滚动指标测试"""
+
+    def test_rolling_helpers(self):
+        values = np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0])
+
+        assert np.allclose(rolling_sum(values, 3)[2:], pd.Series(values).rolling(3).sum().values[2:])
+        assert np.isnan(rolling_sum(values, 3)[:2]).all()
+        assert rolling_max(values, 3).tolist() == pd.Series(values).rolling(3, min_periods=1).max().tolist()
+
+    @pytest.mark.parametrize('window', [20, 60])
+    def test_matches_naive(self, window):
+        equity = make_equity()
+        result = calculate_rolling_metrics(equity, windows=[window])
+        values = equity.values
+
+        assert result[f'sharpe_{window}'].iloc[:window].isna().all()
+        for t in [window, window + 1, 150, len(values) - 1]:
+            expected = naive_window(values, t, window)
+            for metric, value in expected.items():
+                assert result[f'{metric}_{window}'].iloc[t] == pytest.approx(value, rel=1e-6), (metric, t)
+
+    def test_max_drawdown_ignores_peaks_before_window(self):
+        values = np.array([100, 120, 110, 100, 90, 95, 100, 105, 110, 108, 106], dtype=float)
+        result = calculate_rolling_metrics(pd.Series(values, index=pd.bdate_range('2024-01-01', periods=11)), windows=[3])
+
+        expected = [16.667, 25.0, 18.182, 10.0, 0.0, 0.0, 1.818, 3.636]
+        assert result['max_drawdown_3'].iloc[3:].round(3).tolist() == expected
+        assert np.isnan(rolling_max_drawdown(values, 4)[:3]).all()
+        # 窗口 [90, 95, 100, 105] 单调上涨，没有回撤
+        assert np.isnan(result['calmar_3'].iloc[7])
+
+    def test_max_drawdown_matches_direct_per_window(self):
+        rng = np.random.default_rng(3)
+        # 整数取值含大量相等值，以及 0 和负数（峰值不为正时回撤记 0）
+        for values in (rng.integers(-2, 8, 97).astype(float), make_equity(97).to_numpy()):
+            for window in (2, 5, 16, 97):
+                expected = np.full(len(values), np.nan)
+                for t in range(window - 1, len(values)):
+                    segment = values[t - window + 1:t + 1]
+                    peaks = np.maximum.accumulate(segment)
+                    expected[t] = np.where(peaks > 0, (peaks - segment) / np.where(peaks > 0, peaks, 1) * 100, 0.0).max()
+                assert np.allclose(rolling_max_drawdown(values, window), expected, equal_nan=True), window
+
+    def test_window_longer_than_history(self):
+        result = calculate_rolling_metrics(make_equity(30), windows=[250])
+
+        assert len(result) == 30
+        assert result.drop(columns='date').isna().all().all()
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            calculate_rolling_metrics(make_equity(), windows=[1])
+
+    def test_performance_calculator(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-02', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']),
+            'security_code': ['银行转证券', '600519', '600519', '131810', '600519'],
+            'trade_type': ['transfer_in', 'buy', 'sell', 'repo_lend', 'buy'],
+            'quantity': [0, 100, 50, 10, 100],
+            'price': [0.0, 10.0, 12.0, 1.8, 11.0],
+            'amount': [100000.0, 1000.0, 600.0, 1000.0, 1100.0],
+            'net_amount': [100000.0, -1000.0, 600.0, -1000.0, -1100.0],
+            'balance': [100000.0, 99000.0, 99600.0, 98600.0, 97500.0],
+            'total_fee': [0.0] * 5,
+            'security_name': [''] * 5,
+        })
+
+        daily = PerformanceCalculator(df)._calculate_daily_total_assets()
+
+        # 现金 + 逆回购余额 + 持仓 x 截至当日最后成交价
+        assert daily['total_assets'].tolist() == pytest.approx([100000.0, 100200.0, 100200.0, 100150.0])
+
+        rolling = PerformanceCalculator(df).get_rolling_metrics(windows=(2,))
+        assert list(rolling.columns[:2]) == ['date', 'sharpe_2']
+        assert len(rolling) == 4
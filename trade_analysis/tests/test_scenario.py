@@ -0,0 +1,73 @@
+"""
+持仓压力测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.scenario import StressTester, Shock, sector_shock
+
+
+@pytest.fixture
+def tester():
+    positions = {
+        '600000': {'name': '浦发银行', 'quantity': 1000, 'cost_price': 9.0, 'close_price': 10.0},
+        '300750': {'name': '宁德时代', 'quantity': 100, 'cost_price': 200.0, 'close_price': 0},
+        '688111': {'name': '金山办公', 'quantity': 10, 'cost_price': 300.0, 'close_price': 250.0},
+    }
+    return StressTester(positions, nav=100000.0)
+
+
+class TestStressTester:
+    """持仓压力测试"""
+
+    def test_market_value_falls_back_to_cost(self, tester):
+        assert tester.market_value.tolist() == [10000.0, 20000.0, 2500.0]
+
+    def test_shocks_are_sorted_by_loss(self, tester):
+        table = tester.run({
+            '全部 -5%': [Shock(-0.05)],
+            '创业板 -10%': [Shock(-0.10, board='创业板')],
+            '叠加': [Shock(-0.05), Shock(-0.10, board='创业板')],
+            '上涨': [Shock(0.02)],
+        })
+
+        assert table['scenario'].tolist() == ['叠加', '创业板 -10%', '全部 -5%', '上涨']
+        assert table.loc[0, 'pnl'] == pytest.approx(-0.05 * 32500 - 0.10 * 20000)
+        assert table.loc[2, 'pnl_pct'] == pytest.approx(-0.05 * 32500 / 100000 * 100)
+        assert table.loc[2, 'nav_after'] == pytest.approx(100000 - 1625)
+
+    def test_sector_shock(self, tester):
+        shock = sector_shock({'600000': '银行', '300750': '电池'}, '银行', -0.2)
+        table = tester.run({'银行 -20%': [shock]})
+
+        assert table.loc[0, 'pnl'] == pytest.approx(-2000.0)
+
+    def test_replay(self, tester):
+        dates = pd.bdate_range('2024-01-01', periods=4)
+        prices = pd.DataFrame({
+            '600000': [10.0, 9.0, 9.9, np.nan],
+            '300750': [200.0, 210.0, 189.0, 189.0],
+            '999999': [1.0, 2.0, 3.0, 4.0],
+        }, index=dates)
+
+        table = tester.replay(prices)
+
+        assert len(table) == 3
+        worst = table.iloc[0]
+        assert worst['scenario'] == '2024-01-03'
+        assert worst['pnl'] == pytest.approx(0.1 * 10000 - 0.1 * 20000)
+        # 缺失价格按 0 冲击
+        assert table.set_index('scenario').loc['2024-01-04', 'pnl'] == pytest.approx(0.0)
+
+    def test_contributions(self, tester):
+        table = tester.contributions([Shock(-0.1, codes=('688111', '600000'))])
+
+        assert table['security_code'].tolist() == ['600000', '688111', '300750']
+        assert table['pnl'].tolist() == pytest.approx([-1000.0, -250.0, 0.0])
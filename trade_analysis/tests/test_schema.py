@@ -0,0 +1,122 @@
+"""
+交易记录类型约定测试
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.models.data_cleaner import DataCleaner
+from trade_analysis.models.performance import PerformanceCalculator
+from trade_analysis.models.profit_calculator import ProfitCalculator
+from trade_analysis.models.repo import RepoEngine
+from trade_analysis.models.schema import apply_trade_schema, memory_report, DATE_DTYPE
+from trade_analysis.tools.settlement_generator import SyntheticConfig, generate_settlement, write_settlement
+
+
+def make_records(n: int = 200) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2024-01-02', '2024-01-03'] * (n // 2)),
+        'security_code': ['600519', '131810'] * (n // 2),
+        'security_name': ['贵州茅台', 'Ｒ-001'] * (n // 2),
+        'business_type': ['证券买入', '融券回购'] * (n // 2),
+        'trade_type': ['buy', 'repo_lend'] * (n // 2),
+        'currency': ['人民币'] * n,
+        'record_type': ['trade', 'repo'] * (n // 2),
+        'price': [1500.0, 1.885] * (n // 2),
+        'quantity': np.arange(n, dtype='int64'),
+        'position': np.arange(n, dtype='int64'),
+        'amount': np.ones(n),
+        'is_repo': [False, True] * (n // 2),
+    })
+
+
+class TestTradeSchema:
+    """类型约定测试"""
+
+    def test_dtypes(self):
+        df = apply_trade_schema(make_records())
+
+        assert isinstance(df['security_code'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['trade_type'].dtype, pd.CategoricalDtype)
+        assert df['quantity'].dtype == np.int32
+        assert df['date'].dtype == DATE_DTYPE
+        assert df['amount'].dtype == np.float64
+
+    def test_values_preserved(self):
+        raw = make_records()
+        df = apply_trade_schema(raw)
+
+        assert df['security_code'].astype(str).tolist() == raw['security_code'].tolist()
+        assert (df['date'] == raw['date']).all()
+        assert df['quantity'].sum() == raw['quantity'].sum()
+        assert (df['trade_type'] == 'buy').sum() == 100
+
+    def test_int32_overflow_keeps_int64(self):
+        raw = make_records()
+        raw.loc[0, 'position'] = 2 ** 40
+
+        df = apply_trade_schema(raw)
+
+        assert df['quantity'].dtype == np.int32
+        assert df['position'].dtype == np.int64
+
+    def test_memory_report(self):
+        report = memory_report(make_records(2000))
+
+        total = report.iloc[-1]
+        assert total['列名'] == '合计'
+        assert total['新占用(KB)'] < total['原占用(KB)']
+
+    def test_db_load_applies_schema(self, tmp_path):
+        db = DatabaseManager(str(tmp_path / 'trade.db'))
+        db.insert_trade_records(make_records().assign(trade_id=[str(i) for i in range(200)]))
+
+        df = db.load_trade_records()
+
+        assert len(df) == 200
+        assert isinstance(df['security_code'].dtype, pd.CategoricalDtype)
+        assert df['date'].dtype == DATE_DTYPE
+
+
+class TestSchemaTypedPipeline:
+    """
+    datetime64[s] 日期参与日期运算和 merge_asof 的计算，结果须与 datetime64[ns] 日期相同
+
+    pandas 2 中秒精度日期加 Timedelta 得到纳秒精度，与未运算的列合并时会报键类型不一致
+    """
+
+    def test_matches_nanosecond_dates(self, tmp_path):
+        path = write_settlement(
+            generate_settlement(SyntheticConfig(records=1500, securities=8, seed=11)), str(tmp_path / 'synthetic.xls')
+        )
+        cleaner = DataCleaner(path)
+        cleaner.load_data()
+        typed = cleaner.clean()
+        assert typed['date'].dtype == DATE_DTYPE
+        assert (typed['trade_type'] == 'repo_lend').any()
+        nanos = typed.assign(date=typed['date'].astype('datetime64[ns]'))
+
+        results = []
+        for df in (typed, nanos):
+            repo = RepoEngine(df).contracts
+            perf = PerformanceCalculator(df)
+            nav = perf._calculate_daily_total_assets()
+            drawdowns = perf.get_security_drawdowns()
+            profit = ProfitCalculator(df).calculate_account_profit({})
+            results.append((repo, nav, drawdowns, profit))
+
+        (repo, nav, drawdowns, profit), (repo_ns, nav_ns, drawdowns_ns, profit_ns) = results
+        assert repo['matched'].any()
+        assert repo['matched'].tolist() == repo_ns['matched'].tolist()
+        assert repo['interest'].tolist() == pytest.approx(repo_ns['interest'].tolist())
+        assert nav['total_assets'].tolist() == pytest.approx(nav_ns['total_assets'].tolist())
+        assert (nav['date'].values == nav_ns['date'].values).all()
+        assert len(drawdowns) == len(drawdowns_ns)
+        assert profit.total_profit == pytest.approx(profit_ns.total_profit)
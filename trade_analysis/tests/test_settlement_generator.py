@@ -0,0 +1,71 @@
+"""
+模拟交割单生成器测试
+
+生成的数据需与真实导出一致：资金余额连续、持仓不为负，写出的 .xls 能被 DataCleaner 解析。
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.models.data_cleaner import DataCleaner
+from trade_analysis.tools.settlement_generator import (
+    SETTLEMENT_COLUMNS, SyntheticConfig, generate_settlement, write_settlement
+)
+
+
+@pytest.fixture(scope='module')
+def settlement():
+    return generate_settlement(SyntheticConfig(records=3000, securities=20, seed=1))
+
+
+class TestGenerateSettlement:
+    def test_layout(self, settlement):
+        assert list(settlement.columns) == SETTLEMENT_COLUMNS
+        assert 2500 <= len(settlement) <= 3500
+        dates = settlement['交割日期'].astype(str)
+        assert dates.is_monotonic_increasing
+        assert settlement['业务类型'].iloc[0] == '指定交易'
+
+    def test_balance_is_running_sum(self, settlement):
+        balance = settlement['剩余金额'].to_numpy()
+        flows = settlement['发生金额'].fillna(0).to_numpy()
+        assert np.allclose(np.diff(balance), flows[1:], atol=0.011)
+
+    def test_positions_never_negative(self, settlement):
+        stocks = settlement[settlement['业务类型'].isin(['证券买入', '证券卖出', '红股入账'])]
+        assert (stocks['证券数量'] >= 0).all()
+
+    def test_mix(self, settlement):
+        counts = settlement['业务类型'].value_counts()
+        assert counts.get('融券回购', 0) == counts.get('融券购回', 0) > 0
+        assert counts.get('红利入账', 0) > 0
+        assert counts.get('证券卖出', 0) > 0
+
+    def test_seed_is_reproducible(self):
+        config = SyntheticConfig(records=500, seed=7)
+        pd.testing.assert_frame_equal(generate_settlement(config), generate_settlement(config))
+
+
+class TestWriteSettlement:
+    def test_text_xls_round_trip(self, settlement, tmp_path):
+        path = write_settlement(settlement, str(tmp_path / 'synthetic.xls'))
+        raw = Path(path).read_bytes()
+        assert b'\r\n' not in raw
+        assert '交割日期'.encode('gbk') in raw
+
+        cleaner = DataCleaner(path)
+        cleaner.load_data()
+        df = cleaner.clean()
+        assert len(df) == len(settlement)
+        assert set(df['trade_type']) >= {'buy', 'sell', 'repo_lend', 'repo_return', 'dividend'}
+        assert df['balance'].iloc[-1] == pytest.approx(settlement['剩余金额'].iloc[-1])
+
+    def test_unknown_format(self, settlement, tmp_path):
+        with pytest.raises(ValueError):
+            write_settlement(settlement, str(tmp_path / 'synthetic.txt'))
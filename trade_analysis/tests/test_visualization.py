@@ -0,0 +1,82 @@
+"""
+图表批量绘制测试（不依赖 matplotlib 的部分：降采样、输入哈希与缓存）
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from trade_analysis.tools import visualization
+from trade_analysis.tools.visualization import Visualizer, ChartJob, lttb_downsample
+
+
+def fake_plot(self, df, save_path=None, title=''):
+    (self.output_dir / save_path).write_text(f'{title}{len(df)}')
+    return str(self.output_dir / save_path)
+
+
+@pytest.fixture
+def visualizer(tmp_path, monkeypatch):
+    monkeypatch.setattr(Visualizer, 'plot_fake', fake_plot, raising=False)
+    return Visualizer(str(tmp_path))
+
+
+class TestLTTB:
+    """LTTB 降采样测试"""
+
+    def test_keeps_endpoints_and_spikes(self):
+        y = np.zeros(1000)
+        y[500] = 100.0
+        y[700] = -50.0
+
+        selected = lttb_downsample(np.arange(1000), y, 50)
+
+        assert len(selected) == 50
+        assert selected[0] == 0 and selected[-1] == 999
+        assert (np.diff(selected) > 0).all()
+        assert 500 in selected and 700 in selected
+
+    def test_short_series_unchanged(self):
+        assert lttb_downsample(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+class TestRenderBatch:
+    """批量绘制与缓存测试"""
+
+    def test_content_hash(self):
+        df = pd.DataFrame({'a': [1.0, 2.0]})
+
+        same = ChartJob('plot_fake', 'a.png', (df.copy(),)).content_hash()
+        assert ChartJob('plot_fake', 'b.png', (df,)).content_hash() == same
+        assert ChartJob('plot_fake', 'a.png', (df.assign(a=[1.0, 3.0]),)).content_hash() != same
+        assert ChartJob('plot_fake', 'a.png', (df,), {'title': 'x'}).content_hash() != same
+
+    def test_skips_unchanged_charts(self, visualizer, monkeypatch):
+        df = pd.DataFrame({'a': [1, 2, 3]})
+        jobs = [ChartJob('plot_fake', 'one.png', (df,)), ChartJob('plot_fake', 'two.png', (df,), {'title': 't'})]
+
+        first = visualizer.render_batch(jobs, max_workers=1)
+        assert (visualizer.output_dir / 'two.png').read_text() == 't3'
+
+        calls = []
+        monkeypatch.setattr(visualization, '_render_job', lambda output_dir, job: calls.append(job.save_path) or None)
+        assert visualizer.render_batch(jobs, max_workers=1) == first
+        assert calls == []
+
+        changed = [ChartJob('plot_fake', 'one.png', (df.head(2),)), jobs[1]]
+        visualizer.render_batch(changed, max_workers=1)
+        assert calls == ['one.png']
+
+    def test_missing_png_is_redrawn(self, visualizer):
+        job = ChartJob('plot_fake', 'one.png', (pd.DataFrame({'a': [1]}),))
+        visualizer.render_batch([job], max_workers=1)
+        (visualizer.output_dir / 'one.png').unlink()
+
+        assert not visualizer.is_cached(job)
+        visualizer.render_batch([job], max_workers=1)
+        assert visualizer.is_cached(job)
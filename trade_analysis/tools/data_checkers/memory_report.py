@@ -0,0 +1,65 @@
+"""
+对比交易记录应用类型约定前后的内存占用
+
+用法:
+    python tools/data_checkers/memory_report.py              # 读取数据库中的全部交易记录
+    python tools/data_checkers/memory_report.py --repeat 50  # 将历史复制 50 份，模拟多账户多年的数据量
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# 将项目根目录添加到 Python 路径
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+from trade_analysis.db.database import DatabaseManager
+from trade_analysis.models.schema import apply_trade_schema, memory_report, memory_usage
+from trade_analysis.utils.date_utils import day_numbers_to_datetime
+
+DB_PATH = str(Path(__file__).parent.parent.parent / 'data' / 'trade_data.db')
+
+
+def load_raw_records(db_path: str) -> pd.DataFrame:
+    """不经过类型约定，直接读取 trade_records"""
+    db = DatabaseManager(db_path)
+    conn = db._get_connection()
+    df = pd.read_sql_query("SELECT * FROM trade_records ORDER BY date, id", conn)
+    conn.close()
+    df['date'] = day_numbers_to_datetime(df['date'])
+    return df
+
+
+def report(db_path: str, repeat: int):
+    print("=" * 80)
+    print("交易记录内存占用")
+    print("=" * 80)
+
+    raw = load_raw_records(db_path)
+    if raw.empty:
+        print("\n数据库中没有交易记录")
+        return
+
+    if repeat > 1:
+        raw = pd.concat([raw] * repeat, ignore_index=True)
+
+    compact = apply_trade_schema(raw)
+
+    print(f"\n记录数: {len(raw)}")
+    print(f"原占用: {memory_usage(raw) / 1024 / 1024:.2f} MB")
+    print(f"新占用: {memory_usage(compact) / 1024 / 1024:.2f} MB")
+    print()
+
+    with pd.option_context('display.max_rows', None, 'display.width', 120,
+                           'display.float_format', '{:.1f}'.format):
+        print(memory_report(raw, compact).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='交易记录内存占用对比')
+    parser.add_argument('--db', default=DB_PATH, help='数据库路径')
+    parser.add_argument('--repeat', type=int, default=1, help='将历史复制多少份')
+    args = parser.parse_args()
+    report(args.db, args.repeat)
@@ -10,8 +10,7 @@ project_root = Path(__file__).parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-import sqlite3
-from datetime import datetime
+from trade_analysis.db.database import DatabaseManager
 
 DB_PATH = str(Path(__file__).parent.parent.parent / 'data' / 'trade_data.db')
 
@@ -41,28 +40,12 @@ def add_159937_prices():
         print("\n⚠️ 暂无价格数据，请从 Wind 终端导出后填入脚本")
         return
 
-    # 保存到数据库
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    inserted = 0
-    for date_str, close_price in prices_data:
-        try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO daily_prices (date, security_code, close_price, created_at)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                date_str,
-                '159937',
-                float(close_price),
-                datetime.now().isoformat()
-            ))
-            inserted += 1
-        except Exception as e:
-            print(f"  保存失败 {date_str}: {e}")
-
-    conn.commit()
-    conn.close()
+    # 保存到数据库（经 DatabaseManager 写入，日期按数据库格式转换）
+    db = DatabaseManager(DB_PATH)
+    inserted = db.save_daily_prices([
+        {'date': date_str, 'security_code': '159937', 'close_price': float(close_price)}
+        for date_str, close_price in prices_data
+    ])
 
     print(f"\n成功保存 {inserted} 条价格记录")
 
@@ -10,7 +10,6 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 import pandas as pd
-from datetime import datetime
 from trade_analysis.db.database import DatabaseManager
 from trade_analysis.services.price_fetcher import PriceFetcher
 import time
@@ -96,27 +95,8 @@ def save_prices_to_db(db: DatabaseManager, prices: list):
     if not prices:
         return
 
-    conn = db._get_connection()
-    cursor = conn.cursor()
-
-    inserted = 0
-    for price in prices:
-        try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO daily_prices (date, security_code, close_price, created_at)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                price['date'],
-                price['security_code'],
-                price['close_price'],
-                datetime.now().isoformat()
-            ))
-            inserted += 1
-        except Exception as e:
-            print(f"  保存失败 {price['security_code']} {price['date']}: {e}")
-
-    conn.commit()
-    conn.close()
+    # 经 DatabaseManager 写入，日期按数据库格式（整数天数）转换
+    inserted = db.save_daily_prices(prices)
     print(f"  已保存 {inserted} 条价格记录")
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ if str(project_root) not in sys.path:
 import pandas as pd
 from trade_analysis.db.database import DatabaseManager
 from trade_analysis.models.profit_calculator import ProfitCalculator
+from trade_analysis.utils.date_utils import day_number_to_timestamp
 import sqlite3
 
 DB_PATH = str(Path(__file__).parent.parent.parent / 'data' / 'trade_data.db')
@@ -47,6 +48,9 @@ def verify():
         count, min_date, max_date = result
 
         if count > 0:
+            # 日期以整数天数存储
+            min_date = day_number_to_timestamp(min_date).strftime('%Y%m%d')
+            max_date = day_number_to_timestamp(max_date).strftime('%Y%m%d')
             print(f"✓ {code} {pos['name']}: {pos['quantity']}股")
             print(f"    价格数据: {count} 天 ({min_date} ~ {max_date})")
         else:
@@ -0,0 +1,418 @@
+"""
+模拟交割单生成器
+
+按券商导出的交割单格式（RecordParser.COLUMN_MAPPING 的中文列）生成任意规模的模拟数据，
+用于基准测试和大数据量下的功能验证。
+
+生成的数据保持内部一致：
+- 剩余金额 = 之前所有发生金额的累加；证券数量 = 该证券成交后的持仓
+- 卖出数量不超过此前买入（每笔卖出对应一笔更早的买入，少量买入保留到期末）
+- 逆回购出借与购回成对出现，购回金额按年化利率和实际天数计息
+- 红利入账、股息红利差异扣税、红股入账落在持有期内；季度结息、银证转账穿插其中
+
+默认输出与真实导出相同的“假 .xls”：GBK 编码、制表符分隔的文本，非证券行的代码/名称/
+股东代码/成交编号为空，扣税行的印花税、过户费为空，回购名称为全角字符（Ｒ-001），
+数值不带多余的小数位。
+
+使用方法:
+    python tools/settlement_generator.py --records 100000 --output data/raw/synthetic_100k.xls
+
+    from trade_analysis.tools.settlement_generator import SyntheticConfig, generate_settlement
+    df = generate_settlement(SyntheticConfig(records=10_000, securities=80))
+"""
+
+import sys
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# 将项目根目录添加到 Python 路径，支持直接运行此文件
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+import pandas as pd
+
+from trade_analysis.models.record_parser import RecordParser
+
+SETTLEMENT_COLUMNS = list(RecordParser.COLUMN_MAPPING)
+
+SH_SHAREHOLDER = 'A841731132'
+SZ_SHAREHOLDER = '0022693339'
+
+# (代码, 名称)；名称与真实导出一致使用全角字母
+REPO_SECURITIES = [('131810', 'Ｒ-001'), ('204001', 'GC001')]
+
+STOCK_PREFIXES = ['600', '601', '603', '605', '688', '000', '002', '300', '301', '159', '510']
+NAME_CHARS = list('华兴中国科技电子新能源医药生物信息智能精密材料控股股份银行证券汽车通信数据航天重工电气')
+
+COMMISSION_RATE = 0.00025
+MIN_COMMISSION = 5.0
+STAMP_TAX_RATE = 0.0005
+TRANSFER_FEE_RATE = 0.00001
+REPO_FEE_RATE = 0.00001
+
+# 同一交割日内的排列顺序
+_DAY_ORDER = {
+    '指定交易': 0, '银行转证券': 1, '融券购回': 2, '证券买入': 3, '证券卖出': 4,
+    '红利入账': 5, '红股入账': 6, '股息红利差异扣税': 7, '利息归本': 8, '证券转银行': 9, '融券回购': 10,
+}
+
+
+@dataclass
+class SyntheticConfig:
+    """
+    模拟数据参数
+
+    Attributes:
+        records: 总记录数（近似，季度结息行按日期区间另加）
+        securities: 股票/ETF 数量，交易频率按排名递减
+        repo_ratio: 逆回购记录（出借 + 购回）占比
+        dividend_ratio: 红利入账记录占比，另有约一半的扣税行和十分之一的红股入账
+        transfer_ratio: 银证转账记录占比
+        open_ratio: 期末仍持有的买入占股票记录的比例
+        start_date: 首个交割日 YYYYMMDD
+        trading_days: 交易日数，None 时按每日约 20 条记录推算（250 ~ 6000）
+        initial_cash: 首笔银行转证券金额
+        seed: 随机种子
+    """
+    records: int = 10_000
+    securities: int = 50
+    repo_ratio: float = 0.3
+    dividend_ratio: float = 0.01
+    transfer_ratio: float = 0.002
+    open_ratio: float = 0.02
+    start_date: str = '20200102'
+    trading_days: Optional[int] = None
+    initial_cash: float = 1_000_000.0
+    seed: int = 0
+
+
+def _security_universe(rng: np.random.Generator, count: int) -> pd.DataFrame:
+    """
+    证券代码、名称、交易所、起始价格
+    """
+    prefixes = rng.choice(STOCK_PREFIXES, size=count * 2)
+    suffixes = rng.integers(0, 1000, size=count * 2)
+    codes = pd.unique(np.array([f'{p}{s:03d}' for p, s in zip(prefixes, suffixes)], dtype=object))
+    while len(codes) < count:
+        extra = np.array([f'{rng.choice(STOCK_PREFIXES)}{rng.integers(0, 1000):03d}' for _ in range(count)], dtype=object)
+        codes = pd.unique(np.concatenate([codes, extra]))
+    codes = codes[:count]
+
+    chars = rng.choice(NAME_CHARS, size=(count, 4))
+    names = [''.join(row) for row in chars]
+    is_fund = np.array([code[:3] in ('159', '510') for code in codes])
+    base = np.exp(rng.normal(np.log(20), 0.8, size=count))
+    base = np.where(is_fund, base / 10, base)
+    return pd.DataFrame({
+        'code': codes,
+        'name': names,
+        'sh': [code[0] in '56' for code in codes],
+        'fund': is_fund,
+        'base': base,
+    })
+
+
+def _fees(amount: np.ndarray, sell: np.ndarray, sh: np.ndarray, fund: np.ndarray) -> tuple:
+    """
+    佣金、印花税（仅股票卖出）、过户费（仅沪市）
+    """
+    commission = np.maximum(np.round(amount * COMMISSION_RATE, 2), MIN_COMMISSION)
+    stamp_tax = np.where(sell & ~fund, np.round(amount * STAMP_TAX_RATE, 2), 0.0)
+    transfer_fee = np.where(sh & ~fund, np.round(amount * TRANSFER_FEE_RATE, 2), 0.0)
+    return commission, stamp_tax, transfer_fee
+
+
+def generate_settlement(config: SyntheticConfig = None) -> pd.DataFrame:
+    """
+    生成模拟交割单
+
+    Returns:
+        DataFrame，列为 SETTLEMENT_COLUMNS（中文列名），数值列为数值类型，空字段为 NaN
+    """
+    config = config or SyntheticConfig()
+    rng = np.random.default_rng(config.seed)
+
+    n_days = config.trading_days or int(np.clip(config.records // 20, 250, 6000))
+    days = pd.bdate_range(pd.to_datetime(config.start_date, format='%Y%m%d'), periods=n_days)
+
+    n_repo_pairs = int(config.records * config.repo_ratio) // 2
+    n_dividend = int(config.records * config.dividend_ratio)
+    n_tax = n_dividend // 2
+    n_bonus = n_dividend // 10
+    n_transfer = int(config.records * config.transfer_ratio)
+    n_stock = max(config.records - 2 * n_repo_pairs - n_dividend - n_tax - n_bonus - n_transfer - 2, 2)
+    n_open = max(int(n_stock * config.open_ratio), 1)
+    n_trips = (n_stock - n_open) // 2
+    n_open = n_stock - 2 * n_trips
+
+    frames = []
+
+    # 股票买卖：每笔卖出对应一笔更早的买入，交易频率按证券排名递减
+    universe = _security_universe(rng, config.securities)
+    weights = 1 / np.arange(1, len(universe) + 1)
+    walk = np.cumsum(rng.normal(0, 0.02, size=(len(universe), n_days)), axis=1)
+
+    n_buys = n_trips + n_open
+    security = rng.choice(len(universe), size=n_buys, p=weights / weights.sum())
+    buy_day = rng.integers(0, n_days - 1, size=n_buys)
+    hold = np.minimum(rng.geometric(0.08, size=n_trips), n_days - 1 - buy_day[:n_trips])
+    sell_day = buy_day[:n_trips] + np.maximum(hold, 1)
+
+    sec = universe.iloc[np.concatenate([security, security[:n_trips]])].reset_index(drop=True)
+    day = np.concatenate([buy_day, sell_day])
+    sell = np.concatenate([np.zeros(n_buys, dtype=bool), np.ones(n_trips, dtype=bool)])
+    tick = np.where(sec['fund'], 1000, 100)
+    price = np.round(sec['base'].to_numpy() * np.exp(walk[np.concatenate([security, security[:n_trips]]), day]) * tick) / tick
+    lots = rng.integers(1, 50, size=n_buys) * np.where(universe['fund'].to_numpy()[security], 1000, 100)
+    quantity = np.concatenate([lots, lots[:n_trips]])
+    amount = np.round(price * quantity, 2)
+    commission, stamp_tax, transfer_fee = _fees(amount, sell, sec['sh'].to_numpy(), sec['fund'].to_numpy())
+    fees = commission + stamp_tax + transfer_fee
+    frames.append(pd.DataFrame({
+        'day': day,
+        '证券代码': sec['code'],
+        '证券名称': sec['name'],
+        '业务类型': np.where(sell, '证券卖出', '证券买入'),
+        '成交价格': price,
+        '成交数量': quantity,
+        '成交金额': amount,
+        '佣金': commission,
+        '印花税': stamp_tax,
+        '过户费': transfer_fee,
+        '发生金额': np.where(sell, amount - fees, -(amount + fees)),
+        'sh': sec['sh'],
+        '证券全称': sec['name'],
+        '备注': np.where(sell, '证券卖出', '证券买入'),
+        'traded': True,
+    }))
+
+    # 红利、扣税、红股：落在已平仓交易的持有期内
+    if n_dividend and n_trips:
+        trip = rng.integers(0, n_trips, size=n_dividend)
+        div_day = np.minimum(buy_day[trip] + 1, sell_day[trip])
+        div_sec = universe.iloc[security[trip]].reset_index(drop=True)
+        cash = np.round(lots[trip] * price[trip] * rng.uniform(0.005, 0.03, size=n_dividend), 2)
+        frames.append(pd.DataFrame({
+            'day': div_day,
+            '证券代码': div_sec['code'],
+            '证券名称': div_sec['name'],
+            '业务类型': '红利入账',
+            '成交价格': 0.0,
+            '成交数量': lots[trip],
+            '成交金额': cash,
+            '佣金': 0.0, '印花税': 0.0, '过户费': 0.0,
+            '发生金额': cash,
+            'sh': div_sec['sh'],
+            '证券全称': div_sec['name'],
+            '备注': '红利入账',
+        }))
+
+        tax_rate = rng.choice([0.1, 0.2], size=n_tax)
+        tax = np.round(cash[:n_tax] * tax_rate, 2)
+        tax_day = np.minimum(div_day[:n_tax] + 3, n_days - 1)
+        remark = [
+            f'{days[d0].strftime("%Y%m%d")},{days[d1].strftime("%Y%m%d")},{code},{t:.2f}'
+            for d0, d1, code, t in zip(div_day[:n_tax], tax_day, div_sec['code'][:n_tax], tax)
+        ]
+        frames.append(pd.DataFrame({
+            'day': tax_day,
+            '证券代码': div_sec['code'][:n_tax],
+            '证券名称': div_sec['name'][:n_tax],
+            '业务类型': '股息红利差异扣税',
+            '成交价格': 0.0, '成交数量': 0, '成交金额': 0.0, '佣金': 0.0,
+            # 真实导出中扣税行的印花税、过户费为空
+            '印花税': np.nan, '过户费': np.nan,
+            '发生金额': -tax,
+            'sh': div_sec['sh'][:n_tax],
+            '证券全称': div_sec['name'][:n_tax],
+            '备注': remark,
+        }))
+
+        bonus = np.maximum(lots[trip[:n_bonus]] // 10, 1)
+        frames.append(pd.DataFrame({
+            'day': div_day[:n_bonus],
+            '证券代码': div_sec['code'][:n_bonus],
+            '证券名称': div_sec['name'][:n_bonus],
+            '业务类型': '红股入账',
+            '成交价格': 0.0,
+            '成交数量': bonus,
+            '成交金额': 0.0, '佣金': 0.0, '印花税': 0.0, '过户费': 0.0, '发生金额': 0.0,
+            'sh': div_sec['sh'][:n_bonus],
+            '证券全称': div_sec['name'][:n_bonus],
+            '备注': '红股入帐',
+            'traded': True,
+        }))
+
+    # 逆回购：出借次一交易日购回
+    if n_repo_pairs:
+        choice = rng.choice(len(REPO_SECURITIES), size=n_repo_pairs, p=[0.7, 0.3])
+        repo_code = np.array([REPO_SECURITIES[i][0] for i in choice], dtype=object)
+        repo_name = np.array([REPO_SECURITIES[i][1] for i in choice], dtype=object)
+        lend_day = rng.integers(0, n_days - 1, size=n_repo_pairs)
+        return_day = lend_day + 1
+        rate = np.round(np.clip(rng.normal(2.0, 0.6, size=n_repo_pairs), 0.5, 8.0), 3)
+        repo_qty = rng.integers(10, 6000, size=n_repo_pairs) * 10
+        principal = repo_qty * 100.0
+        calendar_days = (days[return_day] - days[lend_day]).days.to_numpy()
+        repaid = np.round(principal * (1 + rate / 100 * calendar_days / 365), 2)
+        fee = np.round(principal * REPO_FEE_RATE, 2)
+        repo_sh = np.array([code.startswith('204') for code in repo_code])
+        for kind, when, value, net, remark in [
+            ('融券回购', lend_day, principal, -(principal + fee), '卖出融券'),
+            ('融券购回', return_day, repaid, repaid, '融券购回'),
+        ]:
+            frames.append(pd.DataFrame({
+                'day': when,
+                '证券代码': repo_code,
+                '证券名称': repo_name,
+                '业务类型': kind,
+                '成交价格': rate,
+                '成交数量': repo_qty,
+                '成交金额': value,
+                '佣金': fee if kind == '融券回购' else 0.0,
+                '印花税': 0.0, '过户费': 0.0,
+                '发生金额': net,
+                'sh': repo_sh,
+                '证券全称': repo_name,
+                '备注': remark,
+                'traded': True,
+            }))
+
+    # 季度结息（3/6/9/12 月 20 日后的首个交易日）与银证转账
+    quarters = pd.date_range(days[0], days[-1], freq='QS-MAR') + pd.Timedelta(days=19)
+    interest_day = np.unique(days.searchsorted(quarters))
+    interest_day = interest_day[interest_day < n_days]
+    transfer_day = rng.integers(1, n_days, size=n_transfer)
+    transfer_amount = rng.integers(1, 20, size=n_transfer) * 10_000.0
+    transfer_in = rng.random(n_transfer) < 0.5
+    frames.append(pd.DataFrame({
+        'day': np.concatenate([[0], transfer_day, interest_day]),
+        '业务类型': np.concatenate([
+            ['银行转证券'], np.where(transfer_in, '银行转证券', '证券转银行'), ['利息归本'] * len(interest_day)
+        ]),
+        '发生金额': np.concatenate([
+            [config.initial_cash],
+            np.where(transfer_in, transfer_amount, -transfer_amount),
+            np.round(rng.uniform(5, 200, size=len(interest_day)), 2),
+        ]),
+        '成交价格': 0.0, '成交数量': 0, '成交金额': 0.0, '佣金': 0.0, '过户费': 0.0,
+        '备注': [None] * (1 + n_transfer) + [
+            f'99.批量结息,批号:{3000000 + i * 97}' for i in range(len(interest_day))
+        ],
+    }))
+
+    frames.insert(0, pd.DataFrame({
+        'day': [0], '证券代码': ['799999'], '证券名称': ['指定登记'], '业务类型': ['指定交易'],
+        '成交价格': [0.0], '成交数量': [0], '成交金额': [0.0], '佣金': [0.0], '印花税': [0.0], '过户费': [0.0],
+        '发生金额': [0.0], 'sh': [True], '证券全称': ['指定登记'], '备注': ['指定交易'],
+    }))
+
+    df = pd.concat(frames, ignore_index=True)
+    df['order'] = df['业务类型'].map(_DAY_ORDER)
+    df = df.sort_values(['day', 'order'], kind='mergesort').reset_index(drop=True)
+
+    df['交割日期'] = days[df['day'].to_numpy()].strftime('%Y%m%d')
+    df['清算费（B股）'] = 0.0
+    df['剩余金额'] = np.round(df['发生金额'].cumsum(), 2)
+
+    # 证券数量：该证券成交后的持仓，非成交行为 0
+    signed = df['成交数量'].where(df['业务类型'].isin(['证券买入', '红股入账']), 0)
+    signed = signed - df['成交数量'].where(df['业务类型'] == '证券卖出', 0)
+    stock_rows = df['业务类型'].isin(['证券买入', '证券卖出', '红股入账'])
+    df['证券数量'] = 0
+    df.loc[stock_rows, '证券数量'] = signed[stock_rows].groupby(df.loc[stock_rows, '证券代码']).cumsum()
+
+    has_code = df['证券代码'].notna()
+    # 现金流水行没有 sh、traded（object 列中的 NaN），按 False 处理
+    sh = df['sh'].eq(True)
+    df['股东代码'] = np.where(has_code, np.where(sh, SH_SHAREHOLDER, SZ_SHAREHOLDER), None)
+    df['币种'] = '人民币'
+    traded = df['traded'].eq(True) & (df['业务类型'] != '红股入账')
+    serial = np.arange(len(df))
+    df['成交编号'] = np.where(
+        traded,
+        np.where(sh, np.char.add('007', np.char.zfill(serial.astype(str), 7)),
+                 np.char.add('CK', np.char.zfill(serial.astype(str), 8))),
+        None,
+    )
+    df.loc[df['业务类型'] == '指定交易', '成交编号'] = '0056000087'
+    df['成交编号'] = df['成交编号'].where(df['成交编号'].notna(), np.nan)
+    df['股东代码'] = df['股东代码'].where(df['股东代码'].notna(), np.nan)
+
+    return df[SETTLEMENT_COLUMNS]
+
+
+def _format_number(values: pd.Series) -> np.ndarray:
+    """
+    按真实导出的样式输出数值：最多 3 位小数，去掉末尾的 0 和小数点，空值为空字符串
+    """
+    array = values.to_numpy(dtype=float)
+    text = np.char.mod('%.3f', np.nan_to_num(array))
+    text = np.char.rstrip(np.char.rstrip(text, '0'), '.')
+    text = np.where(text == '-0', '0', text)
+    return np.where(np.isnan(array), '', text)
+
+
+NUMERIC_COLUMNS = ['成交价格', '成交数量', '成交金额', '佣金', '印花税', '过户费', '清算费（B股）', '发生金额', '剩余金额', '证券数量']
+
+
+def write_settlement(df: pd.DataFrame, path: str, fmt: Optional[str] = None) -> str:
+    """
+    写出交割单文件
+
+    Args:
+        df: generate_settlement 的结果
+        path: 输出路径
+        fmt: 'xls'（GBK 制表符文本，与真实导出相同）、'csv'（UTF-8）或 'xlsx'，默认按扩展名
+
+    Returns:
+        输出路径
+    """
+    fmt = fmt or Path(path).suffix.lstrip('.').lower()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == 'xlsx':
+        df.to_excel(path, index=False)
+        return path
+
+    text = df.copy()
+    for col in NUMERIC_COLUMNS:
+        text[col] = _format_number(text[col])
+    if fmt == 'xls':
+        text.to_csv(path, sep='\t', index=False, encoding='gbk', lineterminator='\n')
+    elif fmt == 'csv':
+        text.to_csv(path, index=False, encoding='utf-8')
+    else:
+        raise ValueError(f"不支持的输出格式: {fmt}")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成模拟交割单')
+    parser.add_argument('--records', '-n', type=int, default=10_000, help='记录数')
+    parser.add_argument('--securities', type=int, default=50, help='证券数量')
+    parser.add_argument('--repo-ratio', type=float, default=0.3, help='逆回购记录占比')
+    parser.add_argument('--dividend-ratio', type=float, default=0.01, help='红利记录占比')
+    parser.add_argument('--start', type=str, default='20200102', help='首个交割日 YYYYMMDD')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--output', '-o', type=str, required=True, help='输出文件（.xls/.csv/.xlsx）')
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        records=args.records,
+        securities=args.securities,
+        repo_ratio=args.repo_ratio,
+        dividend_ratio=args.dividend_ratio,
+        start_date=args.start,
+        seed=args.seed,
+    )
+    df = generate_settlement(config)
+    print(f"生成 {len(df)} 条记录: {write_settlement(df, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
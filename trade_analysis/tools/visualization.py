@@ -2,6 +2,10 @@ import pandas as pd
 import numpy as np
 from typing import Optional, List, Dict, Any
 from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import pickle
 import warnings
 
 try:
@@ -19,12 +23,184 @@ try:
 except ImportError:
     HAS_SEABORN = False
 
+# 资金曲线超过该点数时用 LTTB 降采样后再绘制
+MAX_CURVE_POINTS = 2000
+
+# 图表缓存：PNG 旁的哈希文件后缀；修改绘图代码后递增版本使旧缓存失效
+CHART_HASH_SUFFIX = '.sha256'
+CHART_CACHE_VERSION = 1
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样
+
+    保留首尾两点，其余点均分为 threshold - 2 个桶，每个桶选出与
+    上一个选中点、下一个桶均值构成三角形面积最大的点，折线形状（尖峰、回撤谷底）基本不变。
+
+    Args:
+        x: 横坐标（数值，日期需先转为整数）
+        y: 纵坐标
+        threshold: 目标点数
+
+    Returns:
+        选中点的位置（升序）
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+
+    return selected
+
+
+def _hash_value(digest, value) -> None:
+    """
+    把图表输入写入哈希：DataFrame/Series 按内容逐行哈希，其余对象 pickle
+    """
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(repr(list(value.dtypes.astype(str))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}:{len(value)}'.encode())
+        for item in value:
+            _hash_value(digest, item)
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(repr(key).encode())
+            _hash_value(digest, value[key])
+    else:
+        digest.update(pickle.dumps(value))
+
+
+@dataclass
+class ChartJob:
+    """
+    批量绘图任务
+
+    Attributes:
+        method: Visualizer 绘图方法名，如 'plot_balance_curve'
+        save_path: 输出文件名（相对 output_dir）
+        args: 位置参数
+        kwargs: 关键字参数
+    """
+    method: str
+    save_path: str
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def content_hash(self) -> str:
+        digest = hashlib.sha256(f'{CHART_CACHE_VERSION}:{self.method}'.encode())
+        _hash_value(digest, self.args)
+        _hash_value(digest, self.kwargs)
+        return digest.hexdigest()
+
+
+def _init_render_worker() -> None:
+    """绘图子进程使用非交互的 Agg 后端"""
+    if HAS_MATPLOTLIB:
+        plt.switch_backend('Agg')
+
+
+def _render_job(output_dir: str, job: ChartJob) -> Optional[str]:
+    """在子进程中执行一个绘图任务（模块级函数，便于进程池序列化）"""
+    visualizer = Visualizer(output_dir)
+    return getattr(visualizer, job.method)(*job.args, save_path=job.save_path, **job.kwargs)
+
 
 class Visualizer:
     def __init__(self, output_dir: str = './output'):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+    def _cache_file(self, save_path: str) -> Path:
+        return self.output_dir / (save_path + CHART_HASH_SUFFIX)
+
+    def is_cached(self, job: ChartJob, content_hash: Optional[str] = None) -> bool:
+        """
+        输出 PNG 存在且记录的输入哈希与本次相同
+        """
+        cache_file = self._cache_file(job.save_path)
+        if not (self.output_dir / job.save_path).exists() or not cache_file.exists():
+            return False
+        return cache_file.read_text().strip() == (content_hash or job.content_hash())
+
+    def render_batch(self, jobs: List[ChartJob], max_workers: Optional[int] = None,
+                     force: bool = False) -> Dict[str, Optional[str]]:
+        """
+        批量绘图：输入哈希未变的图表直接复用已有 PNG，其余在进程池中用 Agg 后端绘制
+
+        Args:
+            jobs: 绘图任务列表
+            max_workers: 进程数，1 表示在当前进程中依次绘制，None 为 CPU 核数
+            force: 忽略缓存全部重绘
+
+        Returns:
+            {save_path: 输出文件路径}，绘制失败或没有数据时为 None
+        """
+        results: Dict[str, Optional[str]] = {}
+        pending = []
+        for job in jobs:
+            content_hash = job.content_hash()
+            if not force and self.is_cached(job, content_hash):
+                results[job.save_path] = str(self.output_dir / job.save_path)
+            else:
+                pending.append((job, content_hash))
+
+        if not pending:
+            return results
+
+        executor = None
+        if max_workers != 1 and len(pending) > 1:
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker)
+
+        try:
+            if executor is None:
+                outcomes = [(job, content_hash, None) for job, content_hash in pending]
+            else:
+                outcomes = [
+                    (job, content_hash, executor.submit(_render_job, str(self.output_dir), job))
+                    for job, content_hash in pending
+                ]
+
+            for job, content_hash, future in outcomes:
+                try:
+                    path = future.result() if future is not None else _render_job(str(self.output_dir), job)
+                except Exception as e:
+                    warnings.warn(f"绘制 {job.save_path} 失败: {e}")
+                    path = None
+                results[job.save_path] = path
+                if path is not None:
+                    self._cache_file(job.save_path).write_text(content_hash)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return results
+
     def plot_balance_curve(self, balance_df: pd.DataFrame, save_path: Optional[str] = None) -> Optional[str]:
         if not HAS_MATPLOTLIB:
             print("Warning: matplotlib is required for visualization")
@@ -33,6 +209,10 @@ class Visualizer:
         if balance_df.empty:
             return None
 
+        if len(balance_df) > MAX_CURVE_POINTS:
+            dates = pd.to_datetime(balance_df['日期']).to_numpy().astype('datetime64[s]').astype(np.int64)
+            balance_df = balance_df.iloc[lttb_downsample(dates, balance_df['账户余额'].to_numpy(), MAX_CURVE_POINTS)]
+
         fig, ax = plt.subplots(figsize=(12, 6))
 
         ax.plot(balance_df['日期'], balance_df['账户余额'], linewidth=1.5, color='#4472C4')
@@ -208,3 +388,95 @@ class Visualizer:
             plt.show()
             plt.close()
             return None
+
+    def plot_rolling_metrics(self, rolling_df: pd.DataFrame, save_path: Optional[str] = None) -> Optional[str]:
+        if not HAS_MATPLOTLIB:
+            print("Warning: matplotlib is required for visualization")
+            return None
+
+        if rolling_df is None or rolling_df.empty:
+            return None
+
+        windows = [int(col.rsplit('_', 1)[1]) for col in rolling_df.columns if col.startswith('sharpe_')]
+        panels = [
+            ('sharpe', '滚动夏普比率'),
+            ('volatility', '滚动年化波动率 (%)'),
+            ('drawdown', '滚动回撤 (%)'),
+        ]
+        colors = ['#4472C4', '#ED7D31', '#70AD47', '#7030A0']
+
+        fig, axes = plt.subplots(len(panels), 1, figsize=(12, 10), sharex=True)
+
+        for ax, (metric, title) in zip(axes, panels):
+            for i, window in enumerate(windows):
+                ax.plot(rolling_df['date'], rolling_df[f'{metric}_{window}'],
+                        linewidth=1.2, color=colors[i % len(colors)], label=f'{window}日')
+            ax.set_title(title, fontsize=12, fontweight='bold')
+            ax.grid(True, alpha=0.3)
+            ax.legend(loc='upper left', fontsize=9)
+
+        axes[0].axhline(y=0, color='black', linewidth=0.5)
+        axes[-1].invert_yaxis()
+        axes[-1].xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+        axes[-1].xaxis.set_major_locator(mdates.MonthLocator(interval=3))
+        plt.xticks(rotation=45)
+
+        plt.tight_layout()
+
+        if save_path:
+            filepath = self.output_dir / save_path
+            plt.savefig(filepath, dpi=150, bbox_inches='tight')
+            plt.close()
+            return str(filepath)
+        else:
+            plt.show()
+            plt.close()
+            return None
+
+    def plot_position_history(self, history_df: pd.DataFrame, top_n: int = 8,
+                              save_path: Optional[str] = None) -> Optional[str]:
+        if not HAS_MATPLOTLIB:
+            print("Warning: matplotlib is required for visualization")
+            return None
+
+        if history_df is None or history_df.empty:
+            return None
+
+        # 按日期 x 证券展开持仓成本，成本最大的 top_n 只单列，其余合并为“其他”
+        cost = history_df.pivot_table(index='date', columns='security_name', values='cost', aggfunc='sum', fill_value=0)
+        top = cost.max().nlargest(top_n).index
+        others = cost.columns.difference(top)
+        cost = cost[top]
+        if len(others):
+            cost = cost.assign(其他=history_df[history_df['security_name'].isin(others)]
+                               .groupby('date')['cost'].sum()).fillna(0)
+
+        fig, ax = plt.subplots(figsize=(14, 6))
+
+        x = range(len(cost))
+        bottom = np.zeros(len(cost))
+        for name in cost.columns:
+            ax.bar(x, cost[name], bottom=bottom, label=name, alpha=0.85)
+            bottom += cost[name].to_numpy()
+
+        ax.set_xticks(x)
+        ax.set_xticklabels(cost.index.strftime('%Y-%m'), rotation=45, ha='right')
+
+        ax.set_title('月末持仓成本', fontsize=14, fontweight='bold')
+        ax.set_xlabel('月份', fontsize=12)
+        ax.set_ylabel('持仓成本 (元)', fontsize=12)
+        ax.legend(loc='upper left', fontsize=9)
+
+        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:,.0f}'))
+
+        plt.tight_layout()
+
+        if save_path:
+            filepath = self.output_dir / save_path
+            plt.savefig(filepath, dpi=150, bbox_inches='tight')
+            plt.close()
+            return str(filepath)
+        else:
+            plt.show()
+            plt.close()
+            return None
@@ -1,5 +1,9 @@
 from .code_formatter import format_security_code, normalize_user_code
-from .date_utils import parse_date, format_date, validate_date_range
+from .date_utils import (
+    parse_date, format_date, validate_date_range,
+    to_day_number, dates_to_day_numbers, day_numbers_to_datetime, day_number_to_timestamp,
+)
+from .profiler import PROFILER, Profiler, profiled
 
 __all__ = [
     'format_security_code',
@@ -7,4 +11,11 @@ __all__ = [
     'parse_date',
     'format_date',
     'validate_date_range',
+    'to_day_number',
+    'dates_to_day_numbers',
+    'day_numbers_to_datetime',
+    'day_number_to_timestamp',
+    'PROFILER',
+    'Profiler',
+    'profiled',
 ]
@@ -1,5 +1,10 @@
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_NS_PER_DAY = 86_400_000_000_000
 
 
 def parse_date(date_str: str) -> datetime:
@@ -110,3 +115,45 @@ def get_trading_days(start_date: str, end_date: str) -> list:
         current += timedelta(days=1)
     
     return trading_days
+
+
+def to_day_number(date: Any) -> int:
+    """
+    日期转换为整数天数（距 1970-01-01 的天数，数据库中日期列的存储格式）
+    
+    Args:
+        date: 'YYYYMMDD'（字符串或整数）、'YYYY-MM-DD'、datetime、Timestamp 或 numpy datetime64
+        
+    Returns:
+        天数
+    """
+    if isinstance(date, (int, np.integer)) and not isinstance(date, bool):
+        date = str(date)
+    if isinstance(date, str) and len(date) == 8 and date.isdigit():
+        date = datetime.strptime(date, '%Y%m%d')
+    return int(pd.Timestamp(date).normalize().value // _NS_PER_DAY)
+
+
+def dates_to_day_numbers(dates: pd.Series) -> np.ndarray:
+    """
+    日期列批量转换为整数天数；datetime64 列直接按天截断，不经过字符串
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+    return np.fromiter((to_day_number(d) for d in dates), dtype=np.int64, count=len(dates))
+
+
+def day_numbers_to_datetime(days: Any) -> np.ndarray:
+    """
+    整数天数批量转换为 datetime64[s]（数据库读出的日期列）
+    """
+    return np.asarray(days, dtype=np.int64).astype('datetime64[D]').astype('datetime64[s]')
+
+
+def day_number_to_timestamp(day: Any) -> Optional[pd.Timestamp]:
+    """
+    单个整数天数转换为 Timestamp，空值返回 None
+    """
+    if day is None or pd.isna(day):
+        return None
+    return pd.Timestamp(int(day), unit='D')
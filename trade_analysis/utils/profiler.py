@@ -0,0 +1,314 @@
+"""
+分析流程分阶段计时
+
+在文件读取、清洗、数据库读写、行情获取、FIFO、资产曲线、报告生成等阶段埋点，
+统计每个阶段的调用次数、累计/最大耗时、读写字节数，可选用 tracemalloc 记录各阶段峰值内存。
+
+默认关闭，关闭时埋点只有一次属性判断的开销。
+
+使用方法:
+    from trade_analysis.utils.profiler import PROFILER
+
+    PROFILER.enable(memory=True)
+    ...  # 运行分析
+    print(PROFILER.format_table())
+    PROFILER.dump_json('profile.json')
+
+埋点:
+    with PROFILER.span('analyzer.fifo'):
+        ...
+
+    @profiled('db.load_trade_records', nbytes=frame_nbytes)
+    def load_trade_records(self, ...):
+        ...
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+PROFILE_COLUMNS = ['stage', 'calls', 'total_seconds', 'mean_seconds', 'max_seconds', 'bytes', 'peak_memory']
+
+
+@dataclass
+class StageStats:
+    """
+    单个阶段的累计统计
+
+    Attributes:
+        calls: 调用次数
+        total_seconds: 累计耗时（嵌套阶段的耗时同时计入外层）
+        max_seconds: 单次最大耗时
+        bytes: 读写的数据量（字节）
+        peak_memory: 单次调用期间相对开始时的最大新增内存（字节），未开启内存跟踪时为 0
+    """
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes: int = 0
+    peak_memory: int = 0
+
+    def merge(self, other: 'StageStats') -> None:
+        self.calls += other.calls
+        self.total_seconds += other.total_seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.bytes += other.bytes
+        self.peak_memory = max(self.peak_memory, other.peak_memory)
+
+
+class _Span:
+    """
+    计时区间，退出时写入 Profiler；可在区间内通过 add_bytes 补记数据量
+    """
+
+    __slots__ = ('profiler', 'name', 'nbytes', 'started', 'memory_base')
+
+    def __init__(self, profiler: 'Profiler', name: str, nbytes: int = 0):
+        self.profiler = profiler
+        self.name = name
+        self.nbytes = nbytes
+
+    def add_bytes(self, nbytes: int) -> None:
+        self.nbytes += int(nbytes)
+
+    def __enter__(self) -> '_Span':
+        self.memory_base = self.profiler._memory_enter()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        elapsed = time.perf_counter() - self.started
+        peak = self.profiler._memory_exit(self.memory_base)
+        self.profiler.record(self.name, elapsed, self.nbytes, peak)
+
+
+class _NullSpan:
+    """
+    关闭时使用的空区间
+    """
+
+    __slots__ = ()
+
+    def add_bytes(self, nbytes: int) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    阶段计时器
+
+    Attributes:
+        enabled: 是否记录
+        memory: 是否用 tracemalloc 记录峰值内存
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self._stats: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    def enable(self, memory: bool = False) -> None:
+        """
+        开始记录；memory 为 True 时启动 tracemalloc（会使被测代码明显变慢）
+        """
+        self.enabled = True
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def disable(self) -> None:
+        """
+        停止记录，已记录的数据保留
+        """
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.memory = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def span(self, name: str, nbytes: int = 0):
+        """
+        计时区间（上下文管理器），关闭时返回空区间
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, nbytes)
+
+    def record(self, name: str, seconds: float, nbytes: int = 0, peak_memory: int = 0) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.bytes += int(nbytes)
+            stats.peak_memory = max(stats.peak_memory, int(peak_memory))
+
+    def _memory_enter(self) -> Optional[int]:
+        """
+        嵌套区间共享 tracemalloc 的峰值：进入时重置峰值，
+        退出时把本区间的峰值并入外层区间，外层退出时取两者较大值
+        """
+        if not self.memory or not tracemalloc.is_tracing():
+            return None
+        stack = self._memory_stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        stack.append(0)
+        tracemalloc.reset_peak()
+        return current
+
+    def _memory_exit(self, base: Optional[int]) -> int:
+        if base is None or not tracemalloc.is_tracing():
+            return 0
+        stack = self._memory_stack()
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, stack.pop() if stack else 0)
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        return max(peak - base, 0)
+
+    def _memory_stack(self) -> List[int]:
+        stack = getattr(self._local, 'memory_stack', None)
+        if stack is None:
+            stack = self._local.memory_stack = []
+        return stack
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        当前统计 {阶段: StageStats 字段}，可 pickle / JSON 序列化（用于跨进程汇总）
+        """
+        with self._lock:
+            return {name: asdict(stats) for name, stats in self._stats.items()}
+
+    def merge(self, snapshot: Dict[str, Dict[str, Any]]) -> None:
+        """
+        并入其它进程的 snapshot
+        """
+        with self._lock:
+            for name, values in snapshot.items():
+                self._stats.setdefault(name, StageStats()).merge(StageStats(**values))
+
+    def report(self) -> pd.DataFrame:
+        """
+        按累计耗时从大到小排序的阶段表，列见 PROFILE_COLUMNS
+        """
+        rows = [
+            {
+                'stage': name,
+                'calls': stats['calls'],
+                'total_seconds': stats['total_seconds'],
+                'mean_seconds': stats['total_seconds'] / stats['calls'] if stats['calls'] else 0.0,
+                'max_seconds': stats['max_seconds'],
+                'bytes': stats['bytes'],
+                'peak_memory': stats['peak_memory'],
+            }
+            for name, stats in self.snapshot().items()
+        ]
+        table = pd.DataFrame(rows, columns=PROFILE_COLUMNS)
+        return table.sort_values('total_seconds', ascending=False, kind='mergesort').reset_index(drop=True)
+
+    def format_table(self) -> str:
+        """
+        控制台输出的阶段耗时表
+        """
+        table = self.report()
+        if table.empty:
+            return "（没有记录到任何阶段）"
+        lines = [f"{'阶段':<32}{'次数':>8}{'累计(s)':>12}{'平均(ms)':>12}{'最大(ms)':>12}{'数据量':>12}{'峰值内存':>12}"]
+        for row in table.itertuples(index=False):
+            lines.append(
+                f"{row.stage:<34}{row.calls:>8}{row.total_seconds:>12.3f}{row.mean_seconds * 1000:>12.1f}"
+                f"{row.max_seconds * 1000:>12.1f}{format_bytes(row.bytes):>12}{format_bytes(row.peak_memory):>12}"
+            )
+        return "\n".join(lines)
+
+    def dump_json(self, path: str) -> str:
+        """
+        写出 JSON：{'memory': bool, 'stages': [按累计耗时排序的阶段]}
+        """
+        payload = {'memory': self.memory, 'stages': self.report().to_dict(orient='records')}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        return path
+
+
+PROFILER = Profiler()
+
+
+def profiled(name: str, nbytes: Optional[Callable[..., int]] = None) -> Callable:
+    """
+    函数计时装饰器
+
+    Args:
+        name: 阶段名
+        nbytes: nbytes(result, *args, **kwargs) -> 字节数，用于记录数据量
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.span(name) as span:
+                result = func(*args, **kwargs)
+                if nbytes is not None:
+                    try:
+                        span.add_bytes(nbytes(result, *args, **kwargs) or 0)
+                    except Exception:
+                        pass
+                return result
+        return wrapper
+    return decorator
+
+
+def frame_nbytes(result: Any, *args, **kwargs) -> int:
+    """
+    DataFrame 结果的内存占用（不含字符串对象本身，避免统计本身成为开销）
+    """
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=False).sum())
+    return 0
+
+
+def file_nbytes(path: Any) -> int:
+    """
+    文件大小，文件不存在时为 0
+    """
+    try:
+        return os.path.getsize(path) if path else 0
+    except OSError:
+        return 0
+
+
+def format_bytes(n: float) -> str:
+    if not n:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.0f}{unit}" if unit == 'B' else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"